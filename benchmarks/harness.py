@@ -0,0 +1,182 @@
+"""
+Micro-benchmark harness: warmup, timed iterations, summary statistics and baseline checks.
+
+Kept free of config.py imports so a benchmark module can point config at a local
+fixture site before the page objects are imported.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+# A benchmark regresses when its median exceeds the baseline median by this fraction
+DEFAULT_THRESHOLD = 0.25
+
+
+class Benchmark:
+    """A named operation and the per-iteration setup excluded from its timing"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], object],
+        setup: Optional[Callable[[], object]] = None,
+        prepare: Optional[Callable[[], object]] = None,
+    ):
+        """
+        Initialize benchmark
+
+        Args:
+            name: Unique name, e.g. "JobListingPage.verify_job_listings_content[1000]"
+            func: Operation to time
+            setup: Runs before every iteration, untimed (e.g. reload the page the operation navigates away from)
+            prepare: Runs once before the warmup iterations, untimed
+        """
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.prepare = prepare
+
+
+def summarize(samples: List[float]) -> dict:
+    """
+    Summary statistics of timing samples in seconds
+
+    Args:
+        samples: Durations of the timed iterations
+
+    Returns:
+        iterations, mean, stddev, min, max, p50, p95 and p99
+    """
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {
+        "iterations": len(samples),
+        "mean": statistics.fmean(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+    }
+
+
+def run_benchmark(benchmark: Benchmark, iterations: int = 20, warmup: int = 3) -> dict:
+    """
+    Time a benchmark after warming it up
+
+    Args:
+        benchmark: Benchmark to run
+        iterations: Timed iterations
+        warmup: Untimed iterations first, to fill caches and JIT the in-page scripts
+
+    Returns:
+        summarize() of the timed iterations
+    """
+    if benchmark.prepare:
+        benchmark.prepare()
+    samples = []
+    for i in range(warmup + iterations):
+        if benchmark.setup:
+            benchmark.setup()
+        start = time.perf_counter()
+        benchmark.func()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"environment": {}, "benchmarks": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, results: Dict[str, dict], environment: dict):
+    """Write results as the new baselines, keeping entries for benchmarks that were not run"""
+    baselines = load_baselines(path)
+    baselines["environment"] = environment
+    baselines["benchmarks"].update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def environment_info(**extra) -> dict:
+    """Machine description stored with the baselines, timings only compare on similar machines"""
+    return dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        processor=platform.processor() or platform.machine(),
+        cpus=os.cpu_count(),
+        **extra,
+    )
+
+
+def compare_to_baselines(results: Dict[str, dict], baselines: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Compare medians against the stored baselines
+
+    Args:
+        results: Benchmark name to summarize() output
+        baselines: load_baselines() output
+        threshold: Allowed relative increase of the median
+
+    Returns:
+        One row per benchmark with name, p50, baseline_p50, change and status
+        ("ok", "regressed", "improved" or "new")
+    """
+    rows = []
+    for name, result in results.items():
+        baseline = baselines["benchmarks"].get(name)
+        if baseline is None:
+            rows.append({"name": name, "p50": result["p50"], "baseline_p50": None, "change": None, "status": "new"})
+            continue
+        change = (result["p50"] - baseline["p50"]) / baseline["p50"]
+        if change > threshold:
+            status = "regressed"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "p50": result["p50"], "baseline_p50": baseline["p50"], "change": change, "status": status})
+    return rows
+
+
+def failed_benchmarks(comparison: List[dict], require_baselines: bool = False) -> List[str]:
+    """
+    Names of the benchmarks that fail the run
+
+    Args:
+        comparison: compare_to_baselines() output
+        require_baselines: Also fail benchmarks without a baseline, so an empty or stale
+            baselines file cannot pass silently
+
+    Returns:
+        Regressed benchmarks, plus the new ones when baselines are required
+    """
+    failing = {"regressed", "new"} if require_baselines else {"regressed"}
+    return [row["name"] for row in comparison if row["status"] in failing]
+
+
+def format_results(results: Dict[str, dict], comparison: List[dict]) -> str:
+    """Plain-text table of the results and their baseline comparison, times in milliseconds"""
+    status = {row["name"]: row for row in comparison}
+    width = max([len(name) for name in results] + [9])
+    lines = [
+        f"{'Benchmark':<{width}}  {'mean':>9}  {'stddev':>8}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'baseline':>9}  status",
+        "-" * (width + 76),
+    ]
+    for name, r in results.items():
+        row = status.get(name, {})
+        baseline = f"{row['baseline_p50'] * 1000:>7.1f}ms" if row.get("baseline_p50") else f"{'-':>9}"
+        change = f" ({row['change']:+.0%})" if row.get("change") is not None else ""
+        lines.append(
+            f"{name:<{width}}  {r['mean'] * 1000:>7.1f}ms  {r['stddev'] * 1000:>6.1f}ms  {r['p50'] * 1000:>7.1f}ms  "
+            f"{r['p95'] * 1000:>7.1f}ms  {r['p99'] * 1000:>7.1f}ms  {baseline}  {row.get('status', '')}{change}"
+        )
+    return "\n".join(lines)
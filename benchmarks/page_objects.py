@@ -0,0 +1,157 @@
+"""
+Benchmarks of page-object operations against the local fixture site.
+
+    python -m benchmarks.page_objects                      # compare against benchmarks/baselines.json
+    python -m benchmarks.page_objects --update-baselines   # record new baselines on the reference machine
+    python -m benchmarks.page_objects --filter click_apply --iterations 50
+    python -m benchmarks.page_objects --require-baselines  # CI: a benchmark without a baseline fails too
+
+Boards of 10, 1,000 and 10,000 postings are served locally, so the cost of waits and
+extraction can be measured at scale. Exits 1 when a benchmark's median regresses
+beyond the threshold, or with --require-baselines when one has no baseline.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import List, Sequence
+
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD,
+    Benchmark,
+    compare_to_baselines,
+    environment_info,
+    failed_benchmarks,
+    format_results,
+    load_baselines,
+    run_benchmark,
+    save_baselines,
+)
+from utils.fixture_site import FixtureSite
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+BOARD_SIZES = (10, 1000, 10000)
+
+
+def build_benchmarks(driver, site: FixtureSite, sizes: Sequence[int] = BOARD_SIZES) -> List[Benchmark]:
+    """
+    Page-object benchmarks on a driver pointed at the fixture site
+
+    Args:
+        driver: Selenium WebDriver instance
+        site: Running fixture site; config.py must already point at it
+        sizes: Board sizes for the listing benchmarks
+
+    Returns:
+        Benchmarks in run order
+    """
+    # Imported here: the locators read LEVER_BOARD_URL at import time, after main() set it
+    from selenium.webdriver.common.by import By
+
+    from pages.base_page import BasePage
+    from pages.home_page import HomePage
+    from pages.job_listing_page import JobListingPage
+    from utils.browser_wait import navigate
+    from utils.screenshot_handler import ScreenshotHandler
+
+    screenshot_handler = ScreenshotHandler()
+    base_page = BasePage(driver, screenshot_handler)
+    home_page = HomePage(driver, screenshot_handler)
+    job_listing_page = JobListingPage(driver, screenshot_handler)
+
+    def open_url(url: str):
+        # Waits for the document, so the timed operation never includes the page load
+        return lambda: navigate(driver, url)
+
+    benchmarks = [
+        Benchmark(
+            "BasePage.find_element",
+            lambda: base_page.find_element(By.CSS_SELECTOR, HomePage.WE_ARE_HIRING_LINK[1]),
+            prepare=open_url(site.base_url),
+        ),
+        Benchmark(
+            "HomePage._safe_click",
+            lambda: home_page._safe_click(HomePage.WE_ARE_HIRING_LINK),
+            setup=open_url(site.base_url),
+        ),
+    ]
+    for size in sizes:
+        benchmarks.append(Benchmark(
+            f"JobListingPage.verify_job_listings_content[{size}]",
+            lambda: job_listing_page.verify_job_listings_content("Quality Assurance", "Istanbul"),
+            prepare=open_url(site.board_url_for(size)),
+        ))
+    for size in sizes:
+        benchmarks.append(Benchmark(
+            f"JobListingPage.click_apply_button[{size}]",
+            job_listing_page.click_apply_button,
+            setup=open_url(site.board_url_for(size)),
+        ))
+    return benchmarks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark page-object operations on a local fixture site")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BOARD_SIZES), help="Board sizes in postings")
+    parser.add_argument("--filter", default="", help="Only benchmarks whose name contains this text")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative median increase")
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the baselines")
+    parser.add_argument("--require-baselines", action="store_true",
+                        help="Fail benchmarks that have no baseline instead of reporting them as new")
+    parser.add_argument("--output", default=None, help="Also write the results as JSON")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args(argv)
+
+    site = FixtureSite().start()
+    # Must happen before config.py is first imported; per-step collectors would be timed with each operation,
+    # and with the element cache every iteration after the first would time a dictionary lookup
+    os.environ.update(site.environment(), RUN_HISTORY="0", WEB_VITALS="0", NETWORK_SAVINGS_REPORT="0",
+                      FAILURE_BUNDLES="0", ELEMENT_CACHE="0")
+    from utils.driver_factory import build_chrome_options, create_chrome_driver
+
+    options = build_chrome_options()
+    if not args.headed:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1366,900")
+    driver = create_chrome_driver(options, network_profile="full-fidelity")
+    try:
+        results = {}
+        for benchmark in build_benchmarks(driver, site, args.sizes):
+            if args.filter in benchmark.name:
+                print(f"Running {benchmark.name} ...")
+                results[benchmark.name] = run_benchmark(benchmark, args.iterations, args.warmup)
+        environment = environment_info(browser=driver.capabilities.get("browserVersion"))
+    finally:
+        driver.quit()
+        site.stop()
+
+    baselines = load_baselines(args.baselines)
+    comparison = compare_to_baselines(results, baselines, args.threshold)
+    print()
+    print(format_results(results, comparison))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment, "results": results, "comparison": comparison}, f, indent=2)
+    if args.update_baselines:
+        save_baselines(args.baselines, results, environment)
+        print(f"\nBaselines written: {args.baselines}")
+        return 0
+
+    if baselines["environment"].get("browser") not in (None, environment["browser"]):
+        print(f"\nNote: baselines were recorded with Chrome {baselines['environment']['browser']}")
+    missing = [row["name"] for row in comparison if row["status"] == "new"]
+    if missing:
+        marker = "❌" if args.require_baselines else "Note:"
+        print(f"\n{marker} {len(missing)} benchmark(s) have no baseline in {args.baselines}; "
+              f"record them with --update-baselines on the reference machine")
+    regressed = [row["name"] for row in comparison if row["status"] == "regressed"]
+    if regressed:
+        print(f"\n❌ {len(regressed)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+    return 1 if failed_benchmarks(comparison, args.require_baselines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,104 @@
+import os
 
-BASE_URL = "https://insiderone.com/"
+# Hosts can be pointed at the local stand-in (python -m utils.standin_server serve)
+BASE_URL = os.environ.get("HIRING_BASE_URL", "https://insiderone.com/")
+LEVER_BOARD_URL = os.environ.get("LEVER_BOARD_URL", "https://jobs.lever.co/insiderone")
 SCREENSHOT_DIR = "screenshots"
+SCREENSHOT_FORMAT = "webp"        # png / jpeg / webp (jpeg ve webp için Pillow gerekir)
+SCREENSHOT_MAX_WIDTH = 1280
+SCREENSHOT_MAX_FILES = 200
+SCREENSHOT_MAX_BYTES = 200 * 1024 * 1024
+# Screenshots of a name that has a baseline are stored as the tiles that changed (utils/visual_diff.py, needs numpy)
+VISUAL_BASELINES = os.environ.get("VISUAL_BASELINES", "1") == "1"
+VISUAL_BASELINE_DIR = "screenshots/baselines"
+# Baselines seeded from passing steps are re-captured after this long; approved ones are kept
+VISUAL_BASELINE_REFRESH_HOURS = 24
+VISUAL_TILE_SIZE = 32
+VISUAL_PIXEL_TOLERANCE = 8
+# Of 64 hash bits; unrelated pages differ in about 32, mostly white pages flip many bits on small changes
+VISUAL_PHASH_THRESHOLD = 24
+# "none": get() returns at navigation commit, steps wait on the page objects' readiness contracts instead
+PAGE_LOAD_STRATEGY = os.environ.get("PAGE_LOAD_STRATEGY", "none")
+# Wait timeouts used by the page objects; inside a budgeted run they are capped by the step's share
+SHORT_TIMEOUT = 5
 DEFAULT_TIMEOUT = 10
+PAGE_LOAD_TIMEOUT = 15
+LONG_TIMEOUT = 20
 
+# Run budget shared out across scenario steps by their p95 (utils/step_budget.py)
+RUN_BUDGET = float(os.environ.get("RUN_BUDGET_SECONDS", "120"))
+STEP_RETRIES = int(os.environ.get("STEP_RETRIES", "2"))
+RETRY_BACKOFF = 0.5
+STEP_TIMINGS_PATH = ".cache/step_timings.json"
+
+# Step timing / WebDriver command reports (metrics.json, metrics.prom, trace.json)
+REPORT_DIR = "reports"
+WRITE_CHROME_TRACE = os.environ.get("CHROME_TRACE", "0") == "1"
+
+DRIVER_POOL_SIZE = 2
+
+# Sharded runs on remote WebDriver endpoints (python -m utils.sharding), comma separated Grid/chromedriver URLs
+GRID_ENDPOINTS = [url.strip() for url in os.environ.get("GRID_ENDPOINTS", "").split(",") if url.strip()]
+
+# Browser startup: "default" (headed, maximized) or "fast" (new headless, fixed window, profile template)
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "default")
+STARTUP_WINDOW_SIZE = "1366,900"
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+BROWSER_BINARY_CACHE = ".cache/browser_binaries.json"
+PROFILE_TEMPLATE_DIR = ".cache/chrome_profile_template"
+
+# Soak mode (python -m utils.soak_runner): the browser is recycled past any of these limits
+SOAK_INTERVAL = 60
+SOAK_MAX_RSS_MB = 1500
+SOAK_MAX_HEAP_MB = 256
+SOAK_MAX_HANDLES = 4
+SOAK_RECYCLE_AFTER = 0
+
+# Every run's steps, page loads and artifacts go to SQLite (python -m utils.run_history stats)
+RUN_HISTORY = os.environ.get("RUN_HISTORY", "1") == "1"
+RUN_HISTORY_DB = ".cache/run_history.sqlite"
+
+# Navigation Timing, LCP/CLS/INP/TBT and slowest resources per page (reports/web_vitals.json)
+WEB_VITALS = os.environ.get("WEB_VITALS", "1") == "1"
+WEB_VITALS_TOP_RESOURCES = 10
+
+# Failed steps leave DOM snapshot + console + HAR + screenshot in one archive (python -m utils.failure_bundle show)
+FAILURE_BUNDLES = os.environ.get("FAILURE_BUNDLES", "1") == "1"
+FAILURE_BUNDLE_DIR = "reports/failures"
+FAILURE_RING_SIZE = 2000
+FAILURE_DRAIN_EVERY = 10
+FAILURE_SNAPSHOT = "mhtml"
+# Oldest bundles are deleted beyond these limits
+FAILURE_BUNDLE_MAX_FILES = 50
+FAILURE_BUNDLE_MAX_BYTES = 250 * 1024 * 1024
+
+# Request blocking: full-fidelity / no-third-party / functional-minimal (utils/network_profiles.py)
+NETWORK_PROFILE = os.environ.get("NETWORK_PROFILE", "full-fidelity")
+NETWORK_SAVINGS_REPORT = os.environ.get("NETWORK_SAVINGS_REPORT", "0") == "1"
+RESOURCE_SIZE_CATALOG = ".cache/resource_sizes.json"
+
+# Network/CPU emulation: none / fast-3g / slow-3g / cpu-4x / mobile / slow-3g-cpu-6x (utils/throttling.py)
+THROTTLING_PROFILE = os.environ.get("THROTTLING_PROFILE", "none")
+THROTTLING_SWEEP_RUNS = 3
+# Waits that used this share of their timeout are flagged in the sweep report
+TIMEOUT_WARN_RATIO = 0.8
+
+# Browser-free HTTP checks before Chrome starts (python -m utils.preflight), PREFLIGHT=0 disables
+PREFLIGHT = os.environ.get("PREFLIGHT", "1") == "1"
+
+# Browser-free link crawl of every team, posting and apply link (python -m utils.link_crawler)
+CRAWL_CONCURRENCY = 16
+CRAWL_RATE_PER_HOST = 20.0
+CRAWL_CACHE = ".cache/crawl_cache.json"
+
+STANDIN_FIXTURE_DIR = "fixtures/standin"
+STANDIN_BASE_PORT = 8701
+
+# Elements found since the last page-changing command are reused without a round trip (utils/element_cache.py)
+ELEMENT_CACHE = os.environ.get("ELEMENT_CACHE", "1") == "1"
+
+# Learned order of alternative locators (python -m utils.locator_cache lists dead locators)
+LOCATOR_CACHE_PATH = ".cache/locators.json"
+
+# Scenario graph checkpoints (python -m scenarios.hiring_flow --from lever_board)
+CHECKPOINT_DIR = ".cache/checkpoints"
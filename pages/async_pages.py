@@ -0,0 +1,272 @@
+"""
+Async flavor of the page objects, driven over utils.cdp_async instead of WebDriver.
+
+Locators, scripts and assertions are shared with the synchronous page objects; only
+the transport differs, so `await page.click_we_are_hiring()` checks the same things
+as `page.click_we_are_hiring()`.
+"""
+import urllib.parse
+from typing import Dict, List, Optional, Sequence
+
+from config import BASE_URL, DEFAULT_TIMEOUT, LEVER_BOARD_URL, LONG_TIMEOUT, PAGE_LOAD_TIMEOUT, SHORT_TIMEOUT
+from pages.career_page import CareerPage
+from pages.home_page import HomePage
+from pages.job_listing_page import LEVER_BOARD_MARKER, LEVER_HOST, JobListingPage
+from utils import browser_wait
+from utils.browser_wait import CONDITION_HELPERS_JS
+from utils.cdp_async import AsyncTab
+from utils.instrumentation import get_instrumentation, instrumented
+from utils.locator_cache import get_locator_cache
+from utils.locators import Locator, to_js_locators
+from utils.postings import filtered_board_url, find_violations, format_violations
+from utils.screenshot_handler import ScreenshotHandler
+from utils.step_budget import step_timeout
+
+_FIRST_HREF_JS = CONDITION_HELPERS_JS + """
+    var el = __query(arguments[0])[0];
+    return el ? el.href : null;
+"""
+
+
+class AsyncBasePage:
+
+    def __init__(self, tab: AsyncTab, screenshot_handler: ScreenshotHandler = None):
+        """
+        Initialize async base page
+
+        Args:
+            tab: AsyncTab, kept as `driver` so step observers treat both flavors alike
+            screenshot_handler: Screenshot handler instance
+        """
+        self.driver = tab
+        self.instrumentation = get_instrumentation()
+        self.screenshot_handler = screenshot_handler or ScreenshotHandler()
+
+    async def _wait_in_browser(self, condition: dict, timeout: float, label: str):
+        with self.instrumentation.span(label, "wait"):
+            return await self.driver.wait_for(condition, step_timeout(timeout))
+
+    async def take_screenshot(self, name: str) -> str:
+        """Capture over DevTools and hand the PNG to the screenshot handler; never raises"""
+        try:
+            png = await self.driver.screenshot()
+        except Exception as e:
+            print(f"Failed to take screenshot: {e}")
+            return ""
+        return self.screenshot_handler.save_png(png, name)
+
+    @instrumented("helper")
+    async def find_first(
+        self,
+        locators: Sequence[Locator],
+        element_name: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        visible: bool = False,
+    ) -> Locator:
+        """
+        Resolve alternative locators in a single in-browser wait and record the winner
+
+        Args:
+            locators: Alternative (By, value) locators, highest priority first
+            element_name: Name of the element in the locator cache
+            timeout: Maximum wait time in seconds
+            visible: Only accept elements that have a layout box
+
+        Returns:
+            Winning locator
+        """
+        page = type(self).__name__.replace("Async", "", 1)
+        cache = get_locator_cache()
+        ordered = cache.order(page, element_name, locators)
+        condition = browser_wait.visible(ordered) if visible else browser_wait.present(ordered)
+        try:
+            index, _ = await self._wait_in_browser(condition, timeout, "find_first")
+        except TimeoutError:
+            await self.take_screenshot("element_not_found")
+            raise
+        cache.record(page, element_name, locators, ordered[index])
+        return ordered[index]
+
+    @instrumented("helper")
+    async def click_element(self, locator: Locator, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Wait until an element is clickable, then click it with mouse events
+
+        Args:
+            locator: (By, value) tuple
+            timeout: Maximum wait time in seconds
+        """
+        try:
+            await self._wait_in_browser(browser_wait.clickable([locator]), timeout, "click_element")
+            await self.driver.click([locator])
+        except TimeoutError:
+            await self.take_screenshot("click_failed")
+            raise
+
+    @instrumented("helper")
+    async def is_element_present(self, locator: Locator, timeout: float = DEFAULT_TIMEOUT) -> bool:
+        try:
+            await self._wait_in_browser(browser_wait.present([locator]), timeout, "is_element_present")
+            return True
+        except TimeoutError:
+            return False
+
+    @instrumented("helper")
+    async def wait_for_url_contains(self, url_part: str, timeout: float = DEFAULT_TIMEOUT):
+        try:
+            await self._wait_in_browser(browser_wait.url_contains(url_part), timeout, "wait_for_url_contains")
+        except TimeoutError:
+            await self.take_screenshot("url_check_failed")
+            raise
+
+    async def get_current_url(self) -> str:
+        return await self.driver.current_url()
+
+
+class AsyncHomePage(AsyncBasePage):
+    """Async counterpart of HomePage"""
+
+    @instrumented()
+    async def verify_homepage(self) -> bool:
+        current_url = (await self.get_current_url()).lower()
+        home_host = urllib.parse.urlparse(BASE_URL).netloc.lower()
+        if home_host not in current_url:
+            await self.take_screenshot("homepage_verification_failed")
+            raise AssertionError(f"Not on homepage. Current URL: {current_url}")
+        return True
+
+    @instrumented()
+    async def click_we_are_hiring(self):
+        try:
+            locator = await self.find_first(HomePage.WE_ARE_HIRING_LOCATORS, "we_are_hiring_link", timeout=DEFAULT_TIMEOUT)
+            await self.click_element(locator, timeout=DEFAULT_TIMEOUT)
+            await self.wait_for_url_contains("/careers", timeout=DEFAULT_TIMEOUT)
+        except Exception:
+            await self.take_screenshot("click_we_are_hiring_failed")
+            raise
+
+
+class AsyncCareerPage(AsyncBasePage):
+    """Async counterpart of CareerPage"""
+
+    @instrumented()
+    async def verify_career_page(self) -> bool:
+        current_url = (await self.get_current_url()).lower()
+        if "career" not in current_url and "hiring" not in current_url:
+            await self.take_screenshot("career_page_verification_failed")
+            raise AssertionError(f"Not on career page. Current URL: {current_url}")
+        return True
+
+    @instrumented()
+    async def verify_explore_open_roles_button(self) -> bool:
+        return await self.is_element_present(CareerPage.EXPLORE_OPEN_ROLES_BUTTON, timeout=SHORT_TIMEOUT)
+
+    @instrumented()
+    async def click_explore_open_roles(self):
+        try:
+            await self.click_element(CareerPage.EXPLORE_OPEN_ROLES_BUTTON, timeout=SHORT_TIMEOUT)
+            await self.wait_for_url_contains("#open-roles", timeout=SHORT_TIMEOUT)
+        except Exception:
+            await self.take_screenshot("click_explore_open_roles_failed")
+            raise
+
+
+class AsyncJobListingPage(AsyncBasePage):
+    """Async counterpart of JobListingPage"""
+
+    async def _wait_postings_loaded(self, timeout: float = PAGE_LOAD_TIMEOUT):
+        await self._wait_in_browser(browser_wait.ready(JobListingPage.READY), timeout, "_wait_postings_loaded")
+
+    @instrumented()
+    async def click_software_development_open_positions(self):
+        """
+        Follow the Software Development 'Open Positions' link.
+        The link opens a new window on the live site; here the same tab follows it,
+        so the flow stays on one DevTools session.
+        """
+        try:
+            locator = JobListingPage.SOFTWARE_DEV_OPEN_POSITIONS
+            await self._wait_in_browser(browser_wait.clickable([locator]), PAGE_LOAD_TIMEOUT, "click_software_development_open_positions")
+            href = await self.driver.evaluate(_FIRST_HREF_JS, to_js_locators([locator])[0])
+            await self.driver.navigate(href or f"{LEVER_BOARD_URL}?team=Software%20Development")
+            await self.wait_for_url_contains(LEVER_BOARD_MARKER, timeout=DEFAULT_TIMEOUT)
+            await self._wait_postings_loaded()
+        except Exception:
+            await self.take_screenshot("click_open_positions_failed")
+            raise
+
+    @instrumented()
+    async def apply_filters(self, location: str = "Istanbul, Turkiye", team: str = "Quality Assurance"):
+        try:
+            current_url = await self.get_current_url()
+            if LEVER_BOARD_MARKER not in current_url.lower():
+                current_url = LEVER_BOARD_URL
+            await self.driver.navigate(filtered_board_url(current_url, location=location, team=team))
+            await self._wait_postings_loaded()
+        except Exception:
+            await self.take_screenshot("apply_filters_failed")
+            raise
+
+    async def extract_postings(self, offset: int = 0, limit: Optional[int] = None) -> Dict:
+        """Same single-script extraction as JobListingPage.extract_postings"""
+        return await self.driver.evaluate(
+            JobListingPage._EXTRACT_POSTINGS_JS,
+            JobListingPage.JOB_ITEMS[1],
+            offset,
+            limit,
+            JobListingPage.APPLY_JOB_CARD[1],
+        )
+
+    async def get_postings(self) -> List[Dict[str, str]]:
+        return (await self.extract_postings())["postings"]
+
+    @instrumented()
+    async def verify_job_listings_displayed(self) -> bool:
+        try:
+            await self._wait_in_browser(browser_wait.present([JobListingPage.JOB_ITEMS]), PAGE_LOAD_TIMEOUT, "verify_job_listings_displayed")
+            total = (await self.extract_postings(limit=0))["total"]
+            assert total > 0, "No job listings found after filtering"
+            return True
+        except Exception as e:
+            await self.take_screenshot("verify_job_listings_displayed_failed")
+            raise AssertionError(f"No job listings displayed: {e}")
+
+    @instrumented()
+    async def verify_job_listings_content(
+        self,
+        expected_team: str = "Quality Assurance",
+        expected_location_substr: str = "Istanbul",
+    ) -> bool:
+        try:
+            await self._wait_in_browser(browser_wait.present([JobListingPage.JOB_ITEMS]), DEFAULT_TIMEOUT, "verify_job_listings_content")
+            postings = await self.get_postings()
+            assert postings, "No postings found on page"
+            violations = find_violations(postings, expected_team, expected_location_substr)
+            assert not violations, format_violations(violations)
+            return True
+        except Exception as e:
+            await self.take_screenshot("verify_job_listings_content_failed")
+            raise AssertionError(f"Job listings content verification failed: {e}")
+
+    @instrumented()
+    async def click_apply_button(self):
+        """Listing → job detail → apply form."""
+        try:
+            await self.click_element(JobListingPage.APPLY_JOB_CARD, timeout=LONG_TIMEOUT)
+            await self.wait_for_url_contains(f"{LEVER_BOARD_MARKER}/", timeout=LONG_TIMEOUT)
+            await self.click_element(JobListingPage.APPLY_FOR_THIS_JOB_LINK, timeout=LONG_TIMEOUT)
+            await self.wait_for_url_contains("/apply", timeout=LONG_TIMEOUT)
+            await self._wait_in_browser(browser_wait.present([JobListingPage.LEVER_FORM]), LONG_TIMEOUT, "click_apply_button")
+        except Exception:
+            await self.take_screenshot("click_apply_button_failed")
+            raise
+
+    @instrumented()
+    async def verify_lever_application_form(self) -> bool:
+        try:
+            await self.wait_for_url_contains(LEVER_HOST, timeout=DEFAULT_TIMEOUT)
+            await self._wait_in_browser(browser_wait.present([JobListingPage.LEVER_FORM]), DEFAULT_TIMEOUT, "verify_lever_application_form")
+            return True
+        except Exception as e:
+            await self.take_screenshot("verify_lever_application_form_failed")
+            raise AssertionError(f"Lever application form verification failed: {e}")
@@ -1,17 +1,30 @@
 """
 Base Page Object Model class
 """
+from typing import Sequence, Tuple
+
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+
+from config import DEFAULT_TIMEOUT, ELEMENT_CACHE, PAGE_LOAD_TIMEOUT
+from utils.instrumentation import get_instrumentation, instrumented
+from utils.locator_cache import get_locator_cache
+from utils import browser_wait
+from utils.browser_wait import BrowserWait
+from utils.element_cache import ElementCache
+from utils.locators import Locator
 from utils.screenshot_handler import ScreenshotHandler
+from utils.step_budget import step_timeout
 
 
 class BasePage:
-    
-    
+
+    # Readiness contract: utils.browser_wait clauses that must hold together before a step starts
+    READY: Tuple[dict, ...] = ()
+
     def __init__(self, driver: webdriver, screenshot_handler: ScreenshotHandler = None):
         """
         Initialize base page
@@ -21,10 +34,100 @@ class BasePage:
             screenshot_handler: Screenshot handler instance
         """
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.instrumentation = get_instrumentation()
+        self.instrumentation.attach(driver)
+        self.wait = self._wait(DEFAULT_TIMEOUT)
+        self.browser_wait = BrowserWait(driver)
+        self.element_cache = ElementCache.for_driver(driver) if ELEMENT_CACHE else None
         self.screenshot_handler = screenshot_handler or ScreenshotHandler()
+        self.screenshot_handler.watch_steps(driver)
+
+    def _wait(self, timeout: float, label: str = "wait") -> WebDriverWait:
+        """
+        Build a WebDriverWait whose polling time is recorded
+
+        Args:
+            timeout: Maximum wait time in seconds, capped by the current step's budget
+            label: Name of the wait in reports
+
+        Returns:
+            WebDriverWait instance
+        """
+        return self.instrumentation.wait(self.driver, step_timeout(timeout), label)
+
+    def _wait_in_browser(self, condition: dict, timeout: float, label: str):
+        """
+        Wait for a utils.browser_wait condition inside the page
+
+        Args:
+            condition: Condition spec, e.g. browser_wait.present([locator])
+            timeout: Maximum wait time in seconds, capped by the current step's budget
+            label: Name of the wait in reports
+
+        Returns:
+            Condition value
+        """
+        timeout = step_timeout(timeout)
+        with self.instrumentation.span(label, "wait", timeout):
+            return self.browser_wait.until(condition, timeout)
+
+    def _locate(self, locator: Locator, timeout: float, label: str, all_matches: bool = False):
+        """
+        Wait for elements to be present, reusing them from the element cache when still valid
+
+        Args:
+            locator: (By, value) tuple
+            timeout: Maximum wait time in seconds
+            label: Name of the wait in reports
+            all_matches: Return every match instead of the first
+
+        Returns:
+            WebElement, or a list of them with all_matches
+        """
+        if self.element_cache is None:
+            return self._wait_in_browser(browser_wait.present([locator], all_matches), timeout, label)[1]
+        return self.element_cache.get(
+            locator, lambda condition: self._wait_in_browser(condition, timeout, label), all_matches
+        )
+
+    def _wait_present(self, locator: Locator, timeout: float = DEFAULT_TIMEOUT, label: str = "wait_present") -> WebElement:
+        """Wait for an element without taking a screenshot on timeout"""
+        return self._locate(locator, timeout, label)
+
+    def wait_for_clickable(self, locator: Locator, timeout: float = DEFAULT_TIMEOUT) -> WebElement:
+        """
+        Wait until an element is visible and enabled
+
+        Args:
+            locator: (By, value) tuple
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            WebElement
+        """
+        return self._wait_in_browser(browser_wait.clickable([locator]), timeout, "wait_for_clickable")[1]
+
+    def wait_until_settled(self, element: WebElement, timeout: float = 2):
+        """
+        Wait until an element stops moving, e.g. after scrollIntoView.
+        Never fails: a page that keeps animating is clicked anyway once the timeout passes.
+
+        Args:
+            element: WebElement
+            timeout: Maximum wait time in seconds
+        """
+        try:
+            self._wait_in_browser(browser_wait.settled(element), timeout, "wait_until_settled")
+        except TimeoutException:
+            pass
+
+    def scroll_into_view(self, element: WebElement):
+        """Center the element in the viewport and wait until scrolling has settled"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        self.wait_until_settled(element)
     
-    def find_element(self, by: By, value: str, timeout: int = 10):
+    @instrumented("helper")
+    def find_element(self, by: By, value: str, timeout: int = DEFAULT_TIMEOUT):
         """
         Find element with explicit wait
         
@@ -37,13 +140,13 @@ class BasePage:
             WebElement
         """
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            return wait.until(EC.presence_of_element_located((by, value)))
+            return self._locate((by, value), timeout, "find_element")
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "element_not_found")
             raise
     
-    def find_elements(self, by: By, value: str, timeout: int = 10):
+    @instrumented("helper")
+    def find_elements(self, by: By, value: str, timeout: int = DEFAULT_TIMEOUT):
         """
         Find multiple elements with explicit wait
         
@@ -56,14 +159,46 @@ class BasePage:
             List of WebElements
         """
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.presence_of_element_located((by, value)))
-            return self.driver.find_elements(by, value)
+            return self._locate((by, value), timeout, "find_elements", all_matches=True)
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "elements_not_found")
             raise
     
-    def click_element(self, by: By, value: str, timeout: int = 10):
+    @instrumented("helper")
+    def find_first(
+        self,
+        locators: Sequence[Locator],
+        element_name: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        visible: bool = False,
+    ) -> Tuple[WebElement, Locator]:
+        """
+        Resolve alternative locators in a single in-browser wait, whichever matches first wins.
+        The winner is recorded in the locator cache so the next run tries it first.
+
+        Args:
+            locators: Alternative (By, value) locators, highest priority first
+            element_name: Name of the element in the locator cache
+            timeout: Maximum wait time in seconds
+            visible: Only accept elements that have a layout box
+
+        Returns:
+            (element, winning locator)
+        """
+        page = type(self).__name__
+        cache = get_locator_cache()
+        ordered = cache.order(page, element_name, locators)
+        condition = browser_wait.visible(ordered) if visible else browser_wait.present(ordered)
+        try:
+            index, element = self._wait_in_browser(condition, timeout, "find_first")
+        except TimeoutException:
+            self.screenshot_handler.take_screenshot(self.driver, "element_not_found")
+            raise
+        cache.record(page, element_name, locators, ordered[index])
+        return element, ordered[index]
+
+    @instrumented("helper")
+    def click_element(self, by: By, value: str, timeout: int = DEFAULT_TIMEOUT):
         """
         Click on element with explicit wait
         
@@ -73,14 +208,14 @@ class BasePage:
             timeout: Maximum wait time in seconds
         """
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            element = wait.until(EC.element_to_be_clickable((by, value)))
+            element = self._wait_in_browser(browser_wait.clickable([(by, value)]), timeout, "click_element")[1]
             element.click()
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "click_failed")
             raise
     
-    def get_text(self, by: By, value: str, timeout: int = 10) -> str:
+    @instrumented("helper")
+    def get_text(self, by: By, value: str, timeout: int = DEFAULT_TIMEOUT) -> str:
         """
         Get text from element
         
@@ -99,7 +234,8 @@ class BasePage:
             self.screenshot_handler.take_screenshot(self.driver, "get_text_failed")
             raise
     
-    def is_element_present(self, by: By, value: str, timeout: int = 10) -> bool:
+    @instrumented("helper")
+    def is_element_present(self, by: By, value: str, timeout: int = DEFAULT_TIMEOUT) -> bool:
         """
         Check if element is present
         
@@ -117,7 +253,8 @@ class BasePage:
         except TimeoutException:
             return False
     
-    def wait_for_url_contains(self, url_part: str, timeout: int = 10):
+    @instrumented("helper")
+    def wait_for_url_contains(self, url_part: str, timeout: int = DEFAULT_TIMEOUT):
         """
         Wait for URL to contain specific string
         
@@ -126,12 +263,48 @@ class BasePage:
             timeout: Maximum wait time in seconds
         """
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.url_contains(url_part))
+            self._wait_in_browser(browser_wait.url_contains(url_part), timeout, "wait_for_url_contains")
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "url_check_failed")
             raise
     
+    @instrumented("helper")
+    def wait_until_ready(self, contract: Sequence[dict] = None, timeout: float = PAGE_LOAD_TIMEOUT) -> list:
+        """
+        Wait for the page's readiness contract in a single in-page check
+
+        Args:
+            contract: Clauses from utils.browser_wait, defaults to the page's READY
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            One value per clause, e.g. the matched element or the stable count
+        """
+        contract = self.READY if contract is None else contract
+        try:
+            return self._wait_in_browser(browser_wait.ready(contract), timeout, "wait_until_ready")
+        except TimeoutException:
+            self.screenshot_handler.take_screenshot(self.driver, "page_not_ready")
+            raise
+
+    @instrumented("helper")
+    def open(self, url: str, timeout: float = PAGE_LOAD_TIMEOUT) -> list:
+        """
+        Navigate to url and return as soon as the readiness contract holds.
+        With the "none" page load strategy get() returns once the navigation has started,
+        so the outgoing document is marked and the contract is never met on it.
+
+        Args:
+            url: Absolute URL
+            timeout: Maximum wait time in seconds
+
+        Returns:
+            Values of the readiness contract
+        """
+        browser_wait.mark_navigation(self.driver, url)
+        self.driver.get(url)
+        return self.wait_until_ready(timeout=timeout)
+
     def get_current_url(self) -> str:
         """Get current page URL"""
         return self.driver.current_url
\ No newline at end of file
@@ -3,7 +3,10 @@ Career Page Object Model
 """
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
+from config import SHORT_TIMEOUT
 from pages.base_page import BasePage
+from utils import browser_wait
+from utils.instrumentation import instrumented
 
 
 class CareerPage(BasePage):
@@ -12,10 +15,14 @@ class CareerPage(BasePage):
     #  stabil locator 
     EXPLORE_OPEN_ROLES_BUTTON = (By.CSS_SELECTOR, "a[href='#open-roles']")
 
+    # 'Explore open roles' attached and not covered
+    READY = (browser_wait.uncovered([EXPLORE_OPEN_ROLES_BUTTON]),)
+
     def __init__(self, driver, screenshot_handler=None):
         """Initialize CareerPage"""
         super().__init__(driver, screenshot_handler)
 
+    @instrumented()
     def verify_career_page(self) -> bool:
         """
         Verify that we are on the Career page
@@ -35,6 +42,7 @@ class CareerPage(BasePage):
             self.screenshot_handler.take_screenshot(self.driver, "career_page_verification_failed")
             raise
 
+    @instrumented()
     def verify_explore_open_roles_button(self) -> bool:
         """
         Verify that 'Explore open roles' button exists
@@ -43,20 +51,21 @@ class CareerPage(BasePage):
             True if button exists
         """
         try:
-            return self.is_element_present(*self.EXPLORE_OPEN_ROLES_BUTTON, timeout=5)
+            return self.is_element_present(*self.EXPLORE_OPEN_ROLES_BUTTON, timeout=SHORT_TIMEOUT)
         except Exception:
             self.screenshot_handler.take_screenshot(self.driver, "explore_button_verification_failed")
             raise
 
+    @instrumented()
     def click_explore_open_roles(self):
         """Click on 'Explore open roles' button"""
         try:
             
-            self.click_element(*self.EXPLORE_OPEN_ROLES_BUTTON, timeout=5)
+            self.click_element(*self.EXPLORE_OPEN_ROLES_BUTTON, timeout=SHORT_TIMEOUT)
 
         
             #  Doğrulama: URL içinde open-roles bekle.
-            self.wait_for_url_contains("#open-roles", timeout=5)
+            self.wait_for_url_contains("#open-roles", timeout=SHORT_TIMEOUT)
 
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "click_explore_open_roles_timeout")
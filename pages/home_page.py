@@ -1,11 +1,14 @@
 """
 Home Page Object Model
 """
+import urllib.parse
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from config import BASE_URL, DEFAULT_TIMEOUT
 from pages.base_page import BasePage
+from utils import browser_wait
+from utils.instrumentation import instrumented
 
 
 class HomePage(BasePage):
@@ -13,11 +16,16 @@ class HomePage(BasePage):
 
     WE_ARE_HIRING_LINK = (By.CSS_SELECTOR, "a[href='/careers/']")
     WE_ARE_HIRING_LINK_FALLBACK = (By.CSS_SELECTOR, "a[data-text=\"We're hiring\"]")
+    WE_ARE_HIRING_LOCATORS = (WE_ARE_HIRING_LINK, WE_ARE_HIRING_LINK_FALLBACK)
+
+    # Hiring link attached and not covered (e.g. by a cookie banner)
+    READY = (browser_wait.uncovered(WE_ARE_HIRING_LOCATORS),)
 
     def __init__(self, driver, screenshot_handler=None):
         """Initialize HomePage"""
         super().__init__(driver, screenshot_handler)
 
+    @instrumented()
     def verify_homepage(self) -> bool:
         """
         Verify that we are on the Insider One homepage
@@ -27,13 +35,14 @@ class HomePage(BasePage):
         """
         try:
             current_url = self.get_current_url().lower()
-            assert "insiderone.com" in current_url, f"Not on homepage. Current URL: {current_url}"
+            home_host = urllib.parse.urlparse(BASE_URL).netloc.lower()
+            assert home_host in current_url, f"Not on homepage. Current URL: {current_url}"
             return True
         except AssertionError:
             self.screenshot_handler.take_screenshot(self.driver, "homepage_verification_failed")
             raise
 
-    def _safe_click(self, locator, timeout: int = 10):
+    def _safe_click(self, locator, timeout: int = DEFAULT_TIMEOUT):
         """
         Scroll element into view, then try a normal click.
         Falls back to JavaScript click if the element is intercepted.
@@ -42,36 +51,28 @@ class HomePage(BasePage):
             locator: (By, value) tuple
             timeout: Maximum wait time in seconds
         """
-        wait = WebDriverWait(self.driver, timeout)
-        element = wait.until(EC.presence_of_element_located(locator))
+        element = self._wait_present(locator, timeout, "_safe_click")
 
-        
-        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-
-        
-        import time
-        time.sleep(0.5)
+        # Sabit bekleme yerine scroll bitene kadar (iki kare sabit kalana kadar) beklenir
+        self.scroll_into_view(element)
 
         try:
-            wait.until(EC.element_to_be_clickable(locator)).click()
+            self.wait_for_clickable(locator, timeout).click()
         except Exception:
             
             self.driver.execute_script("arguments[0].click();", element)
 
+    @instrumented()
     def click_we_are_hiring(self):
         """Click on 'We're hiring' link"""
         try:
-            
-            locator = (
-                self.WE_ARE_HIRING_LINK
-                if self.is_element_present(*self.WE_ARE_HIRING_LINK, timeout=3)
-                else self.WE_ARE_HIRING_LINK_FALLBACK
-            )
+            # Tüm alternatif locator'lar tek bir bekleme döngüsünde denenir
+            _, locator = self.find_first(self.WE_ARE_HIRING_LOCATORS, "we_are_hiring_link", timeout=DEFAULT_TIMEOUT)
 
-            self._safe_click(locator, timeout=10)
+            self._safe_click(locator, timeout=DEFAULT_TIMEOUT)
 
             # Confirm 
-            self.wait_for_url_contains("/careers", timeout=10)
+            self.wait_for_url_contains("/careers", timeout=DEFAULT_TIMEOUT)
 
         except TimeoutException:
             self.screenshot_handler.take_screenshot(self.driver, "click_we_are_hiring_timeout")
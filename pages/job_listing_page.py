@@ -3,14 +3,22 @@ Job Listing Page Object Model (Lever job board)
 """
 from __future__ import annotations
 
-import urllib.parse
-from typing import Optional
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+from config import DEFAULT_TIMEOUT, LEVER_BOARD_URL, LONG_TIMEOUT, PAGE_LOAD_TIMEOUT
 from pages.base_page import BasePage
+from utils import browser_wait
+from utils.instrumentation import instrumented
+from utils.postings import filter_result, filtered_board_url, find_violations, format_violations
+
+# "jobs.lever.co/insiderone" for the live board, "127.0.0.1:8702/insiderone" for the stand-in
+LEVER_BOARD_MARKER = LEVER_BOARD_URL.split("://", 1)[-1].rstrip("/").lower()
+LEVER_HOST = LEVER_BOARD_MARKER.split("/", 1)[0]
 
 
 class JobListingPage(BasePage):
@@ -18,41 +26,84 @@ class JobListingPage(BasePage):
     # Locators
     SOFTWARE_DEV_OPEN_POSITIONS = (
         By.XPATH,
-        "//a[contains(@href,'lever.co/insiderone')]"
+        f"//a[contains(@href,'{LEVER_BOARD_MARKER}')]"
         "[contains(translate(@href,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'software')]"
     )
 
-    POSTINGS_CONTAINER = (
-        By.XPATH,
-        "//*[contains(@class,'postings') or contains(@class,'postings-group')]"
-    )
-
-    JOB_ITEMS = (
-        By.XPATH,
-        "//*[contains(@class,'posting') or contains(@class,'position-list-item')]"
-    )
+    JOB_ITEMS = (By.CSS_SELECTOR, ".posting, .position-list-item")
 
     APPLY_JOB_CARD = (By.CSS_SELECTOR, "a.posting-btn-submit")
     APPLY_FOR_THIS_JOB_LINK = (By.CSS_SELECTOR, "a.postings-btn[href*='/apply']")
     LEVER_FORM = (By.CSS_SELECTOR, "form")
 
+    # Readiness contracts: the board, a posting's detail page and its application form
+    READY = (browser_wait.stable_count(JOB_ITEMS, frames=1),)
+    POSTING_READY = (browser_wait.clickable([APPLY_FOR_THIS_JOB_LINK]),)
+    APPLY_FORM_READY = (browser_wait.present([LEVER_FORM]),)
+
+    # One round trip: every posting in [offset, offset + limit) as a compact record
+    _EXTRACT_POSTINGS_JS = """
+        var nodes = document.querySelectorAll(arguments[0]);
+        var offset = arguments[1] || 0;
+        var end = arguments[2] == null ? nodes.length : Math.min(nodes.length, offset + arguments[2]);
+        function text(root, sel) {
+            var el = root.querySelector(sel);
+            return el ? el.textContent.replace(/\\s+/g, ' ').trim() : '';
+        }
+        function href(root, sel) {
+            var el = root.querySelector(sel);
+            return el ? el.href : '';
+        }
+        var postings = [];
+        for (var i = offset; i < end; i++) {
+            var p = nodes[i];
+            postings.push({
+                title: text(p, '[data-qa="posting-name"], h5'),
+                team: text(p, '.sort-by-team, .department'),
+                location: text(p, '.sort-by-location, .location'),
+                commitment: text(p, '.sort-by-commitment, .commitment'),
+                posting_url: href(p, 'a.posting-title'),
+                apply_url: href(p, arguments[3])
+            });
+        }
+        return {total: nodes.length, postings: postings};
+    """
+
+    # Filter matrix: null while the tab is still on the previous document or parsing
+    _MATRIX_COLLECT_JS = (
+        "if (window.__filterMatrixPending || document.readyState === 'loading') { return null; }\n"
+        + _EXTRACT_POSTINGS_JS
+    )
+
+    # The navigation starts after the command returns, so chromedriver does not block on it
+    _MATRIX_NAVIGATE_JS = """
+        window.__filterMatrixPending = true;
+        var url = arguments[0];
+        setTimeout(function () { window.location.href = url; }, 0);
+    """
+
+    _FIRST_VISIBLE_JS = """
+        var el = Array.prototype.find.call(
+            document.querySelectorAll(arguments[0]),
+            function (a) { return a.getClientRects().length > 0; }
+        );
+        if (el) { el.scrollIntoView({block: 'center'}); }
+        return el || null;
+    """
+
     def __init__(self, driver, screenshot_handler=None):
         super().__init__(driver, screenshot_handler)
 
-    def _wait_postings_loaded(self, timeout: int = 15):
-        WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located(self.POSTINGS_CONTAINER)
-        )
-
     # ---------------- Step 5 ----------------
+    @instrumented()
     def click_software_development_open_positions(self):
         """Click 'Open Positions' link for Software Development and land on Lever."""
         try:
-            wait = WebDriverWait(self.driver, 15)
+            wait = self._wait(PAGE_LOAD_TIMEOUT, "click_software_development_open_positions")
             before_tabs = set(self.driver.window_handles)
 
-            el = wait.until(EC.element_to_be_clickable(self.SOFTWARE_DEV_OPEN_POSITIONS))
-            self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
+            el = self.wait_for_clickable(self.SOFTWARE_DEV_OPEN_POSITIONS, timeout=PAGE_LOAD_TIMEOUT)
+            self.scroll_into_view(el)
 
             try:
                 el.click()
@@ -66,17 +117,17 @@ class JobListingPage(BasePage):
                 self.driver.switch_to.window(new_tabs[-1])
 
             
-            if "jobs.lever.co/insiderone" not in self.driver.current_url.lower():
-                self.driver.get("https://jobs.lever.co/insiderone?team=Software%20Development")
-
-            self.wait_for_url_contains("jobs.lever.co/insiderone", timeout=10)
-            self._wait_postings_loaded()
+            if LEVER_BOARD_MARKER not in self.driver.current_url.lower():
+                self.open(f"{LEVER_BOARD_URL}?team=Software%20Development")
+            else:
+                self.wait_until_ready()
 
         except Exception:
             self.screenshot_handler.take_screenshot(self.driver, "click_open_positions_failed")
             raise
 
     # ---------------- Filters ----------------
+    @instrumented()
     def apply_filters(self, location: str = "Istanbul, Turkiye", team: str = "Quality Assurance"):
         """Apply filters via URL params in a single navigation."""
         try:
@@ -86,95 +137,219 @@ class JobListingPage(BasePage):
             raise
 
     def _set_lever_query_params(self, location: Optional[str] = None, team: Optional[str] = None):
-        """Build and navigate to filtered Lever URL."""
-        wait = WebDriverWait(self.driver, 15)
+        """Build and navigate to filtered Lever URL, starting from the bare board when not on it."""
+        current_url = self.driver.current_url
+        if LEVER_BOARD_MARKER not in current_url.lower():
+            current_url = LEVER_BOARD_URL
+        self.open(filtered_board_url(current_url, location=location, team=team))
+
+    # ---------------- Filter matrix ----------------
+    @instrumented()
+    def check_filter_matrix(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        tabs: int = 4,
+        timeout: float = LONG_TIMEOUT,
+        expected_location_for: Optional[Callable[[str], str]] = None,
+        require_postings: bool = False,
+    ) -> List[Dict]:
+        """
+        Check many location/team pairs in parallel tabs of this browser session.
+        Every idle tab starts its next navigation, then finished tabs are collected
+        in whatever order they complete, so the network waits overlap.
+
+        Args:
+            pairs: (location, team) filter pairs
+            tabs: Number of tabs to open, including the current one
+            timeout: Seconds a single pair may take
+            expected_location_for: Maps a location filter to the substring every listing must
+                contain, defaults to the part before the first comma
+            require_postings: Treat a pair without postings as failed rather than a count of 0
+
+        Returns:
+            One utils.postings.filter_result row per pair, in completion order
+        """
+        expected_location_for = expected_location_for or (lambda location: location.split(",")[0].strip())
+        handles = [self.driver.current_window_handle]
+        busy: Dict[str, tuple] = {}
+        rows = []
+        poll = 0.05
+        try:
+            for _ in range(max(1, min(tabs, len(pairs))) - 1):
+                self.driver.switch_to.new_window("tab")
+                handles.append(self.driver.current_window_handle)
+            pending = deque(pairs)
+            idle = list(handles)
+            while pending or busy:
+                while pending and idle:
+                    handle = idle.pop()
+                    location, team = pending.popleft()
+                    url = filtered_board_url(LEVER_BOARD_URL, location=location, team=team)
+                    self.driver.switch_to.window(handle)
+                    self.driver.execute_script(self._MATRIX_NAVIGATE_JS, url)
+                    busy[handle] = (location, team, url, time.perf_counter())
+
+                collected = False
+                for handle, (location, team, url, started) in list(busy.items()):
+                    self.driver.switch_to.window(handle)
+                    elapsed = time.perf_counter() - started
+                    try:
+                        result = self.driver.execute_script(
+                            self._MATRIX_COLLECT_JS, self.JOB_ITEMS[1], 0, None, self.APPLY_JOB_CARD[1]
+                        )
+                        error = None
+                    except WebDriverException as e:
+                        # The script raced with the document being replaced
+                        result, error = None, e.msg
+                    if result is None and elapsed < timeout:
+                        continue
+                    if result is None:
+                        error = f"Timed out after {timeout}s" + (f": {error}" if error else "")
+                    postings = result["postings"] if result else None
+                    rows.append(filter_result(
+                        location, team, url, postings, expected_location_for(location), elapsed, error, require_postings
+                    ))
+                    del busy[handle]
+                    idle.append(handle)
+                    collected = True
+
+                if busy and not collected:
+                    time.sleep(poll)
+                    poll = min(poll * 1.6, 0.5)
+                else:
+                    poll = 0.05
+        except Exception:
+            try:
+                self._close_matrix_tabs(handles)
+            except WebDriverException as e:
+                # The session may be what failed; the original error is the one to report
+                print(f"Could not close filter matrix tabs: {e.msg}")
+            raise
+        self._close_matrix_tabs(handles)
+        return rows
+
+    def _close_matrix_tabs(self, handles: List[str]):
+        """Close the tabs check_filter_matrix opened and switch back to the first one"""
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(handles[0])
+
+    # ---------------- Extraction ----------------
+    def extract_postings(self, offset: int = 0, limit: Optional[int] = None) -> Dict:
+        """
+        Extract postings with a single execute_script call
+
+        Args:
+            offset: Index of the first posting to return
+            limit: Maximum number of postings to return, None for all
+
+        Returns:
+            {"total": int, "postings": [record, ...]} where each record has
+            title, team, location, commitment, posting_url and apply_url
+        """
+        return self.driver.execute_script(
+            self._EXTRACT_POSTINGS_JS, self.JOB_ITEMS[1], offset, limit, self.APPLY_JOB_CARD[1]
+        )
 
-        if "jobs.lever.co/insiderone" not in self.driver.current_url.lower():
-            self.driver.get("https://jobs.lever.co/insiderone")
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    def iter_postings(self, chunk_size: int = 500) -> Iterator[Dict[str, str]]:
+        """
+        Stream postings in chunks so very large boards never travel in one response
 
-        parsed = urllib.parse.urlparse(self.driver.current_url)
-        params = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+        Args:
+            chunk_size: Number of postings per round trip
 
-        if location is not None:
-            params["location"] = [location]
-        if team is not None:
-            params["team"] = [team]
+        Yields:
+            Posting records
+        """
+        offset = 0
+        while True:
+            chunk = self.extract_postings(offset, chunk_size)
+            yield from chunk["postings"]
+            offset += len(chunk["postings"])
+            if not chunk["postings"] or offset >= chunk["total"]:
+                return
 
-        new_url = urllib.parse.urlunparse(
-            parsed._replace(query=urllib.parse.urlencode(params, doseq=True))
-        )
-        self.driver.get(new_url)
-        self._wait_postings_loaded()
+    def get_postings(self, chunk_size: int = 500) -> List[Dict[str, str]]:
+        """Return every posting on the current board"""
+        return list(self.iter_postings(chunk_size))
 
     # ---------------- Step 8 ----------------
+    @instrumented()
     def verify_job_listings_displayed(self) -> bool:
         try:
-            WebDriverWait(self.driver, 15).until(EC.presence_of_element_located(self.JOB_ITEMS))
-            jobs = self.driver.find_elements(*self.JOB_ITEMS)
-            assert len(jobs) > 0, "No job listings found after filtering"
+            total = self.wait_until_ready(timeout=PAGE_LOAD_TIMEOUT)[0]
+            assert total > 0, "No job listings found after filtering"
             return True
         except Exception as e:
             self.screenshot_handler.take_screenshot(self.driver, "verify_job_listings_displayed_failed")
             raise AssertionError(f"No job listings displayed: {e}")
 
     # ---------------- Step 9 ----------------
+    @instrumented()
     def verify_job_listings_content(
         self,
         expected_team: str = "Quality Assurance",
         expected_location_substr: str = "Istanbul"
     ) -> bool:
+        """
+        Check every posting individually, not the page text as a whole
+
+        Args:
+            expected_team: Team each posting must belong to
+            expected_location_substr: Substring each posting location must contain
+
+        Returns:
+            True if all postings match
+        """
         try:
-            WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            body = self.driver.find_element(By.TAG_NAME, "body").text.lower()
-            assert expected_team.lower() in body, f"'{expected_team}' not found on page"
-            assert expected_location_substr.lower() in body, f"'{expected_location_substr}' not found on page"
+            self.wait_until_ready(timeout=DEFAULT_TIMEOUT)
+            postings = self.get_postings()
+            assert postings, "No postings found on page"
+            violations = find_violations(postings, expected_team, expected_location_substr)
+            assert not violations, format_violations(violations)
             return True
         except Exception as e:
             self.screenshot_handler.take_screenshot(self.driver, "verify_job_listings_content_failed")
             raise AssertionError(f"Job listings content verification failed: {e}")
 
     # ---------------- Step 10 ----------------
+    @instrumented()
     def click_apply_button(self):
         """Listing → job detail → apply form."""
         try:
-            wait = WebDriverWait(self.driver, 20)
-
-            wait.until(EC.presence_of_element_located(self.APPLY_JOB_CARD))
-            first_apply = next(
-                (a for a in self.driver.find_elements(*self.APPLY_JOB_CARD) if a.is_displayed()),
-                None
-            )
+            self._wait_present(self.APPLY_JOB_CARD, LONG_TIMEOUT, "click_apply_button")
+            first_apply = self.driver.execute_script(self._FIRST_VISIBLE_JS, self.APPLY_JOB_CARD[1])
             if not first_apply:
                 raise Exception("No visible 'Apply' button found on listings")
+            self.wait_until_settled(first_apply)
 
-            self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", first_apply)
             try:
                 first_apply.click()
             except Exception:
                 self.driver.execute_script("arguments[0].click();", first_apply)
 
-            wait.until(lambda d: "jobs.lever.co/insiderone/" in d.current_url.lower())
+            self.wait_for_url_contains(f"{LEVER_BOARD_MARKER}/", timeout=LONG_TIMEOUT)
 
-            apply_for = wait.until(EC.element_to_be_clickable(self.APPLY_FOR_THIS_JOB_LINK))
-            self.driver.execute_script("arguments[0].scrollIntoView({block:'center'});", apply_for)
+            apply_for = self.wait_until_ready(self.POSTING_READY, LONG_TIMEOUT)[0]
+            self.scroll_into_view(apply_for)
             try:
                 apply_for.click()
             except Exception:
                 self.driver.execute_script("arguments[0].click();", apply_for)
 
-            wait.until(lambda d: "/apply" in d.current_url.lower())
-            wait.until(EC.presence_of_element_located(self.LEVER_FORM))
+            self.wait_for_url_contains("/apply", timeout=LONG_TIMEOUT)
+            self.wait_until_ready(self.APPLY_FORM_READY, LONG_TIMEOUT)
 
         except Exception:
             self.screenshot_handler.take_screenshot(self.driver, "click_apply_button_failed")
             raise
 
+    @instrumented()
     def verify_lever_application_form(self) -> bool:
         try:
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(lambda d: "lever.co" in d.current_url.lower())
-            wait.until(EC.presence_of_element_located(self.LEVER_FORM))
+            self.wait_for_url_contains(LEVER_HOST, timeout=DEFAULT_TIMEOUT)
+            self.wait_until_ready(self.APPLY_FORM_READY, DEFAULT_TIMEOUT)
             return True
         except Exception as e:
             self.screenshot_handler.take_screenshot(self.driver, "verify_lever_application_form_failed")
@@ -0,0 +1,150 @@
+"""
+The hiring flow on the async page objects: many concurrent runs from one event loop,
+as tabs spread over a few Chrome processes instead of a thread per driver.
+"""
+import argparse
+import asyncio
+import math
+import sys
+import time
+import traceback
+from typing import List
+
+from config import BASE_URL, PREFLIGHT, REPORT_DIR, WRITE_CHROME_TRACE
+from pages.async_pages import AsyncCareerPage, AsyncHomePage, AsyncJobListingPage
+from utils.cdp_async import AsyncBrowser, AsyncTab
+from utils.instrumentation import get_instrumentation
+from utils.preflight import run_preflight
+from utils.screenshot_handler import ScreenshotHandler
+
+
+async def run_hiring_flow_async(
+    tab: AsyncTab,
+    screenshot_handler: ScreenshotHandler,
+    location: str = "Istanbul, Turkiye",
+    team: str = "Quality Assurance",
+    location_substr: str = "Istanbul",
+):
+    """
+    Run the ten hiring page steps in one tab
+
+    Args:
+        tab: AsyncTab to drive
+        screenshot_handler: Screenshot handler instance
+        location: Lever location filter
+        team: Lever team filter
+        location_substr: Substring every listing location must contain
+    """
+    step = get_instrumentation().step
+    home_page = AsyncHomePage(tab, screenshot_handler)
+    career_page = AsyncCareerPage(tab, screenshot_handler)
+    job_listing_page = AsyncJobListingPage(tab, screenshot_handler)
+
+    with step("open_homepage"):
+        await tab.navigate(BASE_URL)
+    with step("step_1_verify_homepage"):
+        await home_page.verify_homepage()
+    with step("step_2_open_career_page"):
+        await home_page.click_we_are_hiring()
+        await career_page.verify_career_page()
+    with step("step_3_verify_explore_open_roles"):
+        assert await career_page.verify_explore_open_roles_button(), "'Explore open roles' button not found"
+    with step("step_4_click_explore_open_roles"):
+        await career_page.click_explore_open_roles()
+    with step("step_5_open_software_development"):
+        await job_listing_page.click_software_development_open_positions()
+    with step("step_6_7_apply_filters"):
+        await job_listing_page.apply_filters(location=location, team=team)
+    with step("step_8_verify_listings_displayed"):
+        await job_listing_page.verify_job_listings_displayed()
+    with step("step_9_verify_listings_content"):
+        await job_listing_page.verify_job_listings_content(expected_team=team, expected_location_substr=location_substr)
+    with step("step_10_apply"):
+        await job_listing_page.click_apply_button()
+        await job_listing_page.verify_lever_application_form()
+
+
+async def _launch_browsers(count: int, headless: bool) -> List[AsyncBrowser]:
+    """Launch Chrome processes in parallel; if any launch fails, close the ones that started and re-raise"""
+    results = await asyncio.gather(*(AsyncBrowser.launch(headless=headless) for _ in range(count)),
+                                   return_exceptions=True)
+    browsers = [result for result in results if isinstance(result, AsyncBrowser)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await asyncio.gather(*(browser.close() for browser in browsers), return_exceptions=True)
+        raise errors[0]
+    return browsers
+
+
+async def run_concurrent(runs: int, tabs_per_browser: int = 8, headless: bool = True) -> List[dict]:
+    """
+    Run the flow `runs` times concurrently, `tabs_per_browser` tabs per Chrome process
+
+    Args:
+        runs: Number of concurrent flows
+        tabs_per_browser: Tabs sharing one Chrome process
+        headless: Launch Chrome headless
+
+    Returns:
+        One result dict per run with name, passed, duration and error
+    """
+    screenshot_handler = ScreenshotHandler.from_config()
+    browser_count = max(1, math.ceil(runs / tabs_per_browser))
+    browsers = await _launch_browsers(browser_count, headless)
+
+    async def _run(index: int) -> dict:
+        start = time.perf_counter()
+        tab = await browsers[index % browser_count].new_tab()
+        try:
+            await run_hiring_flow_async(tab, screenshot_handler)
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+            try:
+                screenshot_handler.save_png(await tab.screenshot(), f"failed_hiring_flow_{index + 1}")
+            except Exception as e:
+                print(f"Failed to take screenshot: {e}")
+        finally:
+            await tab.close()
+        return {
+            "name": f"hiring_flow_{index + 1}",
+            "passed": error is None,
+            "duration": time.perf_counter() - start,
+            "error": error,
+        }
+
+    try:
+        return await asyncio.gather(*(_run(i) for i in range(runs)))
+    finally:
+        await asyncio.gather(*(browser.close() for browser in browsers))
+        screenshot_handler.flush()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the hiring flow concurrently on one event loop")
+    parser.add_argument("--runs", type=int, default=4, help="Concurrent flows")
+    parser.add_argument("--tabs-per-browser", type=int, default=8, help="Tabs sharing one Chrome process")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args(argv)
+
+    if PREFLIGHT:
+        preflight = run_preflight()
+        print(preflight.format())
+        if not preflight.passed:
+            print("\n❌ Preflight failed, not starting browsers")
+            return 1
+
+    start = time.perf_counter()
+    results = asyncio.run(run_concurrent(args.runs, args.tabs_per_browser, headless=not args.headed))
+    for result in results:
+        status = "✓" if result["passed"] else "❌"
+        print(f"{status} {result['name']} ({result['duration']:.1f}s)")
+        if result["error"]:
+            print(result["error"])
+    print(f"\nTotal wall time: {time.perf_counter() - start:.1f}s")
+    get_instrumentation().write_reports(REPORT_DIR, chrome_trace=WRITE_CHROME_TRACE)
+    return 0 if all(r["passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
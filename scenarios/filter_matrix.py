@@ -0,0 +1,86 @@
+"""
+Lever filter matrix: every location/team pair checked in parallel tabs,
+optionally spread over several pooled browser sessions.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import REPORT_DIR
+from pages.job_listing_page import JobListingPage
+from utils.driver_pool import DriverPool
+from utils.postings import format_matrix_table
+from utils.screenshot_handler import ScreenshotHandler
+
+
+def run_filter_matrix(
+    pairs: Sequence[Tuple[str, str]],
+    pool: DriverPool,
+    tabs: int = 4,
+    screenshot_handler: Optional[ScreenshotHandler] = None,
+    require_postings: bool = False,
+) -> List[Dict]:
+    """
+    Split the pairs across the pool's sessions and check each share in tabs
+
+    Args:
+        pairs: (location, team) filter pairs
+        pool: Driver pool, one share of the pairs per session
+        tabs: Tabs per session
+        screenshot_handler: Screenshot handler shared by all sessions
+        require_postings: Fail pairs whose board has no postings
+
+    Returns:
+        One row per pair, in the order the pairs were given
+    """
+    screenshot_handler = screenshot_handler or ScreenshotHandler()
+    shares = [list(pairs[i::pool.size]) for i in range(pool.size) if pairs[i::pool.size]]
+
+    def _run(share):
+        with pool.lease() as driver:
+            return JobListingPage(driver, screenshot_handler).check_filter_matrix(
+                share, tabs=tabs, require_postings=require_postings
+            )
+
+    with ThreadPoolExecutor(max_workers=len(shares) or 1) as executor:
+        rows = [row for share_rows in executor.map(_run, shares) for row in share_rows]
+    order = {pair: index for index, pair in enumerate(pairs)}
+    return sorted(rows, key=lambda row: order[(row["location"], row["team"])])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check every location/team filter pair on the Lever board")
+    parser.add_argument("--location", action="append", help="Location filter, repeatable")
+    parser.add_argument("--team", action="append", help="Team filter, repeatable")
+    parser.add_argument("--sessions", type=int, default=1, help="Browser sessions")
+    parser.add_argument("--tabs", type=int, default=4, help="Tabs per session")
+    parser.add_argument("--require-postings", action="store_true",
+                        help="Fail pairs without postings instead of reporting a count of 0")
+    args = parser.parse_args(argv)
+
+    locations = args.location or ["Istanbul, Turkiye"]
+    teams = args.team or ["Quality Assurance"]
+    pairs = list(dict.fromkeys(itertools.product(locations, teams)))
+
+    start = time.perf_counter()
+    with DriverPool(size=min(args.sessions, len(pairs))) as pool:
+        rows = run_filter_matrix(pairs, pool, tabs=args.tabs, require_postings=args.require_postings)
+    print(format_matrix_table(rows))
+    for row in rows:
+        if row["details"]:
+            print(f"\n{row['location']} / {row['team']}:\n{row['details']}")
+    print(f"\n{len(pairs)} pair(s) in {time.perf_counter() - start:.1f}s")
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(os.path.join(REPORT_DIR, "filter_matrix.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+    return 0 if all(not row["error"] and not row["violations"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Hiring page scenario shared by the unittest suite and the runners.
+
+The ten steps form a graph of named nodes (home → careers → open_roles →
+lever_board → filtered → apply_form). Each node can save a checkpoint, so
+focused runs can start from the Lever board instead of the homepage.
+"""
+import argparse
+import sys
+
+from config import BASE_URL, CHECKPOINT_DIR
+from pages.home_page import HomePage
+from pages.career_page import CareerPage
+from pages.job_listing_page import JobListingPage
+from utils.driver_factory import create_chrome_driver
+from utils.instrumentation import get_instrumentation
+from utils.scenario_graph import CheckpointStore, ScenarioGraph
+from utils.screenshot_handler import ScreenshotHandler
+from utils.step_budget import RunBudget, get_step_history
+
+STEP_NAMES = ("home", "careers", "open_roles", "lever_board", "filtered", "apply_form")
+
+
+def build_hiring_graph(
+    location: str = "Istanbul, Turkiye",
+    team: str = "Quality Assurance",
+    location_substr: str = "Istanbul",
+    checkpoint_dir: str = CHECKPOINT_DIR,
+) -> ScenarioGraph:
+    """
+    Build the hiring flow as a scenario graph
+
+    Args:
+        location: Lever location filter
+        team: Lever team filter
+        location_substr: Substring every listing location must contain
+        checkpoint_dir: Where node checkpoints are stored
+
+    Returns:
+        ScenarioGraph with the nodes in STEP_NAMES
+    """
+    step = get_instrumentation().step
+
+    def home(driver, screenshot_handler):
+        home_page = HomePage(driver, screenshot_handler)
+        with step("open_homepage"):
+            home_page.open(BASE_URL)
+        with step("step_1_verify_homepage"):
+            home_page.verify_homepage()
+        print("✓ Step 1: Verified Insider One homepage")
+
+    def careers(driver, screenshot_handler):
+        with step("step_2_open_career_page"):
+            HomePage(driver, screenshot_handler).click_we_are_hiring()
+            career_page = CareerPage(driver, screenshot_handler)
+            career_page.wait_until_ready()
+            career_page.verify_career_page()
+        print("✓ Step 2: Clicked 'We're hiring' and verified Career page")
+
+    def open_roles(driver, screenshot_handler):
+        career_page = CareerPage(driver, screenshot_handler)
+        with step("step_3_verify_explore_open_roles"):
+            career_page.verify_explore_open_roles_button()
+        print("✓ Step 3: Verified 'Explore open roles' button exists")
+
+        with step("step_4_click_explore_open_roles"):
+            career_page.click_explore_open_roles()
+        print("✓ Step 4: Clicked 'Explore open roles' button")
+
+    def lever_board(driver, screenshot_handler):
+        with step("step_5_open_software_development"):
+            JobListingPage(driver, screenshot_handler).click_software_development_open_positions()
+        print("✓ Step 5: Clicked 'Open Positions' under Software Development")
+
+    def filtered(driver, screenshot_handler):
+        job_listing_page = JobListingPage(driver, screenshot_handler)
+        # Step 6-7 tek seferde (hız)
+        with step("step_6_7_apply_filters"):
+            job_listing_page.apply_filters(location=location, team=team)
+        print(f"✓ Step 6-7: Applied Location='{location}' and Team='{team}'")
+
+        with step("step_8_verify_listings_displayed"):
+            job_listing_page.verify_job_listings_displayed()
+        print("✓ Step 8: Verified job listings are displayed")
+
+        with step("step_9_verify_listings_content"):
+            job_listing_page.verify_job_listings_content(expected_team=team, expected_location_substr=location_substr)
+        print(f"✓ Step 9: Verified listings contain '{team}' and '{location_substr}'")
+
+    def apply_form(driver, screenshot_handler):
+        job_listing_page = JobListingPage(driver, screenshot_handler)
+        with step("step_10_apply"):
+            job_listing_page.click_apply_button()
+            job_listing_page.verify_lever_application_form()
+        print("✓ Step 10: Clicked Apply -> Apply for this job and verified Lever Application Form")
+
+    graph = ScenarioGraph(CheckpointStore(checkpoint_dir))
+    parent = None
+    for name, action in zip(STEP_NAMES, (home, careers, open_roles, lever_board, filtered, apply_form)):
+        graph.add_step(name, action, parent)
+        parent = name
+    return graph
+
+
+def run_hiring_flow(
+    driver,
+    screenshot_handler: ScreenshotHandler,
+    location: str = "Istanbul, Turkiye",
+    team: str = "Quality Assurance",
+    location_substr: str = "Istanbul",
+    budget: RunBudget = None,
+):
+    """
+    Run the ten hiring page steps on the given driver.
+    A failed step is retried from the state its parent step left, within the run budget.
+
+    Args:
+        driver: Selenium WebDriver instance
+        screenshot_handler: Screenshot handler instance
+        location: Lever location filter
+        team: Lever team filter
+        location_substr: Substring every listing location must contain
+        budget: Time budget, defaults to RunBudget.from_config()
+    """
+    budget = budget or RunBudget.from_config(STEP_NAMES)
+    try:
+        build_hiring_graph(location, team, location_substr).run(driver, screenshot_handler, "apply_form", budget=budget)
+    finally:
+        if budget.history is not None:
+            budget.history.save()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run part of the hiring flow, optionally from a checkpoint")
+    parser.add_argument("--target", choices=STEP_NAMES, default="apply_form", help="Last step to run")
+    parser.add_argument("--from", dest="start_from", choices=STEP_NAMES, help="Checkpoint to start from")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs in one browser session")
+    parser.add_argument("--save-checkpoints", action="store_true", help="Save a checkpoint after every step")
+    parser.add_argument("--no-verify-upstream", action="store_true",
+                        help="Trust an existing checkpoint without re-running upstream steps once per session")
+    args = parser.parse_args(argv)
+
+    graph = build_hiring_graph()
+    screenshot_handler = ScreenshotHandler.from_config()
+    driver = create_chrome_driver()
+    try:
+        for i in range(args.repeat):
+            executed = graph.run(
+                driver,
+                screenshot_handler,
+                args.target,
+                start_from=args.start_from,
+                save_checkpoints=args.save_checkpoints,
+                verify_upstream_once=not args.no_verify_upstream,
+                budget=RunBudget.from_config(STEP_NAMES),
+            )
+            print(f"Run {i + 1}: executed {', '.join(executed)}")
+    except Exception as e:
+        screenshot_handler.take_screenshot(driver, "test_failure")
+        print(f"\n❌ Test failed: {str(e)}")
+        return 1
+    finally:
+        driver.quit()
+        screenshot_handler.flush()
+        get_step_history().save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
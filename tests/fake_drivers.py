@@ -0,0 +1,25 @@
+"""
+Fake drivers shared by several test modules
+"""
+from selenium.webdriver.remote.command import Command
+
+
+class CommandDriver:
+    """Routes commands through execute() like a real driver, so instrumentation sees them"""
+
+    def __init__(self):
+        self.current_window_handle = "tab-1"
+        self.window_handles = ["tab-1"]
+        self.commands = []
+        self.cdp = []
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        if command == Command.SWITCH_TO_WINDOW:
+            self.current_window_handle = params["handle"]
+        if command == "executeCdpCommand":
+            self.cdp.append((self.current_window_handle, params["cmd"], params["params"]))
+        return {"value": {}}
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"]
@@ -0,0 +1,107 @@
+"""
+Tests for the benchmark harness and the synthetic fixture site
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (
+    Benchmark,
+    compare_to_baselines,
+    failed_benchmarks,
+    format_results,
+    run_benchmark,
+    summarize,
+)
+from utils.fixture_site import FixtureSite
+from utils.preflight import ConnectionPool, LinkCollector, PostingCollector
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_summary_statistics(self):
+        stats = summarize([0.010, 0.012, 0.011, 0.013, 0.050])
+        self.assertEqual(stats["iterations"], 5)
+        self.assertAlmostEqual(stats["mean"], 0.0192)
+        self.assertAlmostEqual(stats["p50"], 0.012)
+        self.assertLessEqual(stats["p95"], stats["p99"])
+        self.assertLessEqual(stats["p99"], stats["max"])
+        self.assertGreater(stats["stddev"], 0)
+
+    def test_setup_and_warmup_are_not_timed(self):
+        calls = []
+        benchmark = Benchmark(
+            "op",
+            lambda: calls.append("run"),
+            setup=lambda: calls.append("setup"),
+            prepare=lambda: calls.append("prepare"),
+        )
+        stats = run_benchmark(benchmark, iterations=4, warmup=2)
+        self.assertEqual(stats["iterations"], 4)
+        self.assertEqual(calls[0], "prepare")
+        self.assertEqual(calls.count("setup"), 6)
+        self.assertEqual(calls.count("run"), 6)
+
+    def test_baseline_comparison(self):
+        results = {name: summarize([p50] * 3) for name, p50 in (("a", 0.10), ("b", 0.20), ("c", 0.05), ("d", 0.01))}
+        baselines = {"benchmarks": {"a": {"p50": 0.10}, "b": {"p50": 0.10}, "c": {"p50": 0.10}}}
+        comparison = compare_to_baselines(results, baselines, threshold=0.25)
+        self.assertEqual([row["status"] for row in comparison], ["ok", "regressed", "improved", "new"])
+        table = format_results(results, comparison)
+        self.assertIn("regressed (+100%)", table)
+
+    def test_missing_baselines_fail_only_when_required(self):
+        results = {"a": summarize([0.10] * 3), "b": summarize([0.30] * 3)}
+        comparison = compare_to_baselines(results, {"environment": {}, "benchmarks": {"b": {"p50": 0.10}}})
+        self.assertEqual(failed_benchmarks(comparison), ["b"])
+        self.assertEqual(failed_benchmarks(comparison, require_baselines=True), ["a", "b"])
+        empty = compare_to_baselines(results, {"environment": {}, "benchmarks": {}})
+        self.assertEqual(failed_benchmarks(empty), [])
+        self.assertEqual(failed_benchmarks(empty, require_baselines=True), ["a", "b"])
+
+
+class TestFixtureSite(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = FixtureSite().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.site.stop()
+
+    def test_board_sizes(self):
+        pool = ConnectionPool()
+        for size in (10, 1000, 10000):
+            collector = PostingCollector(self.site.board_url_for(size))
+            status, _ = pool.fetch_html(self.site.board_url_for(size), collector)
+            self.assertEqual(status, 200)
+            self.assertEqual(len(collector.postings), size)
+        posting = collector.postings[-1]
+        self.assertEqual(posting["team"], "Quality Assurance")
+        self.assertEqual(posting["apply_url"], f"{self.site.board_url}/p09999")
+        self.assertEqual(pool.connections_opened, 1)
+
+    def test_flow_pages_link_up(self):
+        pool = ConnectionPool()
+        links = LinkCollector()
+        pool.fetch_html(f"{self.site.base_url}careers/", links)
+        self.assertTrue(links.find(lambda a: a.get("href") == "#open-roles"))
+        software = links.find(lambda a: a.get("href", "").startswith(self.site.board_url))
+        self.assertIn("Software%20Development", software["href"])
+
+        # Listing card → job detail → application form, as JobListingPage.click_apply_button walks it
+        job = LinkCollector()
+        pool.fetch_html(f"{self.site.board_url}/p00000", job)
+        apply_link = job.find(lambda a: "postings-btn" in a.get("class", ""))
+        self.assertEqual(apply_link["href"], "/insiderone/p00000/apply")
+        body = []
+        status, _, _ = pool.request("GET", f"{self.site.board_url}/p00000/apply", lambda chunk, headers: body.append(chunk))
+        self.assertEqual(status, 200)
+        self.assertIn(b"<form", b"".join(body))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,163 @@
+"""
+Tests for cached driver resolution and startup timings
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import browser_startup, driver_factory
+from utils.browser_startup import (
+    StartupTimings,
+    copy_profile,
+    remove_on_quit,
+    resolve_chromedriver,
+    summarize,
+    time_first_navigation,
+)
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.visited = []
+        self.scripts = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        self.scripts.append("mark")
+
+    def execute_async_script(self, script, spec, timeout_ms):
+        self.scripts.append(spec["kind"])
+        return True
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestBrowserStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "binaries.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_driver_is_resolved_once_then_read_from_cache(self):
+        with mock.patch.object(browser_startup, "_download_chromedriver", return_value=(sys.executable, "webdriver-manager")) as download:
+            self.assertEqual(resolve_chromedriver(cache_path=self.cache_path), (sys.executable, "webdriver-manager"))
+            self.assertEqual(resolve_chromedriver(cache_path=self.cache_path), (sys.executable, "cache"))
+            self.assertEqual(download.call_count, 1)
+            resolve_chromedriver(cache_path=self.cache_path, refresh=True)
+            self.assertEqual(download.call_count, 2)
+
+    def test_missing_cached_binary_is_resolved_again(self):
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({"chromedriver": os.path.join(self.tmp.name, "gone")}, f)
+        with mock.patch.object(browser_startup, "_download_chromedriver", return_value=(sys.executable, "selenium-manager")):
+            self.assertEqual(resolve_chromedriver(cache_path=self.cache_path)[1], "selenium-manager")
+
+    def test_chrome_binary_is_cached_with_its_version_and_an_update_resolves_again(self):
+        chrome = os.path.join(self.tmp.name, "google-chrome")
+        with open(chrome, "w", encoding="utf-8") as f:
+            f.write("")
+        versions = {sys.executable: "120.0.6099.109", chrome: "120.0.6099.129"}
+        with mock.patch.object(browser_startup, "_download_chromedriver", return_value=(sys.executable, "webdriver-manager")) as download, \
+                mock.patch.object(browser_startup, "_find_chrome", return_value=chrome), \
+                mock.patch.object(browser_startup, "_binary_version", side_effect=versions.get):
+            resolve_chromedriver(cache_path=self.cache_path)
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+            self.assertEqual((cached["chrome"], cached["chrome_version"]), (chrome, "120.0.6099.129"))
+            self.assertEqual(cached["chromedriver_version"], "120.0.6099.109")
+
+            options = Options()
+            self.assertEqual(resolve_chromedriver(options, cache_path=self.cache_path)[1], "cache")
+            self.assertEqual(options.binary_location, chrome)
+
+            os.utime(chrome, (0, 0))
+            self.assertEqual(resolve_chromedriver(cache_path=self.cache_path)[1], "webdriver-manager")
+            self.assertEqual(download.call_count, 2)
+
+    def test_profile_copy_skips_locks_and_is_removed_on_quit(self):
+        template = os.path.join(self.tmp.name, "template")
+        os.makedirs(os.path.join(template, "Default"))
+        for name in ("Local State", "SingletonLock", os.path.join("Default", "Preferences")):
+            with open(os.path.join(template, name), "w", encoding="utf-8") as f:
+                f.write("{}")
+        copy = copy_profile(template)
+        self.assertEqual(sorted(os.listdir(copy)), ["Default", "Local State"])
+
+        driver = _FakeDriver()
+        remove_on_quit(driver, copy)
+        driver.quit()
+        self.assertFalse(os.path.exists(copy))
+
+    def test_profile_copy_is_removed_when_the_launch_fails(self):
+        template = os.path.join(self.tmp.name, "template")
+        os.makedirs(template)
+        copies = []
+
+        def copy(path):
+            copies.append(copy_profile(path))
+            return copies[-1]
+
+        with mock.patch.object(driver_factory, "resolve_chromedriver", return_value=(sys.executable, "cache")), \
+                mock.patch.object(driver_factory, "prepare_profile_template", return_value=template), \
+                mock.patch.object(driver_factory, "copy_profile", side_effect=copy), \
+                mock.patch.object(driver_factory, "launch", side_effect=SessionNotCreatedException("version mismatch")) as launch:
+            with self.assertRaises(SessionNotCreatedException):
+                driver_factory.create_chrome_driver(startup_profile="fast")
+        # The refreshed chromedriver was tried too
+        self.assertEqual(launch.call_count, 2)
+        self.assertFalse(os.path.exists(copies[0]))
+
+    def test_driver_is_quit_when_its_setup_fails(self):
+        driver = _FakeDriver()
+        driver.implicitly_wait = lambda seconds: None
+        with mock.patch.object(driver_factory, "apply_network_profile", side_effect=RuntimeError("CDP unavailable")):
+            with self.assertRaises(RuntimeError):
+                driver_factory._configure(driver, StartupTimings("fast"), "no-third-party", "none")
+        self.assertTrue(driver.quit_called)
+
+    def test_first_navigation_is_timed_once(self):
+        driver = _FakeDriver()
+        timings = StartupTimings("fast")
+        timings.record("session_create", 1.0)
+        time_first_navigation(driver, timings)
+        driver.get("https://insiderone.com/")
+        driver.get("https://insiderone.com/careers/")
+        self.assertEqual(driver.visited, ["https://insiderone.com/", "https://insiderone.com/careers/"])
+        self.assertEqual(list(timings.phases), ["session_create", "first_navigation"])
+        self.assertNotIn("get", vars(driver))
+        # The first navigation is timed up to the new document being parsed
+        self.assertEqual(driver.scripts, ["mark", "document_ready"])
+
+    def test_summarize_takes_median_per_phase(self):
+        runs = []
+        for spawn, session in ((0.1, 1.0), (0.2, 3.0), (0.3, 2.0)):
+            timings = StartupTimings("default")
+            timings.record("process_spawn", spawn)
+            timings.record("session_create", session)
+            runs.append(timings)
+        summary = summarize(runs)
+        self.assertEqual(list(summary), ["process_spawn", "session_create", "total"])
+        self.assertAlmostEqual(summary["session_create"], 2.0)
+        self.assertAlmostEqual(summary["total"], 2.3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,154 @@
+"""
+Tests for the in-page waits and the AdaptiveWait polling fallback
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import browser_wait
+from utils.browser_wait import AdaptiveWait, BrowserWait
+
+# Runs WAIT_JS once against a stub page and prints the observer options and the result
+_NODE_HARNESS = """
+var observed = [], result = 'pending';
+var window = {
+    location: {href: 'https://example.test/Careers/'},
+    requestAnimationFrame: function () {}, addEventListener: function () {}, removeEventListener: function () {}
+};
+var document = {readyState: 'complete', hidden: false, querySelectorAll: function () { return []; }};
+function MutationObserver() {
+    this.observe = function (target, options) { observed.push(options); };
+    this.disconnect = function () {};
+}
+function setTimeout() { return 0; }
+function clearTimeout() {}
+(function () {
+    var arguments = [SPEC, 5000, function (value) { result = value; }];
+    WAIT_JS
+})();
+console.log(JSON.stringify({observed: observed, result: result}));
+"""
+
+
+class _Clock:
+    """Stands in for time.monotonic/time.sleep so backoff is checked without waiting"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+class _FallbackDriver:
+    """Loses its document on the async wait, then answers CHECK_JS polls from a list"""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.script_timeouts = []
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, *args):
+        raise WebDriverException("javascript error: document unloaded while waiting for result")
+
+    def execute_script(self, script, *args):
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class TestAdaptiveWait(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.multiple(browser_wait.time, monotonic=self.clock.monotonic, sleep=self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_polls_quickly_then_backs_off_to_poll_frequency(self):
+        answers = iter([False] * 6 + ["done"])
+        self.assertEqual(AdaptiveWait(object(), 5, poll_frequency=0.2).until(lambda d: next(answers)), "done")
+        self.assertEqual(self.clock.sleeps, [0.05, 0.08, 0.128, 0.2, 0.2, 0.2])
+
+    def test_ignored_exceptions_count_as_not_yet(self):
+        answers = iter([NoSuchElementException(), StaleElementReferenceException(), "element"])
+
+        def condition(driver):
+            answer = next(answers)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        wait = AdaptiveWait(object(), 5, ignored_exceptions=StaleElementReferenceException)
+        self.assertEqual(wait.until(condition), "element")
+        with self.assertRaises(ValueError):
+            AdaptiveWait(object(), 5).until(lambda d: int("x"))
+
+    def test_times_out_without_sleeping_past_the_deadline(self):
+        with self.assertRaises(TimeoutException) as raised:
+            AdaptiveWait(object(), 1).until(lambda d: False, "never")
+        self.assertEqual(raised.exception.msg, "never")
+        self.assertLessEqual(self.clock.now, 1)
+        self.assertTrue(AdaptiveWait(object(), 1).until_not(lambda d: False))
+
+
+class TestBrowserWait(unittest.TestCase):
+
+    def test_lost_document_falls_back_to_polling_the_condition(self):
+        driver = _FallbackDriver([None, StaleElementReferenceException(), "https://example.test/careers"])
+        condition = browser_wait.url_contains("/careers")
+        self.assertEqual(BrowserWait(driver).until(condition, 5), "https://example.test/careers")
+        self.assertEqual(driver.script_timeouts, [5 + BrowserWait.SCRIPT_TIMEOUT_SLACK])
+
+    def test_in_page_timeout_raises(self):
+        driver = _FallbackDriver([])
+        driver.execute_async_script = lambda script, *args: None
+        with self.assertRaises(TimeoutException):
+            BrowserWait(driver).until(browser_wait.url_contains("/careers"), 1)
+
+    def _run_in_node(self, spec):
+        script = _NODE_HARNESS.replace("SPEC", json.dumps(spec)).replace("WAIT_JS", browser_wait.WAIT_JS)
+        return json.loads(subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_url_contains_is_case_sensitive(self):
+        self.assertEqual(self._run_in_node(browser_wait.url_contains("/Careers"))["result"], "https://example.test/Careers/")
+        self.assertEqual(self._run_in_node(browser_wait.url_contains("/careers"))["result"], "pending")
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_only_visibility_conditions_observe_attributes(self):
+        locators = [(By.CSS_SELECTOR, ".posting")]
+        self.assertEqual(self._run_in_node(browser_wait.present(locators))["observed"],
+                         [{"subtree": True, "childList": True}])
+        self.assertEqual(self._run_in_node(browser_wait.ready([browser_wait.stable_count(locators[0])]))["observed"],
+                         [{"subtree": True, "childList": True}])
+        observed = self._run_in_node(browser_wait.ready([browser_wait.stable_count(locators[0]),
+                                                         browser_wait.clickable(locators)]))["observed"]
+        self.assertEqual(observed, [{"subtree": True, "childList": True, "attributes": True,
+                                     "attributeFilter": browser_wait.OBSERVED_ATTRIBUTES}])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+"""
+Tests for the asyncio DevTools client, against a scripted fake endpoint
+"""
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenarios import async_hiring_flow
+from utils import browser_wait
+from utils.cdp_async import AsyncTab, CdpConnection, CdpError, JavascriptError, websockets
+
+
+class FakeChrome:
+    """Answers the handful of commands AsyncTab sends, with scripted evaluate results"""
+
+    def __init__(self, evaluate_results):
+        self.evaluate_results = list(evaluate_results)
+        self.methods = []
+
+    async def handler(self, websocket, path=None):
+        async for raw in websocket:
+            message = json.loads(raw)
+            method, session = message["method"], message.get("sessionId")
+            self.methods.append(method)
+            reply = {"id": message["id"], "result": {}}
+            if method == "Target.attachToTarget":
+                reply["result"] = {"sessionId": "S1"}
+            elif method == "Page.navigate":
+                reply["result"] = {"frameId": "F", "loaderId": "L"}
+                await websocket.send(json.dumps(reply))
+                await asyncio.sleep(0.05)
+                # An event for another session must not complete this tab's navigation
+                await websocket.send(json.dumps({"method": "Page.domContentEventFired", "params": {}, "sessionId": "S2"}))
+                await websocket.send(json.dumps({"method": "Page.domContentEventFired", "params": {"timestamp": 1}, "sessionId": session}))
+                continue
+            elif method == "Runtime.evaluate":
+                result = self.evaluate_results.pop(0)
+                if "error" in result:
+                    reply = {"id": message["id"], "error": result["error"]}
+                elif "exception" in result:
+                    reply["result"] = {"result": {"type": "object"},
+                                       "exceptionDetails": {"exception": {"description": result["exception"]}}}
+                else:
+                    reply["result"] = {"result": {"type": "object", "value": result["value"]}}
+            await websocket.send(json.dumps(reply))
+
+
+@unittest.skipIf(websockets is None, "websockets is not installed")
+class TestCdpAsync(unittest.IsolatedAsyncioTestCase):
+
+    async def _tab(self, fake):
+        server = await websockets.serve(fake.handler, "127.0.0.1", 0)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        port = server.sockets[0].getsockname()[1]
+        connection = await CdpConnection.connect(f"ws://127.0.0.1:{port}")
+        self.addAsyncCleanup(connection.close)
+        return await AsyncTab.attach(connection, "T1")
+
+    async def test_navigate_waits_for_own_dom_content_loaded(self):
+        fake = FakeChrome([])
+        tab = await self._tab(fake)
+        await asyncio.wait_for(tab.navigate("http://example.test/"), 2)
+        self.assertEqual(fake.methods, ["Target.attachToTarget", "Page.enable", "Page.navigate"])
+
+    async def test_wait_for_resumes_after_context_destroyed(self):
+        destroyed = {"error": {"code": -32000, "message": "Execution context was destroyed."}}
+        fake = FakeChrome([destroyed, {"value": "http://example.test/careers/"}])
+        tab = await self._tab(fake)
+        url = await tab.wait_for(browser_wait.url_contains("/careers"), timeout=2)
+        self.assertEqual(url, "http://example.test/careers/")
+        self.assertEqual(fake.methods.count("Runtime.evaluate"), 2)
+
+    async def test_wait_for_raises_errors_other_than_a_lost_context(self):
+        no_context = {"error": {"code": -32000, "message": "Cannot find context with specified id"}}
+        thrown = {"value": None, "exception": "TypeError: document.querySelectorAll is not a function"}
+        fake = FakeChrome([no_context, thrown])
+        tab = await self._tab(fake)
+        with self.assertRaises(JavascriptError) as raised:
+            await tab.wait_for(browser_wait.url_contains("/careers"), timeout=2)
+        self.assertIn("TypeError", str(raised.exception))
+        self.assertEqual(fake.methods.count("Runtime.evaluate"), 2)
+
+        fake.evaluate_results = [{"error": {"code": -32602, "message": "Invalid parameters"}}]
+        with self.assertRaises(CdpError):
+            await tab.wait_for(browser_wait.url_contains("/careers"), timeout=2)
+
+    async def test_errors_and_timeouts(self):
+        fake = FakeChrome([{"value": None}, {"error": {"code": -32601, "message": "boom"}}])
+        tab = await self._tab(fake)
+        with self.assertRaises(TimeoutError):
+            await tab.wait_for(browser_wait.url_contains("/never"), timeout=1)
+        with self.assertRaises(CdpError):
+            await tab.send("Runtime.evaluate", {"expression": "1"})
+
+
+
+class TestConcurrentLaunch(unittest.IsolatedAsyncioTestCase):
+
+    async def test_browsers_that_started_are_closed_when_another_launch_fails(self):
+        started = []
+
+        async def launch(headless=True):
+            await asyncio.sleep(0.01 * len(started))
+            if len(started) == 1:
+                started.append(None)
+                raise ConnectionError("DevTools endpoint did not come up")
+            browser = mock.Mock(spec=async_hiring_flow.AsyncBrowser)
+            started.append(browser)
+            return browser
+
+        with mock.patch.object(async_hiring_flow.AsyncBrowser, "launch", side_effect=launch):
+            with self.assertRaises(ConnectionError):
+                await async_hiring_flow.run_concurrent(runs=3, tabs_per_browser=1)
+        browsers = [browser for browser in started if browser is not None]
+        self.assertEqual(len(browsers), 2)
+        for browser in browsers:
+            browser.close.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,178 @@
+"""
+Tests for the warm driver pool and the parallel scenario runner
+"""
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from selenium.common.exceptions import WebDriverException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import parallel_runner
+from utils.driver_pool import DriverPool
+from utils.screenshot_handler import ScreenshotHandler
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class _FakeDriver:
+    """Records the commands a reset sends; broken drivers fail every reset"""
+
+    def __init__(self, number, broken=False):
+        self.number = number
+        self.broken = broken
+        self.window_handles = ["main", "popup"]
+        self.current = "main"
+        self.switch_to = _SwitchTo(self)
+        self.calls = []
+        self.quit_called = False
+
+    def close(self):
+        self.window_handles.remove(self.current)
+        self.calls.append(("close", self.current))
+
+    def execute_cdp_cmd(self, method, params):
+        if self.broken:
+            # What urllib3 raises once chromedriver is gone
+            raise ConnectionRefusedError(111, "Connection refused")
+        self.calls.append((method, params.get("origin")))
+        return {}
+
+    def execute_script(self, script, *args):
+        return "https://example.test"
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def get_screenshot_as_png(self):
+        return f"\x89PNG {self.number}".encode()
+
+    def quit(self):
+        self.quit_called = True
+
+
+class _Factory:
+    """Numbered fake drivers; the launches listed in fail_on raise instead"""
+
+    def __init__(self, fail_on=(), broken=()):
+        self.fail_on = set(fail_on)
+        self.broken = set(broken)
+        self.drivers = []
+        self._numbers = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            number = next(self._numbers)
+        if number in self.fail_on:
+            raise WebDriverException(f"launch {number} failed")
+        driver = _FakeDriver(number, broken=number in self.broken)
+        with self._lock:
+            self.drivers.append(driver)
+        return driver
+
+
+class TestDriverPool(unittest.TestCase):
+
+    def test_failed_prewarm_quits_the_sessions_that_started(self):
+        factory = _Factory(fail_on={2})
+        with self.assertRaises(WebDriverException):
+            DriverPool(size=3, factory=factory)
+        self.assertEqual(len(factory.drivers), 2)
+        self.assertTrue(all(driver.quit_called for driver in factory.drivers))
+
+    def test_lease_resets_the_driver_before_it_goes_back(self):
+        factory = _Factory()
+        with DriverPool(size=1, factory=factory) as pool:
+            with pool.lease() as driver:
+                self.assertEqual(driver.number, 1)
+            self.assertEqual(driver.calls, [
+                ("close", "popup"),
+                ("Network.clearBrowserCookies", None),
+                ("Network.clearBrowserCache", None),
+                ("Storage.clearDataForOrigin", "*"),
+                ("get", "about:blank"),
+            ])
+            self.assertEqual(driver.window_handles, ["main"])
+            self.assertIs(pool.acquire(timeout=0), driver)
+            with self.assertRaises(TimeoutError):
+                pool.acquire(timeout=0)
+        self.assertTrue(driver.quit_called)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+    def test_driver_that_cannot_be_reset_is_replaced(self):
+        factory = _Factory(broken={1})
+        with DriverPool(size=1, factory=factory) as pool:
+            with pool.lease() as first:
+                pass
+            self.assertTrue(first.quit_called)
+            with pool.lease() as second:
+                self.assertEqual(second.number, 2)
+        self.assertTrue(second.quit_called)
+
+    def test_failed_relaunch_leaves_an_empty_slot_the_next_acquire_fills(self):
+        factory = _Factory(broken={1}, fail_on={2, 3})
+        with DriverPool(size=1, factory=factory) as pool:
+            with pool.lease():
+                pass
+            # Relaunch 2 failed in release; acquire retries, fails (3) and keeps the slot
+            with self.assertRaises(WebDriverException):
+                pool.acquire(timeout=0)
+            with pool.lease(timeout=0) as driver:
+                self.assertEqual(driver.number, 4)
+            self.assertEqual(pool._all, [driver])
+
+    def test_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            DriverPool(size=0, factory=_Factory())
+
+
+class TestParallelRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(parallel_runner, "record_run")
+        self.record_run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scenarios_overlap_on_leased_drivers_and_failures_are_captured(self):
+        # Both scenarios must be inside the barrier at once, which needs two leased drivers
+        barrier = threading.Barrier(2, timeout=5)
+        used = []
+
+        def passing(driver, screenshot_handler):
+            used.append(driver.number)
+            barrier.wait()
+
+        def failing(driver, screenshot_handler):
+            used.append(driver.number)
+            barrier.wait()
+            raise AssertionError("apply button missing")
+
+        handler = ScreenshotHandler(self.tmp.name, image_format="png", async_writes=False)
+        with DriverPool(size=2, factory=_Factory()) as pool:
+            results = parallel_runner.run_scenarios({"ok": passing, "broken": failing}, pool, handler)
+        self.assertEqual(sorted(used), [1, 2])
+        self.assertEqual([(r["name"], r["passed"]) for r in results], [("ok", True), ("broken", False)])
+        self.assertIn("apply button missing", results[1]["error"])
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+        self.assertTrue(os.listdir(self.tmp.name)[0].startswith("failed_broken_"))
+        recorded = {call.args[0]: call.args[1] for call in self.record_run.call_args_list}
+        self.assertEqual(recorded, {"ok": True, "broken": False})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+"""
+Tests for the navigation-aware element cache
+"""
+import os
+import sys
+import unittest
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.base_page import BasePage
+from utils.screenshot_handler import ScreenshotHandler
+
+CARD = (By.CSS_SELECTOR, "a.posting-btn-submit")
+ITEMS = (By.CSS_SELECTOR, ".posting")
+
+
+class _FakeDriver:
+    """A page of selector → element ids, answering the wait and validation scripts"""
+
+    def __init__(self):
+        self.url = "https://jobs.lever.co/insiderone"
+        self.generation = 0
+        self.dom = {CARD[1]: ["card-1"], ITEMS[1]: ["item-1", "item-2"]}
+        self.detached = set()
+        self.sent = []
+
+    def execute(self, command, params=None):
+        self.sent.append(command)
+        token = [self.url, self.generation]
+        if command == Command.W3C_EXECUTE_SCRIPT_ASYNC:
+            spec = params["args"][0]
+            ids = self.dom.get(spec["locators"][0][1])
+            if not ids:
+                return {"value": None}
+            elements = [WebElement(self, element_id) for element_id in ids]
+            value = [0, elements if spec["all"] else elements[0]]
+            return {"value": [value, token] if spec["token"] else value}
+        if command == Command.W3C_EXECUTE_SCRIPT and "isConnected" in params["script"]:
+            return {"value": [token, [element.id not in self.detached for element in params["args"][0]]]}
+        if command in (Command.GET_ELEMENT_TEXT, Command.CLICK_ELEMENT):
+            if params["id"] in self.detached:
+                raise StaleElementReferenceException("stale element reference")
+            return {"value": f"text of {params['id']}"}
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})["value"]
+
+    def execute_async_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})["value"]
+
+    def set_script_timeout(self, seconds):
+        self.execute(Command.SET_TIMEOUTS, {"script": int(seconds * 1000)})
+
+    def get(self, url):
+        self.execute(Command.GET, {"url": url})
+        self.url = url
+
+    def rerender(self, selector, ids):
+        """Page JS replaces the matches of a selector"""
+        self.detached.update(self.dom[selector])
+        self.dom[selector] = ids
+        self.generation += 1
+
+
+class TestElementCache(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = _FakeDriver()
+        self.page = BasePage(self.driver, ScreenshotHandler(async_writes=False))
+        self.cache = self.page.element_cache
+
+    def _count(self, command):
+        return self.driver.sent.count(command)
+
+    def test_repeated_lookups_cost_no_round_trips(self):
+        first = self.page.find_element(*CARD)
+        self.assertEqual(self.page.get_text(*CARD), "text of card-1")
+        self.assertTrue(self.page.is_element_present(*CARD))
+        self.assertIs(self.page._wait_present(CARD), first)
+        self.assertEqual(self._count(Command.W3C_EXECUTE_SCRIPT_ASYNC), 1)
+        self.assertEqual(self.cache.stats(), {"hits": 3, "validations": 0, "misses": 1})
+
+    def test_page_changing_command_validates_all_entries_in_one_script(self):
+        card = self.page.find_element(*CARD)
+        self.page.find_elements(*ITEMS)
+        card.click()
+        self.assertEqual(self.page.find_element(*CARD).id, "card-1")
+        self.assertEqual(len(self.page.find_elements(*ITEMS)), 2)
+        self.assertEqual(self._count(Command.W3C_EXECUTE_SCRIPT), 1)
+        self.assertEqual(self._count(Command.W3C_EXECUTE_SCRIPT_ASYNC), 2)
+
+    def test_dom_generation_drops_lists_and_detached_elements(self):
+        self.page.find_element(*CARD)
+        self.page.find_elements(*ITEMS)
+        self.driver.execute_script("window.scrollTo(0, 500);")
+        self.driver.rerender(CARD[1], ["card-2"])
+        self.assertEqual(self.page.find_element(*CARD).id, "card-2")
+        self.assertNotIn((ITEMS, True), self.cache.entries)
+
+    def test_navigation_clears_cache(self):
+        self.page.find_element(*CARD)
+        self.driver.get("https://jobs.lever.co/insiderone?team=QA")
+        self.assertEqual(self.cache.entries, {})
+        self.page.find_element(*CARD)
+        self.assertEqual(self._count(Command.W3C_EXECUTE_SCRIPT_ASYNC), 2)
+        self.assertEqual(self._count(Command.W3C_EXECUTE_SCRIPT), 0)
+
+    def test_stale_element_is_located_again(self):
+        items = self.page.find_elements(*ITEMS)
+        self.driver.rerender(ITEMS[1], ["item-3", "item-4"])
+        self.assertEqual(items[1].text, "text of item-4")
+        self.assertEqual(items[1].id, "item-4")
+        self.driver.rerender(ITEMS[1], ["item-5"])
+        with self.assertRaises(StaleElementReferenceException):
+            items[1].click()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,174 @@
+"""
+Tests for failure bundles
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from selenium.webdriver.chrome.options import Options
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.devtools_log import enable_performance_log
+from utils.failure_bundle import FailureRecorder, events_to_har, read_bundle
+from utils.instrumentation import get_instrumentation
+
+
+def _perf_entry(method, params, timestamp=1000):
+    return {"message": json.dumps({"message": {"method": method, "params": params}}), "timestamp": timestamp}
+
+
+def _request(request_id, url, start):
+    return _perf_entry("Network.requestWillBeSent", {
+        "requestId": request_id, "request": {"url": url, "method": "GET", "headers": {"Accept": "*/*"}},
+        "timestamp": start, "wallTime": 1_700_000_000 + start, "type": "Document",
+    })
+
+
+class _FakeDriver:
+    """Serves queued performance/browser log entries and a page to snapshot"""
+
+    current_url = "https://jobs.lever.co/insiderone?team=Quality%20Assurance"
+    title = "Insider One - Jobs"
+    window_handles = ["main", "lever"]
+
+    def __init__(self):
+        self.performance = []
+        self.browser = []
+        self.log_calls = 0
+
+    def get_log(self, kind):
+        self.log_calls += 1
+        entries = getattr(self, kind)
+        setattr(self, kind, [])
+        return entries
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Page.captureSnapshot":
+            return {"data": "MIME-Version: 1.0\r\n\r\n<html>board</html>"}
+        return {}
+
+    def execute_script(self, script, *args):
+        return "<html>board</html>"
+
+    def get_screenshot_as_png(self):
+        return b"\x89PNG fake"
+
+
+class TestFailureBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.driver = _FakeDriver()
+        self.recorder = FailureRecorder(self.driver, bundle_dir=self.tmp.name, ring_size=8, drain_every=5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_passing_steps_only_drain_every_few_steps(self):
+        for i in range(12):
+            self.driver.performance.append(_request(str(i), f"https://jobs.lever.co/{i}", float(i)))
+            self.recorder._on_step("HomePage.verify_homepage", None)
+        # Two drains (steps 5 and 10), each reading the performance and browser logs
+        self.assertEqual(self.driver.log_calls, 4)
+        self.assertEqual(len(self.recorder.events), 8)
+        self.assertEqual(self.recorder.events[-1][2]["requestId"], "9")
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_failed_step_writes_one_bundle(self):
+        self.driver.performance += [
+            _request("1", "https://jobs.lever.co/insiderone", 10.0),
+            _perf_entry("Network.responseReceived", {"requestId": "1", "timestamp": 10.2, "response": {
+                "status": 200, "statusText": "OK", "mimeType": "text/html", "headers": {}, "protocol": "h2"}}),
+            _perf_entry("Network.loadingFinished", {"requestId": "1", "timestamp": 10.5, "encodedDataLength": 5120}),
+            _request("2", "https://cdn.lever.co/app.js", 10.3),
+            _perf_entry("Network.loadingFailed", {"requestId": "2", "timestamp": 10.4, "errorText": "net::ERR_FAILED"}),
+            _perf_entry("Network.dataReceived", {"requestId": "1", "timestamp": 10.3}),
+        ]
+        self.driver.browser.append({"level": "SEVERE", "message": "app.js - Failed to load resource", "timestamp": 1})
+
+        error = AssertionError("No job listings found")
+        with get_instrumentation().span("JobListingPage.verify_and_apply", "step"):
+            self.recorder._on_step("JobListingPage.verify_job_listings_content", error)
+        try:
+            raise AssertionError(f"Verifying jobs failed: {error}") from error
+        except AssertionError as wrapped:
+            # The enclosing step sees a wrapper of the same failure
+            self.recorder._on_step("JobListingPage.verify_and_apply", wrapped)
+
+        bundles = self.recorder.take_bundles()
+        self.assertEqual(len(bundles), 1)
+        self.assertEqual(self.recorder.take_bundles(), [])
+        files = read_bundle(bundles[0])
+        self.assertEqual(
+            sorted(files),
+            ["console.json", "events.jsonl", "meta.json", "network.har", "page.mhtml", "screenshot.png"],
+        )
+        meta = json.loads(files["meta.json"])
+        self.assertEqual(meta["step"], "JobListingPage.verify_job_listings_content")
+        self.assertEqual(meta["window_handles"], 2)
+        self.assertIn("No job listings found", meta["error"])
+        # dataReceived is not one of the recorded events
+        self.assertEqual(len(files["events.jsonl"].splitlines()), 5)
+        self.assertEqual(json.loads(files["console.json"])[0]["level"], "SEVERE")
+        entries = json.loads(files["network.har"])["log"]["entries"]
+        self.assertEqual([e["response"]["status"] for e in entries], [200, 0])
+        self.assertEqual(entries[0]["time"], 500.0)
+        self.assertEqual(entries[0]["response"]["bodySize"], 5120)
+        self.assertEqual(entries[1]["response"]["_error"], "net::ERR_FAILED")
+
+    def test_failures_are_forgotten_once_the_outermost_step_ends(self):
+        for i in range(3):
+            error = AssertionError(f"Apply button missing {i}")
+            with get_instrumentation().span("JobListingPage.verify_and_apply", "step"):
+                self.recorder._on_step("JobListingPage.click_apply_button", error)
+                self.recorder._on_step("JobListingPage.click_apply_button", error)
+            self.recorder._on_step("JobListingPage.verify_and_apply", error)
+            self.assertEqual(self.recorder._captured, [])
+        # One bundle per failure, however many steps re-raised it
+        self.assertEqual(len(self.recorder.take_bundles()), 3)
+
+    def test_every_navigation_is_drained(self):
+        def command(name):
+            for callback in self.driver._command_observers:
+                callback(name)
+
+        command("get")
+        self.recorder._on_step("HomePage.open", None)
+        self.assertEqual(self.driver.log_calls, 2)
+        # Two navigations in one step: the first is drained before the second starts
+        command("get")
+        command("findElement")
+        command("goBack")
+        self.assertEqual(self.driver.log_calls, 4)
+        self.recorder._on_step("CareerPage.go_back", None)
+        self.assertEqual(self.driver.log_calls, 6)
+        self.recorder._on_step("CareerPage.verify_career_page", None)
+        self.assertEqual(self.driver.log_calls, 6)
+
+    def test_oldest_bundles_are_deleted_beyond_the_budget(self):
+        self.recorder.max_files = 2
+        paths = [self.recorder.capture(f"step_{i}") for i in range(2)]
+        os.utime(paths[0], (1, 1))
+        paths.append(self.recorder.capture("step_2"))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted(os.path.basename(p) for p in paths[1:]))
+
+    def test_performance_log_is_limited_to_the_domains_read(self):
+        options = enable_performance_log(Options(), page=False, console=False)
+        self.assertEqual(options.experimental_options["perfLoggingPrefs"], {"enableNetwork": True, "enablePage": False})
+        self.assertEqual(options.to_capabilities()["goog:loggingPrefs"], {"performance": "ALL"})
+
+    def test_html_snapshot_fallback(self):
+        self.recorder.snapshot = "html"
+        files = read_bundle(self.recorder.capture("manual"))
+        self.assertEqual(files["page.html"], b"<html>board</html>")
+
+    def test_har_ignores_events_without_request(self):
+        events = [(1, "Network.loadingFinished", {"requestId": "x", "timestamp": 1.0})]
+        self.assertEqual(events_to_har(events)["log"]["entries"], [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
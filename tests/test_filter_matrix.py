@@ -0,0 +1,123 @@
+"""
+Tests for the filter matrix run in parallel tabs
+"""
+import os
+import sys
+import unittest
+from urllib.parse import parse_qs, urlparse
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pages.job_listing_page import JobListingPage
+from utils.screenshot_handler import ScreenshotHandler
+
+_QA = {"title": "QA Engineer", "team": "Quality Assurance", "location": "Istanbul, Turkiye"}
+_DEV = {"title": "Backend Engineer", "team": "Software Development", "location": "Istanbul, Turkiye"}
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        self.driver.check()
+        handle = f"tab{len(self.driver.open_handles)}"
+        self.driver.open_handles.append(handle)
+        self.driver.current_window_handle = handle
+
+    def window(self, handle):
+        self.driver.check()
+        self.driver.current_window_handle = handle
+
+
+class _TabDriver:
+    """Tabs that each load the board for the last URL they navigated to, on the second poll"""
+
+    def __init__(self, boards, die_on_navigation=None):
+        self.boards = boards
+        self.die_on_navigation = die_on_navigation
+        self.dead = False
+        self.open_handles = ["main"]
+        self.current_window_handle = "main"
+        self.switch_to = _SwitchTo(self)
+        self.urls = {}
+        self.polls = {}
+        self.navigations = 0
+
+    def check(self):
+        if self.dead:
+            raise WebDriverException("no such window")
+
+    def execute(self, command, params=None):
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        self.check()
+        handle = self.current_window_handle
+        if "__filterMatrixPending = true" in script:
+            self.navigations += 1
+            if self.navigations == self.die_on_navigation:
+                self.dead = True
+                raise InvalidSessionIdException("session deleted")
+            self.urls[handle] = args[0]
+            self.polls[handle] = 0
+            return None
+        self.polls[handle] += 1
+        if self.polls[handle] < 2:
+            return None
+        query = parse_qs(urlparse(self.urls[handle]).query)
+        return {"postings": self.boards[(query["location"][0], query["team"][0])]}
+
+    def close(self):
+        self.check()
+        self.open_handles.remove(self.current_window_handle)
+
+
+class TestFilterMatrix(unittest.TestCase):
+
+    PAIRS = [
+        ("Istanbul, Turkiye", "Quality Assurance"),
+        ("Istanbul, Turkiye", "Software Development"),
+        ("Istanbul, Turkiye", "Sales"),
+    ]
+
+    def _page(self, driver):
+        return JobListingPage(driver, ScreenshotHandler(async_writes=False))
+
+    def test_pairs_run_in_tabs_and_an_empty_board_is_a_count_of_zero(self):
+        driver = _TabDriver({
+            self.PAIRS[0]: [_QA],
+            self.PAIRS[1]: [_DEV, _QA],
+            self.PAIRS[2]: [],
+        })
+        rows = self._page(driver).check_filter_matrix(self.PAIRS, tabs=2, expected_location_for=lambda location: "Istanbul")
+        by_team = {row["team"]: row for row in rows}
+        self.assertEqual(len(rows), 3)
+        self.assertEqual((by_team["Quality Assurance"]["count"], by_team["Quality Assurance"]["error"]), (1, None))
+        self.assertEqual(by_team["Software Development"]["violations"], 1)
+        self.assertEqual((by_team["Sales"]["count"], by_team["Sales"]["error"]), (0, None))
+        self.assertEqual(driver.open_handles, ["main"])
+        self.assertEqual(driver.current_window_handle, "main")
+
+    def test_empty_board_fails_when_postings_are_required(self):
+        driver = _TabDriver({self.PAIRS[2]: []})
+        row = self._page(driver).check_filter_matrix(self.PAIRS[2:], require_postings=True)[0]
+        self.assertEqual((row["count"], row["error"]), (0, "No postings found"))
+
+    def test_expected_location_defaults_to_the_city(self):
+        london = {"title": "QA Engineer", "team": "Quality Assurance", "location": "London, UK"}
+        driver = _TabDriver({("Istanbul, Turkiye", "Quality Assurance"): [london]})
+        row = self._page(driver).check_filter_matrix(self.PAIRS[:1], tabs=4)[0]
+        self.assertEqual(row["violations"], 1)
+        self.assertIn("does not contain 'Istanbul'", row["details"])
+
+    def test_failing_tab_cleanup_does_not_hide_the_original_error(self):
+        driver = _TabDriver({pair: [_QA] for pair in self.PAIRS}, die_on_navigation=2)
+        with self.assertRaises(InvalidSessionIdException):
+            self._page(driver).check_filter_matrix(self.PAIRS, tabs=2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
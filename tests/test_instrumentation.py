@@ -0,0 +1,150 @@
+"""
+Tests for command counting, spans and the metrics reports
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.instrumentation import Instrumentation, add_step_observer, instrumented
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, command, params=None):
+        self.sent.append(command)
+        return {"value": None}
+
+
+class _Page:
+    def __init__(self, driver, instrumentation):
+        self.driver = driver
+        self.instrumentation = instrumentation
+
+    @instrumented()
+    def open_careers(self):
+        self.driver.execute("get", {"url": "https://example.test/careers/"})
+        self.find_link()
+
+    @instrumented(kind="helper")
+    def find_link(self):
+        self.driver.execute("findElement")
+
+    @instrumented()
+    def fail(self):
+        raise AssertionError("banner covers the button")
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+        self.driver = _FakeDriver()
+        self.instrumentation.attach(self.driver)
+        self.page = _Page(self.driver, self.instrumentation)
+
+    def _spans(self):
+        return {span.name: span for span in self.instrumentation.spans}
+
+    def test_commands_count_against_every_open_span(self):
+        self.instrumentation.attach(self.driver)
+        with self.instrumentation.step("hiring_flow"):
+            self.page.open_careers()
+        self.driver.execute("getTitle")
+        spans = self._spans()
+        self.assertEqual(self.driver.sent, ["get", "findElement", "getTitle"])
+        self.assertEqual(spans["hiring_flow"].commands, 2)
+        self.assertEqual(spans["_Page.open_careers"].commands, 2)
+        self.assertEqual(spans["_Page.find_link"].commands, 1)
+        self.assertEqual(spans["get"].kind, "navigation")
+        self.assertEqual(spans["_Page.open_careers"].navigation_time, spans["get"].duration)
+        self.assertEqual(spans["hiring_flow"].navigation_time, spans["get"].duration)
+
+    def test_failed_steps_record_the_error_and_notify_observers(self):
+        seen = []
+        add_step_observer(self.driver, lambda name, error: seen.append((name, type(error).__name__)))
+        with self.assertRaises(AssertionError):
+            self.page.fail()
+        self.page.find_link()
+        self.assertEqual(self._spans()["_Page.fail"].error, "AssertionError: banner covers the button")
+        # Helpers are not steps, observers only hear about steps
+        self.assertEqual(seen, [("_Page.fail", "AssertionError")])
+
+    def test_concurrent_tasks_keep_separate_span_stacks(self):
+        async def flow(name):
+            with self.instrumentation.step(name):
+                for _ in range(3):
+                    self.driver.execute("findElement")
+                    await asyncio.sleep(0)
+
+        async def both():
+            await asyncio.gather(flow("first"), flow("second"))
+
+        asyncio.run(both())
+        spans = self._spans()
+        self.assertEqual((spans["first"].commands, spans["second"].commands), (3, 3))
+
+    def test_waits_are_recorded_as_wait_time(self):
+        answers = iter([False, "element"])
+        with self.instrumentation.step("hiring_flow"):
+            wait = self.instrumentation.wait(self.driver, 2, "wait_for_apply", poll_frequency=0.01)
+            self.assertEqual(wait.until(lambda d: next(answers)), "element")
+        spans = self._spans()
+        self.assertEqual(spans["wait_for_apply"].kind, "wait")
+        self.assertEqual(spans["wait_for_apply"].timeout, 2)
+        self.assertEqual(spans["hiring_flow"].wait_time, spans["wait_for_apply"].duration)
+
+    def test_reports_cover_json_prometheus_trace_and_extras(self):
+        with self.instrumentation.step("hiring_flow"):
+            self.page.open_careers()
+        with self.assertRaises(AssertionError):
+            self.page.fail()
+        self.instrumentation.add_report("startup", lambda: {"startups": [{"total": 1.5}]})
+        with tempfile.TemporaryDirectory() as report_dir:
+            paths = self.instrumentation.write_reports(report_dir, chrome_trace=True)
+            self.assertEqual(sorted(os.path.basename(p) for p in paths),
+                             ["metrics.json", "metrics.prom", "startup.json", "trace.json"])
+            with open(os.path.join(report_dir, "metrics.json"), encoding="utf-8") as f:
+                metrics = json.load(f)
+            with open(os.path.join(report_dir, "metrics.prom"), encoding="utf-8") as f:
+                prom = f.read().splitlines()
+            with open(os.path.join(report_dir, "trace.json"), encoding="utf-8") as f:
+                trace = json.load(f)
+            with open(os.path.join(report_dir, "startup.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f), {"startups": [{"total": 1.5}]})
+
+        summary = metrics["summary"]
+        self.assertEqual(summary["_Page.open_careers"]["commands"], 2)
+        self.assertEqual(summary["_Page.fail"]["errors"], 1)
+        self.assertEqual(summary["get"]["kind"], "navigation")
+        self.assertEqual([span["name"] for span in metrics["spans"]],
+                         ["hiring_flow", "_Page.open_careers", "get", "_Page.find_link", "_Page.fail"])
+
+        self.assertIn("# TYPE hiring_step_duration_seconds summary", prom)
+        self.assertIn('hiring_step_duration_seconds_count{step="_Page.open_careers",kind="step"} 1', prom)
+        self.assertIn('hiring_step_webdriver_commands_total{step="hiring_flow",kind="scenario"} 2', prom)
+        self.assertIn('hiring_step_errors_total{step="_Page.fail",kind="step"} 1', prom)
+
+        events = {event["name"]: event for event in trace["traceEvents"]}
+        self.assertEqual(events["_Page.find_link"]["ph"], "X")
+        self.assertEqual(events["_Page.find_link"]["cat"], "helper")
+        self.assertEqual(events["_Page.fail"]["args"]["error"], "AssertionError: banner covers the button")
+        self.assertGreaterEqual(events["_Page.find_link"]["ts"], events["_Page.open_careers"]["ts"])
+
+    def test_discard_before_keeps_newer_and_open_spans(self):
+        with self.instrumentation.step("old"):
+            pass
+        with self.instrumentation.step("running") as running:
+            cutoff = running.start
+            self.assertEqual(self.instrumentation.discard_before(cutoff), 1)
+        self.assertEqual([span.name for span in self.instrumentation.spans], ["running"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
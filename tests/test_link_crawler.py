@@ -0,0 +1,150 @@
+"""
+Tests for the link crawler, against the local fixture site
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fixture_site import TEAMS, FixtureSite
+from utils.link_crawler import AsyncConnectionPool, CrawlResult, LinkCrawler, crawl_links, selector_matcher
+
+
+class _RecordingPool(AsyncConnectionPool):
+    """Keeps every connection it opens, to check they are all closed"""
+
+    def __init__(self):
+        super().__init__(rate_per_host=0, timeout=2)
+        self.opened = []
+
+    async def _open(self, origin):
+        connection = await super()._open(origin)
+        self.opened.append(connection)
+        return connection
+
+
+class _StaleWriter:
+    """Writer of an idle connection the server already closed"""
+
+    def __init__(self):
+        self.closed = False
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+async def _serve(reply: bytes):
+    """Local server answering every request with reply; an empty reply closes without answering"""
+
+    async def handle(reader, writer):
+        while (await reader.readline()).strip():
+            pass
+        writer.write(reply)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+
+
+class TestLinkCrawler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = FixtureSite(default_postings=1000, broken_postings=3).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.site.stop()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _crawl(self, **kwargs):
+        return crawl_links(
+            base_url=self.site.base_url, board_url=self.site.board_url, concurrency=8, rate_per_host=0,
+            cache_path=os.path.join(self.tmp.name, "crawl.json"), **kwargs
+        )
+
+    def test_every_link_is_checked_and_broken_ones_reported(self):
+        result = self._crawl()
+        kinds = {}
+        for check in result.checks:
+            kinds[check["kind"]] = kinds.get(check["kind"], 0) + 1
+        # Every team board lists the same postings; each URL is checked once
+        self.assertEqual(kinds, {"home": 1, "careers": 1, "team_board": len(TEAMS), "posting": 1000,
+                                 "apply_card": 3, "apply_form": 1000})
+        broken = result.broken
+        self.assertEqual(len(broken), 3)
+        self.assertTrue(all(b["kind"] == "apply_card" and b["status"] == 404 for b in broken))
+        self.assertIn("/insiderone?team=", broken[0]["referrer"])
+        self.assertLessEqual(result.connections_opened, 8 + len(broken) + 2)
+
+    def test_unchanged_pages_are_revalidated_from_cache(self):
+        first = self._crawl(limit=50)
+        second = self._crawl(limit=50)
+        self.assertEqual(sum(c["revalidated"] for c in first.checks), 0)
+        revalidated = [c for c in second.checks if c["revalidated"]]
+        # Everything but the broken links answered 304 and kept its discovered links
+        self.assertEqual(len(revalidated), len(second.checks) - len(second.broken))
+        self.assertEqual(len(second.checks), len(first.checks))
+
+    def test_corrupt_gzip_body_is_reported_as_broken(self):
+        async def run():
+            server, url = await _serve(b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\nContent-Length: 4\r\n\r\nnope")
+            async with server:
+                pool = _RecordingPool()
+                result = CrawlResult()
+                crawler = LinkCrawler(base_url=url, board_url=url, cache_path=None)
+                await crawler._fetch(pool, result, url, "home", None, extract=lambda response: [])
+                await pool.close()
+                return pool, result
+
+        pool, result = asyncio.run(run())
+        self.assertEqual(len(result.broken), 1)
+        self.assertIn("error", result.broken[0]["error"])
+        self.assertTrue(all(writer.is_closing() for _, writer in pool.opened))
+
+    def test_failed_retry_closes_the_fresh_connection(self):
+        async def run():
+            server, url = await _serve(b"")
+            async with server:
+                pool = _RecordingPool()
+                stale_reader = asyncio.StreamReader()
+                stale_reader.feed_eof()
+                stale_writer = _StaleWriter()
+                origin = ("http", "127.0.0.1", server.sockets[0].getsockname()[1])
+                pool._idle[origin] = [(stale_reader, stale_writer)]
+                with self.assertRaises(ConnectionResetError):
+                    await pool.request("GET", url)
+                return pool, pool._idle[origin], stale_writer
+
+        pool, idle, stale_writer = asyncio.run(run())
+        self.assertTrue(stale_writer.closed)
+        self.assertEqual(len(pool.opened), 1)
+        self.assertTrue(pool.opened[0][1].is_closing())
+        self.assertEqual(idle, [])
+
+    def test_selector_matcher(self):
+        matches = selector_matcher("a.postings-btn[href*='/apply'], form")
+        self.assertTrue(matches("a", {"class": "postings-btn template-btn-submit", "href": "/x/1/apply"}))
+        self.assertFalse(matches("a", {"class": "postings-btn", "href": "/x/1"}))
+        self.assertTrue(matches("form", {}))
+        with self.assertRaises(ValueError):
+            selector_matcher("div > a")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
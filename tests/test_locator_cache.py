@@ -0,0 +1,74 @@
+"""
+Tests for the learned locator order and the locator conversion for in-page scripts
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.locator_cache import LocatorCache
+from utils.locators import to_js_locator
+
+_CSS = (By.CSS_SELECTOR, "a.apply")
+_XPATH = (By.XPATH, "//a[text()='Apply']")
+_LINK = (By.LINK_TEXT, "Apply")
+
+
+class TestLocatorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "locators.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_winners_move_first_and_ties_keep_the_declared_order(self):
+        cache = LocatorCache(self.path)
+        locators = [_CSS, _XPATH, _LINK]
+        self.assertEqual(cache.order("JobPage", "apply", locators), locators)
+        cache.record("JobPage", "apply", locators, _LINK)
+        cache.record("JobPage", "apply", locators, _LINK)
+        cache.record("JobPage", "apply", locators, _XPATH)
+        self.assertEqual(cache.order("JobPage", "apply", locators), [_LINK, _XPATH, _CSS])
+        self.assertEqual(cache.order("OtherPage", "apply", locators), locators)
+
+    def test_never_won_lists_locators_that_only_took_part(self):
+        cache = LocatorCache(self.path)
+        cache.record("JobPage", "apply", [_CSS, _XPATH], _XPATH)
+        cache.record("JobPage", "apply", [_CSS, _XPATH], _XPATH)
+        self.assertEqual(cache.never_won(), [("JobPage", "apply", "css selector=a.apply", 2)])
+
+    def test_resolutions_are_written_in_batches_and_on_flush(self):
+        cache = LocatorCache(self.path, save_every=3)
+        cache.record("JobPage", "apply", [_CSS], _CSS)
+        cache.record("JobPage", "apply", [_CSS], _CSS)
+        self.assertFalse(os.path.exists(self.path))
+        cache.record("JobPage", "apply", [_CSS], _CSS)
+        self.assertEqual(LocatorCache(self.path)._data["JobPage"]["apply"]["css selector=a.apply"]["wins"], 3)
+
+        cache.record("JobPage", "apply", [_CSS, _LINK], _CSS)
+        cache.flush()
+        reloaded = LocatorCache(self.path)
+        self.assertEqual(reloaded.never_won(), [("JobPage", "apply", "link text=Apply", 1)])
+        self.assertEqual(reloaded.order("JobPage", "apply", [_LINK, _CSS]), [_CSS, _LINK])
+
+    def test_locators_convert_to_css_or_xpath(self):
+        self.assertEqual(to_js_locator(_CSS), ["css", "a.apply"])
+        self.assertEqual(to_js_locator(_XPATH), ["xpath", "//a[text()='Apply']"])
+        self.assertEqual(to_js_locator((By.ID, "main")), ["css", '[id="main"]'])
+        self.assertEqual(to_js_locator((By.CLASS_NAME, "posting")), ["css", ".posting"])
+        self.assertEqual(to_js_locator(_LINK), ["xpath", "//a[normalize-space(.)='Apply']"])
+        self.assertEqual(to_js_locator((By.PARTIAL_LINK_TEXT, "We're")), ["xpath", '//a[contains(., "We\'re")]'])
+        self.assertEqual(to_js_locator((By.LINK_TEXT, "Say \"we're\"")),
+                         ["xpath", "//a[normalize-space(.)=concat('Say \"we', \"'\", 're\"')]"])
+        with self.assertRaises(ValueError):
+            to_js_locator(("shadow", "x"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,67 @@
+"""
+Tests for applying request-blocking profiles to every tab
+"""
+import os
+import sys
+import unittest
+
+from selenium.webdriver.remote.command import Command
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fake_drivers import CommandDriver
+from utils.instrumentation import _notify_step_observers, get_instrumentation
+from utils.network_profiles import ANALYTICS_AND_TRACKING, PROFILES, apply_network_profile
+
+
+class TestNetworkProfiles(unittest.TestCase):
+
+    def test_profile_blocks_urls_and_sets_headers_on_the_current_tab(self):
+        driver = CommandDriver()
+        self.assertIs(apply_network_profile(driver, "functional-minimal"), PROFILES["functional-minimal"])
+        self.assertEqual([cmd for _, cmd, _ in driver.cdp],
+                         ["Network.enable", "Network.setBlockedURLs", "Network.setExtraHTTPHeaders"])
+        blocked = driver.cdp[1][2]["urls"]
+        self.assertTrue(set(ANALYTICS_AND_TRACKING) <= set(blocked))
+        self.assertEqual(driver.cdp[2][2], {"headers": {"Save-Data": "on", "DNT": "1"}})
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_network_profile(CommandDriver(), "offline")
+
+    def test_window_opened_by_a_step_is_configured_before_its_next_command(self):
+        driver = CommandDriver()
+        apply_network_profile(driver, "no-third-party")
+        instrumentation = get_instrumentation()
+        instrumentation.attach(driver)
+        driver.commands.clear()
+        with instrumentation.span("JobListingPage.click_apply_button", "step"):
+            driver.window_handles.append("tab-2")
+            driver.execute(Command.SWITCH_TO_WINDOW, {"handle": "tab-2"})
+            driver.execute(Command.GET_CURRENT_URL)
+            self.assertEqual([handle for handle, _, _ in driver.cdp], ["tab-1"] * 3 + ["tab-2"] * 3)
+        self.assertEqual(driver.commands, [Command.SWITCH_TO_WINDOW] + ["executeCdpCommand"] * 3
+                         + [Command.GET_CURRENT_URL])
+
+        # Switching back to a configured tab sends nothing
+        driver.execute(Command.SWITCH_TO_WINDOW, {"handle": "tab-1"})
+        driver.execute(Command.GET_CURRENT_URL)
+        self.assertEqual(len(driver.cdp), 6)
+
+    def test_tab_reached_without_a_switch_is_configured_after_the_step(self):
+        driver = CommandDriver()
+        apply_network_profile(driver, "no-third-party")
+        driver.current_window_handle = "tab-2"
+        _notify_step_observers(driver, "JobListingPage.click_apply_button", None)
+        self.assertEqual([handle for handle, _, _ in driver.cdp], ["tab-1"] * 3 + ["tab-2"] * 3)
+
+    def test_changing_profile_reconfigures_the_current_tab(self):
+        driver = CommandDriver()
+        apply_network_profile(driver, "full-fidelity")
+        apply_network_profile(driver, "no-third-party")
+        self.assertEqual(len(driver.cdp), 6)
+        self.assertEqual(driver.cdp[4][2]["urls"], PROFILES["no-third-party"]["blocked_urls"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
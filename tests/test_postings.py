@@ -0,0 +1,48 @@
+"""
+Tests for Lever posting checks
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.postings import filter_result, find_violations, format_matrix_table, format_violations
+
+
+class TestPostings(unittest.TestCase):
+
+    POSTINGS = [
+        {"title": "QA Engineer", "team": "Quality Assurance", "location": "Istanbul, Turkiye"},
+        {"title": "Senior QA Engineer", "team": "Software Development", "location": "Istanbul, Turkiye"},
+        {"title": "Quality Assurance Lead", "team": "Software Development", "location": "Istanbul, Turkiye"},
+        {"title": "QA Engineer", "team": "Quality Assurance", "location": "London, UK"},
+    ]
+
+    def test_single_non_matching_posting_is_reported(self):
+        violations = find_violations(self.POSTINGS, "Quality Assurance", "Istanbul")
+        self.assertEqual([p["title"] for p, _ in violations], ["Senior QA Engineer", "QA Engineer"])
+        self.assertIn("London, UK", violations[1][1][0])
+
+    def test_format_violations_truncates(self):
+        violations = find_violations(self.POSTINGS * 3, "Quality Assurance", "Istanbul")
+        message = format_violations(violations, limit=2)
+        self.assertTrue(message.startswith("6 posting(s) do not match:"))
+        self.assertIn("... and 4 more", message)
+
+    def test_filter_matrix_table(self):
+        rows = [
+            filter_result("Istanbul, Turkiye", "Quality Assurance", "u1", self.POSTINGS[:1], "Istanbul", 1.234),
+            filter_result("London, UK", "Quality Assurance", "u2", self.POSTINGS, "London", 0.5),
+            filter_result("Paris, France", "Sales", "u3", None, "Paris", 20.0, "Timed out after 20s"),
+        ]
+        self.assertEqual([(r["count"], r["violations"]) for r in rows], [(1, 0), (4, 3), (None, 0)])
+        lines = format_matrix_table(rows).splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[2].startswith("Istanbul, Turkiye  Quality Assurance  1 "))
+        self.assertTrue(lines[3].endswith("FAIL"))
+        self.assertTrue(lines[4].endswith("Timed out after 20s"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,159 @@
+"""
+Tests for the browser-free preflight, run against the local stand-in server
+"""
+import os
+import sys
+import tempfile
+import unittest
+import urllib.parse
+import zlib
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.preflight import ConnectionPool, PostingCollector, run_preflight
+from utils.standin_server import FixtureStore, StandInServer
+
+BOARD = "https://jobs.lever.co/insiderone"
+FILTERED = f"{BOARD}?team=Quality+Assurance&location=Istanbul%2C+Turkiye"
+
+
+def _posting(posting_id, title, team, location):
+    return f"""
+    <div class="posting" data-qa-posting-id="{posting_id}">
+      <div class="posting-apply"><a href="{BOARD}/{posting_id}/apply" class="posting-btn-submit">Apply</a></div>
+      <a class="posting-title" href="{BOARD}/{posting_id}">
+        <h5 data-qa="posting-name">{title}</h5>
+        <div class="posting-categories">
+          <span class="sort-by-location posting-category location">{location}</span>
+          <span class="sort-by-team posting-category department">{team}</span>
+          <span class="sort-by-commitment posting-category commitment">Full-time</span>
+        </div>
+      </a>
+      <br><img src="/x.png">
+    </div>"""
+
+
+class TestPreflight(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = FixtureStore(self.tmp.name)
+        self.store.store("https://insiderone.com/", 200, "text/html", b'<a href="/careers/">We\'re hiring</a>')
+        self.store.store(
+            "https://insiderone.com/careers/",
+            200,
+            "text/html; charset=utf-8",
+            b'<a href="#open-roles">Explore open roles</a>'
+            b'<a href="https://jobs.lever.co/insiderone?team=Software%20Development">12 Open Positions</a>',
+        )
+        self._record_board(
+            _posting("a1", "QA Engineer", "Quality Assurance", "Istanbul, Turkiye")
+            + _posting("a2", "Senior QA Engineer", "Quality Assurance", "Istanbul, Turkiye")
+        )
+        for posting_id in ("a1", "a2"):
+            self.store.store(f"{BOARD}/{posting_id}/apply", 200, "text/html", b"<form></form>")
+        self.store.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _record_board(self, postings_html):
+        body = f'<div class="postings-group">{postings_html}</div>'.encode()
+        self.store.store(FILTERED, 200, "text/html", body)
+        self.store.save()
+
+    def _run(self, server):
+        return run_preflight(
+            base_url=server.url_for("https://insiderone.com/"),
+            lever_board_url=server.url_for(BOARD),
+        )
+
+    def test_passes_against_standin(self):
+        with StandInServer(self.tmp.name) as server:
+            result = self._run(server)
+        self.assertTrue(result.passed, result.format())
+        self.assertEqual([c["name"] for c in result.checks], ["homepage", "careers", "lever_board", "apply_urls"])
+
+    def test_fails_on_posting_outside_filters(self):
+        self._record_board(_posting("a1", "Backend Engineer", "Engineering", "Berlin, Germany"))
+        with StandInServer(self.tmp.name) as server:
+            result = self._run(server)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.checks[-1]["name"], "lever_board")
+        self.assertIn("Berlin", result.checks[-1]["detail"])
+
+    def test_stops_at_first_failure_when_board_is_down(self):
+        del self.store.entries[next(k for k in self.store.entries if "team=" in k and "location=" in k)]
+        self.store.save()
+        with StandInServer(self.tmp.name) as server:
+            result = self._run(server)
+        self.assertFalse(result.passed)
+        self.assertEqual([c["passed"] for c in result.checks], [True, True, False])
+
+    def test_corrupt_compressed_body_fails_the_check(self):
+        def corrupt(response, on_chunk):
+            response.read()
+            raise zlib.error("Error -3 while decompressing data: incorrect header check")
+
+        with StandInServer(self.tmp.name) as server, mock.patch.object(ConnectionPool, "_read_body", staticmethod(corrupt)):
+            result = self._run(server)
+        self.assertFalse(result.passed)
+        self.assertEqual(result.checks[0]["name"], "homepage")
+        self.assertIn("incorrect header check", result.checks[0]["detail"])
+
+    def test_board_link_falls_back_to_lever_board_url(self):
+        self.store.store("https://insiderone.com/careers/", 200, "text/html", b'<a href="#open-roles">Explore open roles</a>')
+        self.store.save()
+        with StandInServer(self.tmp.name) as server:
+            result = self._run(server)
+        self.assertTrue(result.passed, result.format())
+        self.assertIn("using", result.checks[1]["detail"])
+
+    def test_retry_after_stale_connection_opens_a_fresh_one(self):
+        class _Stale:
+            closed = False
+
+            def request(self, *args, **kwargs):
+                raise ConnectionResetError("closed by peer")
+
+            def close(self):
+                self.closed = True
+
+        with StandInServer(self.tmp.name) as server, ConnectionPool() as pool:
+            home = server.url_for("https://insiderone.com/")
+            parsed = urllib.parse.urlsplit(home)
+            stale = [_Stale(), _Stale()]
+            pool._idle[(parsed.scheme, parsed.netloc)] = list(stale)
+            status, _, _ = pool.request("GET", home)
+            # Only the connection that failed was used; the other stale one was not tried
+            self.assertEqual([s.closed for s in stale], [False, True])
+        self.assertEqual(status, 200)
+        self.assertEqual(pool.connections_opened, 1)
+
+    def test_connections_are_reused_per_origin(self):
+        with StandInServer(self.tmp.name) as server, ConnectionPool() as pool:
+            home = server.url_for("https://insiderone.com/")
+            for _ in range(3):
+                status, _, _ = pool.request("GET", home)
+                self.assertEqual(status, 200)
+            pool.request("HEAD", server.url_for(f"{BOARD}/a1/apply"))
+        self.assertEqual(pool.connections_opened, 2)
+
+    def test_posting_collector_handles_split_chunks(self):
+        html = _posting("a1", "QA &amp; Test Engineer", "Quality Assurance", "Istanbul, Turkiye")
+        collector = PostingCollector(BOARD)
+        for i in range(0, len(html), 7):
+            collector.feed(html[i:i + 7])
+        collector.close()
+        self.assertEqual(len(collector.postings), 1)
+        posting = collector.postings[0]
+        self.assertEqual(posting["title"], "QA & Test Engineer")
+        self.assertEqual(posting["team"], "Quality Assurance")
+        self.assertEqual(posting["location"], "Istanbul, Turkiye")
+        self.assertEqual(posting["commitment"], "Full-time")
+        self.assertEqual(posting["apply_url"], f"{BOARD}/a1/apply")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+"""
+Tests for the page readiness contracts
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LEVER_BOARD_URL
+from pages.home_page import HomePage
+from pages.job_listing_page import JobListingPage
+from utils import browser_wait
+from utils.screenshot_handler import ScreenshotHandler
+
+# Minimal DOM for WAIT_JS under node: one link, a list of postings and manually stepped frames
+_NODE_HARNESS = """
+var frames = [], postings = [], cover = null, results = [];
+function El(name) { this.name = name; this.disabled = false; }
+El.prototype.getClientRects = function () { return [{left: 10, top: 10, width: 20, height: 20}]; };
+El.prototype.contains = function (other) { return other === this; };
+var link = new El('link');
+var window = {
+    innerWidth: 800, innerHeight: 600, location: {href: 'https://example.test/'}, __navigationPending: PENDING,
+    requestAnimationFrame: function (cb) { frames.push(cb); },
+    addEventListener: function () {}, removeEventListener: function () {},
+    getComputedStyle: function () { return {visibility: 'visible', display: 'block', opacity: '1'}; }
+};
+var document = {
+    readyState: 'loading', hidden: false,
+    querySelectorAll: function (sel) { return sel === 'a.hire' ? [link] : postings; },
+    elementFromPoint: function () { return cover || link; }
+};
+function MutationObserver() { this.observe = function () {}; this.disconnect = function () {}; }
+function setTimeout() { return 0; }
+function clearTimeout() {}
+function frame(label) {
+    var pending = frames;
+    frames = [];
+    pending.forEach(function (cb) { cb(); });
+    results.push(label);
+}
+(function () {
+    var arguments = [SPEC, 5000, function (value) { results.push(value ? ['done'].concat(value.map(function (v) { return v.name || v; })) : null); }];
+    WAIT_JS
+})();
+cover = new El('banner'); postings = [1, 2];
+frame('covered');
+cover = null;
+frame('uncovered');
+postings = [1, 2, 3];
+frame('grew');
+frame('same');
+console.log(JSON.stringify(results));
+"""
+
+
+class _FakeDriver:
+    """Records navigation and answers every in-page wait with placeholder values"""
+
+    def __init__(self, url="data:,"):
+        self.current_url = url
+        self.calls = []
+
+    def execute(self, command, params=None):
+        if command == Command.W3C_EXECUTE_SCRIPT_ASYNC:
+            spec = params["args"][0]
+            self.calls.append(("wait", spec))
+            if spec["kind"] == "ready":
+                return {"value": [3 if c["kind"] == "stable_count" else "element" for c in spec["clauses"]]}
+            return {"value": [0, "element"]}
+        if command == Command.W3C_EXECUTE_SCRIPT and "__navigationPending" in params["script"]:
+            self.calls.append(("mark", params["args"][0]))
+        if command == Command.GET:
+            self.calls.append(("get", params["url"]))
+            self.current_url = params["url"]
+        return {"value": None}
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})["value"]
+
+    def execute_async_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})["value"]
+
+    def set_script_timeout(self, seconds):
+        self.execute(Command.SET_TIMEOUTS, {"script": int(seconds * 1000)})
+
+    def get(self, url):
+        self.execute(Command.GET, {"url": url})
+
+
+class TestReadiness(unittest.TestCase):
+
+    def _page(self, page_class, url="data:,"):
+        driver = _FakeDriver(url)
+        return page_class(driver, ScreenshotHandler(async_writes=False)), driver
+
+    def test_open_marks_the_outgoing_document_then_waits_for_the_contract(self):
+        page, driver = self._page(HomePage)
+        self.assertEqual(page.open("https://example.test/"), ["element"])
+        kinds = [call[0] for call in driver.calls]
+        self.assertEqual(kinds, ["mark", "get", "wait"])
+        spec = driver.calls[2][1]
+        self.assertEqual(spec["kind"], "ready")
+        self.assertEqual([c["kind"] for c in spec["clauses"]], ["uncovered"])
+        self.assertFalse(spec["animate"])
+
+    def test_filters_navigate_once_and_wait_for_a_stable_board(self):
+        page, driver = self._page(JobListingPage, "https://example.test/careers/")
+        page.apply_filters(location="Istanbul, Turkiye", team="Quality Assurance")
+        gets = [call[1] for call in driver.calls if call[0] == "get"]
+        self.assertEqual(len(gets), 1)
+        self.assertTrue(gets[0].startswith(LEVER_BOARD_URL))
+        self.assertIn("team=Quality", gets[0])
+        spec = driver.calls[-1][1]
+        self.assertEqual(spec["clauses"][0]["kind"], "stable_count")
+        self.assertTrue(spec["animate"])
+        self.assertTrue(page.verify_job_listings_displayed())
+
+    def _run_in_node(self, pending):
+        spec = browser_wait.ready([
+            browser_wait.uncovered([(By.CSS_SELECTOR, "a.hire")]),
+            browser_wait.stable_count((By.CSS_SELECTOR, ".posting")),
+        ])
+        script = (_NODE_HARNESS.replace("SPEC", json.dumps(spec))
+                  .replace("PENDING", json.dumps(pending))
+                  .replace("WAIT_JS", browser_wait.WAIT_JS))
+        output = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True).stdout
+        return json.loads(output)
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_contract_holds_once_uncovered_and_count_stable_for_a_frame(self):
+        self.assertEqual(self._run_in_node(False), ["covered", ["done", "link", 2], "uncovered", "grew", "same"])
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_contract_never_holds_on_the_outgoing_document(self):
+        self.assertEqual(self._run_in_node(True), ["covered", "uncovered", "grew", "same"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
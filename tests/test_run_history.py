@@ -0,0 +1,129 @@
+"""
+Tests for the SQLite run history and its regression check
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.instrumentation import Instrumentation
+from utils.run_history import RunHistory, find_regressions, mann_whitney_greater, run_spans, step_stats
+
+
+def _step(name: str, duration: float, kind: str = "scenario", error=None) -> dict:
+    return {"name": name, "kind": kind, "duration": duration, "commands": 3,
+            "wait_time": 0.0, "navigation_time": 0.0, "error": error}
+
+
+class TestRunHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = RunHistory(os.path.join(self.tmp.name, "history.sqlite"), flush_interval=0.05)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_runs_are_written_in_batches_off_thread(self):
+        # The writer is held up until every run is queued: recording never waits for it
+        written = threading.Event()
+        insert = RunHistory._insert
+
+        def held_insert(connection, run):
+            written.wait(5)
+            insert(connection, run)
+
+        patcher = mock.patch.object(RunHistory, "_insert", staticmethod(held_insert))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for i in range(20):
+            self.history.record_run(
+                f"run_{i}", passed=i != 3, duration=1.0,
+                steps=[_step("home", 1.0 + i / 100), _step("apply", 2.0, error="boom" if i == 3 else None)],
+                page_loads=[{"url": "https://example.test/", "ttfb": 12.0, "load": 80.0, "lcp": 640.0,
+                             "step": "home", "resources": [{"name": "https://example.test/app.js", "duration": 41.0}]}],
+                artifacts=["screenshots/failed.png", "reports/metrics.json"] if i == 3 else [],
+                started_at=1_700_000_000 + i * 3600,
+            )
+        self.assertEqual(self.history._queue.unfinished_tasks, 20)
+        written.set()
+        self.history.flush()
+
+        with sqlite3.connect(self.history.path) as connection:
+            counts = [connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("runs", "steps", "page_loads", "artifacts")]
+            kinds = connection.execute("SELECT kind FROM artifacts ORDER BY kind").fetchall()
+            lcp, resources = connection.execute("SELECT lcp, resources FROM page_loads LIMIT 1").fetchone()
+        self.assertEqual(counts, [20, 40, 20, 2])
+        self.assertEqual(lcp, 640.0)
+        self.assertIn("app.js", resources)
+        self.assertEqual(kinds, [("report",), ("screenshot",)])
+
+        samples = self.history.step_samples()
+        self.assertEqual(len(samples["home"]), 20)
+        # The failed attempt of 'apply' is not a duration sample
+        self.assertEqual(len(samples["apply"]), 19)
+        rows = step_stats(samples, "day")
+        self.assertEqual(sum(r["runs"] for r in rows if r["step"] == "home"), 20)
+        self.assertTrue(all(r["p50"] <= r["p95"] <= r["p99"] for r in rows))
+
+    def test_writer_survives_a_run_it_cannot_write(self):
+        self.history.record_run("broken", passed=True, duration=1.0, steps=[{"name": "home"}])
+        self.history.flush()
+        self.history.record_run("next", passed=True, duration=1.0, steps=[_step("home", 1.0)])
+        self.history.flush()
+        self.assertTrue(self.history._writer.is_alive())
+        with sqlite3.connect(self.history.path) as connection:
+            names = connection.execute("SELECT name FROM runs").fetchall()
+        self.assertEqual(names, [("next",)])
+
+    def test_older_database_gets_new_columns(self):
+        path = os.path.join(self.tmp.name, "old.sqlite")
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE page_loads (run_id INTEGER, step TEXT, url TEXT NOT NULL, ttfb REAL,"
+                               " dom_content_loaded REAL, load REAL, transfer_size INTEGER)")
+        RunHistory(path)
+        with sqlite3.connect(path) as connection:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(page_loads)")]
+        self.assertEqual(columns[-6:], ["fcp", "lcp", "cls", "inp", "tbt", "resources"])
+
+    def test_run_spans_selects_one_run(self):
+        instrumentation = Instrumentation()
+        with instrumentation.step("before"):
+            pass
+        since = time.perf_counter()
+        with instrumentation.step("home"):
+            with instrumentation.span("HomePage.verify_homepage", "step"):
+                with instrumentation.span("find_first", "helper"):
+                    instrumentation.record_command()
+        names = [s["name"] for s in run_spans(instrumentation, since)]
+        self.assertEqual(names, ["home", "HomePage.verify_homepage"])
+
+    def test_mann_whitney(self):
+        rng = random.Random(7)
+        baseline = [rng.gauss(2.0, 0.1) for _ in range(30)]
+        self.assertLess(mann_whitney_greater(baseline, [rng.gauss(2.6, 0.1) for _ in range(5)]), 0.01)
+        self.assertGreater(mann_whitney_greater(baseline, [rng.gauss(2.0, 0.1) for _ in range(5)]), 0.05)
+        self.assertGreater(mann_whitney_greater(baseline, [rng.gauss(1.5, 0.1) for _ in range(5)]), 0.5)
+
+    def test_find_regressions(self):
+        rng = random.Random(11)
+        samples = {
+            "stable": [(i, rng.gauss(1.0, 0.05)) for i in range(35)],
+            "slower": [(i, rng.gauss(1.0, 0.05) + (0.5 if i >= 30 else 0)) for i in range(35)],
+            "too_few": [(i, 1.0 + i) for i in range(6)],
+        }
+        found = find_regressions(samples, baseline=30, recent=5)
+        self.assertEqual([r["step"] for r in found], ["slower"])
+        self.assertGreater(found[0]["slowdown"], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+"""
+Tests for the scenario graph and its checkpoints
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scenario_graph import CheckpointStore, ScenarioGraph
+
+
+class _FakeDriver:
+    """Records CDP commands, scripts and navigations in order"""
+
+    def __init__(self, url="https://example.test/careers/"):
+        self.current_url = url
+        self.calls = []
+
+    def execute_cdp_cmd(self, method, params):
+        self.calls.append(method)
+        if method == "Network.getAllCookies":
+            return {"cookies": [{"name": "sid", "value": "1", "domain": "example.test", "path": "/", "session": True}]}
+        if method == "Page.addScriptToEvaluateOnNewDocument":
+            return {"identifier": "1"}
+        return {}
+
+    def execute_script(self, script, *args):
+        if "__navigationPending" in script:
+            self.calls.append("mark")
+            return None
+        return {"origin": "https://example.test", "local": {"k": "v"}, "session": {}}
+
+    def execute_async_script(self, script, spec, timeout_ms):
+        self.calls.append(spec["kind"])
+        return True
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def get(self, url):
+        self.calls.append("get")
+        self.current_url = url
+
+    @property
+    def window_handles(self):
+        return ["w1"]
+
+    @property
+    def current_window_handle(self):
+        return "w1"
+
+    @property
+    def title(self):
+        return "Careers"
+
+
+class TestScenarioGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_restore_waits_for_the_new_document_before_removing_the_storage_script(self):
+        driver = _FakeDriver()
+        self.store.save("careers", driver)
+        driver.calls.clear()
+        self.store.restore("careers", driver)
+        self.assertEqual(driver.calls, [
+            "Network.clearBrowserCookies", "Network.setCookies", "Page.addScriptToEvaluateOnNewDocument",
+            "mark", "get", "document_ready", "Page.removeScriptToEvaluateOnNewDocument",
+        ])
+
+
+class TestScenarioGraphRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ran = []
+        self.graph = self._graph()
+        self.driver = _FakeDriver()
+
+    def _graph(self):
+        """A new graph is a new session: nothing upstream has been verified yet"""
+        graph = ScenarioGraph(CheckpointStore(self.tmp.name))
+        for name, parent in (("home", None), ("careers", "home"), ("listings", "careers"),
+                             ("apply", "listings"), ("teams", "careers")):
+            graph.add_step(name, lambda driver, handler, name=name: self.ran.append(name), parent)
+        return graph
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, target, **kwargs):
+        self.ran.clear()
+        executed = self.graph.run(self.driver, None, target, **kwargs)
+        self.assertEqual(executed, self.ran)
+        return executed
+
+    def test_path_to_follows_parents_from_the_root(self):
+        self.assertEqual([step.name for step in self.graph.path_to("apply")], ["home", "careers", "listings", "apply"])
+        self.assertEqual([step.name for step in self.graph.path_to("teams")], ["home", "careers", "teams"])
+        self.assertEqual([step.name for step in self.graph.path_to("home")], ["home"])
+        with self.assertRaises(ValueError):
+            self.graph.path_to("missing")
+        with self.assertRaises(ValueError):
+            self.graph.add_step("home", lambda driver, handler: None)
+        with self.assertRaises(ValueError):
+            self.graph.add_step("form", lambda driver, handler: None, parent="missing")
+
+    def test_upstream_runs_once_per_session_then_the_checkpoint_is_restored(self):
+        self.assertEqual(self._run("apply", start_from="careers"), ["home", "careers", "listings", "apply"])
+        self.assertTrue(all(self.graph.checkpoints.exists(name) for name in ("home", "careers", "listings", "apply")))
+        self.driver.calls.clear()
+        self.assertEqual(self._run("apply", start_from="careers"), ["listings", "apply"])
+        self.assertIn("Network.setCookies", self.driver.calls)
+        # Another target below the same checkpoint reuses it too
+        self.assertEqual(self._run("teams", start_from="careers"), ["teams"])
+
+    def test_existing_checkpoint_is_trusted_without_upstream_verification(self):
+        self._run("careers", save_checkpoints=True)
+        self.ran.clear()
+        self.assertEqual(self._graph().run(self.driver, None, "apply", start_from="careers", verify_upstream_once=False),
+                         ["listings", "apply"])
+        self.assertEqual(self.ran, ["listings", "apply"])
+        # With verification a new session runs the upstream steps for real once
+        self.ran.clear()
+        self.assertEqual(self._graph().run(self.driver, None, "apply", start_from="careers"),
+                         ["home", "careers", "listings", "apply"])
+
+    def test_start_from_without_a_checkpoint_runs_upstream_and_saves_it(self):
+        self.assertEqual(self._run("apply", start_from="listings", verify_upstream_once=False),
+                         ["home", "careers", "listings", "apply"])
+        self.assertTrue(self.graph.checkpoints.exists("listings"))
+        self.assertEqual(self._run("apply", start_from="listings", verify_upstream_once=False), ["apply"])
+
+    def test_start_from_must_be_upstream_of_the_target(self):
+        with self.assertRaises(ValueError):
+            self.graph.run(self.driver, None, "apply", start_from="teams")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
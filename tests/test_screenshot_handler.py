@@ -0,0 +1,72 @@
+"""
+Tests for screenshot naming, deduplication and retention
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.screenshot_handler import ScreenshotHandler, enforce_retention
+
+
+class TestScreenshotHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "screenshots")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _handler(self, **kwargs):
+        return ScreenshotHandler(self.dir, image_format="png", async_writes=False, **kwargs)
+
+    def test_names_carry_test_timestamp_sequence_and_pid(self):
+        handler = self._handler()
+        first = handler.save_png(b"one", "click_apply_failed")
+        second = handler.save_png(b"two", "click_apply_failed")
+        pattern = rf"click_apply_failed_\d{{8}}_\d{{6}}_\d{{3}}_(\d{{4}})_{os.getpid()}\.png"
+        self.assertEqual([re.fullmatch(pattern, os.path.basename(path)).group(1) for path in (first, second)],
+                         ["0001", "0002"])
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), b"one")
+
+    def test_repeated_capture_of_the_same_test_is_reused(self):
+        handler = self._handler()
+        first = handler.save_png(b"same", "step_failed")
+        self.assertEqual(handler.save_png(b"same", "step_failed"), first)
+        self.assertEqual(len(os.listdir(self.dir)), 1)
+
+    def test_unchanged_frame_under_another_name_reuses_the_earlier_file(self):
+        handler = self._handler()
+        first = handler.save_png(b"same", "element_not_found")
+        count = handler.saved_count
+        self.assertEqual(handler.save_png(b"same", "click_failed"), first)
+        self.assertEqual(handler.save_png(b"same", "test_failure"), first)
+        self.assertEqual(os.listdir(self.dir), [os.path.basename(first)])
+        # Callers collecting their artifacts still see the file they asked for
+        self.assertEqual(handler.paths_since(count), [first, first])
+        changed = handler.save_png(b"other", "test_failure")
+        self.assertTrue(os.path.basename(changed).startswith("test_failure_"))
+
+    def test_retention_keeps_the_newest_files_within_both_budgets(self):
+        handler = self._handler(max_files=3)
+        paths = []
+        for i in range(5):
+            paths.append(handler.save_png(bytes([i]) * 10, f"step_{i}"))
+            # Distinct mtimes so the oldest-first order does not depend on filesystem resolution
+            os.utime(paths[-1], (time.time() - 100 + i, time.time() - 100 + i))
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted(os.path.basename(p) for p in paths[2:]))
+
+        with open(os.path.join(self.dir, "notes.txt"), "w", encoding="utf-8") as f:
+            f.write("kept")
+        self.assertEqual(enforce_retention(self.dir, (".png",), max_files=10, max_bytes=15), 2)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted([os.path.basename(paths[4]), "notes.txt"]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,182 @@
+"""
+Tests for history-weighted sharding and the merged shard reports
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import sharding
+from utils.screenshot_handler import ScreenshotHandler
+from utils.sharding import ShardTask, balance, estimate_weights, run_shards
+from utils.step_budget import StepTimingHistory
+
+
+class _FakeDriver:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.quit_called = False
+
+    def get_screenshot_as_png(self):
+        return f"\x89PNG {self.endpoint} {time.perf_counter()}".encode()
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _sleep_task(name, seconds, steps=("step",), fail=False):
+    def run(driver, screenshot_handler):
+        time.sleep(seconds)
+        if fail:
+            raise AssertionError(f"{name} failed on {driver.endpoint}")
+    return ShardTask(name, run, steps)
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = StepTimingHistory(os.path.join(self.tmp.name, "step_timings.json"))
+        patcher = mock.patch.object(sharding, "record_run")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _handler(self):
+        return ScreenshotHandler(os.path.join(self.tmp.name, "screenshots"), async_writes=False)
+
+    def test_shards_are_balanced_by_step_durations_not_count(self):
+        for step, seconds in (("slow", 8.0), ("mid", 5.0), ("fast", 2.0)):
+            for _ in range(3):
+                self.history.record(step, seconds)
+        tasks = [ShardTask(name, None, steps) for name, steps in (
+            ("a", ("slow",)), ("b", ("slow",)), ("c", ("mid",)), ("d", ("fast",)),
+            ("e", ("fast",)), ("f", ("never_passed",)), ("g", ("fast", "fast")),
+        )]
+        weights = estimate_weights(tasks, self.history)
+        self.assertEqual(weights["f"], 5.0)
+        self.assertEqual(weights["g"], 4.0)
+        shards = balance(tasks, weights, 2)
+        loads = [sum(weights[t.name] for t in share) for share in shards]
+        self.assertEqual(loads, [17.0, 17.0])
+        self.assertEqual(sorted(t.name for share in shards for t in share), list("abcdefg"))
+
+    def test_without_history_every_step_weighs_the_same(self):
+        tasks = [ShardTask("one", None, ("x",)), ShardTask("two", None, ("x", "y"))]
+        self.assertEqual(estimate_weights(tasks, self.history), {"one": 1.0, "two": 2.0})
+
+    def test_shards_run_concurrently_and_reports_are_merged(self):
+        tasks = [_sleep_task(f"t{i}", 0.2) for i in range(5)] + [_sleep_task("broken", 0.2, fail=True)]
+        drivers = []
+
+        def factory(endpoint):
+            if endpoint == "http://down:4444":
+                raise ConnectionError("connection refused")
+            drivers.append(_FakeDriver(endpoint))
+            return drivers[-1]
+
+        report = run_shards(tasks, ["http://a:4444", "http://b:4444", "http://c:4444"], factory=factory,
+                            history=self.history, screenshot_handler_factory=self._handler)
+        self.assertLess(report.wall_time, report.serial_time * 0.6)
+        self.assertEqual([len(shard["results"]) for shard in report.shards], [2, 2, 2])
+        self.assertTrue(all(driver.quit_called for driver in drivers))
+        self.assertFalse(report.passed)
+        broken = next(r for r in report.results if r["name"] == "broken")
+        self.assertEqual(len(broken["artifacts"]), 1)
+        self.assertTrue(os.path.exists(broken["artifacts"][0]))
+
+        paths = report.write(self.tmp.name)
+        root = ET.parse(paths[1]).getroot()
+        self.assertEqual((root.get("tests"), root.get("failures"), root.get("errors")), ("6", "1", "0"))
+        self.assertEqual([suite.get("hostname") for suite in root], ["http://a:4444", "http://b:4444", "http://c:4444"])
+        failure = root.find(".//testcase[@name='broken']/failure")
+        self.assertIn("AssertionError: broken failed", failure.get("message"))
+        self.assertIn(broken["artifacts"][0], root.find(".//testcase[@name='broken']/system-out").text)
+
+        report = run_shards(tasks[:2], ["http://a:4444", "http://down:4444"], factory=factory,
+                            history=self.history, screenshot_handler_factory=self._handler)
+        self.assertTrue(report.passed)
+        self.assertEqual([len(shard["results"]) for shard in report.shards], [2, 0])
+        self.assertIn("connection refused", report.shards[1]["session_error"])
+        root = report.to_junit().getroot()
+        self.assertEqual((root.get("failures"), root.get("errors")), ("0", "0"))
+        self.assertIn("connection refused", root.find("testsuite[@hostname='http://down:4444']/system-err").text)
+
+    def test_free_shards_pull_the_heaviest_task_left(self):
+        for step, seconds in (("heavy", 4.0), ("light", 1.0)):
+            self.history.record(step, seconds)
+        # The heavy task runs far longer than its history says; the other shard takes every light one
+        tasks = [_sleep_task("heavy", 0.6, ("heavy",))] + [_sleep_task(f"light{i}", 0.05, ("light",)) for i in range(6)]
+        report = run_shards(tasks, ["http://a:4444", "http://b:4444"], factory=_FakeDriver,
+                            history=self.history, screenshot_handler_factory=self._handler)
+        self.assertEqual([[r["name"] for r in shard["results"]] for shard in report.shards],
+                         [["heavy"], [f"light{i}" for i in range(6)]])
+        self.assertLess(report.wall_time, 0.9)
+
+    def test_task_whose_endpoint_dies_is_requeued_on_a_healthy_one(self):
+        drivers = []
+
+        def factory(endpoint):
+            drivers.append(_FakeDriver(endpoint))
+            return drivers[-1]
+
+        def run(driver, screenshot_handler):
+            if driver.endpoint == "http://dying:4444":
+                try:
+                    raise InvalidSessionIdException("invalid session id")
+                except InvalidSessionIdException:
+                    raise AssertionError("Job listings not displayed")
+            time.sleep(0.1)
+
+        tasks = [ShardTask("first", run, ("step",)), ShardTask("second", run, ("step",))]
+        report = run_shards(tasks, ["http://dying:4444", "http://a:4444"], factory=factory,
+                            history=self.history, screenshot_handler_factory=self._handler)
+        self.assertTrue(report.passed)
+        dying, healthy = report.shards
+        self.assertEqual(dying["results"], [])
+        self.assertIn("InvalidSessionIdException", dying["session_error"])
+        self.assertEqual(sorted(r["name"] for r in healthy["results"]), ["first", "second"])
+        self.assertEqual(sum(r["requeues"] for r in healthy["results"]), 1)
+        self.assertTrue(all(driver.quit_called for driver in drivers))
+        self.assertFalse(any(r["artifacts"] for r in healthy["results"]))
+
+    def test_tasks_no_session_can_run_are_session_errors(self):
+        def factory(endpoint):
+            if endpoint == "http://down:4444":
+                raise WebDriverException("session not created")
+            return _FakeDriver(endpoint)
+
+        def run(driver, screenshot_handler):
+            raise ConnectionResetError("endpoint went away")
+
+        self.history.record("step", 2.0)
+        self.history.record("other", 1.0)
+        tasks = [ShardTask("only", run, ("step",)), _sleep_task("never", 0, ("other",))]
+        report = run_shards(tasks, ["http://flaky:4444", "http://down:4444"], factory=factory,
+                            history=self.history, screenshot_handler_factory=self._handler)
+        self.assertFalse(report.passed)
+        results = {r["name"]: r for r in report.results}
+        self.assertTrue(results["only"]["session_error"])
+        self.assertTrue(results["never"]["session_error"])
+        self.assertEqual(results["only"]["requeues"], 1)
+        self.assertIn("endpoint went away", results["only"]["error"])
+        root = report.to_junit().getroot()
+        self.assertEqual((root.get("failures"), root.get("errors")), ("0", "2"))
+
+    def test_task_names_must_be_unique(self):
+        with self.assertRaises(ValueError):
+            run_shards([_sleep_task("same", 0), _sleep_task("same", 0)], ["http://a:4444"], factory=_FakeDriver,
+                       history=self.history)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,167 @@
+"""
+Tests for soak mode cleanup and browser recycling
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import web_vitals
+from utils.instrumentation import get_instrumentation
+from utils.screenshot_handler import ScreenshotHandler
+from utils.soak_runner import SoakRunner, process_tree_memory, recycle_reasons
+from utils.web_vitals import collect_web_vitals
+
+
+class _FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class _FakeDriver:
+    """Just enough of a Chrome session for DriverPool.reset() and sample_browser()"""
+
+    instances = 0
+
+    def __init__(self, heap_growth_mb: float = 0):
+        _FakeDriver.instances += 1
+        self.window_handles = ["main"]
+        self.current = "main"
+        self.switch_to = _FakeSwitch(self)
+        self.heap_mb = 20.0
+        self.heap_growth_mb = heap_growth_mb
+        self.quit_called = False
+        self.service = None
+
+    def open_window(self):
+        handle = f"w{len(self.window_handles)}"
+        self.window_handles.append(handle)
+        self.current = handle
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_cdp_cmd(self, command, params):
+        if command == "Performance.getMetrics":
+            self.heap_mb += self.heap_growth_mb
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap_mb * 1024 * 1024}, {"name": "Nodes", "value": 900}]}
+        return {}
+
+    def execute_script(self, script, *args):
+        return "null"
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestSoakRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch("utils.soak_runner.record_run")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_orphan_windows_are_closed_every_iteration(self):
+        drivers = []
+
+        def factory():
+            drivers.append(_FakeDriver())
+            return drivers[-1]
+
+        runner = SoakRunner(
+            lambda driver, sh: driver.open_window(), factory=factory, interval=0,
+            report_path=os.path.join(self.tmp.name, "soak.jsonl"), sleep=lambda s: None,
+        )
+        self.assertEqual(runner.run(iterations=5), 0)
+        self.assertEqual(len(drivers), 1)
+        self.assertTrue(drivers[0].quit_called)
+
+        with open(runner.report_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["handles"] for r in records], [2] * 5)
+        self.assertEqual([r["orphans_closed"] for r in records], [1] * 5)
+        self.assertEqual(records[0]["dom_nodes"], 900)
+
+    def test_browser_is_recycled_past_heap_threshold(self):
+        drivers = []
+
+        def factory():
+            drivers.append(_FakeDriver(heap_growth_mb=40))
+            return drivers[-1]
+
+        runner = SoakRunner(lambda driver, sh: None, factory=factory, interval=0,
+                            thresholds={"max_heap_mb": 100}, sleep=lambda s: None)
+        runner.run(iterations=6)
+        # Heap samples 60, 100, 140 → recycle; the next driver repeats the pattern
+        self.assertEqual(runner.recycles, 2)
+        self.assertEqual(len(drivers), 3)
+        self.assertTrue(all(d.quit_called for d in drivers))
+
+    def test_failed_iteration_keeps_running(self):
+        def flaky(driver, sh):
+            raise AssertionError("board down")
+
+        runner = SoakRunner(flaky, factory=_FakeDriver, interval=0, sleep=lambda s: None)
+        runner.screenshot_handler = mock.Mock()
+        self.assertEqual(runner.run(iterations=3), 3)
+
+    def test_memory_held_by_the_process_stays_flat(self):
+        instrumentation = get_instrumentation()
+        handler = ScreenshotHandler(self.tmp.name, async_writes=False, max_files=3)
+        collectors_before = len(web_vitals._collectors)
+
+        def factory():
+            driver = _FakeDriver()
+            collect_web_vitals(driver)
+            return driver
+
+        def scenario(driver, sh):
+            for step in ("open", "filter", "apply"):
+                with instrumentation.span(step, "scenario"):
+                    pass
+            sh.save_png(os.urandom(64), "failed_soak")
+
+        runner = SoakRunner(scenario, factory=factory, interval=0, screenshot_handler=handler,
+                            thresholds={"recycle_after": 2}, sleep=lambda s: None)
+        sizes = []
+        for iteration in range(1, 13):
+            runner.run_once(iteration)
+            sizes.append((len(instrumentation.spans), len(web_vitals._collectors), len(handler.saved_paths)))
+        runner.run(iterations=0)
+        # Spans of the latest iteration, the current driver's collector, max_files paths
+        self.assertEqual(set(sizes[3:]), {(3, collectors_before + 1, 3)})
+        self.assertEqual(runner.recycles, 6)
+        self.assertEqual(len(web_vitals._collectors), collectors_before)
+        self.assertEqual(handler.saved_count, 12)
+        self.assertEqual(handler.paths_since(10), handler.saved_paths[-2:])
+
+    def test_recycle_reasons(self):
+        sample = {"handles": 6, "rss_mb": 2100.0, "js_heap_mb": 10.0}
+        reasons = recycle_reasons(sample, 3, max_rss_mb=1500, max_heap_mb=256, max_handles=4, recycle_after=3)
+        self.assertEqual(len(reasons), 3)
+        self.assertEqual(recycle_reasons({"handles": 1, "rss_mb": None}, 1, recycle_after=0), [])
+
+    def test_process_tree_memory(self):
+        memory = process_tree_memory(os.getpid())
+        if memory["rss_mb"] is not None:
+            self.assertGreater(memory["rss_mb"], 1)
+            self.assertGreaterEqual(memory["processes"], 1)
+        self.assertIsNone(process_tree_memory(None)["rss_mb"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+"""
+Tests for the local stand-in server
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.standin_server import FixtureStore, StandInServer
+
+
+class TestStandInServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        store = FixtureStore(self.tmp.name)
+        store.store(
+            "https://insiderone.com/careers/",
+            200,
+            "text/html; charset=utf-8",
+            b'<a href="https://jobs.lever.co/insiderone?team=Software%20Development">Open</a>',
+        )
+        store.store(
+            "https://jobs.lever.co/insiderone?team=QA&location=Istanbul",
+            200,
+            "text/html",
+            b"<div class='posting'>QA</div>",
+        )
+        store.store("https://jobs.lever.co/insiderone/missing", 404, "text/plain", b"gone")
+        store.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _get(self, url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+
+    def test_replays_and_rewrites_links_between_recorded_hosts(self):
+        with StandInServer(self.tmp.name) as server:
+            status, body = self._get(server.url_for("https://insiderone.com/careers/"))
+            lever_origin = server.origins["jobs.lever.co"]
+        self.assertEqual(status, 200)
+        self.assertIn(f'href="{lever_origin}/insiderone?team=Software%20Development"'.encode(), body)
+
+    def test_query_parameter_order_does_not_matter(self):
+        with StandInServer(self.tmp.name) as server:
+            status, body = self._get(server.url_for("https://jobs.lever.co/insiderone?location=Istanbul&team=QA"))
+        self.assertEqual(status, 200)
+        self.assertIn(b"posting", body)
+
+    def test_recorded_errors_and_unknown_paths(self):
+        with StandInServer(self.tmp.name) as server:
+            for path, code in (("/insiderone/missing", 404), ("/never-recorded", 404)):
+                with self.assertRaises(urllib.error.HTTPError) as ctx:
+                    self._get(server.url_for(f"https://jobs.lever.co{path}"))
+                self.assertEqual(ctx.exception.code, code)
+
+    def test_latency_injection(self):
+        with StandInServer(self.tmp.name, latency_ms=200) as server:
+            start = time.perf_counter()
+            self._get(server.url_for("https://insiderone.com/careers/"))
+            elapsed = time.perf_counter() - start
+        self.assertGreaterEqual(elapsed, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+"""
+Tests for the run time budget and step retries
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from selenium.common.exceptions import TimeoutException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scenario_graph import ScenarioGraph
+from utils.step_budget import MIN_WAIT, BudgetExceeded, RunBudget, StepTimingHistory, step_timeout
+
+
+class _MemoryCheckpoints:
+    """CheckpointStore stand-in that records applied checkpoints"""
+
+    def __init__(self):
+        self.applied = []
+
+    def capture(self, name, driver):
+        return {"name": name, "url": driver["url"]}
+
+    def apply(self, checkpoint, driver):
+        self.applied.append(checkpoint["name"])
+        driver["url"] = checkpoint["url"]
+        return checkpoint
+
+
+class TestStepBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = StepTimingHistory(os.path.join(self.tmp.name, "timings.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_p95_nearest_rank_and_persistence(self):
+        for seconds in range(1, 21):
+            self.history.record("search", float(seconds))
+        self.assertEqual(self.history.p95("search"), 19.0)
+        self.assertIsNone(self.history.p95("unknown"))
+        self.history.save()
+        self.assertEqual(StepTimingHistory(self.history.path).p95("search"), 19.0)
+
+    def test_allowance_is_weighted_by_p95(self):
+        self.history.record("a", 1.0)
+        self.history.record("b", 3.0)
+        budget = RunBudget(40, ["a", "b", "c"], self.history)
+        # c has no history and weighs as much as the median of the known steps (2s)
+        self.assertAlmostEqual(budget.allowance("a"), 40 * 1 / 6, delta=0.1)
+        self.assertAlmostEqual(budget.allowance("b"), 40 * 3 / 5, delta=0.1)
+        self.assertAlmostEqual(budget.allowance("c"), 40, delta=0.1)
+
+    def test_step_timeout_is_capped_by_step_share(self):
+        self.assertEqual(step_timeout(10), 10)
+        budget = RunBudget(4, ["a", "b"])
+        with budget.step("a"):
+            self.assertLessEqual(step_timeout(10), 2.0)
+            self.assertEqual(step_timeout(0.1), MIN_WAIT)
+        self.assertEqual(step_timeout(10), 10)
+
+    def test_spent_budget_raises(self):
+        budget = RunBudget(0.05, ["a"])
+        with budget.step("a"):
+            time.sleep(0.06)
+            with self.assertRaises(BudgetExceeded):
+                step_timeout(10)
+        with self.assertRaises(BudgetExceeded):
+            with budget.step("a"):
+                pass
+
+    def test_failed_step_is_retried_from_parent_state(self):
+        calls = []
+
+        def open_page(driver, sh):
+            driver["url"] = "/page"
+
+        def flaky_click(driver, sh):
+            calls.append(driver["url"])
+            driver["url"] = "/broken"
+            if len(calls) < 3:
+                raise TimeoutException("not clickable yet")
+
+        checkpoints = _MemoryCheckpoints()
+        graph = ScenarioGraph(checkpoints)
+        graph.add_step("open", open_page).add_step("click", flaky_click, parent="open")
+
+        budget = RunBudget(10, ["open", "click"], self.history, retries=2, backoff=0.01)
+        executed = graph.run({"url": ""}, None, "click", budget=budget)
+        self.assertEqual(executed, ["open", "click"])
+        self.assertEqual(calls, ["/page", "/page", "/page"])
+        self.assertEqual(checkpoints.applied, ["open", "open"])
+        self.assertEqual(budget.attempts, {"open": 1, "click": 3})
+        # Only the successful attempt is recorded
+        self.assertEqual(len(self.history.durations["click"]), 1)
+
+        calls.clear()
+        budget = RunBudget(10, ["open", "click"], retries=1, backoff=0.01)
+        with self.assertRaises(TimeoutException):
+            graph.run({"url": ""}, None, "click", budget=budget)
+
+    def test_failed_check_is_not_retried(self):
+        calls = []
+
+        def verify(driver, sh):
+            calls.append(driver["url"])
+            try:
+                assert False, "2 postings outside Istanbul"
+            except Exception as e:
+                raise AssertionError(f"Job listings content verification failed: {e}")
+
+        def wrapped_timeout(driver, sh):
+            calls.append(driver["url"])
+            try:
+                raise TimeoutException("board not rendered")
+            except Exception as e:
+                raise AssertionError(f"No job listings displayed: {e}")
+
+        checkpoints = _MemoryCheckpoints()
+        graph = ScenarioGraph(checkpoints)
+        graph.add_step("verify", verify).add_step("displayed", wrapped_timeout)
+        budget = RunBudget(10, ["verify", "displayed"], retries=2, backoff=0.01)
+        with self.assertRaises(AssertionError):
+            graph.run({"url": "/board"}, None, "verify", budget=budget)
+        self.assertEqual((len(calls), checkpoints.applied), (1, []))
+
+        # A failed wait re-raised as an assertion is still retried
+        calls.clear()
+        with self.assertRaises(AssertionError):
+            graph.run({"url": "/board"}, None, "displayed", budget=budget)
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
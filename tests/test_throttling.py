@@ -0,0 +1,135 @@
+"""
+Tests for throttling profiles and the throttling sweep report
+"""
+import os
+import sys
+import time
+import unittest
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.command import Command
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fake_drivers import CommandDriver
+from utils.instrumentation import _notify_step_observers, get_instrumentation
+from utils.throttling import apply_throttling, run_sweep
+
+
+class _FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class _FakeDriver:
+    def __init__(self, profile="none"):
+        self.profile = profile
+        self.current_window_handle = "tab-1"
+        self.window_handles = ["tab-1"]
+        self.switch_to = _FakeSwitchTo(self)
+        self.cdp = []
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((self.current_window_handle, cmd, params))
+        return {}
+
+    def execute_script(self, script, *args):
+        return "null"
+
+    def get(self, url):
+        pass
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _scenario(driver, screenshot_handler):
+    """Two steps whose waits slow down with the profile; the slowest profile times out"""
+    instrumentation = get_instrumentation()
+    delay = {"none": 0.01, "fast-3g": 0.05, "slow-3g": 0.09}[driver.profile]
+    with instrumentation.span("HomePage.click_we_are_hiring", "step"):
+        with instrumentation.span("click_element", "wait", 0.1):
+            time.sleep(delay)
+    with instrumentation.span("CareerPage.click_explore_open_roles", "step"):
+        with instrumentation.span("find_element", "wait", 0.1):
+            time.sleep(delay)
+            if driver.profile == "slow-3g":
+                raise TimeoutException("Explore open roles not found")
+
+
+class TestThrottling(unittest.TestCase):
+
+    def test_profile_is_applied_to_every_new_tab(self):
+        driver = _FakeDriver()
+        apply_throttling(driver, "slow-3g-cpu-6x")
+        self.assertEqual([cmd for _, cmd, _ in driver.cdp],
+                         ["Network.enable", "Network.emulateNetworkConditions", "Emulation.setCPUThrottlingRate"])
+        self.assertEqual(driver.cdp[1][2]["latency"], 2000)
+        self.assertEqual(driver.cdp[2][2], {"rate": 6})
+
+        _notify_step_observers(driver, "HomePage.verify_homepage", None)
+        self.assertEqual(len(driver.cdp), 3)
+        driver.current_window_handle = "tab-2"
+        _notify_step_observers(driver, "JobListingPage.click_apply_for_this_job", None)
+        self.assertEqual([handle for handle, _, _ in driver.cdp[3:]], ["tab-2"] * 3)
+
+        with self.assertRaises(ValueError):
+            apply_throttling(driver, "dial-up")
+
+    def test_window_opened_by_a_step_is_throttled_before_its_next_command(self):
+        driver = CommandDriver()
+        apply_throttling(driver, "slow-3g")
+        instrumentation = get_instrumentation()
+        instrumentation.attach(driver)
+        driver.commands.clear()
+        with instrumentation.span("CareerPage.click_explore_open_roles", "step"):
+            driver.window_handles.append("tab-2")
+            driver.execute(Command.SWITCH_TO_WINDOW, {"handle": "tab-2"})
+            driver.execute(Command.GET_CURRENT_URL)
+            self.assertEqual([handle for handle, _, _ in driver.cdp], ["tab-1"] * 3 + ["tab-2"] * 3)
+        self.assertEqual(driver.commands, [Command.SWITCH_TO_WINDOW] + ["executeCdpCommand"] * 3
+                         + [Command.GET_CURRENT_URL])
+
+    def test_cpu_only_profile_leaves_network_unthrottled(self):
+        driver = _FakeDriver()
+        apply_throttling(driver, "cpu-4x")
+        conditions = driver.cdp[1][2]
+        self.assertEqual((conditions["latency"], conditions["downloadThroughput"]), (0, -1))
+
+    def test_sweep_reports_latency_curves_and_exceeded_timeouts(self):
+        drivers = []
+
+        def factory(profile):
+            drivers.append(_FakeDriver(profile))
+            return drivers[-1]
+
+        result = run_sweep(["none", "fast-3g", "slow-3g"], runs=2, factory=factory, scenario=_scenario,
+                           screenshot_handler=object())
+        self.assertTrue(all(driver.quit_called for driver in drivers))
+        curves = result.curves()
+        self.assertEqual(list(curves), ["HomePage.click_we_are_hiring", "CareerPage.click_explore_open_roles"])
+        home = curves["HomePage.click_we_are_hiring"]
+        self.assertLess(home["none"]["median"], home["slow-3g"]["median"])
+        self.assertFalse(home["none"]["at_risk"])
+        self.assertTrue(home["slow-3g"]["at_risk"])
+        explore = curves["CareerPage.click_explore_open_roles"]["slow-3g"]
+        self.assertEqual(explore["failures"], 2)
+        self.assertTrue(explore["exceeded"])
+
+        suggested = result.suggested_timeouts()["HomePage.click_we_are_hiring / click_element"]
+        self.assertEqual((suggested["configured"], suggested["profile"], suggested["suggested"]), (0.1, "slow-3g", 1))
+        self.assertEqual(result.totals()["slow-3g"]["failures"], 2)
+        table = result.format()
+        self.assertIn("✗", table)
+        self.assertIn("Timeouts to raise:", table)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,192 @@
+"""
+Tests for visual baselines and screenshot deltas
+"""
+import base64
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import visual_diff
+from utils.instrumentation import instrumented
+from utils.screenshot_handler import ScreenshotHandler
+from utils.visual_diff import DELTA_EXTENSION, VisualBaselines, baseline_key, changed_tiles
+
+if visual_diff.available():
+    import numpy as np
+    from PIL import Image
+
+
+def _page(seed=0, width=1366, height=900):
+    """A synthetic page: header band, text-like noise rows and a button"""
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 250, dtype=np.uint8)
+    pixels[:80] = (30, 40, 120)
+    for top in range(120, height - 100, 24):
+        pixels[top:top + 12, 60:width - 400] = rng.integers(0, 90, (12, width - 460, 1), dtype=np.uint8)
+    pixels[height - 90:height - 40, 60:300] = (220, 60, 40)
+    return pixels
+
+
+class _ScreenDriver:
+    """Answers screenshot commands with a settable PNG"""
+
+    def __init__(self, png):
+        self.png = png
+        self.screenshots = 0
+
+    def execute(self, driver_command, params=None):
+        self.screenshots += 1
+        return {"value": base64.b64encode(self.png).decode()}
+
+
+class _Page:
+    def __init__(self, driver, handler):
+        self.driver = driver
+        self.screenshot_handler = handler
+        handler.watch_steps(driver)
+        handler.watch_steps(driver)
+
+    @instrumented()
+    def open_positions(self):
+        pass
+
+    @instrumented()
+    def apply(self):
+        self.screenshot_handler.save_png(self.driver.png, "click_apply_failed")
+        raise RuntimeError("Apply button not found")
+
+
+def _png(pixels):
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@unittest.skipUnless(visual_diff.available(), "numpy and Pillow are needed for visual baselines")
+class TestVisualDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.baselines = VisualBaselines(os.path.join(self.tmp.name, "baselines"))
+        self.baseline = _page()
+        self.baselines.set("click_we_are_hiring_failed", _png(self.baseline))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _changed(self):
+        """The baseline with a banner over 2 x 10 tiles and one antialiasing-level wobble"""
+        current = self.baseline.copy()
+        current[800:864, 32:352] = (255, 220, 0)
+        current[300, 500] += 3
+        return current
+
+    def test_only_changed_tiles_are_stored_and_the_capture_is_restored(self):
+        current = self._changed()
+        path = os.path.join(self.tmp.name, f"capture{DELTA_EXTENSION}")
+        meta = self.baselines.write_delta(path, "click_we_are_hiring_failed", _png(current))
+        self.assertFalse(meta["page_changed"])
+        self.assertEqual(meta["changed_tiles"], 20)
+        self.assertLess(os.path.getsize(path) * 10, len(_png(current)))
+        restored = np.asarray(Image.open(io.BytesIO(self.baselines.restore(path))))
+        # Differences within the tolerance are not stored
+        self.assertEqual(np.abs(restored.astype(int) - current).max(), 3)
+        np.testing.assert_array_equal(restored[800:864, 32:352], current[800:864, 32:352])
+
+    def test_another_page_keeps_every_tile(self):
+        other = _page(seed=1)[::-1].copy()
+        path = os.path.join(self.tmp.name, f"other{DELTA_EXTENSION}")
+        meta = self.baselines.write_delta(path, "click_we_are_hiring_failed", _png(other))
+        self.assertTrue(meta["page_changed"])
+        self.assertEqual(meta["changed_tiles"], meta["total_tiles"])
+        restored = np.asarray(Image.open(io.BytesIO(self.baselines.restore(path))))
+        np.testing.assert_array_equal(restored, other)
+
+    def test_highlighted_diff_outlines_changed_tiles(self):
+        path = os.path.join(self.tmp.name, f"capture{DELTA_EXTENSION}")
+        self.baselines.write_delta(path, "click_we_are_hiring_failed", _png(self._changed()))
+        diff = np.asarray(Image.open(io.BytesIO(self.baselines.render_diff(path))))
+        self.assertEqual(diff.shape, self.baseline.shape)
+        self.assertEqual(tuple(diff[800, 40]), (230, 30, 30))
+        self.assertEqual(tuple(diff[820, 100]), (255, 220, 0))
+        self.assertEqual(tuple(diff[0, 0]), tuple((self.baseline[0, 0] * 0.3 + 255 * 0.7).astype(np.uint8)))
+
+    def test_comparison_takes_milliseconds(self):
+        png = _png(self._changed())
+        self.baselines.compare("click_we_are_hiring_failed", png)
+        start = time.perf_counter()
+        for _ in range(10):
+            tiles = self.baselines.compare("click_we_are_hiring_failed", png)["tiles"]
+        self.assertEqual(len(tiles), 20)
+        self.assertLess((time.perf_counter() - start) / 10, 0.1)
+        self.assertEqual(len(changed_tiles(self.baseline, self.baseline, 32, 8)), 0)
+
+    def _handler(self):
+        screenshot_dir = os.path.join(self.tmp.name, "screenshots")
+        baselines = VisualBaselines(os.path.join(screenshot_dir, "baselines"))
+        return ScreenshotHandler(screenshot_dir, async_writes=False, visual_baselines=baselines), baselines
+
+    def test_passing_steps_seed_the_baseline_failures_of_the_next_step_compare_with(self):
+        handler, baselines = self._handler()
+        first = handler.save_png(_png(_page(seed=5)), "failed_hiring_flow_1")
+        self.assertTrue(first.endswith(".png"))
+
+        driver = _ScreenDriver(_png(self.baseline))
+        page = _Page(driver, handler)
+        page.open_positions()
+        self.assertFalse(baselines.index["_Page.open_positions"]["approved"])
+        self.assertEqual(driver.screenshots, 1)
+        # Fresh baselines are not re-captured
+        page.open_positions()
+        self.assertEqual(driver.screenshots, 1)
+
+        driver.png = _png(self._changed())
+        with self.assertRaises(RuntimeError):
+            page.apply()
+        self.assertNotIn("_Page.apply", baselines.index)
+        second = handler.saved_paths[-1]
+        self.assertTrue(second.endswith(DELTA_EXTENSION))
+        self.assertEqual(baselines.read_delta(second)[0]["key"], "_Page.open_positions")
+        self.assertEqual(sorted(os.listdir(handler.screenshot_dir)),
+                         sorted(["baselines", os.path.basename(first), os.path.basename(second)]))
+
+    def test_stale_unapproved_baselines_are_refreshed_approved_ones_kept(self):
+        handler, baselines = self._handler()
+        handler.baseline_refresh = timedelta(0)
+        driver = _ScreenDriver(_png(self.baseline))
+        page = _Page(driver, handler)
+        page.open_positions()
+        driver.png = _png(_page(seed=2))
+        page.open_positions()
+        self.assertEqual(baselines.index["_Page.open_positions"]["sha1"], hashlib.sha1(driver.png).hexdigest())
+
+        baselines.set("_Page.open_positions", _png(self.baseline), approved=True)
+        page.open_positions()
+        self.assertEqual(driver.screenshots, 2)
+        self.assertTrue(baselines.index["_Page.open_positions"]["approved"])
+
+    def test_replaced_baselines_are_pruned_once_no_delta_refers_to_them(self):
+        handler, baselines = self._handler()
+        baselines.set("failed_hiring_flow", _png(self.baseline), approved=False)
+        old_file = baselines.index["failed_hiring_flow"]["file"]
+        delta = handler.save_png(_png(self._changed()), "failed_hiring_flow_1")
+        baselines.set("failed_hiring_flow", _png(_page(seed=2)))
+        # The delta was written against the replaced file, so it stays
+        handler.save_png(_png(_page(seed=3)), "other_1")
+        self.assertIn(old_file, os.listdir(baselines.directory))
+
+        os.remove(delta)
+        handler.save_png(_png(_page(seed=4)), "other_2")
+        self.assertEqual(sorted(os.listdir(baselines.directory)),
+                         sorted(["index.json", baselines.index["failed_hiring_flow"]["file"]]))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
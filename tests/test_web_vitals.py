@@ -0,0 +1,120 @@
+"""
+Tests for web vitals collection
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from selenium.webdriver.remote.command import Command
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import web_vitals
+from utils.step_budget import RunBudget, StepTimingHistory
+from utils.web_vitals import WebVitalsCollector, collect_web_vitals, detach_web_vitals, take_web_vitals, web_vitals_report
+
+
+class _FakeDriver:
+    """Reports the current document and answers the collection scripts with queued snapshots"""
+
+    def __init__(self, snapshots, delay=0.0):
+        self.snapshots = list(snapshots)
+        self.document = [snapshots[0]["url"], snapshots[0]["origin"]] if snapshots else None
+        self.delay = delay
+        self.calls = []
+
+    def execute(self, command, params):
+        if params["script"] == web_vitals._DOCUMENT_JS:
+            self.calls.append("document")
+            return {"value": self.document}
+        time.sleep(self.delay)
+        self.calls.append((command, params["args"]))
+        return {"value": dict(self.snapshots.pop(0))}
+
+    def navigate(self):
+        self.document = [self.snapshots[0]["url"], self.snapshots[0]["origin"]]
+
+
+def _snapshot(url, origin, **metrics):
+    return dict({"url": url, "origin": origin, "load": 800.0, "lcp": 900.0, "cls": 0.01, "inp": None, "tbt": 0,
+                 "resources": []}, **metrics)
+
+
+class TestWebVitals(unittest.TestCase):
+
+    def test_documents_are_read_once_unless_still_loading(self):
+        driver = _FakeDriver([
+            _snapshot("https://insiderone.com/", 1.0, load=None),
+            _snapshot("https://insiderone.com/", 1.0, cls=0.2, inp=180.0),
+            _snapshot("https://insiderone.com/careers/", 2.0, lcp=2500.0),
+        ])
+        collector = WebVitalsCollector(driver, top_resources=5)
+        collector._on_step("HomePage.open", None)
+        self.assertEqual(len(collector.take()), 1)
+        # The load event had not fired yet, so the same document is read again
+        collector._on_step("HomePage.verify_homepage", None)
+        collector._on_step("HomePage.close_cookie_banner", None)
+        driver.navigate()
+        collector._on_step("CareerPage.verify_career_page", None)
+        collector._on_step("CareerPage.click_explore_open_roles", None)
+
+        self.assertEqual(driver.calls, [
+            "document", (Command.W3C_EXECUTE_SCRIPT_ASYNC, [5]),
+            "document", (Command.W3C_EXECUTE_SCRIPT_ASYNC, [5]),
+            "document",
+            "document", (Command.W3C_EXECUTE_SCRIPT_ASYNC, [5]),
+            "document",
+        ])
+        self.assertEqual(len(driver._step_observers), 1)
+        pages = list(collector.pages.values())
+        self.assertEqual([p["step"] for p in pages], ["HomePage.open", "CareerPage.verify_career_page"])
+        self.assertEqual((pages[0]["cls"], pages[0]["inp"], pages[0]["load"]), (0.2, 180.0, 800.0))
+        # The home page was read again after the first take()
+        self.assertEqual([p["url"] for p in collector.take()], ["https://insiderone.com/", "https://insiderone.com/careers/"])
+        self.assertEqual(collector.take(), [])
+
+    def test_navigation_timing_only_without_web_vitals(self):
+        driver = _FakeDriver([{"url": "https://insiderone.com/", "origin": 1.0, "ttfb": 120.0, "load": 800.0}])
+        collector = collect_web_vitals(driver, vitals=False)
+        try:
+            collector._on_step("HomePage.open", None)
+            self.assertEqual(driver.calls[1], (Command.W3C_EXECUTE_SCRIPT, []))
+            self.assertEqual(take_web_vitals(driver)[0]["ttfb"], 120.0)
+            self.assertNotIn(collector, web_vitals._collectors)
+        finally:
+            detach_web_vitals(driver)
+
+    def test_collection_is_left_out_of_the_step_budget(self):
+        history = StepTimingHistory(os.path.join(tempfile.mkdtemp(), "step_timings.json"))
+        budget = RunBudget(10, ["CareerPage.verify_career_page"], history)
+        deadline = budget.deadline
+        driver = _FakeDriver([_snapshot("https://insiderone.com/careers/", 2.0)], delay=0.2)
+        collector = WebVitalsCollector(driver)
+        with budget.step("CareerPage.verify_career_page"):
+            collector._on_step("CareerPage.verify_career_page", None)
+        self.assertGreaterEqual(budget.deadline - deadline, 0.2)
+        self.assertLess(history.median("CareerPage.verify_career_page"), 0.1)
+
+    def test_report_keeps_worst_value_per_step(self):
+        driver = _FakeDriver([
+            _snapshot("https://jobs.lever.co/insiderone?team=QA", 1.0, lcp=1200.0),
+            _snapshot("https://jobs.lever.co/insiderone?team=Sales", 2.0, lcp=3100.0, tbt=250.0),
+        ])
+        collector = WebVitalsCollector(driver)
+        collector._on_step("JobListingPage.apply_filters", None)
+        driver.navigate()
+        collector._on_step("JobListingPage.apply_filters", None)
+        web_vitals._collectors.append(collector)
+        try:
+            report = web_vitals_report()
+        finally:
+            web_vitals._collectors.remove(collector)
+        worst = report["worst_by_step"]["JobListingPage.apply_filters"]
+        self.assertEqual((worst["pages"], worst["lcp"], worst["tbt"]), (2, 3100.0, 250.0))
+        self.assertNotIn("inp", worst)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,371 @@
+"""
+Browser startup: cached driver resolution, a prepared profile template and a
+breakdown of where cold-start time goes.
+
+chromedriver is resolved once (webdriver-manager, falling back to Selenium
+Manager) and cached in .cache/browser_binaries.json together with the Chrome
+binary it drives and both versions, so later runs work offline and skip the
+version lookup. A Chrome binary that changed since (an update) resolves again. The "fast" startup profile additionally runs
+new-headless Chrome at a fixed window size on a copy of a user-data-dir template
+whose first-run work was done once. Every session records driver resolution,
+profile copy, process spawn, session creation and first navigation times into
+reports/startup.json:
+
+    python -m utils.browser_startup --runs 5 --compare
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.driver_finder import DriverFinder
+
+from config import BASE_URL, BROWSER_BINARY_CACHE, CHROMEDRIVER_PATH, PROFILE_TEMPLATE_DIR
+from utils.browser_wait import navigate
+from utils.instrumentation import get_instrumentation
+
+PHASES = ("driver_resolution", "profile_copy", "process_spawn", "session_create", "first_navigation")
+
+# Lock and crash files of the Chrome that prepared the template must not be copied
+_PROFILE_IGNORE = shutil.ignore_patterns("Singleton*", "lockfile", "*.lock", "Crashpad", "*.log")
+_TEMPLATE_MARKER = ".prepared"
+# Looked up on PATH when neither the options nor Selenium Manager named a Chrome binary
+_CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+_CHROME_PATHS = (
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+)
+# DriverPool launches sessions in parallel; only one of them may build the template
+_template_lock = threading.Lock()
+
+
+class StartupTimings:
+    """Per-phase durations of one browser start"""
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.phases: Dict[str, float] = OrderedDict()
+        self.driver_source: Optional[str] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "profile": self.profile,
+            "driver_source": self.driver_source,
+            "total": round(self.total, 3),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+        }
+
+    def format(self) -> str:
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        return f"{self.total:.2f}s ({parts})"
+
+
+class _TimedService(Service):
+    """chromedriver service that measures how long spawning the process takes"""
+
+    spawn_time = 0.0
+
+    def start(self):
+        started = time.perf_counter()
+        super().start()
+        self.spawn_time = time.perf_counter() - started
+
+
+def _load_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _download_chromedriver(options: Options) -> tuple:
+    """(path, source) from webdriver-manager, or Selenium Manager when it is unavailable or offline"""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        return ChromeDriverManager().install(), "webdriver-manager"
+    except Exception as e:
+        print(f"webdriver-manager could not resolve chromedriver, trying Selenium Manager: {e}")
+    return DriverFinder.get_path(Service(), options), "selenium-manager"
+
+
+def _find_chrome() -> Optional[str]:
+    for name in _CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return next((path for path in _CHROME_PATHS if os.path.isfile(path)), None)
+
+
+def _binary_version(path: Optional[str]) -> Optional[str]:
+    """Version printed by `<binary> --version`, None if it cannot be read"""
+    if not path:
+        return None
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"\d+(\.\d+)+", output)
+    return match.group(0) if match else None
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def _cache_valid(cached: dict) -> bool:
+    """Cached chromedriver still exists and the Chrome it was resolved for has not changed"""
+    if not cached.get("chromedriver") or not os.path.isfile(cached["chromedriver"]):
+        return False
+    if cached.get("chrome") and _mtime(cached["chrome"]) != cached.get("chrome_mtime"):
+        print(f"Chrome at {cached['chrome']} changed since chromedriver was resolved, resolving again")
+        return False
+    return True
+
+
+def resolve_chromedriver(
+    options: Optional[Options] = None,
+    cache_path: str = BROWSER_BINARY_CACHE,
+    refresh: bool = False,
+) -> tuple:
+    """
+    Path of the chromedriver binary, resolved once and cached
+
+    Args:
+        options: Chrome options; the Chrome binary is cached alongside and set as their binary_location
+        cache_path: JSON file holding the resolved paths
+        refresh: Ignore the cache, e.g. after Chrome updated past the cached driver
+
+    Returns:
+        (path, source) where source is "env", "cache", "webdriver-manager" or "selenium-manager"
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH, "env"
+    options = options or Options()
+    cached = _load_cache(cache_path)
+    if not refresh and _cache_valid(cached):
+        if not options.binary_location and cached.get("chrome"):
+            options.binary_location = cached["chrome"]
+        return cached["chromedriver"], "cache"
+
+    path, source = _download_chromedriver(options)
+    # Selenium Manager fills binary_location in; webdriver-manager leaves Chrome to be found here
+    chrome = options.binary_location or _find_chrome()
+    if chrome and not options.binary_location:
+        options.binary_location = chrome
+    driver_version = _binary_version(path)
+    # chrome.exe --version opens a browser window instead of printing
+    chrome_version = None if sys.platform == "win32" else _binary_version(chrome)
+    if driver_version and chrome_version and driver_version.split(".")[0] != chrome_version.split(".")[0]:
+        print(f"chromedriver {driver_version} does not match Chrome {chrome_version}")
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "chromedriver": path,
+            "chromedriver_version": driver_version,
+            "chrome": chrome,
+            "chrome_version": chrome_version,
+            "chrome_mtime": _mtime(chrome),
+            "source": source,
+            "resolved_at": datetime.now(timezone.utc).isoformat(),
+        }, f, indent=2)
+    return path, source
+
+
+def prepare_profile_template(driver_path: str, template_dir: str = PROFILE_TEMPLATE_DIR) -> str:
+    """
+    Launch Chrome once on template_dir so profile creation and first-run work are done up front
+
+    Args:
+        driver_path: chromedriver binary
+        template_dir: Directory of the template profile
+
+    Returns:
+        template_dir
+    """
+    with _template_lock:
+        if not os.path.exists(os.path.join(template_dir, _TEMPLATE_MARKER)):
+            _build_profile_template(driver_path, template_dir)
+    return template_dir
+
+
+def _build_profile_template(driver_path: str, template_dir: str):
+    os.makedirs(template_dir, exist_ok=True)
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument(f"--user-data-dir={os.path.abspath(template_dir)}")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    driver = webdriver.Chrome(options=options, service=Service(executable_path=driver_path))
+    try:
+        driver.get("about:blank")
+    finally:
+        driver.quit()
+    with open(os.path.join(template_dir, _TEMPLATE_MARKER), "w", encoding="utf-8") as f:
+        f.write(datetime.now(timezone.utc).isoformat())
+
+
+def copy_profile(template_dir: str) -> str:
+    """
+    Copy the template into a fresh user-data-dir, one per session
+
+    Args:
+        template_dir: Prepared template profile
+
+    Returns:
+        Path of the copy; remove it when the session ends (remove_on_quit)
+    """
+    target = tempfile.mkdtemp(prefix="chrome-profile-")
+    shutil.copytree(template_dir, target, dirs_exist_ok=True, ignore=_PROFILE_IGNORE)
+    return target
+
+
+def remove_on_quit(driver, path: str):
+    """Delete a session's profile copy once the driver quits"""
+    quit = driver.quit
+
+    def quit_and_remove():
+        try:
+            quit()
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    driver.quit = quit_and_remove
+
+
+def launch(options: Options, driver_path: str, timings: StartupTimings) -> webdriver.Chrome:
+    """
+    Start chromedriver and a session, recording process spawn and session creation separately
+
+    Args:
+        options: Chrome options
+        driver_path: chromedriver binary
+        timings: Receives the process_spawn and session_create phases
+
+    Returns:
+        Chrome WebDriver instance
+    """
+    service = _TimedService(executable_path=driver_path)
+    started = time.perf_counter()
+    try:
+        driver = webdriver.Chrome(options=options, service=service)
+    finally:
+        elapsed = time.perf_counter() - started
+        timings.record("process_spawn", service.spawn_time)
+        timings.record("session_create", elapsed - service.spawn_time)
+    return driver
+
+
+def time_first_navigation(driver, timings: StartupTimings):
+    """
+    Record the driver's first get() as the first_navigation phase, up to the new document
+    being parsed whatever the page load strategy
+    """
+    def timed_get(url):
+        del driver.get
+        with timings.phase("first_navigation"):
+            navigate(driver, url)
+
+    driver.get = timed_get
+
+
+# The most recent browser starts; a soak run starts a new browser on every recycle
+_startups: Deque[StartupTimings] = deque(maxlen=100)
+
+
+def startup_report() -> dict:
+    """Every browser start of this process with its phase breakdown"""
+    return {"startups": [timings.to_dict() for timings in _startups]}
+
+
+def record_startup(driver, timings: StartupTimings):
+    """Keep a session's timings for reports/startup.json"""
+    driver._startup_timings = timings
+    if not _startups:
+        get_instrumentation().add_report("startup", startup_report)
+    _startups.append(timings)
+    print(f"Chrome started ({timings.profile} profile) in {timings.format()}")
+
+
+def summarize(runs: List[StartupTimings]) -> Dict[str, float]:
+    """Median seconds per phase and in total over several starts"""
+    summary = OrderedDict(
+        (phase, statistics.median(run.phases.get(phase, 0.0) for run in runs))
+        for phase in PHASES
+        if any(phase in run.phases for run in runs)
+    )
+    summary["total"] = statistics.median(run.total for run in runs)
+    return summary
+
+
+def main(argv=None) -> int:
+    from utils.driver_factory import create_chrome_driver
+
+    parser = argparse.ArgumentParser(description="Measure cold browser start, phase by phase")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", choices=("default", "fast"), default="fast")
+    parser.add_argument("--compare", action="store_true", help="Measure both profiles")
+    parser.add_argument("--url", default=BASE_URL, help="First navigation target")
+    parser.add_argument("--refresh", action="store_true", help="Resolve chromedriver again and rebuild the profile template")
+    args = parser.parse_args(argv)
+
+    if args.refresh:
+        resolve_chromedriver(refresh=True)
+        shutil.rmtree(PROFILE_TEMPLATE_DIR, ignore_errors=True)
+
+    results = {}
+    for profile in ("default", "fast") if args.compare else (args.profile,):
+        runs = []
+        for _ in range(args.runs):
+            driver = create_chrome_driver(startup_profile=profile)
+            try:
+                driver.get(args.url)
+            finally:
+                driver.quit()
+            runs.append(driver._startup_timings)
+        results[profile] = summarize(runs)
+
+    columns = [phase for phase in PHASES if any(phase in summary for summary in results.values())] + ["total"]
+    print(f"\nMedian of {args.runs} start(s), seconds")
+    print(f"{'profile':<10}" + "".join(f"{column:>18}" for column in columns))
+    for profile, summary in results.items():
+        print(f"{profile:<10}" + "".join(f"{summary.get(column, 0.0):>18.3f}" for column in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
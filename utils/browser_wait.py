@@ -0,0 +1,388 @@
+"""
+Event-driven waits that run inside the page.
+
+A condition is checked once, then re-checked on every DOM mutation, hash/history
+change and on an in-page poll that starts at one frame and backs off. The wait
+resolves as soon as the condition holds instead of on the next 500 ms poll.
+When the document unloads mid-wait (cross-document navigation) the wait falls
+back to AdaptiveWait polling from Python for the remaining time.
+
+ready() combines several clauses into a page object's readiness contract, checked
+as one condition so a step starts as soon as the elements it needs exist.
+navigate() is get() that waits for the new document whatever the page load strategy.
+"""
+import json
+import time
+from typing import Any, Callable, Sequence
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from utils.locators import Locator, to_js_locator, to_js_locators
+
+# [url, generation]: the generation counts childList mutations since the observer was installed
+DOM_TOKEN_JS = """
+    function __domToken() {
+        if (window.__domGeneration === undefined) {
+            window.__domGeneration = 0;
+            new MutationObserver(function () { window.__domGeneration++; })
+                .observe(document, {subtree: true, childList: true});
+        }
+        return [window.location.href, window.__domGeneration];
+    }
+"""
+
+CONDITION_HELPERS_JS = DOM_TOKEN_JS + """
+    function __query(loc) {
+        if (loc[0] === 'css') { return Array.prototype.slice.call(document.querySelectorAll(loc[1])); }
+        var snapshot = document.evaluate(loc[1], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+        return nodes;
+    }
+    function __visible(el) {
+        if (!el.getClientRects().length) { return false; }
+        var style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && parseFloat(style.opacity) > 0;
+    }
+    function __uncovered(el) {
+        var rects = el.getClientRects();
+        if (!rects.length) { return true; }
+        var x = rects[0].left + rects[0].width / 2, y = rects[0].top + rects[0].height / 2;
+        // Off-screen elements are scrolled into view before they are clicked
+        if (x < 0 || y < 0 || x >= window.innerWidth || y >= window.innerHeight) { return true; }
+        var hit = document.elementFromPoint(x, y);
+        return !hit || hit === el || el.contains(hit);
+    }
+    function __matches(kind, el) {
+        if (kind === 'present') { return true; }
+        if (kind === 'visible') { return __visible(el); }
+        if (kind === 'uncovered') { return __uncovered(el); }
+        return __visible(el) && !el.disabled;
+    }
+    function __clause(clause, state, key) {
+        if (clause.kind === 'stable_count') {
+            var n = __query(clause.locator).length, seen = state[key] || (state[key] = {count: -1, since: 0});
+            if (n !== seen.count) {
+                seen.count = n;
+                seen.since = state.frame;
+                return null;
+            }
+            // An empty list is only final once the document has been parsed
+            if (n < clause.minimum && document.readyState === 'loading') { return null; }
+            return state.frame - seen.since >= clause.frames ? n : null;
+        }
+        var value = __check(clause, state);
+        return value === null || clause.kind === 'url_contains' ? value : value[1];
+    }
+    function __check(spec, state) {
+        if (spec.kind === 'ready') {
+            // Still the document BasePage.open navigated away from
+            if (window.__navigationPending) { return null; }
+            // Every clause is checked each time so the stable counts keep up with the page
+            var values = spec.clauses.map(function (clause, c) { return __clause(clause, state, 'clause' + c); });
+            return values.indexOf(null) === -1 ? values : null;
+        }
+        if (spec.kind === 'document_ready') {
+            return !window.__navigationPending && document.readyState !== 'loading' ? true : null;
+        }
+        if (spec.kind === 'url_contains') {
+            return window.location.href.indexOf(spec.text) !== -1 ? window.location.href : null;
+        }
+        if (spec.kind === 'settled') {
+            var r = spec.element.getBoundingClientRect();
+            var key = [r.top, r.left, r.width, r.height, window.scrollX, window.scrollY].join(',');
+            state.stable = key === state.last ? (state.stable || 0) + 1 : 0;
+            state.last = key;
+            return state.stable >= 2 ? true : null;
+        }
+        for (var i = 0; i < spec.locators.length; i++) {
+            var nodes = __query(spec.locators[i]);
+            var hits = nodes.filter(function (el) { return __matches(spec.kind, el); });
+            if (hits.length) { return [i, spec.all ? hits : hits[0]]; }
+        }
+        return null;
+    }
+    // Visibility, coverage and enabled state change through attributes; presence and counts only through childList
+    function __watchesAttributes(spec) {
+        if (spec.kind === 'ready') { return spec.clauses.some(__watchesAttributes); }
+        return spec.kind === 'visible' || spec.kind === 'clickable' || spec.kind === 'uncovered';
+    }
+    function __result(spec, value) {
+        return value !== null && spec.token ? [value, __domToken()] : value;
+    }
+"""
+
+# Attributes that can show, hide, cover or enable an element
+OBSERVED_ATTRIBUTES = ["class", "style", "hidden", "disabled", "open", "aria-hidden"]
+
+WAIT_JS = CONDITION_HELPERS_JS + f"""
+    var OBSERVED_ATTRIBUTES = {json.dumps(OBSERVED_ATTRIBUTES)};
+""" + """
+    var spec = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+    var state = {frame: 0}, finished = false, observer = null, poll = null, deadline = null, delay = 16;
+    function finish(value) {
+        if (finished) { return; }
+        finished = true;
+        if (observer) { observer.disconnect(); }
+        clearTimeout(poll);
+        clearTimeout(deadline);
+        window.removeEventListener('hashchange', onEvent);
+        window.removeEventListener('popstate', onEvent);
+        window.removeEventListener('scrollend', onEvent, true);
+        done(__result(spec, value));
+    }
+    function onEvent() {
+        var value = __check(spec, state);
+        if (value !== null) { finish(value); }
+    }
+    function tick() {
+        state.frame++;
+        onEvent();
+        if (finished) { return; }
+        if ((spec.kind === 'settled' || spec.animate) && !document.hidden) {
+            window.requestAnimationFrame(tick);
+            return;
+        }
+        delay = Math.min(delay * 2, 250);
+        poll = setTimeout(tick, delay);
+    }
+    var first = __check(spec, state);
+    if (first !== null && spec.kind !== 'settled') { return done(__result(spec, first)); }
+    if (spec.kind !== 'settled' && spec.kind !== 'url_contains') {
+        observer = new MutationObserver(onEvent);
+        observer.observe(document, __watchesAttributes(spec)
+            ? {subtree: true, childList: true, attributes: true, attributeFilter: OBSERVED_ATTRIBUTES}
+            : {subtree: true, childList: true});
+    }
+    window.addEventListener('hashchange', onEvent);
+    window.addEventListener('popstate', onEvent);
+    window.addEventListener('scrollend', onEvent, true);
+    deadline = setTimeout(function () { finish(null); }, timeoutMs);
+    tick();
+"""
+
+# Polled from Python; a readiness contract keeps its per-frame counts on the window between polls
+# Marks the outgoing document; a fragment-only change keeps the document, so it is not marked
+MARK_NAVIGATION_JS = """
+    var target = arguments[0];
+    if (target.indexOf('#') === -1 || target.split('#')[0] !== window.location.href.split('#')[0]) {
+        window.__navigationPending = true;
+    }
+"""
+
+CHECK_JS = CONDITION_HELPERS_JS + """
+    var spec = arguments[0], state = {frame: 0};
+    if (spec.kind === 'ready') {
+        state = window.__readyState || (window.__readyState = {frame: 0});
+        state.frame++;
+    }
+    return __result(spec, __check(spec, state));
+"""
+
+
+class AdaptiveWait:
+    """Polling wait like WebDriverWait that polls quickly at first and backs off to poll_frequency"""
+
+    def __init__(
+        self,
+        driver,
+        timeout: float,
+        poll_frequency: float = 0.5,
+        ignored_exceptions=None,
+        initial_poll: float = 0.05,
+        backoff: float = 1.6,
+    ):
+        """
+        Args:
+            driver: Selenium WebDriver instance passed to the conditions
+            timeout: Maximum wait time in seconds
+            poll_frequency: Longest sleep between polls in seconds
+            ignored_exceptions: Exceptions treated as "not yet", in addition to NoSuchElementException
+            initial_poll: First sleep between polls in seconds
+            backoff: Factor the sleep grows by after each poll
+        """
+        self._driver = driver
+        self._timeout = float(timeout)
+        self._poll = poll_frequency or 0.5
+        ignored = [NoSuchElementException]
+        if ignored_exceptions:
+            try:
+                ignored.extend(iter(ignored_exceptions))
+            except TypeError:  # a single exception class
+                ignored.append(ignored_exceptions)
+        self._ignored_exceptions = tuple(ignored)
+        self._initial_poll = min(initial_poll, self._poll)
+        self._backoff = backoff
+
+    def _poll_until(self, method: Callable, message: str, expected: bool):
+        screen = None
+        stacktrace = None
+        delay = self._initial_poll
+        end_time = time.monotonic() + self._timeout
+        while True:
+            try:
+                value = method(self._driver)
+                if bool(value) == expected:
+                    return value if expected else True
+            except self._ignored_exceptions as exc:
+                if not expected:
+                    return True
+                screen = getattr(exc, "screen", None)
+                stacktrace = getattr(exc, "stacktrace", None)
+            if time.monotonic() + delay > end_time:
+                break
+            time.sleep(delay)
+            delay = min(delay * self._backoff, self._poll)
+        raise TimeoutException(message, screen, stacktrace)
+
+    def until(self, method, message: str = ""):
+        return self._poll_until(method, message, True)
+
+    def until_not(self, method, message: str = ""):
+        return self._poll_until(method, message, False)
+
+
+class BrowserWait:
+    """Runs wait conditions inside the page with execute_async_script"""
+
+    # Extra slack so the in-page deadline always fires before WebDriver's script timeout
+    SCRIPT_TIMEOUT_SLACK = 5
+
+    def __init__(self, driver):
+        """
+        Initialize browser wait
+
+        Args:
+            driver: Selenium WebDriver instance
+        """
+        self.driver = driver
+
+    def _ensure_script_timeout(self, timeout: float):
+        needed = timeout + self.SCRIPT_TIMEOUT_SLACK
+        if getattr(self.driver, "_browser_wait_script_timeout", 0) < needed:
+            self.driver.set_script_timeout(needed)
+            self.driver._browser_wait_script_timeout = needed
+
+    def until(self, condition: dict, timeout: float, message: str = "") -> Any:
+        """
+        Wait for a condition built by one of the helpers below
+
+        Args:
+            condition: Condition spec
+            timeout: Maximum wait time in seconds
+            message: Message for the TimeoutException
+
+        Returns:
+            The condition's value, e.g. [locator_index, element]
+        """
+        self._ensure_script_timeout(timeout)
+        end_time = time.monotonic() + timeout
+        try:
+            result = self.driver.execute_async_script(WAIT_JS, condition, int(timeout * 1000))
+        except WebDriverException as e:
+            # The document went away mid-wait (navigation) or the page blocks async scripts
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message or str(e))
+            if condition["kind"] == "settled":
+                return True
+            ignored = (JavascriptException, StaleElementReferenceException)
+            return AdaptiveWait(self.driver, remaining, ignored_exceptions=ignored).until(
+                lambda d: d.execute_script(CHECK_JS, condition), message
+            )
+        if result is None:
+            raise TimeoutException(message or f"Condition {condition['kind']} not met within {timeout}s")
+        return result
+
+
+def present(locators: Sequence[Locator], all_matches: bool = False, token: bool = False) -> dict:
+    """
+    Any of the locators matches an element in the DOM.
+    With token the value comes back as [value, [url, dom_generation]] for utils.element_cache.
+    """
+    return {"kind": "present", "locators": to_js_locators(locators), "all": all_matches, "token": token}
+
+
+def visible(locators: Sequence[Locator]) -> dict:
+    """Any of the locators matches a rendered, visible element"""
+    return {"kind": "visible", "locators": to_js_locators(locators), "all": False}
+
+
+def clickable(locators: Sequence[Locator]) -> dict:
+    """Any of the locators matches a visible, enabled element"""
+    return {"kind": "clickable", "locators": to_js_locators(locators), "all": False}
+
+
+def url_contains(text: str) -> dict:
+    """The current URL contains text, case-sensitive like expected_conditions.url_contains"""
+    return {"kind": "url_contains", "text": text}
+
+
+def document_ready() -> dict:
+    """The document has been parsed (DOMContentLoaded) and is not the one mark_navigation marked"""
+    return {"kind": "document_ready"}
+
+
+def settled(element) -> dict:
+    """The element's position and the scroll offset stay the same for two consecutive frames"""
+    return {"kind": "settled", "element": element}
+
+
+def uncovered(locators: Sequence[Locator]) -> dict:
+    """
+    Any of the locators matches an attached element that nothing else covers at its centre.
+    Elements without a layout box or outside the viewport count as uncovered.
+    """
+    return {"kind": "uncovered", "locators": to_js_locators(locators), "all": False}
+
+
+def stable_count(locator: Locator, frames: int = 1, minimum: int = 1) -> dict:
+    """
+    The number of elements matching locator stays the same for frames animation frames.
+    Fewer than minimum only holds once the document has finished parsing. Value: the count.
+    """
+    return {"kind": "stable_count", "locator": to_js_locator(locator), "frames": frames, "minimum": minimum}
+
+
+def ready(clauses: Sequence[dict]) -> dict:
+    """
+    Every clause holds in the same check: a page object's readiness contract.
+    The value has one entry per clause, the element for locator clauses, the count for
+    stable_count and the URL for url_contains. Never holds while window.__navigationPending
+    is set, i.e. on the document BasePage.open is navigating away from.
+    """
+    clauses = list(clauses)
+    return {"kind": "ready", "clauses": clauses, "animate": any(c["kind"] == "stable_count" for c in clauses)}
+
+
+def mark_navigation(driver, url: str):
+    """
+    Mark the current document before get(url), so ready() and document_ready() never hold on it.
+    With the "none" page load strategy get() returns once the navigation has started.
+    """
+    try:
+        driver.execute_script(MARK_NAVIGATION_JS, url)
+    except WebDriverException:
+        # Pages that do not run scripts (e.g. error pages) cannot be mistaken for the target
+        pass
+
+
+def navigate(driver, url: str, timeout: float = 30):
+    """
+    get() that returns once the new document has been parsed, like the "eager" strategy,
+    for callers without a readiness contract (checkpoint restores, benchmarks, startup timing)
+
+    Args:
+        driver: Selenium WebDriver instance
+        url: Absolute URL
+        timeout: Maximum wait time in seconds
+    """
+    mark_navigation(driver, url)
+    driver.get(url)
+    BrowserWait(driver).until(document_ready(), timeout, f"{url} was not parsed within {timeout}s")
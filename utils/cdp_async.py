@@ -0,0 +1,408 @@
+"""
+Asyncio Chrome DevTools Protocol client.
+
+One websocket to the browser carries every tab as a flattened target session, so
+many tabs, or many browsers, are driven from a single event loop. Navigation and
+in-page waits are awaited instead of blocking a thread per driver.
+"""
+import asyncio
+import base64
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import urllib.request
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import websockets
+except ImportError:  # optional, only needed for the async page objects
+    websockets = None
+
+from utils.browser_wait import CONDITION_HELPERS_JS, WAIT_JS
+from utils.instrumentation import Instrumentation, get_instrumentation
+from utils.locators import Locator, to_js_locators
+
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+# Scroll the first clickable match to the centre, wait for two stable frames, return its centre point
+_CLICK_POINT_JS = CONDITION_HELPERS_JS + """
+    var locators = arguments[0], done = arguments[arguments.length - 1];
+    var el = null;
+    for (var i = 0; i < locators.length && !el; i++) {
+        el = __query(locators[i]).filter(function (e) { return __matches('clickable', e); })[0] || null;
+    }
+    if (!el) { return done(null); }
+    el.scrollIntoView({block: 'center'});
+    var last = null, stable = 0, frames = 0;
+    function frame() {
+        var r = el.getBoundingClientRect();
+        var key = [r.left, r.top, r.width, r.height].join(',');
+        stable = key === last ? stable + 1 : 0;
+        last = key;
+        if (stable >= 2 || ++frames > 60) { return done({x: r.left + r.width / 2, y: r.top + r.height / 2}); }
+        // Background tabs get no animation frames
+        if (document.hidden) { setTimeout(frame, 16); } else { window.requestAnimationFrame(frame); }
+    }
+    frame();
+"""
+
+
+# Errors of a script whose document was replaced while it ran
+CONTEXT_LOST_ERRORS = ("Execution context was destroyed", "Cannot find context")
+
+
+class CdpError(Exception):
+    """A DevTools command returned an error"""
+
+    def __init__(self, method: str, error: dict):
+        self.method = method
+        self.code = error.get("code")
+        super().__init__(f"{method}: {error.get('message', '')} {error.get('data', '')}".strip())
+
+
+class JavascriptError(Exception):
+    """A script evaluated in the page threw"""
+
+
+class CdpConnection:
+    """A DevTools websocket; commands are matched to replies by id, events are routed by session"""
+
+    def __init__(self, websocket):
+        """
+        Initialize connection and start reading messages
+
+        Args:
+            websocket: Open websockets client connection
+        """
+        self._ws = websocket
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self._listeners: Dict[Optional[str], List[Callable[[str, dict], None]]] = {}
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, ws_url: str) -> "CdpConnection":
+        if websockets is None:
+            raise ImportError("The async page objects need the 'websockets' package (pip install websockets)")
+        return cls(await websockets.connect(ws_url, max_size=None, ping_interval=None))
+
+    async def send(self, method: str, params: Optional[dict] = None, session_id: Optional[str] = None) -> dict:
+        """
+        Send a command and wait for its reply
+
+        Args:
+            method: DevTools method, e.g. "Page.navigate"
+            params: Command parameters
+            session_id: Target session, None for the browser
+
+        Returns:
+            Command result
+        """
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (method, future)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        await self._ws.send(json.dumps(message))
+        return await future
+
+    def listen(self, session_id: Optional[str], callback: Callable[[str, dict], None]):
+        """Call callback(method, params) for every event of the session"""
+        self._listeners.setdefault(session_id, []).append(callback)
+
+    def unlisten(self, session_id: Optional[str]):
+        self._listeners.pop(session_id, None)
+
+    async def _read(self):
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    method, future = self._pending.pop(message["id"], (None, None))
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CdpError(method, message["error"]))
+                    else:
+                        future.set_result(message.get("result", {}))
+                    continue
+                for callback in list(self._listeners.get(message.get("sessionId"), ())):
+                    callback(message.get("method", ""), message.get("params", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for method, future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"DevTools connection closed during {method}"))
+            self._pending.clear()
+
+    async def close(self):
+        await self._ws.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class AsyncTab:
+    """One page target, driven over a flattened session of the browser connection"""
+
+    def __init__(self, connection: CdpConnection, target_id: str, session_id: str,
+                 instrumentation: Optional[Instrumentation] = None):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.instrumentation = instrumentation or get_instrumentation()
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        connection.listen(session_id, self._on_event)
+
+    @classmethod
+    async def attach(cls, connection: CdpConnection, target_id: str) -> "AsyncTab":
+        session = await connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        tab = cls(connection, target_id, session["sessionId"])
+        await tab.send("Page.enable")
+        return tab
+
+    async def send(self, method: str, params: Optional[dict] = None) -> dict:
+        """Send a command to this tab, counted like a WebDriver command in the step reports"""
+        self.instrumentation.record_command()
+        return await self.connection.send(method, params, self.session_id)
+
+    def _on_event(self, method: str, params: dict):
+        for future in self._waiters.pop(method, ()):
+            if not future.done():
+                future.set_result(params)
+
+    def _expect(self, method: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(method, []).append(future)
+        return future
+
+    async def navigate(self, url: str, timeout: float = 30):
+        """
+        Load a URL and wait for DOMContentLoaded, like the "eager" page load strategy
+
+        Args:
+            url: Absolute URL
+            timeout: Maximum wait time in seconds
+        """
+        with self.instrumentation.span("navigate", "navigation"):
+            loaded = self._expect("Page.domContentEventFired")
+            result = await self.send("Page.navigate", {"url": url})
+            if result.get("errorText"):
+                loaded.cancel()
+                raise CdpError("Page.navigate", {"message": f"{result['errorText']} ({url})"})
+            if result.get("loaderId"):
+                await asyncio.wait_for(loaded, timeout)
+            else:
+                # Same-document navigation, e.g. a fragment change
+                loaded.cancel()
+
+    async def evaluate(self, script: str, *args):
+        """
+        Run a script body written for execute_script (arguments[i], return) and return its JSON value
+
+        Args:
+            script: Script body
+            *args: JSON-serialisable arguments
+
+        Returns:
+            The script's return value
+        """
+        expression = f"(function () {{ {script}\n}}).apply(null, {json.dumps(list(args))})"
+        return await self._evaluate(expression, await_promise=False)
+
+    async def evaluate_async(self, script: str, *args):
+        """Like execute_async_script: the script calls its last argument with the result"""
+        expression = (
+            "new Promise(function (resolve) { (function () { %s\n}).apply(null, %s.concat([resolve])); })"
+            % (script, json.dumps(list(args)))
+        )
+        return await self._evaluate(expression, await_promise=True)
+
+    async def _evaluate(self, expression: str, await_promise: bool):
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+            "userGesture": True,
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise JavascriptError(details.get("exception", {}).get("description") or details.get("text", "Script error"))
+        return result["result"].get("value")
+
+    async def wait_for(self, condition: dict, timeout: float, message: str = ""):
+        """
+        Wait for a utils.browser_wait condition inside the page.
+        If the document is replaced mid-wait, the wait resumes in the new document.
+
+        Args:
+            condition: Condition spec, e.g. browser_wait.present([locator])
+            timeout: Maximum wait time in seconds
+            message: Message for the TimeoutError
+
+        Returns:
+            The condition's value; elements come back as empty objects
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(message or f"Condition {condition['kind']} not met within {timeout}s")
+            try:
+                result = await self.evaluate_async(WAIT_JS, condition, int(remaining * 1000))
+            except (CdpError, JavascriptError) as e:
+                if not any(text in str(e) for text in CONTEXT_LOST_ERRORS):
+                    raise
+                # Execution context destroyed by a navigation, check again in the next document
+                await asyncio.sleep(0.05)
+                continue
+            if result is None:
+                raise TimeoutError(message or f"Condition {condition['kind']} not met within {timeout}s")
+            return result
+
+    async def click(self, locators: Sequence[Locator]):
+        """
+        Click the first visible, enabled match with real mouse events at its centre.
+        Falls back to a JavaScript click when the element has no usable point.
+
+        Args:
+            locators: Alternative (By, value) locators
+        """
+        js_locators = to_js_locators(locators)
+        point = await self.evaluate_async(_CLICK_POINT_JS, js_locators)
+        if point is None:
+            raise JavascriptError(f"No clickable element for {js_locators}")
+        base = {"x": point["x"], "y": point["y"], "button": "left", "clickCount": 1}
+        await self.send("Input.dispatchMouseEvent", dict(base, type="mouseMoved", button="none"))
+        await self.send("Input.dispatchMouseEvent", dict(base, type="mousePressed"))
+        await self.send("Input.dispatchMouseEvent", dict(base, type="mouseReleased"))
+
+    async def current_url(self) -> str:
+        return await self.evaluate("return window.location.href;")
+
+    async def screenshot(self) -> bytes:
+        result = await self.send("Page.captureScreenshot", {"format": "png"})
+        return base64.b64decode(result["data"])
+
+    async def close(self):
+        self.connection.unlisten(self.session_id)
+        await self.connection.send("Target.closeTarget", {"targetId": self.target_id})
+
+
+class AsyncBrowser:
+    """A Chrome process (or an existing one) controlled over a single DevTools websocket"""
+
+    def __init__(self, connection: CdpConnection, process=None, user_data_dir: Optional[str] = None):
+        self.connection = connection
+        self.process = process
+        self.user_data_dir = user_data_dir
+
+    @classmethod
+    async def launch(
+        cls,
+        arguments: Optional[Sequence[str]] = None,
+        binary: Optional[str] = None,
+        headless: bool = True,
+        startup_timeout: float = 20,
+    ) -> "AsyncBrowser":
+        """
+        Start Chrome with remote debugging on a free port
+
+        Args:
+            arguments: Chrome switches, defaults to the ones from build_chrome_options()
+            binary: Chrome executable, defaults to $CHROME_BINARY or the first one on PATH
+            headless: Run with --headless=new
+            startup_timeout: Seconds to wait for the DevTools endpoint
+
+        Returns:
+            AsyncBrowser
+        """
+        binary = binary or os.environ.get("CHROME_BINARY") or next(
+            (path for path in map(shutil.which, CHROME_BINARIES) if path), None
+        )
+        if not binary:
+            raise FileNotFoundError("Chrome not found, set CHROME_BINARY")
+        if arguments is None:
+            from utils.driver_factory import build_chrome_options
+
+            # Content-setting prefs are not switches, images are turned off with blink settings instead
+            arguments = build_chrome_options().arguments + ["--blink-settings=imagesEnabled=false"]
+
+        user_data_dir = tempfile.mkdtemp(prefix="cdp-async-")
+        command = [binary, "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}", *arguments]
+        if headless:
+            command.append("--headless=new")
+        process = await asyncio.create_subprocess_exec(
+            *command, "about:blank", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        # Chrome writes the chosen port and the browser websocket path once it is listening
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + startup_timeout
+        lines: List[str] = []
+        while len(lines) < 2:
+            if process.returncode is not None or loop.time() > deadline:
+                if process.returncode is None:
+                    process.kill()
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+                raise RuntimeError(f"Chrome did not expose a DevTools endpoint within {startup_timeout}s")
+            await asyncio.sleep(0.05)
+            if os.path.exists(port_file):
+                with open(port_file, encoding="utf-8") as f:
+                    lines = f.read().split()
+        connection = await CdpConnection.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}")
+        return cls(connection, process, user_data_dir)
+
+    @classmethod
+    async def connect(cls, debugger_address: str) -> "AsyncBrowser":
+        """
+        Attach to a running Chrome, e.g. one started by Selenium:
+        driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+        Args:
+            debugger_address: host:port of the remote debugging endpoint
+
+        Returns:
+            AsyncBrowser that does not own the process
+        """
+        def version():
+            with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=10) as response:
+                return json.load(response)
+
+        info = await asyncio.get_running_loop().run_in_executor(None, version)
+        return cls(await CdpConnection.connect(info["webSocketDebuggerUrl"]))
+
+    async def new_tab(self, url: str = "about:blank") -> AsyncTab:
+        """Open a tab and attach to it"""
+        target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+        tab = await AsyncTab.attach(self.connection, target["targetId"])
+        if url != "about:blank":
+            await tab.navigate(url)
+        return tab
+
+    async def close(self):
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self.connection.send("Browser.close"), 5)
+            except (CdpError, ConnectionError, asyncio.TimeoutError):
+                pass
+        await self.connection.close()
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,74 @@
+"""
+Shared reader for the chromedriver performance log (DevTools protocol events)
+"""
+import json
+from typing import Callable, List
+
+from selenium.webdriver.chrome.options import Options
+
+
+def enable_performance_log(options: Options, page: bool = True, console: bool = True) -> Options:
+    """
+    Ask chromedriver to buffer DevTools Network (and Page) events and console messages.
+    Other domains and tracing stay off, so the buffer only grows with what the readers use.
+
+    Args:
+        options: Chrome options to modify
+        page: Also log Page.* events (navigations, load events)
+        console: Also buffer console messages in the "browser" log
+
+    Returns:
+        The same options
+    """
+    logging_prefs = {"performance": "ALL"}
+    if console:
+        logging_prefs["browser"] = "ALL"
+    options.set_capability("goog:loggingPrefs", logging_prefs)
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": page})
+    return options
+
+
+class DevtoolsEventTap:
+    """Drains the performance log once and fans events out to every subscriber"""
+
+    def __init__(self, driver):
+        """
+        Initialize tap
+
+        Args:
+            driver: Selenium WebDriver created with enable_performance_log()
+        """
+        self.driver = driver
+        self._subscribers: List[Callable[[str, dict, float], None]] = []
+
+    @classmethod
+    def for_driver(cls, driver) -> "DevtoolsEventTap":
+        """Return the tap attached to the driver, creating it on first use"""
+        tap = getattr(driver, "_devtools_event_tap", None)
+        if tap is None:
+            tap = cls(driver)
+            driver._devtools_event_tap = tap
+        return tap
+
+    def subscribe(self, callback: Callable[[str, dict, float], None]):
+        """
+        Register a callback(method, params, timestamp_ms)
+
+        Args:
+            callback: Called once per DevTools event, in arrival order
+        """
+        self._subscribers.append(callback)
+
+    def drain(self) -> int:
+        """
+        Fetch buffered events from chromedriver (one WebDriver command) and dispatch them
+
+        Returns:
+            Number of events dispatched
+        """
+        entries = self.driver.get_log("performance")
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            for callback in self._subscribers:
+                callback(message.get("method", ""), message.get("params", {}), entry.get("timestamp", 0))
+        return len(entries)
@@ -0,0 +1,215 @@
+"""
+Factory for pre-configured Chrome WebDriver sessions
+"""
+import shutil
+from typing import Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+
+from config import (
+    FAILURE_BUNDLES,
+    NETWORK_PROFILE,
+    NETWORK_SAVINGS_REPORT,
+    PAGE_LOAD_STRATEGY,
+    PROFILE_TEMPLATE_DIR,
+    RESOURCE_SIZE_CATALOG,
+    RUN_HISTORY,
+    STARTUP_PROFILE,
+    STARTUP_WINDOW_SIZE,
+    THROTTLING_PROFILE,
+    WEB_VITALS,
+)
+from utils.browser_startup import (
+    StartupTimings,
+    copy_profile,
+    launch,
+    prepare_profile_template,
+    record_startup,
+    remove_on_quit,
+    resolve_chromedriver,
+    time_first_navigation,
+)
+from utils.devtools_log import enable_performance_log
+from utils.failure_bundle import record_failures
+from utils.network_profiles import apply_network_profile, monitor_network_savings
+from utils.throttling import apply_throttling
+from utils.web_vitals import collect_web_vitals
+
+
+def build_chrome_options(window_size: Optional[str] = None) -> Options:
+    """
+    Build the Chrome options used by the suite
+
+    Args:
+        window_size: "width,height" instead of a maximized window
+
+    Returns:
+        Configured ChromeOptions instance
+    """
+    chrome_options = Options()
+    if window_size:
+        chrome_options.add_argument(f"--window-size={window_size}")
+    else:
+        chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+
+    # speed tweaks
+    chrome_options.page_load_strategy = PAGE_LOAD_STRATEGY
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    }
+    chrome_options.add_experimental_option("prefs", prefs)
+
+    # log azalt (opsiyonel)
+    chrome_options.add_argument("--log-level=3")
+    chrome_options.add_argument("--disable-logging")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-default-apps")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--disable-gpu")
+    return chrome_options
+
+
+def build_fast_options(user_data_dir: Optional[str] = None) -> Options:
+    """
+    Chrome options of the "fast" startup profile: new headless mode, fixed window size
+
+    Args:
+        user_data_dir: Copy of the prepared profile template
+
+    Returns:
+        Configured ChromeOptions instance
+    """
+    chrome_options = build_chrome_options(window_size=STARTUP_WINDOW_SIZE)
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-default-browser-check")
+    if user_data_dir:
+        chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
+    return chrome_options
+
+
+def create_chrome_driver(
+    options: Options = None,
+    network_profile: str = NETWORK_PROFILE,
+    startup_profile: str = STARTUP_PROFILE,
+    throttling_profile: str = THROTTLING_PROFILE,
+) -> webdriver.Chrome:
+    """
+    Launch a new Chrome session
+
+    Args:
+        options: Chrome options, defaults to the startup profile's options
+        network_profile: Request-blocking profile from utils.network_profiles.PROFILES
+        startup_profile: "default" (headed, maximized) or "fast" (headless on a profile template copy)
+        throttling_profile: Network/CPU emulation profile from utils.throttling.PROFILES
+
+    Returns:
+        Chrome WebDriver instance
+    """
+    timings = StartupTimings(startup_profile)
+    with timings.phase("driver_resolution"):
+        driver_path, timings.driver_source = resolve_chromedriver(options)
+    profile_dir = None
+    if options is None and startup_profile == "fast":
+        with timings.phase("profile_copy"):
+            profile_dir = copy_profile(prepare_profile_template(driver_path, PROFILE_TEMPLATE_DIR))
+        options = build_fast_options(profile_dir)
+    options = options or build_chrome_options()
+    if NETWORK_SAVINGS_REPORT or FAILURE_BUNDLES:
+        # Network savings only read Network.* events; Page events and console messages are for bundles
+        enable_performance_log(options, page=FAILURE_BUNDLES, console=FAILURE_BUNDLES)
+    try:
+        try:
+            driver = launch(options, driver_path, timings)
+        except SessionNotCreatedException:
+            if timings.driver_source != "cache":
+                raise
+            # Chrome updated past the cached chromedriver
+            with timings.phase("driver_resolution"):
+                driver_path, timings.driver_source = resolve_chromedriver(options, refresh=True)
+            driver = launch(options, driver_path, timings)
+    except BaseException:
+        if profile_dir:
+            # No driver will quit and remove the copy
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    if profile_dir:
+        remove_on_quit(driver, profile_dir)
+    return _configure(driver, timings, network_profile, throttling_profile)
+
+
+class RemoteChromeDriver(webdriver.Remote):
+    """Chrome on a Selenium Grid node or a remote chromedriver, with the DevTools command the suite relies on"""
+
+    def __init__(self, command_executor: str, options: Options):
+        super().__init__(
+            command_executor=ChromiumRemoteConnection(command_executor, vendor_prefix="goog", browser_name="chrome"),
+            options=options,
+        )
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+
+def create_remote_driver(
+    command_executor: str,
+    options: Options = None,
+    network_profile: str = NETWORK_PROFILE,
+    throttling_profile: str = THROTTLING_PROFILE,
+) -> RemoteChromeDriver:
+    """
+    Start a Chrome session on a remote endpoint (Grid hub, Grid node or standalone chromedriver)
+
+    Args:
+        command_executor: Endpoint URL, e.g. "http://node1:4444"
+        options: Chrome options, defaults to the headless fixed-size options of the fast profile
+        network_profile: Request-blocking profile from utils.network_profiles.PROFILES
+        throttling_profile: Network/CPU emulation profile from utils.throttling.PROFILES
+
+    Returns:
+        Remote WebDriver instance
+    """
+    timings = StartupTimings("remote")
+    timings.driver_source = command_executor
+    options = options or build_fast_options()
+    if NETWORK_SAVINGS_REPORT or FAILURE_BUNDLES:
+        # Network savings only read Network.* events; Page events and console messages are for bundles
+        enable_performance_log(options, page=FAILURE_BUNDLES, console=FAILURE_BUNDLES)
+    with timings.phase("session_create"):
+        driver = RemoteChromeDriver(command_executor, options)
+    return _configure(driver, timings, network_profile, throttling_profile)
+
+
+def _configure(driver, timings: StartupTimings, network_profile: str, throttling_profile: str):
+    """Per-session setup shared by local and remote drivers; quits the driver if any step fails"""
+    try:
+        driver.implicitly_wait(0)
+        if network_profile != "full-fidelity":
+            apply_network_profile(driver, network_profile)
+        if throttling_profile != "none":
+            apply_throttling(driver, throttling_profile)
+        if NETWORK_SAVINGS_REPORT:
+            monitor_network_savings(driver, RESOURCE_SIZE_CATALOG)
+        if WEB_VITALS or RUN_HISTORY:
+            # Without web vitals the run history still gets each page's Navigation Timing
+            collect_web_vitals(driver, vitals=WEB_VITALS)
+        if FAILURE_BUNDLES:
+            record_failures(driver)
+    except BaseException:
+        # The caller never gets the driver, so nobody else would end the session
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Failed to quit a driver whose setup failed: {e}")
+        raise
+    time_first_navigation(driver, timings)
+    record_startup(driver, timings)
+    return driver
@@ -0,0 +1,171 @@
+"""
+Pool of pre-launched Chrome WebDriver sessions that are leased and reset instead of relaunched
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from selenium import webdriver
+
+from utils.driver_factory import create_chrome_driver
+
+
+class DriverPool:
+    """Thread-safe pool of warm WebDriver sessions"""
+
+    def __init__(self, size: int = 2, factory: Callable[[], webdriver.Chrome] = create_chrome_driver):
+        """
+        Initialize the pool and launch all sessions up front
+
+        Args:
+            size: Number of browser sessions to keep
+            factory: Callable that creates a new, configured driver
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.factory = factory
+        self._idle = queue.Queue()
+        self._all: List[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._prewarm()
+
+    def _prewarm(self):
+        """
+        Launch every session in parallel, browser startup dominates the fixed cost.
+        If any launch fails, the sessions that did start are quit before the error is raised.
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self.factory) for _ in range(self.size)]
+        drivers, errors = [], []
+        for future in futures:
+            try:
+                drivers.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            for driver in drivers:
+                self._quit(driver)
+            raise errors[0]
+        for driver in drivers:
+            self._all.append(driver)
+            self._idle.put(driver)
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        """
+        Take a driver out of the pool, blocking until one is free.
+        A slot whose driver could not be relaunched is launched again here.
+
+        Args:
+            timeout: Maximum wait time in seconds, None waits forever
+
+        Returns:
+            WebDriver instance
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No driver became free within {timeout}s")
+        if driver is None:
+            try:
+                driver = self.factory()
+            except Exception:
+                # The slot stays empty for the next caller
+                self._idle.put(None)
+                raise
+            with self._lock:
+                self._all.append(driver)
+        return driver
+
+    def release(self, driver: webdriver.Chrome):
+        """
+        Reset a driver and return it to the pool.
+        A driver that cannot be reset is replaced with a fresh session; if that launch
+        fails too, the slot is returned empty and the next acquire() launches it.
+
+        Args:
+            driver: Driver previously returned by acquire()
+        """
+        if self._closed:
+            self._quit(driver)
+            return
+        try:
+            self.reset(driver)
+        except Exception as e:
+            # A crashed browser or chromedriver surfaces as urllib3/connection errors, not WebDriverException
+            print(f"Driver reset failed, relaunching: {e}")
+            self._quit(driver)
+            with self._lock:
+                self._all.remove(driver)
+            try:
+                driver = self.factory()
+            except Exception as e:
+                print(f"Driver relaunch failed, the next acquire will retry: {e}")
+                driver = None
+            else:
+                with self._lock:
+                    self._all.append(driver)
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        Context manager that acquires a driver and always releases it
+
+        Args:
+            timeout: Maximum wait time in seconds for a free driver
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    @staticmethod
+    def reset(driver: webdriver.Chrome):
+        """
+        Bring a session back to a clean state: one blank tab, no cookies, no storage
+
+        Args:
+            driver: WebDriver instance
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        # "*" covers every origin the flow visited, not only the one of the last page
+        driver.execute_cdp_cmd(
+            "Storage.clearDataForOrigin",
+            {"origin": "*", "storageTypes": "local_storage,session_storage,indexeddb,cache_storage"},
+        )
+        driver.get("about:blank")
+
+    @staticmethod
+    def _quit(driver: webdriver.Chrome):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Failed to quit driver: {e}")
+
+    def close(self):
+        """Quit every session owned by the pool"""
+        self._closed = True
+        with self._lock:
+            drivers, self._all = self._all, []
+        for driver in drivers:
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
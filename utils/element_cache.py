@@ -0,0 +1,260 @@
+"""
+Per-driver cache of located elements, keyed by locator.
+
+An element found since the last page-changing command is returned without a round
+trip. Read-only commands (element text, attributes, URL, window handles, logs) keep
+the cache warm; navigation and window commands clear it. Any other command, such as
+a click or a script, makes the next cache hit check the entry first: a single script
+returns the URL, a DOM generation counter kept by a MutationObserver and whether the
+cached elements are still connected. A cached element that went stale anyway is
+located again and the failed command is retried once.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Union
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from config import SHORT_TIMEOUT
+from utils import browser_wait
+from utils.browser_wait import DOM_TOKEN_JS, BrowserWait
+from utils.instrumentation import add_command_observer
+from utils.locators import Locator
+from utils.step_budget import step_timeout
+
+# Commands that cannot change the DOM or the current document
+READ_ONLY_COMMANDS = {
+    Command.FIND_ELEMENT,
+    Command.FIND_ELEMENTS,
+    Command.FIND_CHILD_ELEMENT,
+    Command.FIND_CHILD_ELEMENTS,
+    Command.GET_ELEMENT_TEXT,
+    Command.GET_ELEMENT_TAG_NAME,
+    Command.GET_ELEMENT_ATTRIBUTE,
+    Command.GET_ELEMENT_PROPERTY,
+    Command.GET_ELEMENT_VALUE_OF_CSS_PROPERTY,
+    Command.GET_ELEMENT_RECT,
+    Command.GET_ELEMENT_ARIA_ROLE,
+    Command.GET_ELEMENT_ARIA_LABEL,
+    Command.IS_ELEMENT_SELECTED,
+    Command.IS_ELEMENT_ENABLED,
+    Command.GET_CURRENT_URL,
+    Command.GET_TITLE,
+    Command.GET_PAGE_SOURCE,
+    Command.W3C_GET_CURRENT_WINDOW_HANDLE,
+    Command.W3C_GET_WINDOW_HANDLES,
+    Command.GET_WINDOW_RECT,
+    Command.SCREENSHOT,
+    Command.ELEMENT_SCREENSHOT,
+    Command.GET_LOG,
+    Command.GET_AVAILABLE_LOG_TYPES,
+    Command.GET_ALL_COOKIES,
+    Command.GET_COOKIE,
+    Command.GET_TIMEOUTS,
+    Command.SET_TIMEOUTS,
+}
+
+# Commands that replace the current document or browsing context
+NAVIGATION_COMMANDS = {
+    Command.GET,
+    Command.GO_BACK,
+    Command.GO_FORWARD,
+    Command.REFRESH,
+    Command.SWITCH_TO_WINDOW,
+    Command.NEW_WINDOW,
+    Command.CLOSE,
+    Command.SWITCH_TO_FRAME,
+    Command.SWITCH_TO_PARENT_FRAME,
+}
+
+VALIDATE_JS = DOM_TOKEN_JS + """
+    return [__domToken(), arguments[0].map(function (el) { return el.isConnected; })];
+"""
+
+
+class CachedElement(WebElement):
+    """WebElement that locates itself again once when a command finds it stale"""
+
+    def __init__(self, element: WebElement, cache: "ElementCache", locator: Locator, index: Optional[int] = None):
+        super().__init__(element.parent, element.id)
+        self._cache = cache
+        self._locator = locator
+        self._index = index
+
+    def _execute(self, command, params=None):
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException as stale:
+            try:
+                self._id = self._cache.relocate(self._locator, self._index).id
+            except TimeoutException:
+                raise stale from None
+            return super()._execute(command, params)
+
+
+class _Entry:
+    __slots__ = ("value", "epoch", "generation")
+
+    def __init__(self, value, epoch: int, generation: int):
+        self.value = value
+        self.epoch = epoch
+        self.generation = generation
+
+
+class ElementCache:
+    """Located elements of the driver's current document"""
+
+    def __init__(self, driver):
+        """
+        Initialize cache and start watching the driver's commands
+
+        Args:
+            driver: Selenium WebDriver instance, attached to utils.instrumentation
+        """
+        self.driver = driver
+        self.browser_wait = BrowserWait(driver)
+        self.entries: Dict[tuple, _Entry] = {}
+        self.url: Optional[str] = None
+        self.generation = 0
+        # Bumped by every command that may have changed the page
+        self.epoch = 0
+        self.hits = 0
+        self.validations = 0
+        self.misses = 0
+        self._own_commands = 0
+        add_command_observer(driver, self._on_command)
+
+    @classmethod
+    def for_driver(cls, driver) -> "ElementCache":
+        """Return the cache attached to the driver, creating it on first use"""
+        cache = getattr(driver, "_element_cache", None)
+        if cache is None:
+            cache = driver._element_cache = cls(driver)
+        return cache
+
+    def _on_command(self, command: str):
+        if self._own_commands or command in READ_ONLY_COMMANDS:
+            return
+        self.epoch += 1
+        if command in NAVIGATION_COMMANDS:
+            self.clear()
+
+    @contextmanager
+    def _own(self):
+        # Lookup and validation scripts only read the page
+        self._own_commands += 1
+        try:
+            yield
+        finally:
+            self._own_commands -= 1
+
+    def clear(self):
+        """Forget every cached element"""
+        self.entries.clear()
+        self.url = None
+
+    def invalidate(self, locator: Locator):
+        """Forget the cached elements of one locator"""
+        self.entries.pop((tuple(locator), False), None)
+        self.entries.pop((tuple(locator), True), None)
+
+    def _apply_token(self, token: list):
+        url, generation = token
+        if url != self.url:
+            self.entries.clear()
+        elif generation != self.generation:
+            for key in [key for key, entry in self.entries.items() if key[1] and entry.generation != generation]:
+                del self.entries[key]
+        self.url, self.generation = url, generation
+
+    def _validate(self):
+        """Re-check every entry not confirmed since the last page-changing command, in one script"""
+        self.validations += 1
+        keys = [key for key, entry in self.entries.items() if entry.epoch != self.epoch]
+        groups = [self._elements(self.entries[key].value) for key in keys]
+        try:
+            with self._own():
+                token, connected = self.driver.execute_script(VALIDATE_JS, [e for group in groups for e in group])
+        except WebDriverException:
+            # An element from a replaced document cannot even be passed to the page
+            self.clear()
+            return
+        self._apply_token(token)
+        offset = 0
+        for key, group in zip(keys, groups):
+            alive = all(connected[offset:offset + len(group)])
+            offset += len(group)
+            entry = self.entries.get(key)
+            if entry is None:
+                continue
+            # New matches may have appeared for a list, a single element only has to stay attached
+            if alive and (not key[1] or entry.generation == self.generation):
+                entry.epoch, entry.generation = self.epoch, self.generation
+            else:
+                del self.entries[key]
+
+    @staticmethod
+    def _elements(value) -> List[WebElement]:
+        return value if isinstance(value, list) else [value]
+
+    def get(
+        self,
+        locator: Locator,
+        wait: Callable[[dict], list],
+        all_matches: bool = False,
+    ) -> Union[WebElement, List[WebElement]]:
+        """
+        Return cached elements for a locator, locating them with wait() on a miss
+
+        Args:
+            locator: (By, value) tuple
+            wait: Runs a browser_wait condition and returns its value, e.g. BasePage._wait_in_browser
+            all_matches: Return every match instead of the first
+
+        Returns:
+            CachedElement, or a list of them with all_matches
+        """
+        key = (tuple(locator), all_matches)
+        if key in self.entries and self.entries[key].epoch != self.epoch:
+            self._validate()
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry.value
+        self.misses += 1
+        with self._own():
+            (_, found), token = wait(browser_wait.present([locator], all_matches, token=True))
+        self._apply_token(token)
+        if all_matches:
+            value = [CachedElement(element, self, locator, i) for i, element in enumerate(found)]
+        else:
+            value = CachedElement(found, self, locator)
+        self.entries[key] = _Entry(value, self.epoch, self.generation)
+        return value
+
+    def relocate(self, locator: Locator, index: Optional[int] = None) -> WebElement:
+        """
+        Locate a stale element again
+
+        Args:
+            locator: Locator the element was found with
+            index: Position in the match list for elements of a list lookup
+
+        Returns:
+            Fresh element
+        """
+        self.invalidate(locator)
+        condition = browser_wait.present([locator], all_matches=index is not None, token=True)
+        with self._own():
+            (_, found), token = self.browser_wait.until(condition, step_timeout(SHORT_TIMEOUT))
+        self._apply_token(token)
+        if index is None:
+            return found
+        if index >= len(found):
+            raise StaleElementReferenceException(f"Element {index} of {locator} is gone")
+        return found[index]
+
+    def stats(self) -> dict:
+        """Hit, validation and miss counts"""
+        return {"hits": self.hits, "validations": self.validations, "misses": self.misses}
@@ -0,0 +1,380 @@
+"""
+Failure bundles: everything needed to triage a failed step without a rerun.
+
+During the run DevTools network events and console messages land in a fixed-size ring
+buffer. The chromedriver log is drained after every step that navigated and otherwise
+every few steps, so the passing path costs few commands and chromedriver never buffers
+more than one navigation's events. Only the oldest bundles beyond a count and size
+budget are deleted. When a page-object step fails, the ring is serialized together
+with a DOM snapshot (MHTML, or outerHTML as a fallback), a HAR built from the network
+events and a screenshot into one compressed archive (zstd when `zstandard` is installed,
+gzip otherwise):
+
+    python -m utils.failure_bundle show reports/failures/<bundle>.tar.gz
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from config import (
+    FAILURE_BUNDLE_DIR,
+    FAILURE_BUNDLE_MAX_BYTES,
+    FAILURE_BUNDLE_MAX_FILES,
+    FAILURE_DRAIN_EVERY,
+    FAILURE_RING_SIZE,
+    FAILURE_SNAPSHOT,
+)
+from utils.devtools_log import DevtoolsEventTap
+from utils.instrumentation import NAVIGATION_COMMANDS, add_command_observer, add_step_observer, get_instrumentation
+from utils.screenshot_handler import enforce_retention
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, bundles are then gzip-compressed
+    zstandard = None
+
+# Only these DevTools events are kept; console messages come from the browser log instead
+RECORDED_EVENTS = {
+    "Network.requestWillBeSent",
+    "Network.responseReceived",
+    "Network.loadingFinished",
+    "Network.loadingFailed",
+    "Page.frameNavigated",
+    "Page.loadEventFired",
+    "Page.domContentEventFired",
+}
+
+
+class FailureRecorder:
+    """Ring buffer of recent DevTools events and console messages for one driver"""
+
+    def __init__(
+        self,
+        driver,
+        bundle_dir: str = FAILURE_BUNDLE_DIR,
+        ring_size: int = FAILURE_RING_SIZE,
+        drain_every: int = FAILURE_DRAIN_EVERY,
+        snapshot: str = FAILURE_SNAPSHOT,
+        max_files: int = FAILURE_BUNDLE_MAX_FILES,
+        max_bytes: int = FAILURE_BUNDLE_MAX_BYTES,
+    ):
+        """
+        Initialize recorder and start observing the driver's steps
+
+        Args:
+            driver: Chrome WebDriver created with utils.devtools_log.enable_performance_log
+            bundle_dir: Directory bundles are written to
+            ring_size: DevTools events kept; console messages keep a quarter of that
+            drain_every: Drain the chromedriver log every N passing steps, bounding its buffer
+            snapshot: "mhtml" or "html"
+            max_files: Retention budget, oldest bundles beyond this count are deleted
+            max_bytes: Retention budget, oldest bundles beyond this total size are deleted
+        """
+        self.driver = driver
+        self.bundle_dir = bundle_dir
+        self.drain_every = drain_every
+        self.snapshot = snapshot
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.events = deque(maxlen=ring_size)
+        self.console = deque(maxlen=max(1, ring_size // 4))
+        self.bundles: List[str] = []
+        self._steps = 0
+        self._navigated = False
+        # Failures bundled inside the current outermost step; the objects, since ids are reused once freed
+        self._captured: List[BaseException] = []
+        self._tap = DevtoolsEventTap.for_driver(driver)
+        self._tap.subscribe(self._on_event)
+        add_command_observer(driver, self._on_command)
+        add_step_observer(driver, self._on_step)
+
+    def _on_event(self, method: str, params: dict, timestamp: float):
+        if method in RECORDED_EVENTS:
+            self.events.append((timestamp, method, params))
+
+    def _on_command(self, driver_command: str):
+        if driver_command not in NAVIGATION_COMMANDS:
+            return
+        if self._navigated:
+            # Second navigation since the last drain, collect the first one's events before it starts
+            self.drain()
+        self._navigated = True
+
+    def drain(self):
+        """Move buffered DevTools events and console messages from chromedriver into the rings"""
+        self._navigated = False
+        try:
+            self._tap.drain()
+            self.console.extend(self.driver.get_log("browser"))
+        except Exception as e:
+            print(f"Failed to drain browser logs: {e}")
+
+    def _on_step(self, step_name: str, error: Optional[BaseException]):
+        self._steps += 1
+        if error is None:
+            if self._navigated or self._steps % self.drain_every == 0:
+                self.drain()
+        else:
+            self._bundle_once(step_name, error)
+        if not any(span.kind == "step" for span in get_instrumentation().open_spans()):
+            # The outermost step is over, nothing can re-raise its failures any more
+            self._captured.clear()
+
+    def _bundle_once(self, step_name: str, error: BaseException):
+        # A failure re-raised or wrapped by an enclosing page-object step was bundled already
+        chain, cause = [], error
+        while cause is not None and not any(cause is seen for seen in chain):
+            chain.append(cause)
+            cause = cause.__cause__ or cause.__context__
+        bundled = any(cause is seen for cause in chain for seen in self._captured)
+        self._captured.append(error)
+        if not bundled:
+            try:
+                path = self.capture(step_name, error)
+                print(f"Failure bundle saved: {path}")
+            except Exception as e:
+                print(f"Failed to write failure bundle for {step_name}: {e}")
+
+    def _dom_snapshot(self) -> tuple:
+        if self.snapshot == "mhtml":
+            try:
+                return "page.mhtml", self.driver.execute_cdp_cmd("Page.captureSnapshot", {"format": "mhtml"})["data"].encode()
+            except Exception as e:
+                print(f"MHTML snapshot failed, falling back to outerHTML: {e}")
+        html = self.driver.execute_script("return document.documentElement ? document.documentElement.outerHTML : '';")
+        return "page.html", (html or "").encode("utf-8")
+
+    def capture(self, step_name: str, error: Optional[BaseException] = None) -> str:
+        """
+        Write a bundle for the current browser state
+
+        Args:
+            step_name: Failed step
+            error: Exception the step raised
+
+        Returns:
+            Path of the archive
+        """
+        self.drain()
+        files: Dict[str, bytes] = {}
+        meta = {
+            "step": step_name,
+            "error": f"{type(error).__name__}: {error}" if error else None,
+            "time": datetime.now(timezone.utc).isoformat(),
+        }
+        for name, read in (
+            ("url", lambda: self.driver.current_url),
+            ("title", lambda: self.driver.title),
+            ("window_handles", lambda: len(self.driver.window_handles)),
+        ):
+            try:
+                meta[name] = read()
+            except Exception as e:
+                meta[name] = f"unavailable: {e}"
+        try:
+            snapshot_name, snapshot = self._dom_snapshot()
+            files[snapshot_name] = snapshot
+        except Exception as e:
+            meta["snapshot_error"] = str(e)
+        try:
+            files["screenshot.png"] = self.driver.get_screenshot_as_png()
+        except Exception as e:
+            meta["screenshot_error"] = str(e)
+
+        events = list(self.events)
+        files["meta.json"] = json.dumps(meta, indent=2).encode()
+        files["events.jsonl"] = "".join(
+            json.dumps({"timestamp": t, "method": m, "params": p}) + "\n" for t, m, p in events
+        ).encode()
+        files["console.json"] = json.dumps(list(self.console), indent=2).encode()
+        files["network.har"] = json.dumps(events_to_har(events)).encode()
+        path = write_bundle(self.bundle_dir, step_name, files)
+        self.bundles.append(path)
+        enforce_retention(self.bundle_dir, (".tar.gz", ".tar.zst"), self.max_files, self.max_bytes)
+        return path
+
+    def take_bundles(self) -> List[str]:
+        """Bundles written since the previous call, for the run history"""
+        bundles, self.bundles = self.bundles, []
+        return bundles
+
+
+def write_bundle(bundle_dir: str, step_name: str, files: Dict[str, bytes]) -> str:
+    """
+    Pack files into <bundle_dir>/<step>_<timestamp>.tar.zst (or .tar.gz)
+
+    Args:
+        bundle_dir: Output directory
+        step_name: Failed step, used in the file name
+        files: Member name to content
+
+    Returns:
+        Archive path
+    """
+    os.makedirs(bundle_dir, exist_ok=True)
+    stem = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', step_name)}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+    if zstandard is not None:
+        path = os.path.join(bundle_dir, f"{stem}.tar.zst")
+        data = zstandard.ZstdCompressor(level=10).compress(buffer.getvalue())
+    else:
+        import gzip
+
+        path = os.path.join(bundle_dir, f"{stem}.tar.gz")
+        data = gzip.compress(buffer.getvalue(), compresslevel=6)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def read_bundle(path: str) -> Dict[str, bytes]:
+    """Member name to content of a bundle written by write_bundle()"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("Reading .tar.zst bundles needs the zstandard package")
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    else:
+        import gzip
+
+        data = gzip.decompress(data)
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        return {member.name: tar.extractfile(member).read() for member in tar.getmembers()}
+
+
+def _headers(headers: dict) -> list:
+    return [{"name": name, "value": str(value)} for name, value in (headers or {}).items()]
+
+
+def events_to_har(events: List[tuple]) -> dict:
+    """
+    Build a HAR 1.2 log from recorded Network.* events
+
+    Args:
+        events: (timestamp_ms, method, params) tuples in arrival order
+
+    Returns:
+        HAR dict; requests without a response are kept with status 0
+    """
+    entries: Dict[str, dict] = {}
+    for _, method, params in events:
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            request = params["request"]
+            wall_time = params.get("wallTime") or time.time()
+            entries[request_id] = {
+                "startedDateTime": datetime.fromtimestamp(wall_time, timezone.utc).isoformat(),
+                "_monotonic_start": params.get("timestamp", 0),
+                "time": 0,
+                "request": {
+                    "method": request.get("method", "GET"),
+                    "url": request.get("url", ""),
+                    "httpVersion": "",
+                    "headers": _headers(request.get("headers")),
+                    "queryString": [],
+                    "cookies": [],
+                    "headersSize": -1,
+                    "bodySize": -1,
+                },
+                "response": {
+                    "status": 0, "statusText": "", "httpVersion": "", "headers": [], "cookies": [],
+                    "content": {"size": 0, "mimeType": ""}, "redirectURL": "", "headersSize": -1, "bodySize": -1,
+                },
+                "cache": {},
+                "timings": {"send": 0, "wait": 0, "receive": 0},
+                "_resourceType": params.get("type", ""),
+            }
+        elif request_id not in entries:
+            continue
+        elif method == "Network.responseReceived":
+            response = params["response"]
+            entry = entries[request_id]
+            entry["response"].update(
+                status=response.get("status", 0),
+                statusText=response.get("statusText", ""),
+                httpVersion=response.get("protocol", ""),
+                headers=_headers(response.get("headers")),
+            )
+            entry["response"]["content"]["mimeType"] = response.get("mimeType", "")
+            entry["timings"]["wait"] = round((params.get("timestamp", 0) - entry["_monotonic_start"]) * 1000, 1)
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            entry = entries[request_id]
+            entry["time"] = round((params.get("timestamp", 0) - entry["_monotonic_start"]) * 1000, 1)
+            entry["timings"]["receive"] = max(0, round(entry["time"] - entry["timings"]["wait"], 1))
+            if method == "Network.loadingFinished":
+                entry["response"]["bodySize"] = entry["response"]["content"]["size"] = int(params.get("encodedDataLength", 0))
+            else:
+                entry["response"]["_error"] = params.get("errorText", "")
+                entry["response"]["_blockedReason"] = params.get("blockedReason")
+    for entry in entries.values():
+        entry.pop("_monotonic_start")
+    return {"log": {"version": "1.2", "creator": {"name": "failure_bundle", "version": "1.0"}, "entries": list(entries.values())}}
+
+
+def record_failures(driver, **kwargs) -> FailureRecorder:
+    """Attach a FailureRecorder to the driver, once"""
+    recorder = getattr(driver, "_failure_recorder", None)
+    if recorder is None:
+        recorder = driver._failure_recorder = FailureRecorder(driver, **kwargs)
+    return recorder
+
+
+def take_failure_bundles(driver) -> List[str]:
+    """Bundles the driver's recorder wrote since the previous call, [] without a recorder"""
+    recorder = getattr(driver, "_failure_recorder", None)
+    return recorder.take_bundles() if recorder else []
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect failure bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Summarize a bundle: error, console errors and failed requests")
+    show.add_argument("path")
+    extract = sub.add_parser("extract", help="Unpack a bundle into a directory")
+    extract.add_argument("path")
+    extract.add_argument("--to", default=None, help="Target directory, defaults to the bundle name")
+    args = parser.parse_args(argv)
+
+    files = read_bundle(args.path)
+    if args.command == "extract":
+        target = args.to or re.sub(r"\.tar\.(gz|zst)$", "", args.path)
+        os.makedirs(target, exist_ok=True)
+        for name, data in files.items():
+            with open(os.path.join(target, name), "wb") as f:
+                f.write(data)
+        print(f"Extracted {len(files)} file(s) into {target}")
+        return 0
+
+    meta = json.loads(files["meta.json"])
+    print(f"Step:  {meta['step']}\nError: {meta['error']}\nURL:   {meta.get('url')}\nTime:  {meta['time']}")
+    print(f"Files: {', '.join(f'{name} ({len(data) // 1024} KB)' for name, data in files.items())}")
+    console = [m for m in json.loads(files["console.json"]) if m.get("level") in ("SEVERE", "WARNING")]
+    print(f"\nConsole warnings/errors ({len(console)}):")
+    for message in console[-20:]:
+        print(f"  [{message['level']}] {message['message'][:200]}")
+    har = json.loads(files["network.har"])["log"]["entries"]
+    failed = [e for e in har if e["response"]["status"] == 0 or e["response"]["status"] >= 400]
+    print(f"\nRequests: {len(har)}, failed or unfinished: {len(failed)}")
+    for entry in failed[-20:]:
+        reason = entry["response"].get("_error") or entry["response"]["status"] or "no response"
+        print(f"  {entry['request']['method']} {entry['request']['url'][:150]} -> {reason}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Synthetic local site with the structure the page objects expect.
+
+Serves a homepage, a career page and a Lever-like board on one local port. The board
+renders any number of postings (?postings=10000), so page-object costs can be measured
+at sizes the live board never reaches. Point the suite at it with the printed
+HIRING_BASE_URL / LEVER_BOARD_URL exports (python -m utils.fixture_site).
+"""
+import argparse
+import functools
+import hashlib
+import html
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOARD_SLUG = "insiderone"
+DEFAULT_TEAM = "Quality Assurance"
+DEFAULT_LOCATION = "Istanbul, Turkiye"
+DEFAULT_POSTINGS = 10
+TEAMS = ("Software Development", "Quality Assurance", "Sales")
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>body{{font-family:sans-serif;margin:0}} .posting{{padding:12px 24px;border-bottom:1px solid #ddd}}
+a.posting-btn-submit{{float:right}} section{{min-height:60vh}}</style></head>
+<body>{body}</body></html>"""
+
+_HOME = """
+<header><nav><a href="/">Insider One</a> <a href="/careers/" data-text="We're hiring">We're hiring</a></nav></header>
+<section><h1>Insider One</h1></section>
+"""
+
+_CAREERS = """
+<section><h1>Careers</h1><a href="#open-roles">Explore open roles</a></section>
+<section id="open-roles"><h2>Open roles</h2>{departments}</section>
+"""
+
+_DEPARTMENT = """
+<div class="department"><h3>{team}</h3>
+<a href="{origin}/{slug}?team={query}">{count} Open Positions</a></div>"""
+
+_POSTING = (
+    '<div class="posting" data-qa-posting-id="{id}">'
+    '<div class="posting-apply"><a class="posting-btn-submit template-btn-submit" href="/{slug}/{apply_id}">Apply</a></div>'
+    '<a class="posting-title" href="/{slug}/{id}"><h5 data-qa="posting-name">{title}</h5>'
+    '<div class="posting-categories"><span class="sort-by-location posting-category location">{location}</span>'
+    '<span class="sort-by-team posting-category department">{team}</span>'
+    '<span class="sort-by-commitment posting-category commitment">Full-time</span></div></a></div>'
+)
+
+_JOB = """
+<div class="posting-headline"><h2>{title}</h2></div>
+<div class="section page-centered"><p>Synthetic posting.</p>
+<a class="postings-btn template-btn-submit" href="/{slug}/{id}/apply">Apply for this job</a></div>
+"""
+
+_APPLY = """
+<h2>Submit your application</h2>
+<form id="application-form" method="post" action="#">
+<input name="name" placeholder="Full name"><input name="email" placeholder="Email">
+<button type="submit">Submit application</button></form>
+"""
+
+
+def _page(title: str, body: str) -> bytes:
+    return _PAGE.format(title=html.escape(title), body=body).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=16)
+def render_board(count: int, team: str = DEFAULT_TEAM, location: str = DEFAULT_LOCATION, broken: int = 0) -> bytes:
+    """
+    Lever-like board page with `count` postings, all in the given team and location
+
+    Args:
+        count: Number of postings
+        team: Team of every posting
+        location: Location of every posting
+        broken: The last `broken` postings get an apply link that returns 404
+
+    Returns:
+        HTML bytes
+    """
+    team, location = html.escape(team), html.escape(location)
+    postings = "".join(
+        _POSTING.format(
+            id=f"p{i:05d}", apply_id=f"gone-p{i:05d}" if i >= count - broken else f"p{i:05d}",
+            slug=BOARD_SLUG, title=f"QA Engineer {i + 1}", team=team, location=location,
+        )
+        for i in range(count)
+    )
+    body = (
+        f'<div class="main-header"><h1>{BOARD_SLUG}</h1></div>'
+        f'<div class="postings-wrapper"><div class="postings-group">{postings}</div></div>'
+    )
+    return _page("Jobs", body)
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "FixtureSite/1.0"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        parts = [p for p in parsed.path.split("/") if p]
+
+        if not parts:
+            body = _page("Insider One", _HOME)
+        elif parts == ["careers"]:
+            # Absolute link: the page objects match the board by host and path
+            origin = f"http://{self.headers.get('Host', '127.0.0.1')}"
+            departments = "".join(
+                _DEPARTMENT.format(team=team, origin=origin, slug=BOARD_SLUG, query=urllib.parse.quote(team),
+                                   count=self.server.default_postings)
+                for team in TEAMS
+            )
+            body = _page("Careers", _CAREERS.format(departments=departments))
+        elif parts[0] == BOARD_SLUG and len(parts) == 1:
+            count = int(query.get("postings", self.server.default_postings))
+            broken = int(query.get("broken", self.server.broken_postings))
+            body = render_board(count, query.get("team", DEFAULT_TEAM), query.get("location", DEFAULT_LOCATION), broken)
+        elif parts[0] == BOARD_SLUG and len(parts) == 2 and parts[1].startswith("gone-"):
+            self.send_error(404)
+            return
+        elif parts[0] == BOARD_SLUG and len(parts) == 2:
+            body = _page("Job", _JOB.format(slug=BOARD_SLUG, id=html.escape(parts[1]), title="QA Engineer"))
+        elif parts[0] == BOARD_SLUG and parts[2:] == ["apply"]:
+            body = _page("Apply", _APPLY)
+        else:
+            self.send_error(404)
+            return
+
+        # Validators for conditional requests (utils.link_crawler); no-store keeps browsers from caching
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    """Local server for the synthetic site"""
+
+    def __init__(
+        self,
+        bind: str = "127.0.0.1",
+        port: int = 0,
+        default_postings: int = DEFAULT_POSTINGS,
+        broken_postings: int = 0,
+    ):
+        """
+        Initialize fixture site
+
+        Args:
+            bind: Interface to listen on
+            port: Port to listen on, 0 picks a free port
+            default_postings: Board size when the URL has no ?postings= parameter
+            broken_postings: Postings per board whose apply link is broken, when the URL has no ?broken=
+        """
+        self.bind = bind
+        self.port = port
+        self.default_postings = default_postings
+        self.broken_postings = broken_postings
+        self._server = None
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._server = ThreadingHTTPServer((self.bind, self.port), _FixtureHandler)
+        self._server.daemon_threads = True
+        self._server.default_postings = self.default_postings
+        self._server.broken_postings = self.broken_postings
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.bind}:{self.port}/"
+
+    @property
+    def board_url(self) -> str:
+        return f"{self.base_url}{BOARD_SLUG}"
+
+    def board_url_for(self, postings: int) -> str:
+        """Board URL rendering the given number of postings"""
+        return f"{self.board_url}?postings={postings}"
+
+    def environment(self) -> dict:
+        """Environment variables that point config.py at this site"""
+        return {"HIRING_BASE_URL": self.base_url, "LEVER_BOARD_URL": self.board_url}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the synthetic fixture site")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--postings", type=int, default=DEFAULT_POSTINGS, help="Default board size")
+    args = parser.parse_args(argv)
+
+    site = FixtureSite(port=args.port, default_postings=args.postings).start()
+    print(f"Serving {site.base_url} (board: {site.board_url_for(1000)})")
+    print("\nPoint the suite at the fixture site with:")
+    for name, value in site.environment().items():
+        print(f"  export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
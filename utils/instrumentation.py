@@ -0,0 +1,460 @@
+"""
+Per-step timing and WebDriver command instrumentation.
+
+Every WebDriver command issued through an attached driver is counted against the
+steps open on the current thread (or asyncio task). Time spent polling in WebDriverWait and time spent
+in navigation commands are tracked separately. Results can be written as JSON,
+Prometheus text format and Chrome trace format.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from selenium.webdriver.remote.command import Command
+
+from utils.browser_wait import AdaptiveWait
+
+NAVIGATION_COMMANDS = {"get", "goBack", "goForward", "refresh"}
+
+
+class Span:
+    """A timed region: a scenario step, a page-object step, a helper, a wait or a navigation"""
+
+    __slots__ = ("name", "kind", "start", "end", "thread_id", "commands", "wait_time", "navigation_time", "error", "timeout")
+
+    def __init__(self, name: str, kind: str, timeout: Optional[float] = None):
+        self.name = name
+        self.kind = kind
+        self.timeout = timeout
+        self.start = time.perf_counter()
+        self.end = None
+        self.thread_id = threading.get_ident()
+        self.commands = 0
+        self.wait_time = 0.0
+        self.navigation_time = 0.0
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "duration": self.duration,
+            "commands": self.commands,
+            "wait_time": self.wait_time,
+            "navigation_time": self.navigation_time,
+            "error": self.error,
+        }
+
+
+class Instrumentation:
+    """Collects spans and WebDriver command counts for a run"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self.extra_reports: Dict[str, Callable[[], dict]] = {}
+        # A context variable rather than a thread-local so concurrent asyncio tasks keep separate stacks
+        self._open = contextvars.ContextVar(f"open_spans_{id(self)}", default=())
+        self._lock = threading.Lock()
+
+    def _stack(self) -> tuple:
+        return self._open.get()
+
+    def open_spans(self) -> tuple:
+        """Spans still open in the current thread or asyncio task, outermost first"""
+        return self._stack()
+
+    def record_command(self):
+        """Count one browser command against every span open in the current context"""
+        for span in self._stack():
+            span.commands += 1
+
+    def attach(self, driver):
+        """
+        Count every command the driver sends. Safe to call more than once per driver.
+
+        Args:
+            driver: Selenium WebDriver instance
+        """
+        if getattr(driver, "_instrumentation", None) is self:
+            return
+        execute = getattr(driver, "_uninstrumented_execute", driver.execute)
+
+        @functools.wraps(execute)
+        def instrumented_execute(driver_command, params=None):
+            self.record_command()
+            for callback in getattr(driver, "_command_observers", ()):
+                callback(driver_command)
+            if driver_command not in NAVIGATION_COMMANDS:
+                return execute(driver_command, params)
+            with self.span(driver_command, "navigation"):
+                return execute(driver_command, params)
+
+        driver._uninstrumented_execute = execute
+        driver.execute = instrumented_execute
+        driver._instrumentation = self
+
+    @contextmanager
+    def span(self, name: str, kind: str = "step", timeout: Optional[float] = None):
+        """
+        Time a region on the current thread or asyncio task
+
+        Args:
+            name: Span name, e.g. "HomePage.click_we_are_hiring"
+            kind: "scenario", "step", "helper", "wait" or "navigation"
+            timeout: Seconds a wait was allowed to take
+        """
+        span = Span(name, kind, timeout)
+        stack = self._stack()
+        token = self._open.set(stack + (span,))
+        try:
+            yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._open.reset(token)
+            if kind in ("wait", "navigation"):
+                attr = "wait_time" if kind == "wait" else "navigation_time"
+                for parent in stack:
+                    setattr(parent, attr, getattr(parent, attr) + span.duration)
+            with self._lock:
+                self.spans.append(span)
+
+    def discard_before(self, since: float) -> int:
+        """
+        Drop finished spans that started before since, e.g. runs already in the run history.
+        Keeps memory flat when one process repeats a scenario for days.
+
+        Args:
+            since: perf_counter() value
+
+        Returns:
+            Number of spans dropped
+        """
+        with self._lock:
+            kept = [span for span in self.spans if span.start >= since or span.end is None]
+            dropped = len(self.spans) - len(kept)
+            self.spans[:] = kept
+        return dropped
+
+    def step(self, name: str):
+        """Shortcut for span(name, "scenario")"""
+        return self.span(name, "scenario")
+
+    def wait(self, driver, timeout: float, label: str = "wait", poll_frequency: float = 0.5) -> "InstrumentedWait":
+        """
+        Build an AdaptiveWait whose until() calls are recorded as wait spans
+
+        Args:
+            driver: Selenium WebDriver instance
+            timeout: Maximum wait time in seconds
+            label: Span name for the waits
+            poll_frequency: Sleep interval between polls in seconds
+
+        Returns:
+            InstrumentedWait instance
+        """
+        return InstrumentedWait(self, driver, timeout, label, poll_frequency)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Aggregate spans by name
+
+        Returns:
+            Mapping of span name to count, total/mean/max duration, commands, wait and navigation time
+        """
+        result = OrderedDict()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        for span in spans:
+            row = result.setdefault(span.name, {
+                "kind": span.kind, "count": 0, "errors": 0, "total": 0.0, "max": 0.0,
+                "commands": 0, "wait_time": 0.0, "navigation_time": 0.0,
+            })
+            row["count"] += 1
+            row["errors"] += 1 if span.error else 0
+            row["total"] += span.duration
+            row["max"] = max(row["max"], span.duration)
+            row["commands"] += span.commands
+            row["wait_time"] += span.wait_time
+            row["navigation_time"] += span.navigation_time
+        for row in result.values():
+            row["mean"] = row["total"] / row["count"]
+        return result
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {
+            "summary": self.summary(),
+            "spans": [dict(s.to_dict(), start=s.start - self.origin) for s in spans],
+        }
+
+    def write_json(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path: str, prefix: str = "hiring") -> str:
+        metrics = (
+            ("duration_seconds", "summary", "Wall time per span", None),
+            ("webdriver_commands_total", "counter", "WebDriver commands issued", "commands"),
+            ("wait_seconds_total", "counter", "Time spent polling in WebDriverWait", "wait_time"),
+            ("navigation_seconds_total", "counter", "Time spent in navigation commands", "navigation_time"),
+            ("errors_total", "counter", "Spans that raised", "errors"),
+        )
+        summary = self.summary()
+        lines = []
+        for metric, metric_type, help_text, key in metrics:
+            name = f"{prefix}_step_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for step, row in summary.items():
+                labels = '{step="%s",kind="%s"}' % (step.replace('"', '\\"'), row["kind"])
+                if key is None:
+                    lines.append(f"{name}_sum{labels} {row['total']:.6f}")
+                    lines.append(f"{name}_count{labels} {row['count']}")
+                else:
+                    lines.append(f"{name}{labels} {row[key]}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def write_chrome_trace(self, path: str) -> str:
+        """Write spans as complete ("X") events, viewable in chrome://tracing or Perfetto"""
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": s.name,
+                "cat": s.kind,
+                "ph": "X",
+                "ts": (s.start - self.origin) * 1e6,
+                "dur": s.duration * 1e6,
+                "pid": os.getpid(),
+                "tid": s.thread_id,
+                "args": {"commands": s.commands, "error": s.error},
+            }
+            for s in spans
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def add_report(self, name: str, build: Callable[[], dict]):
+        """
+        Register an extra JSON report written by write_reports() as <name>.json
+
+        Args:
+            name: Report name
+            build: Callable returning the report contents
+        """
+        self.extra_reports[name] = build
+
+    def write_reports(self, report_dir: str, chrome_trace: bool = False) -> List[str]:
+        """
+        Write metrics.json, metrics.prom, every extra report and optionally trace.json
+
+        Args:
+            report_dir: Output directory
+            chrome_trace: Also write a Chrome trace file
+
+        Returns:
+            Paths written
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        paths = [
+            self.write_json(os.path.join(report_dir, "metrics.json")),
+            self.write_prometheus(os.path.join(report_dir, "metrics.prom")),
+        ]
+        for name, build in self.extra_reports.items():
+            path = os.path.join(report_dir, f"{name}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(build(), f, indent=2)
+            paths.append(path)
+        if chrome_trace:
+            paths.append(self.write_chrome_trace(os.path.join(report_dir, "trace.json")))
+        return paths
+
+
+class InstrumentedWait(AdaptiveWait):
+    """AdaptiveWait that records each until()/until_not() call as a wait span"""
+
+    def __init__(
+        self,
+        instrumentation: Instrumentation,
+        driver,
+        timeout: float,
+        label: str = "wait",
+        poll_frequency: float = 0.5,
+    ):
+        super().__init__(driver, timeout, poll_frequency)
+        self._instrumentation = instrumentation
+        self._label = label
+        self._span_timeout = timeout
+
+    def until(self, method, message: str = ""):
+        with self._instrumentation.span(self._label, "wait", self._span_timeout):
+            return super().until(method, message)
+
+    def until_not(self, method, message: str = ""):
+        with self._instrumentation.span(self._label, "wait", self._span_timeout):
+            return super().until_not(method, message)
+
+
+_default = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """Process-wide instrumentation used by page objects"""
+    return _default
+
+
+def add_step_observer(driver, callback: Callable[[str, Optional[BaseException]], None]):
+    """
+    Call callback(step_name, error) after every page-object step run on this driver
+
+    Args:
+        driver: Selenium WebDriver instance
+        callback: Observer, e.g. a collector that drains DevTools events per step
+    """
+    observers = getattr(driver, "_step_observers", None)
+    if observers is None:
+        observers = driver._step_observers = []
+    observers.append(callback)
+
+
+def add_command_observer(driver, callback: Callable[[str], None]):
+    """
+    Call callback(driver_command) before every command the instrumented driver sends.
+    Commands sent through driver._uninstrumented_execute are not observed.
+
+    Args:
+        driver: Selenium WebDriver instance
+        callback: Observer, e.g. a cache that must notice page-changing commands
+    """
+    observers = getattr(driver, "_command_observers", None)
+    if observers is None:
+        observers = driver._command_observers = []
+    observers.append(callback)
+
+
+def add_window_observer(driver, callback: Callable[[], None]):
+    """
+    Call callback() right after the instrumented driver switches windows, before the next
+    command runs in the new window. Per-tab DevTools settings (emulation, blocked URLs)
+    then reach a window opened by a step while that step is still running.
+
+    Args:
+        driver: Selenium WebDriver instance
+        callback: Configures the current window; must be safe to call again for a known window
+    """
+    switched = []
+
+    def on_command(driver_command: str):
+        # Command observers run before the command, so the callback waits for the next one
+        if driver_command == Command.SWITCH_TO_WINDOW:
+            switched.append(True)
+        elif switched:
+            switched.clear()
+            callback()
+
+    add_command_observer(driver, on_command)
+
+
+def configure_every_window(driver, key: str, configure: Callable[[], None]):
+    """
+    Run configure() in the current window now, in every window the driver switches to
+    before the next command runs there, and after each step in a window the step reached
+    without switching. Each window is configured once per call. Calling again with the
+    same key replaces the configuration and applies it to windows afresh.
+
+    Args:
+        driver: Selenium WebDriver instance
+        key: Name of the configuration, e.g. "throttling"
+        configure: Configures the current window, e.g. with per-tab DevTools commands
+    """
+    configurations = getattr(driver, "_window_configurations", None)
+    if configurations is None:
+        configurations = driver._window_configurations = {}
+    first_time = key not in configurations
+    configurations[key] = (configure, set())
+
+    def configure_current_window():
+        configure, handles = configurations[key]
+        handle = driver.current_window_handle
+        if handle not in handles:
+            configure()
+            handles.add(handle)
+
+    configure_current_window()
+    if first_time:
+        add_window_observer(driver, configure_current_window)
+        add_step_observer(driver, lambda step_name, error: configure_current_window())
+
+
+def _notify_step_observers(driver, step_name: str, error: Optional[BaseException]):
+    for callback in getattr(driver, "_step_observers", ()):
+        try:
+            callback(step_name, error)
+        except Exception as e:
+            print(f"Step observer failed after {step_name}: {e}")
+
+
+def instrumented(kind: str = "step", name: Optional[str] = None):
+    """
+    Decorator that records a page-object method as a span named "<Class>.<method>".
+    Coroutine methods are supported. Step observers registered on the page's driver
+    run after each "step" span.
+
+    Args:
+        kind: Span kind, "step" for page steps and "helper" for BasePage helpers
+        name: Override for the span name
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                instrumentation = getattr(self, "instrumentation", None) or _default
+                span_name = name or f"{type(self).__name__}.{func.__name__}"
+                error = None
+                try:
+                    with instrumentation.span(span_name, kind):
+                        return await func(self, *args, **kwargs)
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    if kind == "step":
+                        _notify_step_observers(self.driver, span_name, error)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = getattr(self, "instrumentation", None) or _default
+            span_name = name or f"{type(self).__name__}.{func.__name__}"
+            error = None
+            try:
+                with instrumentation.span(span_name, kind):
+                    return func(self, *args, **kwargs)
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if kind == "step":
+                    _notify_step_observers(self.driver, span_name, error)
+        return wrapper
+    return decorator
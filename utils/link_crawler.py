@@ -0,0 +1,535 @@
+"""
+Browser-free link crawler for the careers site and the Lever board.
+
+Starting from the homepage, the crawler finds the careers page, every team link to the
+board (the same href match as JobListingPage.SOFTWARE_DEV_OPEN_POSITIONS, without the
+"software" filter), every posting and APPLY_JOB_CARD URL on those boards and the
+APPLY_FOR_THIS_JOB_LINK on each job page, then checks that the application form behind
+it loads. Requests run concurrently on asyncio over a bounded keep-alive connection pool
+with a per-host rate limit. ETag / Last-Modified validators are kept between runs, so
+unchanged pages come back as 304 with their links taken from the cache:
+
+    python -m utils.link_crawler --rate 10
+"""
+import argparse
+import asyncio
+import codecs
+import json
+import os
+import re
+import ssl
+import sys
+import time
+import urllib.parse
+import zlib
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    BASE_URL,
+    CRAWL_CACHE,
+    CRAWL_CONCURRENCY,
+    CRAWL_RATE_PER_HOST,
+    DEFAULT_TIMEOUT,
+    LEVER_BOARD_URL,
+    REPORT_DIR,
+)
+from pages.job_listing_page import JobListingPage
+from utils.preflight import MAX_REDIRECTS, USER_AGENT, LinkCollector, PostingCollector
+
+_COMPOUND_SELECTOR = re.compile(
+    r"^(?P<tag>[a-z0-9]+)?(?P<classes>(?:\.[\w-]+)*)(?P<attrs>(?:\[[\w-]+\*?=['\"][^'\"]*['\"]\])*)$"
+)
+_ATTRIBUTE_SELECTOR = re.compile(r"\[([\w-]+)(\*?=)['\"]([^'\"]*)['\"]\]")
+
+
+def selector_matcher(selector: str) -> Callable[[str, Dict[str, str]], bool]:
+    """
+    Matcher for the simple CSS selectors the page objects use: tag, .class, [attr='v'] and [attr*='v'], comma lists
+
+    Args:
+        selector: CSS selector
+
+    Returns:
+        Callable(tag, attrs) -> bool
+    """
+    alternatives = []
+    for part in selector.split(","):
+        match = _COMPOUND_SELECTOR.match(part.strip())
+        if not match:
+            raise ValueError(f"Unsupported selector for crawling: {part.strip()}")
+        classes = set(filter(None, match.group("classes").split(".")))
+        attrs = _ATTRIBUTE_SELECTOR.findall(match.group("attrs"))
+        alternatives.append((match.group("tag"), classes, attrs))
+
+    def matches(tag: str, element_attrs: Dict[str, str]) -> bool:
+        element_classes = set(element_attrs.get("class", "").split())
+        for want_tag, want_classes, want_attrs in alternatives:
+            if want_tag and want_tag != tag or not want_classes <= element_classes:
+                continue
+            if all(
+                (value in element_attrs.get(name, "")) if op == "*=" else element_attrs.get(name) == value
+                for name, op, value in want_attrs
+            ):
+                return True
+        return False
+
+    return matches
+
+
+class SelectorCollector(HTMLParser):
+    """Attributes of every element matching a selector, collected while the page streams"""
+
+    def __init__(self, selector: str):
+        super().__init__(convert_charrefs=True)
+        self._matches = selector_matcher(selector)
+        self.found: List[Dict[str, str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if self._matches(tag, attrs):
+            self.found.append(attrs)
+
+
+class Response:
+    """Status, lowercase headers and decoded body of one exchange"""
+
+    __slots__ = ("status", "headers", "body", "url")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, url: str):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    def text(self) -> str:
+        charset = "utf-8"
+        match = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""))
+        if match:
+            try:
+                charset = codecs.lookup(match.group(1)).name
+            except LookupError:
+                pass
+        return self.body.decode(charset, errors="replace")
+
+
+class _RateLimiter:
+    """Spaces request starts to one per 1/rate seconds; rate 0 means unlimited"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections on asyncio, at most max_per_host open per origin"""
+
+    def __init__(self, max_per_host: int = CRAWL_CONCURRENCY, rate_per_host: float = CRAWL_RATE_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize connection pool
+
+        Args:
+            max_per_host: Concurrent connections (and so requests) per scheme/host/port
+            rate_per_host: Request starts per second per origin, 0 for no limit
+            timeout: Seconds one request may take
+        """
+        self.max_per_host = max_per_host
+        self.rate_per_host = rate_per_host
+        self.timeout = timeout
+        self.connections_opened = 0
+        self.requests = 0
+        self._idle: Dict[tuple, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._slots: Dict[tuple, asyncio.Semaphore] = {}
+        self._limiters: Dict[tuple, _RateLimiter] = {}
+        self._ssl = ssl.create_default_context()
+
+    async def _open(self, origin: tuple):
+        scheme, host, port = origin
+        self.connections_opened += 1
+        return await asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None)
+
+    async def _exchange(self, connection, method: str, host: str, path: str, headers: Dict[str, str]):
+        reader, writer = connection
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: gzip, deflate", "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        response_headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        status = int(status)
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()).strip():
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in response_headers:
+            body = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        encoding = response_headers.get("content-encoding", "").lower()
+        if encoding == "gzip":
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return status, response_headers, body, keep_alive
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Send one request, following redirects
+
+        Args:
+            method: GET or HEAD
+            url: Absolute http(s) URL
+            headers: Extra request headers, e.g. conditional request validators
+
+        Returns:
+            Response of the final URL
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            origin = (parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+            path = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+            slot = self._slots.setdefault(origin, asyncio.Semaphore(self.max_per_host))
+            limiter = self._limiters.setdefault(origin, _RateLimiter(self.rate_per_host))
+            async with slot:
+                await limiter.wait()
+                self.requests += 1
+                idle = self._idle.setdefault(origin, [])
+                reused = bool(idle)
+                connection = idle.pop() if idle else await self._open(origin)
+                keep_alive = False
+                try:
+                    try:
+                        status, response_headers, body, keep_alive = await asyncio.wait_for(
+                            self._exchange(connection, method, parsed.netloc, path, headers or {}), self.timeout
+                        )
+                    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                        connection[1].close()
+                        if not reused or isinstance(e, asyncio.TimeoutError):
+                            raise
+                        # The server closed an idle connection, retry once on a fresh one
+                        connection = await self._open(origin)
+                        status, response_headers, body, keep_alive = await asyncio.wait_for(
+                            self._exchange(connection, method, parsed.netloc, path, headers or {}), self.timeout
+                        )
+                finally:
+                    # Any failed exchange, including the retry, leaves the connection in an unknown state
+                    if keep_alive:
+                        idle.append(connection)
+                    else:
+                        connection[1].close()
+            location = response_headers.get("location")
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return Response(status, response_headers, body, url)
+        raise ConnectionError(f"Too many redirects for {url}")
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class ConditionalCache:
+    """ETag / Last-Modified validators and the links found on each page, kept between runs"""
+
+    def __init__(self, path: Optional[str] = CRAWL_CACHE):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def validators(self, url: str) -> Dict[str, str]:
+        entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: Response, links: List[str]):
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        if etag or last_modified:
+            self.entries[url] = {"etag": etag, "last_modified": last_modified, "links": links}
+        else:
+            self.entries.pop(url, None)
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+
+
+class CrawlResult:
+    """One row per checked URL"""
+
+    def __init__(self):
+        self.checks: List[dict] = []
+        self.elapsed = 0.0
+        self.requests = 0
+        self.connections_opened = 0
+
+    def add(self, url: str, kind: str, referrer: Optional[str], status: Optional[int], error: Optional[str],
+            revalidated: bool, elapsed: float):
+        self.checks.append({
+            "url": url, "kind": kind, "referrer": referrer, "status": status,
+            "ok": error is None, "error": error, "revalidated": revalidated,
+            "elapsed_ms": round(elapsed * 1000, 1),
+        })
+
+    @property
+    def broken(self) -> List[dict]:
+        return [check for check in self.checks if not check["ok"]]
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed": round(self.elapsed, 3),
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "checks": self.checks,
+        }
+
+    def format(self) -> str:
+        kinds: Dict[str, List[int]] = {}
+        for check in self.checks:
+            counts = kinds.setdefault(check["kind"], [0, 0])
+            counts[0] += 1
+            counts[1] += 0 if check["ok"] else 1
+        lines = [f"{kind:<14} {total:>6} checked, {broken} broken" for kind, (total, broken) in kinds.items()]
+        revalidated = sum(1 for check in self.checks if check["revalidated"])
+        lines.append(
+            f"\n{len(self.checks)} URL(s) in {self.elapsed:.2f}s: {self.requests} request(s) on "
+            f"{self.connections_opened} connection(s), {revalidated} unchanged (304)"
+        )
+        for check in self.broken[:50]:
+            lines.append(f"❌ {check['kind']} {check['url']} ({check['error']}), linked from {check['referrer']}")
+        if len(self.broken) > 50:
+            lines.append(f"... and {len(self.broken) - 50} more")
+        return "\n".join(lines)
+
+
+class LinkCrawler:
+    """Discovers and checks team, posting, apply-card and application-form links"""
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        board_url: str = LEVER_BOARD_URL,
+        concurrency: int = CRAWL_CONCURRENCY,
+        rate_per_host: float = CRAWL_RATE_PER_HOST,
+        cache_path: Optional[str] = CRAWL_CACHE,
+        timeout: float = DEFAULT_TIMEOUT,
+        limit: Optional[int] = None,
+    ):
+        """
+        Initialize crawler
+
+        Args:
+            base_url: Homepage URL
+            board_url: Lever board URL; team links are links whose host and path contain it
+            concurrency: Connections per host
+            rate_per_host: Request starts per second per host, 0 for no limit
+            cache_path: Conditional request cache, None to always fetch in full
+            timeout: Seconds one request may take
+            limit: Check at most this many job pages
+        """
+        self.base_url = base_url
+        self.board_marker = board_url.split("://", 1)[-1].rstrip("/").lower()
+        self.board_url = board_url
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.cache = ConditionalCache(cache_path)
+        self.timeout = timeout
+        self.limit = limit
+
+    async def _fetch(self, pool: AsyncConnectionPool, result: CrawlResult, url: str, kind: str,
+                     referrer: Optional[str], extract: Optional[Callable[[Response], List[str]]] = None) -> List[str]:
+        """
+        Check one URL and return the links extract() finds on it (from the cache on a 304)
+
+        A page counts as broken when it does not load with 2xx or when extract() raises AssertionError.
+        """
+        started = time.perf_counter()
+        status, error, links, revalidated = None, None, [], False
+        try:
+            response = await pool.request("GET", url, self.cache.validators(url) if extract else None)
+            status = response.status
+            if status == 304 and url in self.cache.entries:
+                revalidated = True
+                links = self.cache.entries[url]["links"]
+            elif not 200 <= status < 300:
+                error = f"HTTP {status}"
+            elif extract:
+                links = extract(response)
+                self.cache.store(url, response, links)
+        except AssertionError as e:
+            error = str(e)
+        except (OSError, ValueError, zlib.error, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        result.add(url, kind, referrer, status, error, revalidated, time.perf_counter() - started)
+        return links
+
+    @staticmethod
+    def _parse(response: Response, parser: HTMLParser) -> HTMLParser:
+        parser.feed(response.text())
+        parser.close()
+        return parser
+
+    def _careers_link(self, response: Response) -> List[str]:
+        links = self._parse(response, LinkCollector())
+        careers = links.find(lambda a: a.get("href") == "/careers/") or links.find(
+            lambda a: a.get("data-text") == "We're hiring"
+        )
+        assert careers, "No 'We're hiring' link"
+        return [urllib.parse.urljoin(response.url, careers["href"])]
+
+    def _team_links(self, response: Response) -> List[str]:
+        links = self._parse(response, LinkCollector())
+        urls = [
+            urllib.parse.urljoin(response.url, a["href"])
+            for a in links.links
+            if self.board_marker in a.get("href", "").lower()
+        ]
+        assert urls, f"No links to {self.board_marker}"
+        return list(dict.fromkeys(urls))
+
+    def _posting_links(self, response: Response) -> List[str]:
+        postings = self._parse(response, PostingCollector(response.url)).postings
+        assert postings, "No postings on the board"
+        # Posting title link and APPLY_JOB_CARD link, tagged so the check row says which one broke
+        return [f"posting {p['posting_url']}" for p in postings if p["posting_url"]] + [
+            f"apply_card {p['apply_url']}" for p in postings if p["apply_url"]
+        ]
+
+    def _apply_form_link(self, response: Response) -> List[str]:
+        found = self._parse(response, SelectorCollector(JobListingPage.APPLY_FOR_THIS_JOB_LINK[1])).found
+        assert found, "No 'Apply for this job' link"
+        return [urllib.parse.urljoin(response.url, found[0]["href"])]
+
+    def _form(self, response: Response) -> List[str]:
+        assert self._parse(response, SelectorCollector(JobListingPage.LEVER_FORM[1])).found, "No application form"
+        return []
+
+    async def crawl(self) -> CrawlResult:
+        """Discover and check every link, level by level"""
+        result = CrawlResult()
+        started = time.perf_counter()
+        async with AsyncConnectionPool(self.concurrency, self.rate_per_host, self.timeout) as pool:
+            careers = await self._fetch(pool, result, self.base_url, "home", None, self._careers_link)
+            teams = []
+            for url in careers:
+                teams += await self._fetch(pool, result, url, "careers", self.base_url, self._team_links)
+            if not teams:
+                teams = [self.board_url]
+
+            boards = await asyncio.gather(*(
+                self._fetch(pool, result, url, "team_board", careers[0] if careers else None, self._posting_links)
+                for url in teams
+            ))
+            jobs: Dict[str, Tuple[str, str]] = {}
+            for board_url, links in zip(teams, boards):
+                for link in links:
+                    kind, url = link.split(" ", 1)
+                    jobs.setdefault(url, (kind, board_url))
+            job_urls = list(jobs)[:self.limit] if self.limit else list(jobs)
+
+            forms = await asyncio.gather(*(
+                self._fetch(pool, result, url, jobs[url][0], jobs[url][1], self._apply_form_link) for url in job_urls
+            ))
+            form_referrers: Dict[str, str] = {}
+            for job_url, links in zip(job_urls, forms):
+                for url in links:
+                    form_referrers.setdefault(url, job_url)
+            await asyncio.gather(*(
+                self._fetch(pool, result, url, "apply_form", referrer, self._form)
+                for url, referrer in form_referrers.items()
+            ))
+            result.requests = pool.requests
+            result.connections_opened = pool.connections_opened
+        self.cache.save()
+        result.elapsed = time.perf_counter() - started
+        return result
+
+
+def crawl_links(**kwargs) -> CrawlResult:
+    """Run LinkCrawler(**kwargs).crawl() on a new event loop"""
+    return asyncio.run(LinkCrawler(**kwargs).crawl())
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check every team, posting and apply link without a browser")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--board-url", default=LEVER_BOARD_URL)
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY, help="Connections per host")
+    parser.add_argument("--rate", type=float, default=CRAWL_RATE_PER_HOST, help="Requests per second per host, 0 for no limit")
+    parser.add_argument("--limit", type=int, default=None, help="Check at most this many job pages")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore stored ETag / Last-Modified validators")
+    args = parser.parse_args(argv)
+
+    result = crawl_links(
+        base_url=args.base_url,
+        board_url=args.board_url,
+        concurrency=args.concurrency,
+        rate_per_host=args.rate,
+        cache_path=None if args.no_cache else CRAWL_CACHE,
+        limit=args.limit,
+    )
+    print(result.format())
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, "link_crawl.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result.to_dict(), f, indent=2)
+    print(f"\nReport written: {path}")
+    return 1 if result.broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
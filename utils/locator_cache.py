@@ -0,0 +1,134 @@
+"""
+On-disk cache of which alternative locator won, per page and per element
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+from typing import List, Sequence, Tuple
+
+from config import LOCATOR_CACHE_PATH
+from utils.locators import Locator, locator_key
+
+
+class LocatorCache:
+    """Learns which locator of an ordered set matches, so the next run tries it first"""
+
+    def __init__(self, path: str, save_every: int = 50):
+        """
+        Initialize locator cache
+
+        Args:
+            path: JSON file holding {page: {element: {locator: {"wins": n, "attempts": n}}}}
+            save_every: Resolutions recorded between writes; the rest is written by flush() at exit
+        """
+        self.path = path
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._flush_registered = False
+        self._data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable locator cache {path}: {e}")
+
+    def order(self, page: str, element: str, locators: Sequence[Locator]) -> List[Locator]:
+        """
+        Sort locators by past wins, keeping the declared order for ties
+
+        Args:
+            page: Page object class name
+            element: Element name
+            locators: Declared locators, highest priority first
+
+        Returns:
+            Locators in the order they should be tried
+        """
+        stats = self._data.get(page, {}).get(element, {})
+        ranked = sorted(enumerate(locators), key=lambda item: (-stats.get(locator_key(item[1]), {}).get("wins", 0), item[0]))
+        return [locator for _, locator in ranked]
+
+    def record(self, page: str, element: str, locators: Sequence[Locator], winner: Locator):
+        """
+        Record that `winner` resolved the element. Written in batches, not on every resolution
+
+        Args:
+            page: Page object class name
+            element: Element name
+            locators: Every locator that took part
+            winner: The locator that matched
+        """
+        with self._lock:
+            stats = self._data.setdefault(page, {}).setdefault(element, {})
+            for locator in locators:
+                entry = stats.setdefault(locator_key(locator), {"wins": 0, "attempts": 0})
+                entry["attempts"] += 1
+                if locator == winner:
+                    entry["wins"] += 1
+            self._unsaved += 1
+            if not self._flush_registered:
+                self._flush_registered = True
+                atexit.register(self.flush)
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def flush(self):
+        """Write resolutions recorded since the last save"""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+
+    def never_won(self) -> List[Tuple[str, str, str, int]]:
+        """
+        Locators that took part in resolutions but never matched
+
+        Returns:
+            (page, element, locator, attempts) tuples
+        """
+        result = []
+        for page, elements in sorted(self._data.items()):
+            for element, stats in sorted(elements.items()):
+                for key, entry in sorted(stats.items()):
+                    if entry["wins"] == 0:
+                        result.append((page, element, key, entry["attempts"]))
+        return result
+
+
+_default = None
+
+
+def get_locator_cache() -> LocatorCache:
+    """Process-wide cache stored at config.LOCATOR_CACHE_PATH"""
+    global _default
+    if _default is None:
+        _default = LocatorCache(LOCATOR_CACHE_PATH)
+    return _default
+
+
+def main() -> int:
+    dead = get_locator_cache().never_won()
+    if not dead:
+        print("Every recorded locator has won at least once")
+        return 0
+    print("Locators that never won:")
+    for page, element, key, attempts in dead:
+        print(f"  {page}.{element}: {key} (0/{attempts})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Helpers for passing Selenium locators to in-browser scripts
+"""
+import json
+from typing import List, Sequence, Tuple
+
+from selenium.webdriver.common.by import By
+
+Locator = Tuple[str, str]
+
+
+def _xpath_literal(text: str) -> str:
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def to_js_locator(locator: Locator) -> List[str]:
+    """
+    Convert a (By, value) locator to a ["css" | "xpath", selector] pair
+
+    Args:
+        locator: Selenium locator tuple
+
+    Returns:
+        Two-item list understood by the in-browser scripts
+    """
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return ["css", value]
+    if by == By.XPATH:
+        return ["xpath", value]
+    if by == By.ID:
+        return ["css", f"[id={json.dumps(value)}]"]
+    if by == By.NAME:
+        return ["css", f"[name={json.dumps(value)}]"]
+    if by == By.CLASS_NAME:
+        return ["css", f".{value}"]
+    if by == By.TAG_NAME:
+        return ["css", value]
+    if by == By.LINK_TEXT:
+        return ["xpath", f"//a[normalize-space(.)={_xpath_literal(value)}]"]
+    if by == By.PARTIAL_LINK_TEXT:
+        return ["xpath", f"//a[contains(., {_xpath_literal(value)})]"]
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+def to_js_locators(locators: Sequence[Locator]) -> List[List[str]]:
+    return [to_js_locator(locator) for locator in locators]
+
+
+def locator_key(locator: Locator) -> str:
+    """Stable string form of a locator, used as a cache key"""
+    return f"{locator[0]}={locator[1]}"
@@ -0,0 +1,205 @@
+"""
+Named request-blocking profiles applied through the Chrome DevTools Protocol.
+
+Profiles block third-party and heavy resources with Network.setBlockedURLs and can
+rewrite request headers with Network.setExtraHTTPHeaders. When performance logging
+is enabled, a NetworkSavingsMonitor attributes blocked requests and the bytes they
+would have cost to each page-object step.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from utils.devtools_log import DevtoolsEventTap
+from utils.instrumentation import add_step_observer, configure_every_window, get_instrumentation
+
+ANALYTICS_AND_TRACKING = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*px.ads.linkedin.com*",
+    "*snap.licdn.com*",
+    "*bat.bing.com*",
+    "*clarity.ms*",
+    "*hotjar.com*",
+    "*hs-analytics.net*",
+    "*hs-scripts.com*",
+    "*hsadspixel.net*",
+    "*segment.io*",
+    "*cdn.segment.com*",
+]
+CHAT_WIDGETS = [
+    "*intercom.io*",
+    "*intercomcdn.com*",
+    "*widget.intercom.io*",
+    "*drift.com*",
+    "*driftt.com*",
+    "*zdassets.com*",
+    "*tawk.to*",
+]
+FONTS = ["*fonts.googleapis.com*", "*fonts.gstatic.com*", "*use.typekit.net*", "*.woff*", "*.ttf*", "*.otf*"]
+MEDIA = ["*youtube.com/embed*", "*ytimg.com*", "*player.vimeo.com*", "*vimeocdn.com*", "*.mp4*", "*.webm*", "*.m3u8*"]
+
+PROFILES: Dict[str, dict] = {
+    # Everything loads, nothing is rewritten
+    "full-fidelity": {"blocked_urls": [], "extra_headers": {}},
+    # Only analytics, tracking pixels and chat widgets are blocked
+    "no-third-party": {"blocked_urls": ANALYTICS_AND_TRACKING + CHAT_WIDGETS, "extra_headers": {}},
+    # Everything the functional assertions do not need
+    "functional-minimal": {
+        "blocked_urls": ANALYTICS_AND_TRACKING + CHAT_WIDGETS + FONTS + MEDIA,
+        "extra_headers": {"Save-Data": "on", "DNT": "1"},
+    },
+}
+
+
+def apply_network_profile(driver, name: str) -> dict:
+    """
+    Apply a named profile to the driver's browser session.
+    DevTools settings are per tab, so the profile is applied to every window the driver
+    switches to (e.g. the Lever tab) before the next command runs there. Steps that end
+    in a window they never switched to explicitly are caught after the step.
+
+    Args:
+        driver: Selenium Chrome WebDriver instance
+        name: Key in PROFILES
+
+    Returns:
+        The applied profile
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown network profile '{name}'. Available: {', '.join(PROFILES)}")
+    driver._network_profile = name
+    configure_every_window(driver, "network_profile", lambda: _configure_current_window(driver, PROFILES[name]))
+    return PROFILES[name]
+
+
+def _configure_current_window(driver, profile: dict):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile["blocked_urls"]})
+    driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": profile["extra_headers"]})
+
+
+class ResourceSizeCatalog:
+    """Transfer sizes seen per URL, learned from runs where the resource was not blocked"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.sizes = json.load(f)
+
+    def learn(self, url: str, size: int):
+        with self._lock:
+            self.sizes[url] = int(size)
+
+    def size_of(self, url: str) -> Optional[int]:
+        return self.sizes.get(url)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.sizes, f, indent=0, sort_keys=True)
+
+
+class NetworkSavingsMonitor:
+    """Counts loaded and blocked requests per page-object step for one driver"""
+
+    def __init__(self, driver, catalog: ResourceSizeCatalog):
+        """
+        Initialize monitor and start observing the driver's steps
+
+        Args:
+            driver: Chrome WebDriver created with utils.devtools_log.enable_performance_log
+            catalog: Shared resource size catalog
+        """
+        self.driver = driver
+        self.catalog = catalog
+        self.steps: Dict[str, dict] = OrderedDict()
+        self._urls: Dict[str, str] = {}
+        self._current = self._empty()
+        self._tap = DevtoolsEventTap.for_driver(driver)
+        self._tap.subscribe(self._on_event)
+        add_step_observer(driver, self._on_step)
+
+    @staticmethod
+    def _empty() -> dict:
+        return {"requests_loaded": 0, "bytes_loaded": 0, "requests_blocked": 0, "bytes_saved": 0, "unknown_size_blocked": 0}
+
+    def _on_event(self, method: str, params: dict, timestamp: float):
+        if method == "Network.requestWillBeSent":
+            self._urls[params["requestId"]] = params["request"]["url"]
+        elif method == "Network.loadingFinished":
+            url = self._urls.pop(params["requestId"], None)
+            size = int(params.get("encodedDataLength", 0))
+            self._current["requests_loaded"] += 1
+            self._current["bytes_loaded"] += size
+            if url:
+                self.catalog.learn(url, size)
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            url = self._urls.pop(params["requestId"], None)
+            size = self.catalog.size_of(url) if url else None
+            self._current["requests_blocked"] += 1
+            if size is None:
+                self._current["unknown_size_blocked"] += 1
+            else:
+                self._current["bytes_saved"] += size
+
+    def _on_step(self, step_name: str, error):
+        # Events between the previous step and the end of this one belong to this step
+        self._tap.drain()
+        row = self.steps.setdefault(step_name, self._empty())
+        for key, value in self._current.items():
+            row[key] += value
+        self._current = self._empty()
+
+    def report(self) -> Dict[str, dict]:
+        return self.steps
+
+
+_monitors: List[NetworkSavingsMonitor] = []
+_catalog: Optional[ResourceSizeCatalog] = None
+
+
+def monitor_network_savings(driver, catalog_path: str) -> NetworkSavingsMonitor:
+    """
+    Attach a savings monitor to the driver and include it in the run's network_savings report
+
+    Args:
+        driver: Chrome WebDriver created with performance logging enabled
+        catalog_path: JSON file with learned resource sizes
+
+    Returns:
+        NetworkSavingsMonitor
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = ResourceSizeCatalog(catalog_path)
+        get_instrumentation().add_report("network_savings", network_savings_report)
+    monitor = NetworkSavingsMonitor(driver, _catalog)
+    _monitors.append(monitor)
+    return monitor
+
+
+def network_savings_report() -> dict:
+    """Per-step totals across every monitored driver; also persists the size catalog"""
+    totals: Dict[str, dict] = OrderedDict()
+    for monitor in _monitors:
+        for step, row in monitor.report().items():
+            total = totals.setdefault(step, NetworkSavingsMonitor._empty())
+            for key, value in row.items():
+                total[key] += value
+    if _catalog is not None:
+        _catalog.save()
+    profiles = sorted({getattr(m.driver, "_network_profile", None) or "full-fidelity" for m in _monitors})
+    return {"profiles": profiles, "steps": totals}
@@ -0,0 +1,96 @@
+"""
+Run scenarios concurrently on a pool of warm WebDriver sessions
+"""
+import argparse
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from config import DRIVER_POOL_SIZE, PREFLIGHT, REPORT_DIR, WRITE_CHROME_TRACE
+from scenarios.hiring_flow import run_hiring_flow
+from utils.driver_pool import DriverPool
+from utils.instrumentation import get_instrumentation
+from utils.preflight import run_preflight
+from utils.run_history import record_run
+from utils.screenshot_handler import ScreenshotHandler
+
+
+def run_scenarios(
+    scenarios: Dict[str, Callable],
+    pool: DriverPool,
+    screenshot_handler: Optional[ScreenshotHandler] = None,
+    workers: Optional[int] = None,
+) -> List[dict]:
+    """
+    Run every scenario on a leased driver, up to `workers` at a time
+
+    Args:
+        scenarios: Mapping of scenario name to callable(driver, screenshot_handler)
+        pool: Driver pool to lease sessions from
+        screenshot_handler: Screenshot handler shared by all scenarios
+        workers: Number of worker threads, defaults to the pool size
+
+    Returns:
+        One result dict per scenario with name, passed, duration and error
+    """
+    screenshot_handler = screenshot_handler or ScreenshotHandler()
+
+    def _run(item):
+        name, scenario = item
+        start = time.perf_counter()
+        with pool.lease() as driver:
+            artifacts = []
+            try:
+                scenario(driver, screenshot_handler)
+                error = None
+            except Exception:
+                artifacts.append(screenshot_handler.take_screenshot(driver, f"failed_{name}"))
+                error = traceback.format_exc()
+            record_run(name, error is None, start, driver, [a for a in artifacts if a], error, threading.get_ident())
+        return {
+            "name": name,
+            "passed": error is None,
+            "duration": time.perf_counter() - start,
+            "error": error,
+        }
+
+    # WebDriver calls are HTTP round trips, threads overlap them without a process per browser
+    with ThreadPoolExecutor(max_workers=workers or pool.size) as executor:
+        return list(executor.map(_run, scenarios.items()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the hiring scenario in parallel")
+    parser.add_argument("--workers", type=int, default=DRIVER_POOL_SIZE, help="Number of browser sessions")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of scenario copies to run")
+    args = parser.parse_args(argv)
+
+    if PREFLIGHT:
+        preflight = run_preflight()
+        print(preflight.format())
+        if not preflight.passed:
+            print("\n❌ Preflight failed, not starting browsers")
+            return 1
+
+    scenarios = {f"hiring_flow_{i + 1}": run_hiring_flow for i in range(args.repeat)}
+    start = time.perf_counter()
+    screenshot_handler = ScreenshotHandler.from_config()
+    with DriverPool(size=args.workers) as pool:
+        results = run_scenarios(scenarios, pool, screenshot_handler)
+    screenshot_handler.flush()
+
+    for result in results:
+        status = "✓" if result["passed"] else "❌"
+        print(f"{status} {result['name']} ({result['duration']:.1f}s)")
+        if result["error"]:
+            print(result["error"])
+    print(f"\nTotal wall time: {time.perf_counter() - start:.1f}s")
+    get_instrumentation().write_reports(REPORT_DIR, chrome_trace=WRITE_CHROME_TRACE)
+    return 0 if all(r["passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Helpers for checking Lever posting records extracted from the job board
+"""
+import urllib.parse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Keys of a posting record, as returned by JobListingPage.extract_postings
+POSTING_FIELDS = ("title", "team", "location", "commitment", "posting_url", "apply_url")
+
+
+def filtered_board_url(board_url: str, location: Optional[str] = None, team: Optional[str] = None) -> str:
+    """
+    Add or replace Lever filter query parameters on a board URL
+
+    Args:
+        board_url: Lever board URL, possibly with existing filters
+        location: Location filter, None keeps the current value
+        team: Team filter, None keeps the current value
+
+    Returns:
+        Filtered board URL
+    """
+    parsed = urllib.parse.urlparse(board_url)
+    params = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+
+    if location is not None:
+        params["location"] = [location]
+    if team is not None:
+        params["team"] = [team]
+
+    return urllib.parse.urlunparse(parsed._replace(query=urllib.parse.urlencode(params, doseq=True)))
+
+
+def posting_violations(posting: Dict[str, str], expected_team: str, expected_location_substr: str) -> List[str]:
+    """
+    Check a single posting against the expected filters
+
+    Args:
+        posting: Posting record
+        expected_team: Team that must appear in the posting's team or title
+        expected_location_substr: Substring the posting's location must contain
+
+    Returns:
+        Human readable reasons, empty if the posting matches
+    """
+    reasons = []
+    team = expected_team.lower()
+    if team not in posting.get("team", "").lower() and team not in posting.get("title", "").lower():
+        reasons.append(f"team '{posting.get('team', '')}' does not contain '{expected_team}'")
+    if expected_location_substr.lower() not in posting.get("location", "").lower():
+        reasons.append(f"location '{posting.get('location', '')}' does not contain '{expected_location_substr}'")
+    return reasons
+
+
+def find_violations(
+    postings: Iterable[Dict[str, str]],
+    expected_team: str,
+    expected_location_substr: str,
+) -> List[Tuple[Dict[str, str], List[str]]]:
+    """
+    Check every posting against the expected filters
+
+    Args:
+        postings: Posting records
+        expected_team: Team that must appear in each posting
+        expected_location_substr: Substring each location must contain
+
+    Returns:
+        (posting, reasons) pairs for postings that do not match
+    """
+    violations = []
+    for posting in postings:
+        reasons = posting_violations(posting, expected_team, expected_location_substr)
+        if reasons:
+            violations.append((posting, reasons))
+    return violations
+
+
+def format_violations(violations: List[Tuple[Dict[str, str], List[str]]], limit: int = 5) -> str:
+    """
+    Render violations for an assertion message
+
+    Args:
+        violations: Output of find_violations
+        limit: Maximum number of postings to list
+
+    Returns:
+        Multi-line description
+    """
+    lines = [f"{len(violations)} posting(s) do not match:"]
+    for posting, reasons in violations[:limit]:
+        lines.append(f"  - {posting.get('title', '?')} ({posting.get('posting_url', '')}): {'; '.join(reasons)}")
+    if len(violations) > limit:
+        lines.append(f"  ... and {len(violations) - limit} more")
+    return "\n".join(lines)
+
+
+def filter_result(
+    location: str,
+    team: str,
+    url: str,
+    postings: Optional[List[Dict[str, str]]],
+    expected_location_substr: str,
+    elapsed: float,
+    error: Optional[str] = None,
+    require_postings: bool = False,
+) -> Dict:
+    """
+    Build one row of a filter matrix
+
+    Args:
+        location: Location filter
+        team: Team filter
+        url: Filtered board URL
+        postings: Postings found, None if the board could not be read
+        expected_location_substr: Substring every posting location must contain
+        elapsed: Seconds from navigation start to collection
+        error: Reason the board could not be read
+        require_postings: Report a board without postings as an error instead of a count of 0
+
+    Returns:
+        Row with location, team, url, count, violations, details, error and elapsed
+    """
+    violations = find_violations(postings or [], team, expected_location_substr)
+    if require_postings and postings == [] and not error:
+        error = "No postings found"
+    return {
+        "location": location,
+        "team": team,
+        "url": url,
+        "count": len(postings) if postings is not None else None,
+        "violations": len(violations),
+        "details": format_violations(violations) if violations else "",
+        "error": error,
+        "elapsed": round(elapsed, 3),
+    }
+
+
+def format_matrix_table(rows: List[Dict]) -> str:
+    """
+    Render filter matrix rows as a fixed-width table
+
+    Args:
+        rows: Output of filter_result
+
+    Returns:
+        Multi-line table
+    """
+    headers = ("Location", "Team", "Postings", "Violations", "Time (s)", "Status")
+    table = [headers]
+    for row in rows:
+        status = row["error"] or ("FAIL" if row["violations"] else "OK")
+        count = "-" if row["count"] is None else str(row["count"])
+        table.append((row["location"], row["team"], count, str(row["violations"]), f"{row['elapsed']:.2f}", status))
+    widths = [max(len(line[i]) for line in table) for i in range(len(headers))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in table]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
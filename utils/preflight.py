@@ -0,0 +1,442 @@
+"""
+Browser-free preflight for the hiring flow.
+
+Fetches the homepage, careers page, filtered Lever board and a few apply URLs over
+pooled keep-alive HTTP connections, parses them with a streaming HTML parser and runs
+the same assertions as the page objects. A failed preflight means the site or board is
+down, so the Selenium run is not worth starting.
+"""
+import argparse
+import codecs
+import http.client
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import BASE_URL, LEVER_BOARD_URL
+from utils.postings import filtered_board_url, find_violations, format_violations
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class PreflightError(AssertionError):
+    """A preflight check failed"""
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, reused per origin"""
+
+    def __init__(self, timeout: float = 10, max_idle_per_origin: int = 4):
+        """
+        Initialize connection pool
+
+        Args:
+            timeout: Socket timeout in seconds
+            max_idle_per_origin: Idle connections kept open per scheme/host/port
+        """
+        self.timeout = timeout
+        self.max_idle_per_origin = max_idle_per_origin
+        self.connections_opened = 0
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def _checkout(self, scheme: str, netloc: str) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self._open(scheme, netloc), False
+
+    def _checkin(self, scheme: str, netloc: str, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_origin:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        on_chunk: Optional[Callable[[bytes, http.client.HTTPMessage], None]] = None,
+    ) -> Tuple[int, str, http.client.HTTPMessage]:
+        """
+        Send one request, following redirects, and stream the body to on_chunk
+
+        Args:
+            method: GET or HEAD
+            url: Absolute http(s) URL
+            on_chunk: Receives decompressed body chunks and the response headers as they arrive
+
+        Returns:
+            (status, final URL, response headers)
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            parsed = urllib.parse.urlsplit(url)
+            path = urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, ""))
+            headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+            conn, reused = self._checkout(parsed.scheme, parsed.netloc)
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle connection, retry once on a fresh one; another
+                # idle connection to the same origin may be just as stale
+                conn = self._open(parsed.scheme, parsed.netloc)
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+
+            redirect = response.status in (301, 302, 303, 307, 308) and response.getheader("Location")
+            try:
+                self._read_body(response, None if redirect else on_chunk)
+            except Exception:
+                # The rest of the body is still unread, so the connection cannot be reused
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(parsed.scheme, parsed.netloc, conn)
+            if not redirect:
+                return response.status, url, response.headers
+            url = urllib.parse.urljoin(url, response.getheader("Location"))
+        raise PreflightError(f"Too many redirects for {url}")
+
+    @staticmethod
+    def _read_body(response: http.client.HTTPResponse, on_chunk):
+        encoding = (response.getheader("Content-Encoding") or "").lower()
+        decompressor = None
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        while True:
+            # Reading to the end is required before the connection can be reused
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if on_chunk is not None:
+                on_chunk(decompressor.decompress(chunk) if decompressor else chunk, response.headers)
+        if on_chunk is not None and decompressor:
+            on_chunk(decompressor.flush(), response.headers)
+
+    def fetch_html(self, url: str, parser: HTMLParser) -> Tuple[int, str]:
+        """
+        GET a page and feed it to the parser as it downloads
+
+        Args:
+            url: Absolute URL
+            parser: HTMLParser to feed
+
+        Returns:
+            (status, final URL)
+        """
+        decoders = []
+
+        def on_chunk(chunk: bytes, headers: http.client.HTTPMessage):
+            if not decoders:
+                decoders.append(codecs.getincrementaldecoder(_charset(headers))(errors="replace"))
+            parser.feed(decoders[0].decode(chunk))
+
+        status, final_url, _ = self.request("GET", url, on_chunk)
+        parser.close()
+        return status, final_url
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _charset(headers: Optional[http.client.HTTPMessage]) -> str:
+    charset = headers.get_content_charset() if headers is not None else None
+    try:
+        codecs.lookup(charset or "utf-8")
+    except LookupError:
+        return "utf-8"
+    return charset or "utf-8"
+
+
+class LinkCollector(HTMLParser):
+    """Collects anchors (attributes and text) from a streamed page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Dict[str, str]] = []
+        self._open: List[Dict[str, str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            link = {name: value or "" for name, value in attrs}
+            link["text"] = ""
+            self.links.append(link)
+            self._open.append(link)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._open:
+            self._open.pop()
+
+    def handle_data(self, data):
+        for link in self._open:
+            link["text"] += data
+
+    def find(self, predicate: Callable[[Dict[str, str]], bool]) -> Optional[Dict[str, str]]:
+        return next((link for link in self.links if predicate(link)), None)
+
+
+class PostingCollector(HTMLParser):
+    """
+    Builds posting records from Lever board markup while it streams.
+    Field selectors mirror JobListingPage._EXTRACT_POSTINGS_JS; the first match wins.
+    """
+
+    POSTING_CLASSES = {"posting", "position-list-item"}
+    TEXT_FIELDS = (
+        ("title", lambda tag, cls, attrs: attrs.get("data-qa") == "posting-name" or tag == "h5"),
+        ("team", lambda tag, cls, attrs: bool(cls & {"sort-by-team", "department"})),
+        ("location", lambda tag, cls, attrs: bool(cls & {"sort-by-location", "location"})),
+        ("commitment", lambda tag, cls, attrs: bool(cls & {"sort-by-commitment", "commitment"})),
+    )
+    HREF_FIELDS = (
+        ("posting_url", "posting-title"),
+        ("apply_url", "posting-btn-submit"),
+    )
+
+    def __init__(self, base_url: str):
+        """
+        Initialize collector
+
+        Args:
+            base_url: Page URL, used to resolve relative links like el.href does
+        """
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.postings: List[Dict[str, str]] = []
+        self._posting: Optional[Dict[str, str]] = None
+        self._found = set()
+        self._depth = 0
+        self._stack: List[Optional[str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        attrs = {name: value or "" for name, value in attrs}
+        classes = set(attrs.get("class", "").split())
+        if self._posting is None:
+            if classes & self.POSTING_CLASSES:
+                self._posting = {field: "" for field, _ in self.TEXT_FIELDS + self.HREF_FIELDS}
+                self._found = set()
+                self._depth = 1
+                self._stack = [None]
+            return
+
+        self._depth += 1
+        field = None
+        for name, matches in self.TEXT_FIELDS:
+            if name not in self._found and matches(tag, classes, attrs):
+                self._found.add(name)
+                field = name
+                break
+        if tag == "a":
+            for name, cls in self.HREF_FIELDS:
+                if name not in self._found and cls in classes:
+                    self._found.add(name)
+                    self._posting[name] = urllib.parse.urljoin(self.base_url, attrs.get("href", ""))
+        self._stack.append(field)
+
+    def handle_endtag(self, tag):
+        if self._posting is None or tag in VOID_TAGS:
+            return
+        self._depth -= 1
+        if self._stack:
+            self._stack.pop()
+        if self._depth == 0:
+            for name, _ in self.TEXT_FIELDS:
+                self._posting[name] = " ".join(self._posting[name].split())
+            self.postings.append(self._posting)
+            self._posting = None
+
+    def handle_data(self, data):
+        if self._posting is None:
+            return
+        for field in self._stack:
+            if field:
+                self._posting[field] += data
+
+
+class PreflightResult:
+    """Outcome of each preflight check"""
+
+    def __init__(self):
+        self.checks: List[dict] = []
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.checks) and all(check["passed"] for check in self.checks)
+
+    def add(self, name: str, passed: bool, detail: str, elapsed: float):
+        self.checks.append({"name": name, "passed": passed, "detail": detail, "elapsed_ms": round(elapsed * 1000, 1)})
+
+    def format(self) -> str:
+        lines = []
+        for check in self.checks:
+            status = "✓" if check["passed"] else "❌"
+            lines.append(f"{status} {check['name']} ({check['elapsed_ms']} ms): {check['detail']}")
+        return "\n".join(lines)
+
+
+def run_preflight(
+    base_url: str = BASE_URL,
+    lever_board_url: str = LEVER_BOARD_URL,
+    location: str = "Istanbul, Turkiye",
+    team: str = "Quality Assurance",
+    location_substr: str = "Istanbul",
+    apply_samples: int = 3,
+    timeout: float = 10,
+) -> PreflightResult:
+    """
+    Run the browser-free checks, stopping at the first failure
+
+    Args:
+        base_url: Homepage URL
+        lever_board_url: Lever board URL, used when the careers page has no board link
+        location: Lever location filter
+        team: Lever team filter
+        location_substr: Substring every listing location must contain
+        apply_samples: Number of apply URLs to request
+        timeout: Socket timeout in seconds
+
+    Returns:
+        PreflightResult
+    """
+    result = PreflightResult()
+    board_marker = lever_board_url.split("://", 1)[-1].rstrip("/").lower()
+    context = {}
+
+    def home(pool):
+        links = LinkCollector()
+        status, url = pool.fetch_html(base_url, links)
+        assert status == 200, f"{url} returned {status}"
+        careers = links.find(lambda a: a.get("href") == "/careers/") or links.find(
+            lambda a: a.get("data-text") == "We're hiring"
+        )
+        assert careers, f"No 'We're hiring' link on {url}"
+        context["careers_url"] = urllib.parse.urljoin(url, careers["href"])
+        return context["careers_url"]
+
+    def careers(pool):
+        links = LinkCollector()
+        status, url = pool.fetch_html(context["careers_url"], links)
+        assert status == 200, f"{url} returned {status}"
+        assert links.find(lambda a: a.get("href") == "#open-roles"), f"No 'Explore open roles' link on {url}"
+        software = links.find(
+            lambda a: board_marker in a.get("href", "").lower() and "software" in a.get("href", "").lower()
+        )
+        if software is None:
+            # Same fallback as JobListingPage.click_software_development_open_positions
+            context["board_url"] = f"{lever_board_url}?team=Software%20Development"
+            return f"No Software Development link on {url}, using {context['board_url']}"
+        context["board_url"] = urllib.parse.urljoin(url, software["href"])
+        return context["board_url"]
+
+    def listings(pool):
+        board_url = filtered_board_url(context["board_url"], location=location, team=team)
+        postings = PostingCollector(board_url)
+        status, url = pool.fetch_html(board_url, postings)
+        assert status == 200, f"{url} returned {status}"
+        assert postings.postings, f"No job listings found on {url}"
+        violations = find_violations(postings.postings, team, location_substr)
+        assert not violations, format_violations(violations)
+        context["apply_urls"] = [p["apply_url"] for p in postings.postings if p["apply_url"]]
+        return f"{len(postings.postings)} posting(s) match"
+
+    def apply_urls(pool):
+        urls = context["apply_urls"][:apply_samples]
+        assert urls, "No apply URLs on the filtered board"
+        for url in urls:
+            assert "/apply" in url, f"Apply link does not point at an application form: {url}"
+            status, final_url, _ = pool.request("HEAD", url)
+            if status == 405:
+                status, final_url, _ = pool.request("GET", url)
+            assert status == 200, f"{final_url} returned {status}"
+        return f"{len(urls)} apply URL(s) reachable"
+
+    with ConnectionPool(timeout=timeout) as pool:
+        for name, check in (("homepage", home), ("careers", careers), ("lever_board", listings), ("apply_urls", apply_urls)):
+            start = time.perf_counter()
+            try:
+                detail = check(pool)
+                result.add(name, True, detail, time.perf_counter() - start)
+            except (AssertionError, http.client.HTTPException, OSError, ValueError, zlib.error) as e:
+                # zlib.error: a gzip/deflate body that does not decompress
+                result.add(name, False, str(e) or type(e).__name__, time.perf_counter() - start)
+                break
+    return result
+
+
+def require_preflight(**kwargs) -> PreflightResult:
+    """
+    Run the preflight and raise PreflightError if any check fails
+
+    Args:
+        **kwargs: Passed to run_preflight
+
+    Returns:
+        Passing PreflightResult
+    """
+    result = run_preflight(**kwargs)
+    print(result.format())
+    if not result.passed:
+        raise PreflightError(f"Preflight failed, skipping the browser run:\n{result.format()}")
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the hiring flow over HTTP without a browser")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--lever-board-url", default=LEVER_BOARD_URL)
+    parser.add_argument("--location", default="Istanbul, Turkiye")
+    parser.add_argument("--team", default="Quality Assurance")
+    parser.add_argument("--location-substr", default="Istanbul")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = run_preflight(args.base_url, args.lever_board_url, args.location, args.team, args.location_substr)
+    print(result.format())
+    print(f"\nPreflight {'passed' if result.passed else 'failed'} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0 if result.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
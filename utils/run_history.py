@@ -0,0 +1,497 @@
+"""
+SQLite store of past runs: step durations, WebDriver command counts, page loads,
+pass/fail and artifact paths.
+
+Writes are queued and committed in batches by a background thread, so recording
+never touches the disk on the thread that drives the browser. The CLI shows step
+percentiles over time and flags steps that got significantly slower than their
+rolling baseline (one-sided Mann-Whitney U test):
+
+    python -m utils.run_history stats --bucket day
+    python -m utils.run_history regressions --baseline 30 --recent 5
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from config import BASE_URL, RUN_HISTORY, RUN_HISTORY_DB
+from utils.failure_bundle import take_failure_bundles
+from utils.instrumentation import Instrumentation, get_instrumentation
+from utils.web_vitals import take_web_vitals
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    base_url TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    duration REAL NOT NULL,
+    commands INTEGER NOT NULL,
+    wait_time REAL NOT NULL,
+    navigation_time REAL NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS page_loads (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    step TEXT,
+    url TEXT NOT NULL,
+    ttfb REAL,
+    dom_content_loaded REAL,
+    load REAL,
+    transfer_size INTEGER,
+    fcp REAL,
+    lcp REAL,
+    cls REAL,
+    inp REAL,
+    tbt REAL,
+    resources TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS steps_by_name ON steps (name, run_id);
+CREATE INDEX IF NOT EXISTS runs_by_start ON runs (started_at);
+"""
+
+# Columns added after the first release, created on databases that predate them
+ADDED_COLUMNS = {
+    "page_loads": (("fcp", "REAL"), ("lcp", "REAL"), ("cls", "REAL"), ("inp", "REAL"), ("tbt", "REAL"), ("resources", "TEXT")),
+}
+PAGE_LOAD_COLUMNS = ("step", "url", "ttfb", "dom_content_loaded", "load", "transfer_size", "fcp", "lcp", "cls", "inp", "tbt")
+
+# Span kinds stored per run: scenario steps and page-object steps
+RECORDED_KINDS = ("scenario", "step")
+
+class RunHistory:
+    """Batched writer and query helper for the run history database"""
+
+    def __init__(self, path: str, batch_size: int = 50, flush_interval: float = 1.0):
+        """
+        Initialize history; the schema is created on first use
+
+        Args:
+            path: SQLite database file
+            batch_size: Runs committed per transaction at most
+            flush_interval: Seconds the writer waits to fill a batch
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.executescript(SCHEMA)
+            for table, columns in ADDED_COLUMNS.items():
+                existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                for column, column_type in columns:
+                    if column not in existing:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def record_run(
+        self,
+        name: str,
+        passed: bool,
+        duration: float,
+        steps: Sequence[dict] = (),
+        page_loads: Sequence[dict] = (),
+        artifacts: Iterable[str] = (),
+        error: Optional[str] = None,
+        started_at: Optional[float] = None,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Queue a finished run; it is written by the background thread
+
+        Args:
+            name: Run name, e.g. "test_hiring_page_automation"
+            passed: Whether the run passed
+            duration: Wall time of the run in seconds
+            steps: Span dicts (Span.to_dict()) of the run
+            page_loads: Page records from utils.web_vitals (timing, vitals and slowest resources)
+            artifacts: Screenshot and report paths
+            error: Failure message or traceback
+            started_at: Unix time the run started, defaults to now - duration
+            base_url: Site the run was pointed at
+        """
+        run = {
+            "name": name,
+            "passed": passed,
+            "duration": duration,
+            "started_at": started_at if started_at is not None else time.time() - duration,
+            "base_url": base_url,
+            "error": error,
+            "steps": list(steps),
+            "page_loads": list(page_loads),
+            "artifacts": list(artifacts),
+        }
+        self._ensure_writer()
+        self._queue.put(run)
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._drain, name="run-history-writer", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    def _drain(self):
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with connection:
+                    for run in batch:
+                        self._insert(connection, run)
+            except Exception as e:
+                # The batch is rolled back; the writer must outlive a bad run or a full disk
+                print(f"Failed to write run history to {self.path}: {type(e).__name__}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, run: dict):
+        cursor = connection.execute(
+            "INSERT INTO runs (name, started_at, duration, passed, base_url, error) VALUES (?, ?, ?, ?, ?, ?)",
+            (run["name"], run["started_at"], run["duration"], int(run["passed"]), run["base_url"], run["error"]),
+        )
+        run_id = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO steps (run_id, name, kind, duration, commands, wait_time, navigation_time, error)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, s["name"], s["kind"], s["duration"], s["commands"], s["wait_time"], s["navigation_time"], s["error"])
+                for s in run["steps"]
+            ],
+        )
+        connection.executemany(
+            f"INSERT INTO page_loads (run_id, {', '.join(PAGE_LOAD_COLUMNS)}, resources)"
+            f" VALUES (?, {', '.join('?' * len(PAGE_LOAD_COLUMNS))}, ?)",
+            [
+                (run_id, *(p.get(column) for column in PAGE_LOAD_COLUMNS), json.dumps(p.get("resources", [])))
+                for p in run["page_loads"]
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO artifacts (run_id, kind, path) VALUES (?, ?, ?)",
+            [(run_id, _artifact_kind(path), path) for path in run["artifacts"]],
+        )
+
+    def flush(self):
+        """Block until every queued run has been committed"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def step_samples(self, kinds: Sequence[str] = ("scenario",), since: Optional[float] = None) -> Dict[str, List[tuple]]:
+        """
+        Durations of passed steps, oldest first
+
+        Args:
+            kinds: Span kinds to include
+            since: Only runs started at or after this Unix time
+
+        Returns:
+            Mapping of step name to [(started_at, duration), ...]
+        """
+        self.flush()
+        query = (
+            "SELECT steps.name, runs.started_at, steps.duration FROM steps JOIN runs ON runs.id = steps.run_id"
+            f" WHERE steps.error IS NULL AND steps.kind IN ({', '.join('?' * len(kinds))}) AND runs.started_at >= ?"
+            " ORDER BY runs.started_at, steps.rowid"
+        )
+        samples: Dict[str, List[tuple]] = OrderedDict()
+        with closing(self._connect()) as connection:
+            for name, started_at, duration in connection.execute(query, (*kinds, since or 0)):
+                samples.setdefault(name, []).append((started_at, duration))
+        return samples
+
+
+def _artifact_kind(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".png", ".jpg", ".jpeg", ".webp"):
+        return "screenshot"
+    if path.endswith((".tar.gz", ".tar.zst")):
+        return "failure_bundle"
+    if path.endswith(".vdelta.npz"):
+        return "screenshot_delta"
+    return "report"
+
+
+def run_spans(
+    instrumentation: Instrumentation,
+    since: float,
+    until: Optional[float] = None,
+    thread_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Step spans of one run, picked out of the process-wide instrumentation
+
+    Args:
+        instrumentation: Instrumentation that recorded the run
+        since: perf_counter() value when the run started
+        until: perf_counter() value when the run ended, defaults to now
+        thread_id: Only spans recorded on this thread (parallel runs)
+
+    Returns:
+        Span dicts, oldest first
+    """
+    until = until if until is not None else time.perf_counter()
+    with instrumentation._lock:
+        spans = [
+            span for span in instrumentation.spans
+            if span.kind in RECORDED_KINDS
+            and since <= span.start and (span.end or until) <= until
+            and (thread_id is None or span.thread_id == thread_id)
+        ]
+    # Only the run's own spans are sorted, not everything the process has recorded
+    return [span.to_dict() for span in sorted(spans, key=lambda s: s.start)]
+
+
+_history: Optional[RunHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_run_history() -> Optional[RunHistory]:
+    """Process-wide run history, None when RUN_HISTORY is disabled"""
+    global _history
+    if not RUN_HISTORY:
+        return None
+    with _history_lock:
+        if _history is None:
+            _history = RunHistory(RUN_HISTORY_DB)
+        return _history
+
+
+def record_run(
+    name: str,
+    passed: bool,
+    since: float,
+    driver=None,
+    artifacts: Iterable[str] = (),
+    error: Optional[str] = None,
+    thread_id: Optional[int] = None,
+    until: Optional[float] = None,
+):
+    """
+    Queue a run with its steps and page loads into the process-wide history.
+    Does nothing when RUN_HISTORY is disabled.
+
+    Args:
+        name: Run name
+        passed: Whether the run passed
+        since: perf_counter() value when the run started
+        driver: Driver the run used, for its collected web vitals and failure bundles
+        artifacts: Screenshot and report paths
+        error: Failure message or traceback
+        thread_id: Thread the run executed on, when runs share the process
+        until: perf_counter() value when the run ended, defaults to now
+    """
+    history = get_run_history()
+    if history is None:
+        return
+    until = until if until is not None else time.perf_counter()
+    history.record_run(
+        name,
+        passed,
+        until - since,
+        steps=run_spans(get_instrumentation(), since, until, thread_id),
+        page_loads=take_web_vitals(driver) if driver is not None else (),
+        artifacts=list(artifacts) + (take_failure_bundles(driver) if driver is not None else []),
+        error=error,
+        base_url=BASE_URL,
+    )
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def mann_whitney_greater(baseline: Sequence[float], recent: Sequence[float]) -> float:
+    """
+    One-sided Mann-Whitney U test that `recent` tends to be larger than `baseline`.
+    Normal approximation with tie correction; adequate from about five samples per side.
+
+    Args:
+        baseline: Earlier durations
+        recent: Latest durations
+
+    Returns:
+        p-value
+    """
+    n1, n2 = len(recent), len(baseline)
+    pooled = sorted([(v, 0) for v in recent] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def step_stats(samples: Dict[str, List[tuple]], bucket: str = "day") -> List[dict]:
+    """
+    p50/p95/p99 per step and time bucket
+
+    Args:
+        samples: Output of RunHistory.step_samples()
+        bucket: "day", "week" or "run" (every run its own row)
+
+    Returns:
+        Rows with step, bucket, runs, p50, p95 and p99
+    """
+    formats = {"day": "%Y-%m-%d", "week": "%G-W%V", "run": "%Y-%m-%d %H:%M:%S"}
+    rows = []
+    for step, values in samples.items():
+        buckets: Dict[str, List[float]] = OrderedDict()
+        for started_at, duration in values:
+            buckets.setdefault(datetime.fromtimestamp(started_at).strftime(formats[bucket]), []).append(duration)
+        for label, durations in buckets.items():
+            rows.append({
+                "step": step,
+                "bucket": label,
+                "runs": len(durations),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "p99": percentile(durations, 99),
+            })
+    return rows
+
+
+def find_regressions(
+    samples: Dict[str, List[tuple]],
+    baseline: int = 30,
+    recent: int = 5,
+    alpha: float = 0.01,
+    min_slowdown: float = 0.1,
+) -> List[dict]:
+    """
+    Steps whose latest runs are significantly slower than the runs before them
+
+    Args:
+        samples: Output of RunHistory.step_samples()
+        baseline: Number of runs before the recent window used as the baseline
+        recent: Number of latest runs compared against the baseline
+        alpha: Significance level of the one-sided test
+        min_slowdown: Minimum relative increase of the median, filters out tiny but significant shifts
+
+    Returns:
+        One row per regressed step with the medians, slowdown and p-value
+    """
+    regressions = []
+    for step, values in samples.items():
+        durations = [duration for _, duration in values]
+        if len(durations) < recent + 5:
+            continue
+        latest = durations[-recent:]
+        reference = durations[-recent - baseline:-recent]
+        before, after = percentile(reference, 50), percentile(latest, 50)
+        slowdown = (after - before) / before if before else 0.0
+        p_value = mann_whitney_greater(reference, latest)
+        if p_value < alpha and slowdown >= min_slowdown:
+            regressions.append({
+                "step": step,
+                "baseline_p50": before,
+                "recent_p50": after,
+                "slowdown": slowdown,
+                "p_value": p_value,
+            })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Query the run history database")
+    parser.add_argument("--db", default=RUN_HISTORY_DB)
+    parser.add_argument("--kind", action="append", choices=RECORDED_KINDS, help="Span kinds, default: scenario")
+    parser.add_argument("--days", type=float, default=None, help="Only runs from the last N days")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats = sub.add_parser("stats", help="p50/p95/p99 per step over time")
+    stats.add_argument("--bucket", choices=("day", "week", "run"), default="day")
+    stats.add_argument("--step", action="append", default=[], help="Only these steps")
+
+    regressions = sub.add_parser("regressions", help="Steps slower than their rolling baseline; exits 1 if any")
+    regressions.add_argument("--baseline", type=int, default=30, help="Runs in the baseline window")
+    regressions.add_argument("--recent", type=int, default=5, help="Latest runs compared against the baseline")
+    regressions.add_argument("--alpha", type=float, default=0.01)
+    regressions.add_argument("--min-slowdown", type=float, default=0.1, help="Minimum relative median increase")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"No run history at {args.db}")
+        return 0
+    since = time.time() - args.days * 86400 if args.days else None
+    samples = RunHistory(args.db).step_samples(tuple(args.kind or ("scenario",)), since)
+
+    if args.command == "stats":
+        rows = [r for r in step_stats(samples, args.bucket) if not args.step or r["step"] in args.step]
+        width = max([len(r["step"]) for r in rows] + [4])
+        print(f"{'Step':<{width}}  {'Bucket':<19}  {'Runs':>4}  {'p50':>7}  {'p95':>7}  {'p99':>7}")
+        for r in rows:
+            print(f"{r['step']:<{width}}  {r['bucket']:<19}  {r['runs']:>4}  {r['p50']:>6.2f}s  {r['p95']:>6.2f}s  {r['p99']:>6.2f}s")
+        return 0
+
+    found = find_regressions(samples, args.baseline, args.recent, args.alpha, args.min_slowdown)
+    for r in found:
+        print(
+            f"❌ {r['step']}: p50 {r['baseline_p50']:.2f}s -> {r['recent_p50']:.2f}s "
+            f"(+{r['slowdown']:.0%}, p={r['p_value']:.4f})"
+        )
+    if not found:
+        print(f"✓ No step slower than its baseline in the last {args.recent} runs")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""
+Scenario expressed as a graph of named steps with restorable checkpoints.
+
+After a step runs, its browser state (URL, cookies, localStorage, sessionStorage and
+window context) can be saved. A later run can restore that checkpoint and execute
+only the downstream steps.
+"""
+import json
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+from config import PAGE_LOAD_TIMEOUT
+from utils.browser_wait import navigate
+from utils.step_budget import BudgetExceeded, RunBudget
+
+# Errors worth a retry: the page was slow or changed under the step, not wrong
+TRANSIENT_ERRORS = (TimeoutException, StaleElementReferenceException, WebDriverException)
+
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+_READ_STORAGE_JS = """
+    function dump(storage) {
+        var out = {};
+        for (var i = 0; i < storage.length; i++) { var k = storage.key(i); out[k] = storage.getItem(k); }
+        return out;
+    }
+    return {origin: window.location.origin, local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Injected before any page script on restore, so the page boots with the saved storage
+_WRITE_STORAGE_JS = """
+(function (origin, local, session) {
+    if (window.location.origin !== origin) { return; }
+    Object.keys(local).forEach(function (k) { window.localStorage.setItem(k, local[k]); });
+    Object.keys(session).forEach(function (k) { window.sessionStorage.setItem(k, session[k]); });
+})(%s, %s, %s);
+"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether a step error is worth a retry. Page objects re-raise failed waits as
+    AssertionError, so an assertion caused by a transient error counts as transient too.
+    """
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return isinstance(error, AssertionError) and isinstance(error.__context__, TRANSIENT_ERRORS)
+
+
+class ScenarioStep:
+    """A named step, its action and the step it depends on"""
+
+    def __init__(self, name: str, action: Callable, parent: Optional[str] = None):
+        """
+        Initialize scenario step
+
+        Args:
+            name: Unique step name
+            action: Callable(driver, screenshot_handler) that performs and verifies the step
+            parent: Name of the step that must run first
+        """
+        self.name = name
+        self.action = action
+        self.parent = parent
+
+
+class CheckpointStore:
+    """Saves and restores browser state per step name"""
+
+    def __init__(self, checkpoint_dir: str):
+        """
+        Initialize checkpoint store
+
+        Args:
+            checkpoint_dir: Directory holding one JSON file per checkpoint
+        """
+        self.checkpoint_dir = checkpoint_dir
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}.json")
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def capture(self, name: str, driver) -> dict:
+        """
+        Capture the current browser state without writing it
+
+        Args:
+            name: Checkpoint name
+            driver: Selenium WebDriver instance
+
+        Returns:
+            Checkpoint dict
+        """
+        storage = driver.execute_script(_READ_STORAGE_JS)
+        handles = driver.window_handles
+        checkpoint = {
+            "name": name,
+            "url": driver.current_url,
+            "cookies": driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"],
+            "origin": storage["origin"],
+            "local_storage": storage["local"],
+            "session_storage": storage["session"],
+            "window": {
+                "handle_count": len(handles),
+                "handle_index": handles.index(driver.current_window_handle),
+                "title": driver.title,
+            },
+        }
+        return checkpoint
+
+    def save(self, name: str, driver) -> dict:
+        """
+        Capture the current browser state and write it to the checkpoint directory
+
+        Args:
+            name: Checkpoint name
+            driver: Selenium WebDriver instance
+
+        Returns:
+            Checkpoint dict
+        """
+        checkpoint = self.capture(name, driver)
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        with open(self._path(name), "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2)
+        return checkpoint
+
+    def load(self, name: str) -> dict:
+        with open(self._path(name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def restore(self, name: str, driver) -> dict:
+        """
+        Recreate a saved checkpoint in the current window
+
+        Args:
+            name: Checkpoint name
+            driver: Selenium WebDriver instance
+
+        Returns:
+            Checkpoint dict
+        """
+        return self.apply(self.load(name), driver)
+
+    def apply(self, checkpoint: dict, driver) -> dict:
+        """
+        Recreate a checkpoint in the current window with a single navigation.
+        The saved window is always restored into the current window handle. Returns once the
+        restored document has been parsed, so the storage script has run and the next step
+        never sees the previous document.
+
+        Args:
+            checkpoint: Dict returned by capture(), save() or load()
+            driver: Selenium WebDriver instance
+
+        Returns:
+            Checkpoint dict
+        """
+        cookies = [
+            {key: cookie[key] for key in COOKIE_FIELDS if key in cookie and not (key == "expires" and cookie.get("session"))}
+            for cookie in checkpoint["cookies"]
+        ]
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        if cookies:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+        script = _WRITE_STORAGE_JS % (
+            json.dumps(checkpoint["origin"]),
+            json.dumps(checkpoint["local_storage"]),
+            json.dumps(checkpoint["session_storage"]),
+        )
+        identifier = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})["identifier"]
+        try:
+            navigate(driver, checkpoint["url"], PAGE_LOAD_TIMEOUT)
+        finally:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": identifier})
+        return checkpoint
+
+
+class ScenarioGraph:
+    """Named steps with parent links; runs any target from the root or from a checkpoint"""
+
+    def __init__(self, checkpoint_store: CheckpointStore):
+        """
+        Initialize scenario graph
+
+        Args:
+            checkpoint_store: Where checkpoints are saved and restored
+        """
+        self.checkpoints = checkpoint_store
+        self.steps: Dict[str, ScenarioStep] = {}
+        self._verified_upstream = set()
+
+    def add_step(self, name: str, action: Callable, parent: Optional[str] = None) -> "ScenarioGraph":
+        """
+        Register a step
+
+        Args:
+            name: Unique step name
+            action: Callable(driver, screenshot_handler)
+            parent: Name of a previously added step
+
+        Returns:
+            The graph, for chaining
+        """
+        if name in self.steps:
+            raise ValueError(f"Step '{name}' already exists")
+        if parent is not None and parent not in self.steps:
+            raise ValueError(f"Unknown parent step '{parent}'")
+        self.steps[name] = ScenarioStep(name, action, parent)
+        return self
+
+    def path_to(self, target: str) -> List[ScenarioStep]:
+        """
+        Steps from the root to target, inclusive
+
+        Args:
+            target: Step name
+
+        Returns:
+            Ordered list of steps
+        """
+        if target not in self.steps:
+            raise ValueError(f"Unknown step '{target}'")
+        path = []
+        name = target
+        while name is not None:
+            step = self.steps[name]
+            path.append(step)
+            name = step.parent
+        return list(reversed(path))
+
+    def run(
+        self,
+        driver,
+        screenshot_handler,
+        target: str,
+        start_from: Optional[str] = None,
+        save_checkpoints: bool = False,
+        verify_upstream_once: bool = True,
+        budget: Optional[RunBudget] = None,
+    ) -> List[str]:
+        """
+        Run every step up to target
+
+        Args:
+            driver: Selenium WebDriver instance
+            screenshot_handler: Screenshot handler passed to each step
+            target: Last step to run
+            start_from: Checkpoint to restore instead of running the steps up to and including it
+            save_checkpoints: Save a checkpoint after every executed step
+            verify_upstream_once: Run the upstream steps for real the first time a checkpoint
+                is used in this session, restore it afterwards
+            budget: Time budget; caps every wait and allows failed steps to be retried from
+                their parent's state. None runs each step once without a budget
+
+        Returns:
+            Names of the steps that were executed
+        """
+        path = self.path_to(target)
+        names = [step.name for step in path]
+        start_index = 0
+        precondition = None
+
+        if start_from is not None:
+            if start_from not in names:
+                raise ValueError(f"'{start_from}' is not upstream of '{target}'")
+            must_verify = verify_upstream_once and start_from not in self._verified_upstream
+            if self.checkpoints.exists(start_from) and not must_verify:
+                precondition = self.checkpoints.restore(start_from, driver)
+                start_index = names.index(start_from) + 1
+            else:
+                # Upstream steps run for real and refresh the checkpoint
+                save_checkpoints = True
+
+        executed = []
+        for step in path[start_index:]:
+            self._run_step(step, driver, screenshot_handler, budget, precondition)
+            executed.append(step.name)
+            if save_checkpoints:
+                precondition = self.checkpoints.save(step.name, driver)
+            elif budget is not None and budget.retries:
+                # Kept in memory only: the state the next step is retried from
+                precondition = self.checkpoints.capture(step.name, driver)
+            if step.name == start_from:
+                self._verified_upstream.add(start_from)
+        return executed
+
+    def _run_step(self, step: ScenarioStep, driver, screenshot_handler, budget: Optional[RunBudget],
+                  precondition: Optional[dict]):
+        """
+        Run one step; with a budget, retry it from its precondition while budget and retries remain.
+        Only transient errors are retried, a failed check fails the step at once.
+        """
+        if budget is None:
+            step.action(driver, screenshot_handler)
+            return
+        attempt = 0
+        while True:
+            try:
+                with budget.step(step.name):
+                    step.action(driver, screenshot_handler)
+                return
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                if budget.remaining() <= 0:
+                    raise BudgetExceeded(f"Run budget of {budget.total:.0f}s used up in step '{step.name}': {e}") from e
+                if attempt >= budget.retries:
+                    raise
+                delay = budget.backoff_delay(attempt)
+                attempt += 1
+                print(f"↻ Retrying step '{step.name}' ({attempt}/{budget.retries}) in {delay:.2f}s after: {type(e).__name__}: {e}")
+                time.sleep(delay)
+                if precondition is not None:
+                    self.checkpoints.apply(precondition, driver)
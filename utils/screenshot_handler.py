@@ -1,56 +1,318 @@
 """
 Utility module for taking screenshots on test failures
 """
+import atexit
+import base64
+import contextvars
+import hashlib
+import io
+import itertools
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from selenium import webdriver
+from selenium.webdriver.remote.command import Command
+
+import config
+from utils import visual_diff
+from utils.instrumentation import add_step_observer
+from utils.step_budget import untimed
+from utils.visual_diff import DELTA_EXTENSION, VisualBaselines, baseline_key
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, screenshots are then stored as raw PNG
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+# Files the retention budget applies to: full screenshots and deltas against a baseline
+STORED_EXTENSIONS = IMAGE_EXTENSIONS + (DELTA_EXTENSION,)
+
+
+def enforce_retention(directory: str, extensions: tuple, max_files: int, max_bytes: int) -> int:
+    """
+    Delete the oldest files in a directory until the file-count and disk budgets hold
+
+    Args:
+        directory: Directory to prune, subdirectories are left alone
+        extensions: Lower-case file extensions the budgets apply to
+        max_files: Most files kept
+        max_bytes: Most bytes kept
+
+    Returns:
+        Number of files deleted
+    """
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.lower().endswith(extensions):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    deleted = 0
+    while files and (len(files) > max_files or total > max_bytes):
+        _, size, path = files.pop(0)
+        try:
+            os.remove(path)
+            total -= size
+            deleted += 1
+        except OSError as e:
+            print(f"Failed to delete old file {path}: {e}")
+    return deleted
 
 
 class ScreenshotHandler:
     """Handler for taking screenshots when tests fail"""
-    
-    def __init__(self, screenshot_dir: str = "screenshots"):
+
+    def __init__(
+        self,
+        screenshot_dir: str = "screenshots",
+        image_format: str = "png",
+        quality: int = 80,
+        max_width: int = None,
+        max_files: int = 200,
+        max_bytes: int = 200 * 1024 * 1024,
+        async_writes: bool = True,
+        visual_baselines: Optional[VisualBaselines] = None,
+        baseline_refresh_hours: float = 24,
+    ):
         """
         Initialize screenshot handler
-        
+
         Args:
             screenshot_dir: Directory to save screenshots
+            image_format: "png", "jpeg" or "webp" (jpeg/webp and downscaling need Pillow)
+            quality: Encoder quality for jpeg/webp
+            max_width: Downscale wider captures to this width, None keeps full size
+            max_files: Retention budget, oldest screenshots beyond this count are deleted
+            max_bytes: Retention budget, oldest screenshots beyond this total size are deleted
+            async_writes: Encode and write on a background thread
+            visual_baselines: Store captures whose key has a baseline as the tiles that changed
+            baseline_refresh_hours: Age from which a passing step re-captures its unapproved baseline
         """
         self.screenshot_dir = screenshot_dir
+        self.image_format = image_format.lower() if Image else "png"
+        self.quality = quality
+        self.max_width = max_width if Image else None
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.async_writes = async_writes
+        self.visual_baselines = visual_baselines
+        self.baseline_refresh = timedelta(hours=baseline_refresh_hours)
+        # Step whose screen is showing: the last one that passed in this thread or asyncio task
+        self._screen_step = contextvars.ContextVar(f"screen_step_{id(self)}", default=None)
+        self._counter = itertools.count(1)
+        self._last_hash = None
+        self._last_path = ""
+        # The newest max_files paths; older files are removed by retention anyway
+        self.saved_paths = []
+        self.saved_count = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
         self._ensure_directory_exists()
-    
+
     def _ensure_directory_exists(self):
         """Create screenshot directory if it doesn't exist"""
-        if not os.path.exists(self.screenshot_dir):
-            os.makedirs(self.screenshot_dir)
-    
+        # Shards create their handlers concurrently
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+
+    def _next_filepath(self, test_name: str, delta: bool = False) -> str:
+        """Collision-free path: millisecond timestamp plus a per-handler sequence number"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        extension = "jpg" if self.image_format == "jpeg" else self.image_format
+        extension = DELTA_EXTENSION if delta else f".{extension}"
+        filename = f"{test_name}_{timestamp}_{next(self._counter):04d}_{os.getpid()}{extension}"
+        return os.path.join(self.screenshot_dir, filename)
+
     def take_screenshot(self, driver: webdriver, test_name: str = "test") -> str:
         """
-        Take a screenshot and save it with timestamp
-        
+        Take a screenshot and save it with timestamp.
+        Only the capture happens on the calling thread, encoding and writing are queued.
+
         Args:
             driver: Selenium WebDriver instance
             test_name: Name of the test for filename
-            
+
         Returns:
-            Path to the saved screenshot
+            Path the screenshot is (or will be) saved to
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{test_name}_{timestamp}.png"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        
         try:
             # Check if driver is still valid
             if driver is None:
                 print("Driver is None, cannot take screenshot")
                 return ""
-            
-            # Try to take screenshot with timeout
-            driver.save_screenshot(filepath)
-            print(f"Screenshot saved: {filepath}")
-            return filepath
+
+            png = driver.get_screenshot_as_png()
         except Exception as e:
             # Don't raise exception, just log it
             print(f"Failed to take screenshot: {e}")
             return ""
+        return self.save_png(png, test_name)
+
+    def save_png(self, png: bytes, test_name: str = "test") -> str:
+        """
+        Queue an already captured PNG, e.g. one taken over the DevTools protocol
+
+        Args:
+            png: PNG bytes
+            test_name: Name of the test for filename
+
+        Returns:
+            Path the screenshot is (or will be) saved to
+        """
+        digest = hashlib.sha1(png).digest()
+        key = self._screen_step.get() or baseline_key(test_name)
+        delta = self.visual_baselines is not None and self.visual_baselines.has(key)
+        with self._lock:
+            if digest == self._last_hash:
+                # Several handlers of one failure (element_not_found, click_failed, test_failure) capture the
+                # same frame: the earlier file stands for this name too and is listed again for paths_since
+                print(f"Screenshot for {test_name} unchanged, reusing: {self._last_path}")
+                self._remember(self._last_path)
+                return self._last_path
+            filepath = self._next_filepath(test_name, delta)
+            self._last_hash, self._last_path = digest, filepath
+            self._remember(filepath)
+
+        if self.async_writes:
+            self._ensure_writer()
+            self._queue.put((png, filepath, key))
+        else:
+            self._write(png, filepath, key)
+        return filepath
+
+    def _remember(self, filepath: str):
+        """Append to saved_paths under self._lock"""
+        self.saved_paths.append(filepath)
+        self.saved_count += 1
+        if len(self.saved_paths) > self.max_files:
+            del self.saved_paths[0]
+
+    def watch_steps(self, driver: webdriver):
+        """
+        Seed the baseline of every page-object step that passes on this driver, and refresh
+        an unapproved one older than baseline_refresh_hours. Later failure screenshots are
+        compared with the baseline of the last passing step. Safe to call more than once per driver.
+
+        Args:
+            driver: Selenium WebDriver instance
+        """
+        if self.visual_baselines is None:
+            return
+        watched = getattr(driver, "_baseline_handlers", None)
+        if watched is None:
+            watched = driver._baseline_handlers = set()
+        if id(self) in watched:
+            return
+        watched.add(id(self))
+        add_step_observer(driver, lambda step_name, error: self._on_step(driver, step_name, error))
+
+    def _on_step(self, driver: webdriver, step_name: str, error):
+        if error is not None:
+            return
+        self._screen_step.set(step_name)
+        entry = self.visual_baselines.get(step_name)
+        if entry is not None and (entry["approved"] or self._fresh(entry)):
+            return
+        with untimed():
+            try:
+                # Bypass the command counter so seeding does not show up in the step's command count
+                execute = getattr(driver, "_uninstrumented_execute", driver.execute)
+                png = base64.b64decode(execute(Command.SCREENSHOT)["value"])
+                self.visual_baselines.set(step_name, png, approved=False)
+            except Exception as e:
+                print(f"Failed to seed the baseline of '{step_name}': {e}")
+                return
+        print(f"Baseline of '{step_name}' {'refreshed' if entry else 'seeded'} from a passing step")
+
+    def _fresh(self, entry: dict) -> bool:
+        return datetime.now(timezone.utc) - datetime.fromisoformat(entry["updated_at"]) < self.baseline_refresh
+
+    def paths_since(self, count: int) -> list:
+        """
+        Paths saved since saved_count was count, as far as saved_paths still holds them
+
+        Args:
+            count: Earlier value of saved_count
+
+        Returns:
+            Paths, oldest first
+        """
+        with self._lock:
+            return self.saved_paths[max(0, len(self.saved_paths) - (self.saved_count - count)):]
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._drain, name="screenshot-writer", daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    def _drain(self):
+        while True:
+            png, filepath, key = self._queue.get()
+            try:
+                self._write(png, filepath, key)
+            finally:
+                self._queue.task_done()
+
+    def _encode(self, png: bytes) -> bytes:
+        if Image is None or (self.image_format == "png" and not self.max_width):
+            return png
+        image = Image.open(io.BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.BILINEAR)
+        if self.image_format == "jpeg":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        options = {"optimize": True} if self.image_format == "png" else {"quality": self.quality}
+        image.save(buffer, format=self.image_format.upper(), **options)
+        return buffer.getvalue()
+
+    def _write(self, png: bytes, filepath: str, key: Optional[str] = None):
+        try:
+            if filepath.endswith(DELTA_EXTENSION):
+                meta = self.visual_baselines.write_delta(filepath, key, png)
+                print(f"Screenshot saved: {filepath} ({meta['changed_tiles']}/{meta['total_tiles']} tiles differ from the baseline)")
+            else:
+                data = self._encode(png)
+                tmp_path = filepath + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, filepath)
+                print(f"Screenshot saved: {filepath}")
+            self._enforce_retention()
+        except Exception as e:
+            print(f"Failed to save screenshot {filepath}: {e}")
+
+    def _enforce_retention(self):
+        """Delete the oldest screenshots until the file-count and disk budgets hold"""
+        enforce_retention(self.screenshot_dir, STORED_EXTENSIONS, self.max_files, self.max_bytes)
+        if self.visual_baselines is not None:
+            deltas = [entry.stat().st_mtime for entry in os.scandir(self.screenshot_dir)
+                      if entry.is_file() and entry.name.endswith(DELTA_EXTENSION)]
+            self.visual_baselines.prune(min(deltas) if deltas else None)
+
+    @classmethod
+    def from_config(cls) -> "ScreenshotHandler":
+        """Build a handler from the SCREENSHOT_* settings in config.py"""
+        return cls(
+            config.SCREENSHOT_DIR,
+            image_format=config.SCREENSHOT_FORMAT,
+            max_width=config.SCREENSHOT_MAX_WIDTH,
+            max_files=config.SCREENSHOT_MAX_FILES,
+            max_bytes=config.SCREENSHOT_MAX_BYTES,
+            visual_baselines=VisualBaselines(config.VISUAL_BASELINE_DIR)
+            if config.VISUAL_BASELINES and visual_diff.available() else None,
+            baseline_refresh_hours=config.VISUAL_BASELINE_REFRESH_HOURS,
+        )
 
+    def flush(self):
+        """Block until every queued screenshot has been written"""
+        if self._writer is not None:
+            self._queue.join()
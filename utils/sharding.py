@@ -0,0 +1,456 @@
+"""
+Sharded runs across remote WebDriver endpoints: Selenium Grid nodes, or a local
+stand-in of chromedriver processes / standalone-chrome containers on one box.
+
+Scenarios and filter pairs are weighted by the median of their steps' past
+durations (.cache/step_timings.json) and queued longest-first. Every endpoint runs
+one webdriver.Remote session that pulls the next task from the shared queue as soon
+as it is free, so a task that runs longer than its history says does not hold the
+others back. A task whose session dies (the endpoint refuses the session or goes
+away mid-run) goes back on the queue for a healthy endpoint. Results, step timings
+and screenshots of every shard are merged into reports/shards.json and reports/junit.xml:
+
+    GRID_ENDPOINTS=http://node1:4444,http://node2:4444 python -m utils.sharding --repeat 4
+"""
+import argparse
+import heapq
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import urllib3
+from selenium.common.exceptions import InvalidSessionIdException
+
+from config import GRID_ENDPOINTS, PREFLIGHT, REPORT_DIR, WRITE_CHROME_TRACE
+from pages.job_listing_page import JobListingPage
+from scenarios.hiring_flow import STEP_NAMES, run_hiring_flow
+from utils.driver_factory import create_remote_driver
+from utils.instrumentation import get_instrumentation
+from utils.preflight import run_preflight
+from utils.run_history import record_run, run_spans
+from utils.screenshot_handler import ScreenshotHandler
+from utils.step_budget import StepTimingHistory, get_step_history
+
+# Timing history key of one filter pair check
+FILTER_PAIR_STEP = "filter_pair"
+# Weight of a step that has never passed, when no step has history either
+DEFAULT_STEP_WEIGHT = 1.0
+# Times a task goes back on the queue after its session died before it is reported as an error
+MAX_REQUEUES = 2
+# Errors that mean the session or its endpoint is gone, not that the task failed
+SESSION_ERRORS = (InvalidSessionIdException, ConnectionError, urllib3.exceptions.HTTPError)
+
+
+class ShardTask:
+    """One unit of work placed on a shard: a scenario run or a filter pair check"""
+
+    def __init__(self, name: str, run: Callable, steps: Sequence[str]):
+        """
+        Args:
+            name: Unique task name, used as the run and test case name
+            run: Callable(driver, screenshot_handler), raises on failure
+            steps: Step names whose historical durations make up the task's weight
+        """
+        self.name = name
+        self.run = run
+        self.steps = tuple(steps)
+
+
+def hiring_flow_task(name: str, **kwargs) -> ShardTask:
+    """The full hiring flow as a shard task; kwargs go to run_hiring_flow"""
+    return ShardTask(name, lambda driver, screenshot_handler: run_hiring_flow(driver, screenshot_handler, **kwargs), STEP_NAMES)
+
+
+def filter_pair_task(location: str, team: str, require_postings: bool = False) -> ShardTask:
+    """One location/team pair of the filter matrix as a shard task; require_postings fails an empty board"""
+
+    def run(driver, screenshot_handler):
+        started = time.perf_counter()
+        row = JobListingPage(driver, screenshot_handler).check_filter_matrix(
+            [(location, team)], tabs=1, require_postings=require_postings
+        )[0]
+        if row["error"] or row["violations"]:
+            raise AssertionError(f"{location} / {team}: {row['error'] or row['details']}")
+        get_step_history().record(FILTER_PAIR_STEP, time.perf_counter() - started)
+
+    return ShardTask(f"filter_pair[{location} / {team}]", run, (FILTER_PAIR_STEP,))
+
+
+def estimate_weights(tasks: Sequence[ShardTask], history: StepTimingHistory) -> Dict[str, float]:
+    """
+    Expected seconds per task: the sum of its steps' median past durations.
+    Steps without history count as the median of the steps that have one.
+
+    Args:
+        tasks: Tasks to weigh
+        history: Step timing history
+
+    Returns:
+        Mapping of task name to weight
+    """
+    medians = {step: history.median(step) for task in tasks for step in task.steps}
+    known = [median for median in medians.values() if median is not None]
+    fallback = statistics.median(known) if known else DEFAULT_STEP_WEIGHT
+    return {
+        task.name: sum(medians[step] if medians[step] is not None else fallback for step in task.steps)
+        for task in tasks
+    }
+
+
+def balance(tasks: Sequence[ShardTask], weights: Dict[str, float], shards: int) -> List[List[ShardTask]]:
+    """
+    Longest-processing-time-first placement: heaviest task onto the least loaded shard.
+    This is the plan the shared queue of run_shards follows while tasks take as long
+    as their history says; used for --plan.
+
+    Args:
+        tasks: Tasks to place
+        weights: Expected seconds per task name
+        shards: Number of shards
+
+    Returns:
+        One task list per shard, heaviest first; shards may be empty when tasks are few
+    """
+    if shards < 1:
+        raise ValueError("At least one shard is needed")
+    placed: List[List[ShardTask]] = [[] for _ in range(shards)]
+    loads = [(0.0, index) for index in range(shards)]
+    for task in sorted(tasks, key=lambda t: (-weights[t.name], t.name)):
+        load, index = heapq.heappop(loads)
+        placed[index].append(task)
+        heapq.heappush(loads, (load + weights[task.name], index))
+    return placed
+
+
+class ShardReport:
+    """Merged outcome of every shard"""
+
+    def __init__(self, shards: List[dict], wall_time: float):
+        self.shards = shards
+        self.wall_time = wall_time
+
+    @property
+    def results(self) -> List[dict]:
+        return [result for shard in self.shards for result in shard["results"]]
+
+    @property
+    def passed(self) -> bool:
+        return all(result["passed"] for result in self.results)
+
+    @property
+    def serial_time(self) -> float:
+        """Sum of task durations, the wall time the run would take on a single session"""
+        return sum(result["duration"] for result in self.results)
+
+    def to_dict(self) -> dict:
+        # Shards that never held a session would make the others look imbalanced
+        durations = [shard["duration"] for shard in self.shards
+                     if any(not result["session_error"] for result in shard["results"])]
+        return {
+            "passed": self.passed,
+            "wall_time": round(self.wall_time, 3),
+            "serial_time": round(self.serial_time, 3),
+            "speedup": round(self.serial_time / self.wall_time, 2) if self.wall_time else None,
+            "imbalance": round(max(durations) / statistics.mean(durations), 2) if durations and statistics.mean(durations) else None,
+            "shards": self.shards,
+        }
+
+    def to_junit(self) -> ET.ElementTree:
+        """JUnit XML with one testsuite per shard and one testcase per task"""
+        results = self.results
+        root = ET.Element("testsuites", {
+            "name": "sharded",
+            "tests": str(len(results)),
+            "failures": str(sum(1 for r in results if not r["passed"] and not r["session_error"])),
+            "errors": str(sum(1 for r in results if r["session_error"])),
+            "time": f"{self.wall_time:.3f}",
+        })
+        for shard in self.shards:
+            shard_results = shard["results"]
+            suite = ET.SubElement(root, "testsuite", {
+                "name": f"shard-{shard['index']}",
+                "hostname": shard["endpoint"],
+                "tests": str(len(shard_results)),
+                "failures": str(sum(1 for r in shard_results if not r["passed"] and not r["session_error"])),
+                "errors": str(sum(1 for r in shard_results if r["session_error"])),
+                "time": f"{shard['duration']:.3f}",
+            })
+            if shard["session_error"]:
+                ET.SubElement(suite, "system-err").text = shard["session_error"]
+            for result in shard_results:
+                case = ET.SubElement(suite, "testcase", {
+                    "classname": f"shard-{shard['index']}",
+                    "name": result["name"],
+                    "time": f"{result['duration']:.3f}",
+                })
+                if result["error"]:
+                    tag = "error" if result["session_error"] else "failure"
+                    message = result["error"].strip().splitlines()[-1]
+                    ET.SubElement(case, tag, {"message": message}).text = result["error"]
+                if result["artifacts"]:
+                    # Attachment lines are picked up by the Jenkins/GitLab JUnit attachment support
+                    ET.SubElement(case, "system-out").text = "\n".join(f"[[ATTACHMENT|{path}]]" for path in result["artifacts"])
+        ET.indent(root)
+        return ET.ElementTree(root)
+
+    def write(self, report_dir: str = REPORT_DIR) -> List[str]:
+        """Write shards.json and junit.xml, returns their paths"""
+        os.makedirs(report_dir, exist_ok=True)
+        json_path = os.path.join(report_dir, "shards.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        junit_path = os.path.join(report_dir, "junit.xml")
+        self.to_junit().write(junit_path, encoding="utf-8", xml_declaration=True)
+        return [json_path, junit_path]
+
+    def format(self) -> str:
+        lines = []
+        for shard in self.shards:
+            lines.append(
+                f"shard-{shard['index']} {shard['endpoint']}: {len(shard['results'])} task(s), "
+                f"estimated {shard['estimate']:.1f}s, took {shard['duration']:.1f}s"
+            )
+            if shard["session_error"]:
+                lines.append(f"  session lost: {shard['session_error'].strip().splitlines()[-1]}")
+            for result in shard["results"]:
+                status = "✓" if result["passed"] else "❌"
+                requeued = f", requeued {result['requeues']}x" if result["requeues"] else ""
+                lines.append(f"  {status} {result['name']} ({result['duration']:.1f}s{requeued})")
+        summary = self.to_dict()
+        lines.append(
+            f"\nWall time {self.wall_time:.1f}s for {self.serial_time:.1f}s of work "
+            f"(speedup {summary['speedup']}x, imbalance {summary['imbalance']})"
+        )
+        return "\n".join(lines)
+
+
+def is_session_error(error: BaseException) -> bool:
+    """True when the error, or the error it was raised while handling, means the session is gone"""
+    while error is not None:
+        if isinstance(error, SESSION_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class _TaskQueue:
+    """Tasks heaviest-first, shared by every shard; holds back idle shards while a task may be requeued"""
+
+    def __init__(self, tasks: Sequence[ShardTask], weights: Dict[str, float]):
+        self.weights = weights
+        self.pending = sorted(tasks, key=lambda t: (-weights[t.name], t.name))
+        self.requeues: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+        self._running = 0
+        self._condition = threading.Condition()
+
+    def take(self) -> Optional[ShardTask]:
+        """Next task, or None once the queue is empty and no running task can come back"""
+        with self._condition:
+            while not self.pending and self._running:
+                self._condition.wait()
+            if not self.pending:
+                return None
+            self._running += 1
+            return self.pending.pop(0)
+
+    def done(self, task: ShardTask):
+        with self._condition:
+            self._running -= 1
+            self._condition.notify_all()
+
+    def requeue(self, task: ShardTask, error: str) -> bool:
+        """Put a task whose session died back in weight order; False once it used up its requeues"""
+        with self._condition:
+            self._running -= 1
+            self.errors[task.name] = error
+            self.requeues[task.name] = self.requeues.get(task.name, 0) + 1
+            requeued = self.requeues[task.name] <= MAX_REQUEUES
+            if requeued:
+                self.pending.append(task)
+                self.pending.sort(key=lambda t: (-self.weights[t.name], t.name))
+            self._condition.notify_all()
+            return requeued
+
+    def drain(self) -> List[ShardTask]:
+        with self._condition:
+            pending, self.pending = self.pending, []
+            return pending
+
+
+def _session_error_result(task: ShardTask, error: str, weight: float, requeues: int) -> dict:
+    return {"name": task.name, "passed": False, "duration": 0.0, "error": error, "session_error": True,
+            "artifacts": [], "steps": [], "estimate": round(weight, 3), "requeues": requeues}
+
+
+def _run_task(task: ShardTask, driver, screenshot_handler: ScreenshotHandler) -> dict:
+    start = time.perf_counter()
+    first_artifact = screenshot_handler.saved_count
+    try:
+        task.run(driver, screenshot_handler)
+        error = None
+    except Exception as e:
+        if is_session_error(e):
+            # Nothing to screenshot or record, the task goes back on the queue
+            return {"name": task.name, "passed": False, "duration": time.perf_counter() - start,
+                    "error": traceback.format_exc(), "session_error": True}
+        screenshot_handler.take_screenshot(driver, f"failed_{task.name}")
+        error = traceback.format_exc()
+    end = time.perf_counter()
+    artifacts = list(dict.fromkeys(screenshot_handler.paths_since(first_artifact)))
+    record_run(task.name, error is None, start, driver, artifacts, error, threading.get_ident(), until=end)
+    return {
+        "name": task.name,
+        "passed": error is None,
+        "duration": end - start,
+        "error": error,
+        "session_error": False,
+        "artifacts": artifacts,
+        "steps": [
+            {"name": span["name"], "duration": round(span["duration"], 3)}
+            for span in run_spans(get_instrumentation(), start, end, threading.get_ident())
+        ],
+    }
+
+
+def _run_shard(
+    index: int,
+    endpoint: str,
+    queue: _TaskQueue,
+    factory: Callable,
+    screenshot_handler_factory: Callable[[], ScreenshotHandler],
+) -> dict:
+    started = time.perf_counter()
+    shard = {"index": index, "endpoint": endpoint, "estimate": 0.0, "results": [], "session_error": None}
+    try:
+        driver = factory(endpoint)
+    except Exception:
+        shard["session_error"] = traceback.format_exc()
+        print(f"❌ No session on {endpoint}: {shard['session_error'].strip().splitlines()[-1]}")
+        shard["duration"] = time.perf_counter() - started
+        return shard
+
+    screenshot_handler = screenshot_handler_factory()
+    try:
+        while True:
+            task = queue.take()
+            if task is None:
+                break
+            result = _run_task(task, driver, screenshot_handler)
+            if result["session_error"]:
+                shard["session_error"] = result["error"]
+                where = "back on the queue" if queue.requeue(task, result["error"]) else "out of retries"
+                print(f"❌ Session on {endpoint} died during {task.name}, {where}")
+                break
+            result["estimate"] = round(queue.weights[task.name], 3)
+            result["requeues"] = queue.requeues.get(task.name, 0)
+            shard["estimate"] += queue.weights[task.name]
+            shard["results"].append(result)
+            queue.done(task)
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        screenshot_handler.flush()
+    shard["duration"] = time.perf_counter() - started
+    return shard
+
+
+def run_shards(
+    tasks: Sequence[ShardTask],
+    endpoints: Sequence[str],
+    factory: Callable = create_remote_driver,
+    history: Optional[StepTimingHistory] = None,
+    screenshot_handler_factory: Callable[[], ScreenshotHandler] = ScreenshotHandler.from_config,
+) -> ShardReport:
+    """
+    Run the tasks heaviest-first from one queue shared by a session per endpoint
+
+    Args:
+        tasks: Tasks with unique names
+        endpoints: WebDriver endpoint URLs; list one twice to run two sessions on it
+        factory: Callable(endpoint) that starts a configured driver
+        history: Step timing history to weigh the tasks by, defaults to the process-wide one
+        screenshot_handler_factory: Builds each shard's screenshot handler
+
+    Returns:
+        Merged report of every shard. Tasks no session could run are reported as
+        session errors on a shard that lost its session.
+    """
+    if len({task.name for task in tasks}) != len(tasks):
+        raise ValueError("Shard task names must be unique")
+    history = history or get_step_history()
+    queue = _TaskQueue(tasks, estimate_weights(tasks, history))
+    workers = list(enumerate(endpoints[:len(tasks)]))
+
+    start = time.perf_counter()
+    # The browsers run on the endpoints; a thread per shard is enough to keep them all busy
+    with ThreadPoolExecutor(max_workers=len(workers) or 1) as executor:
+        shards = list(executor.map(
+            lambda item: _run_shard(*item, queue, factory, screenshot_handler_factory), workers
+        ))
+    leftover = queue.drain() + [task for task in tasks if queue.requeues.get(task.name, 0) > MAX_REQUEUES]
+    if leftover:
+        failed = [shard for shard in shards if shard["session_error"]][-1]
+        failed["results"] += [
+            _session_error_result(task, queue.errors.get(task.name, failed["session_error"]),
+                                  queue.weights[task.name], queue.requeues.get(task.name, 0))
+            for task in leftover
+        ]
+    history.save()
+    return ShardReport(shards, time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run scenarios sharded over remote WebDriver endpoints")
+    parser.add_argument("--endpoint", action="append", help="WebDriver endpoint URL, repeatable (default: GRID_ENDPOINTS)")
+    parser.add_argument("--repeat", type=int, default=1, help="Copies of the hiring flow")
+    parser.add_argument("--location", action="append", help="Filter pair location, repeatable")
+    parser.add_argument("--team", action="append", help="Filter pair team, repeatable")
+    parser.add_argument("--require-postings", action="store_true", help="Fail filter pairs without postings")
+    parser.add_argument("--plan", action="store_true", help="Print the shard plan without starting browsers")
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoint or GRID_ENDPOINTS
+    if not endpoints:
+        parser.error("no endpoints: pass --endpoint or set GRID_ENDPOINTS")
+    tasks = [hiring_flow_task(f"hiring_flow_{i + 1}") for i in range(args.repeat)]
+    if args.location or args.team:
+        locations = args.location or ["Istanbul, Turkiye"]
+        teams = args.team or ["Quality Assurance"]
+        tasks += [filter_pair_task(location, team, args.require_postings)
+                  for location in dict.fromkeys(locations) for team in dict.fromkeys(teams)]
+
+    if args.plan:
+        weights = estimate_weights(tasks, get_step_history())
+        for endpoint, share in zip(endpoints, balance(tasks, weights, len(endpoints))):
+            print(f"{endpoint}: {sum(weights[t.name] for t in share):.1f}s estimated")
+            for task in share:
+                print(f"  {task.name} ({weights[task.name]:.1f}s)")
+        return 0
+
+    if PREFLIGHT:
+        preflight = run_preflight()
+        print(preflight.format())
+        if not preflight.passed:
+            print("\n❌ Preflight failed, not starting browsers")
+            return 1
+
+    report = run_shards(tasks, endpoints)
+    print(report.format())
+    for path in report.write(REPORT_DIR):
+        print(f"Report written: {path}")
+    get_instrumentation().write_reports(REPORT_DIR, chrome_trace=WRITE_CHROME_TRACE)
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
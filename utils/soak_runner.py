@@ -0,0 +1,345 @@
+"""
+Soak mode: repeat a scenario on a schedule for hours or days on one browser,
+recycling the browser before it grows without bound.
+
+After every iteration the runner samples JS heap, DOM and document counts through
+CDP Performance.getMetrics, the RSS of the browser process tree and the open window
+handles, then closes orphaned windows (the Lever link opens a new window each run)
+and resets the session. Once RSS, heap or window-handle thresholds are crossed, the
+driver is quit and replaced. One JSON line per iteration goes to
+reports/soak.jsonl:
+
+    python -m utils.soak_runner --hours 24 --interval 60
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from config import (
+    REPORT_DIR,
+    SOAK_INTERVAL,
+    SOAK_MAX_HANDLES,
+    SOAK_MAX_HEAP_MB,
+    SOAK_MAX_RSS_MB,
+    SOAK_RECYCLE_AFTER,
+)
+from utils.driver_factory import create_chrome_driver
+from utils.driver_pool import DriverPool
+from utils.instrumentation import get_instrumentation
+from utils.run_history import get_run_history, record_run
+from utils.screenshot_handler import ScreenshotHandler
+from utils.web_vitals import detach_web_vitals
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, RSS is then read from /proc where available
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def _proc_tree_rss(root_pid: int) -> Dict[int, tuple]:
+    """{pid: (rss_bytes, cmdline)} of root_pid and its descendants, read from /proc"""
+    parents, info = {}, {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", encoding="utf-8") as f:
+                # The command name may contain spaces, fields after it are fixed
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            continue
+        parents[int(name)] = int(fields[1])
+        info[int(name)] = (int(fields[21]) * os.sysconf("SC_PAGE_SIZE"), cmdline)
+    tree, frontier = {}, [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        if pid in info:
+            tree[pid] = info[pid]
+        frontier.extend(child for child, parent in parents.items() if parent == pid)
+    return tree
+
+
+def process_tree_memory(root_pid: Optional[int]) -> dict:
+    """
+    RSS of the browser process tree in MB: total and the largest renderer
+
+    Args:
+        root_pid: chromedriver (or browser) process id
+
+    Returns:
+        {"rss_mb", "max_renderer_rss_mb", "processes"}, values None when unavailable
+    """
+    empty = {"rss_mb": None, "max_renderer_rss_mb": None, "processes": None}
+    if root_pid is None:
+        return empty
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+            tree = {}
+            for process in processes:
+                try:
+                    tree[process.pid] = (process.memory_info().rss, " ".join(process.cmdline()))
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except psutil.NoSuchProcess:
+            return empty
+    elif os.path.isdir("/proc"):
+        tree = _proc_tree_rss(root_pid)
+    else:
+        return empty
+    renderers = [rss for rss, cmdline in tree.values() if "--type=renderer" in cmdline]
+    return {
+        "rss_mb": round(sum(rss for rss, _ in tree.values()) / MB, 1),
+        "max_renderer_rss_mb": round(max(renderers) / MB, 1) if renderers else None,
+        "processes": len(tree),
+    }
+
+
+def sample_browser(driver) -> dict:
+    """
+    Memory and handle sample of a live session
+
+    Args:
+        driver: Chrome WebDriver instance
+
+    Returns:
+        handles, js_heap_mb, js_heap_total_mb, dom_nodes, documents, event_listeners,
+        rss_mb, max_renderer_rss_mb and processes
+    """
+    sample = {"handles": len(driver.window_handles)}
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        sample.update(
+            js_heap_mb=round(metrics.get("JSHeapUsedSize", 0) / MB, 1),
+            js_heap_total_mb=round(metrics.get("JSHeapTotalSize", 0) / MB, 1),
+            dom_nodes=int(metrics.get("Nodes", 0)),
+            documents=int(metrics.get("Documents", 0)),
+            event_listeners=int(metrics.get("JSEventListeners", 0)),
+        )
+    except Exception as e:
+        print(f"Performance.getMetrics failed: {e}")
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    sample.update(process_tree_memory(process.pid if process else None))
+    return sample
+
+
+def recycle_reasons(
+    sample: dict,
+    runs_on_driver: int,
+    max_rss_mb: float = SOAK_MAX_RSS_MB,
+    max_heap_mb: float = SOAK_MAX_HEAP_MB,
+    max_handles: int = SOAK_MAX_HANDLES,
+    recycle_after: int = SOAK_RECYCLE_AFTER,
+) -> list:
+    """
+    Thresholds the sample crosses; an empty list keeps the driver
+
+    Args:
+        sample: sample_browser() output at the end of an iteration
+        runs_on_driver: Iterations run on the current driver
+        max_rss_mb: Browser process tree RSS limit
+        max_heap_mb: JS heap limit of the current page
+        max_handles: Window handles open at the end of an iteration
+        recycle_after: Recycle after this many iterations regardless, 0 disables
+
+    Returns:
+        Human-readable reasons
+    """
+    reasons = []
+    if sample.get("rss_mb") is not None and sample["rss_mb"] > max_rss_mb:
+        reasons.append(f"rss {sample['rss_mb']:.0f}MB > {max_rss_mb:.0f}MB")
+    if sample.get("js_heap_mb") is not None and sample["js_heap_mb"] > max_heap_mb:
+        reasons.append(f"js heap {sample['js_heap_mb']:.0f}MB > {max_heap_mb:.0f}MB")
+    if sample["handles"] > max_handles:
+        reasons.append(f"{sample['handles']} window handles > {max_handles}")
+    if recycle_after and runs_on_driver >= recycle_after:
+        reasons.append(f"{runs_on_driver} runs on this driver")
+    return reasons
+
+
+class SoakRunner:
+    """Repeats a scenario on one browser, resetting and recycling it as it ages"""
+
+    def __init__(
+        self,
+        scenario: Callable,
+        factory: Callable = create_chrome_driver,
+        screenshot_handler: Optional[ScreenshotHandler] = None,
+        interval: float = SOAK_INTERVAL,
+        thresholds: Optional[dict] = None,
+        report_path: Optional[str] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize soak runner
+
+        Args:
+            scenario: Callable(driver, screenshot_handler) run each iteration
+            factory: Creates a new, configured driver
+            screenshot_handler: Screenshot handler for failures
+            interval: Seconds between iteration starts; a slow iteration starts the next one at once
+            thresholds: Overrides for recycle_reasons() keyword arguments
+            report_path: JSON-lines file, one record per iteration
+            sleep: Sleep function, replaceable in tests
+        """
+        self.scenario = scenario
+        self.factory = factory
+        self.screenshot_handler = screenshot_handler or ScreenshotHandler()
+        self.interval = interval
+        self.thresholds = thresholds or {}
+        self.report_path = report_path
+        self.sleep = sleep
+        self.driver = None
+        self.runs_on_driver = 0
+        self.recycles = 0
+
+    def _retire_driver(self):
+        # The web vitals report would otherwise keep every recycled driver and its pages
+        detach_web_vitals(self.driver)
+        DriverPool._quit(self.driver)
+
+    def _recycle(self):
+        if self.driver is not None:
+            self._retire_driver()
+        self.driver = self.factory()
+        self.runs_on_driver = 0
+
+    def run_once(self, iteration: int) -> dict:
+        """
+        Run one iteration, clean up, sample and recycle if needed
+
+        Args:
+            iteration: Iteration number, used in names
+
+        Returns:
+            Iteration record as written to the report
+        """
+        if self.driver is None:
+            self._recycle()
+        name = f"soak_{iteration}"
+        start = time.perf_counter()
+        try:
+            self.scenario(self.driver, self.screenshot_handler)
+            error = None
+        except Exception:
+            self.screenshot_handler.take_screenshot(self.driver, f"failed_{name}")
+            error = traceback.format_exc()
+        duration = time.perf_counter() - start
+        record_run(name, error is None, start, self.driver, error=error)
+        # Earlier iterations are in the run history; only the latest stays in memory
+        get_instrumentation().discard_before(start)
+        self.runs_on_driver += 1
+
+        try:
+            # Sampled before the reset: the blank page left afterwards would hide the heap the run built up
+            sample = sample_browser(self.driver)
+            DriverPool.reset(self.driver)
+            reasons = recycle_reasons(sample, self.runs_on_driver, **self.thresholds)
+        except Exception as e:
+            sample, reasons = {"handles": None}, [f"session unusable: {type(e).__name__}: {e}"]
+        if reasons:
+            print(f"♻ Recycling browser after {name}: {', '.join(reasons)}")
+            self._recycle()
+            self.recycles += 1
+
+        record = dict(
+            sample,
+            iteration=iteration,
+            time=time.time(),
+            passed=error is None,
+            duration=round(duration, 3),
+            orphans_closed=max(0, (sample["handles"] or 1) - 1),
+            recycled=reasons,
+        )
+        if self.report_path:
+            with open(self.report_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        return record
+
+    def run(self, iterations: Optional[int] = None, duration: Optional[float] = None) -> int:
+        """
+        Iterate until the iteration count or the duration runs out, whichever comes first
+
+        Args:
+            iterations: Maximum number of iterations, None for unlimited
+            duration: Maximum wall time in seconds, None for unlimited
+
+        Returns:
+            Number of failed iterations
+        """
+        started = time.monotonic()
+        failures = 0
+        iteration = 0
+        try:
+            while iterations is None or iteration < iterations:
+                if duration is not None and time.monotonic() - started >= duration:
+                    break
+                iteration += 1
+                began = time.monotonic()
+                record = self.run_once(iteration)
+                failures += 0 if record["passed"] else 1
+                status = "✓" if record["passed"] else "❌"
+                print(
+                    f"{status} {iteration}: {record['duration']:.1f}s, rss {record.get('rss_mb')}MB, "
+                    f"heap {record.get('js_heap_mb')}MB, handles {record['handles']}"
+                )
+                if iterations is None or iteration < iterations:
+                    self.sleep(max(0.0, self.interval - (time.monotonic() - began)))
+        finally:
+            if self.driver is not None:
+                self._retire_driver()
+                self.driver = None
+            self.screenshot_handler.flush()
+            history = get_run_history()
+            if history is not None:
+                history.flush()
+        return failures
+
+
+def main(argv=None) -> int:
+    from scenarios.hiring_flow import run_hiring_flow
+
+    parser = argparse.ArgumentParser(description="Run the hiring flow repeatedly with browser recycling")
+    parser.add_argument("--hours", type=float, default=None, help="Stop after this many hours")
+    parser.add_argument("--iterations", type=int, default=None, help="Stop after this many iterations")
+    parser.add_argument("--interval", type=float, default=SOAK_INTERVAL, help="Seconds between iteration starts")
+    parser.add_argument("--max-rss-mb", type=float, default=SOAK_MAX_RSS_MB)
+    parser.add_argument("--max-heap-mb", type=float, default=SOAK_MAX_HEAP_MB)
+    parser.add_argument("--max-handles", type=int, default=SOAK_MAX_HANDLES)
+    parser.add_argument("--recycle-after", type=int, default=SOAK_RECYCLE_AFTER, help="Runs per browser, 0 for no limit")
+    args = parser.parse_args(argv)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    runner = SoakRunner(
+        run_hiring_flow,
+        screenshot_handler=ScreenshotHandler.from_config(),
+        interval=args.interval,
+        thresholds={
+            "max_rss_mb": args.max_rss_mb,
+            "max_heap_mb": args.max_heap_mb,
+            "max_handles": args.max_handles,
+            "recycle_after": args.recycle_after,
+        },
+        report_path=os.path.join(REPORT_DIR, "soak.jsonl"),
+    )
+    try:
+        failures = runner.run(args.iterations, args.hours * 3600 if args.hours else None)
+    except KeyboardInterrupt:
+        failures = 0
+    print(f"\n{failures} failed iteration(s), browser recycled {runner.recycles} time(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+Hermetic local stand-in for insiderone.com and jobs.lever.co.
+
+Record mode captures every page and asset the hiring flow touches into a fixture
+directory. Replay mode serves each recorded host on its own local port, rewriting
+absolute links between recorded hosts, with configurable latency, jitter and bandwidth.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+MANIFEST_NAME = "manifest.json"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+TEXT_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg")
+
+
+def _request_key(url: str) -> str:
+    """Manifest key for a URL: host, path and query with sorted parameters"""
+    parsed = urllib.parse.urlsplit(url)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)))
+    return f"{parsed.netloc.lower()}{parsed.path or '/'}" + (f"?{query}" if query else "")
+
+
+class FixtureStore:
+    """Recorded responses on disk, indexed by a JSON manifest"""
+
+    def __init__(self, fixture_dir: str):
+        """
+        Initialize fixture store
+
+        Args:
+            fixture_dir: Directory holding manifest.json and response bodies
+        """
+        self.fixture_dir = fixture_dir
+        self.manifest_path = os.path.join(fixture_dir, MANIFEST_NAME)
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.entries = json.load(f)["entries"]
+
+    @property
+    def hosts(self) -> List[str]:
+        """Recorded hosts, sorted so port assignment is stable"""
+        return sorted({key.split("/", 1)[0] for key in self.entries})
+
+    def store(self, url: str, status: int, content_type: str, body: bytes):
+        """
+        Save a single response
+
+        Args:
+            url: Absolute request URL
+            status: HTTP status code
+            content_type: Content-Type header value
+            body: Raw response body
+        """
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        digest = hashlib.sha1(body).hexdigest()
+        rel_path = os.path.join(host, digest)
+        abs_path = os.path.join(self.fixture_dir, rel_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        if not os.path.exists(abs_path):
+            with open(abs_path, "wb") as f:
+                f.write(body)
+        self.entries[_request_key(url)] = {
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "body": rel_path,
+        }
+
+    def save(self):
+        """Write the manifest to disk"""
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": self.entries}, f, indent=2, sort_keys=True)
+
+    def lookup(self, host: str, path: str) -> Optional[dict]:
+        """
+        Find the recorded response for a request
+
+        Args:
+            host: Original host name
+            path: Request path including query string
+
+        Returns:
+            Manifest entry or None
+        """
+        return self.entries.get(_request_key(f"http://{host}{path}"))
+
+    def read_body(self, entry: dict) -> bytes:
+        with open(os.path.join(self.fixture_dir, entry["body"]), "rb") as f:
+            return f.read()
+
+
+class Recorder:
+    """Fetches URLs over the network and stores them in a FixtureStore"""
+
+    def __init__(self, store: FixtureStore, timeout: int = 20):
+        """
+        Initialize recorder
+
+        Args:
+            store: Fixture store to write into
+            timeout: Per-request timeout in seconds
+        """
+        self.store = store
+        self.timeout = timeout
+
+    def fetch(self, url: str) -> bool:
+        """
+        Fetch a URL and record it, error responses included
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            True if a response was recorded
+        """
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Accept-Encoding": "identity"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self.store.store(url, response.status, response.headers.get("Content-Type", ""), response.read())
+        except urllib.error.HTTPError as e:
+            self.store.store(url, e.code, e.headers.get("Content-Type", ""), e.read())
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Failed to record {url}: {e}")
+            return False
+        return True
+
+    def record(self, urls: Iterable[str]) -> int:
+        """
+        Record every URL and save the manifest
+
+        Args:
+            urls: Absolute URLs to capture
+
+        Returns:
+            Number of responses recorded
+        """
+        count = 0
+        for url in dict.fromkeys(urls):
+            if url.startswith(("http://", "https://")) and self.fetch(url):
+                count += 1
+        self.store.save()
+        return count
+
+
+def collect_flow_urls() -> List[str]:
+    """
+    Run the hiring flow in Chrome with performance logging and return every URL it loaded
+
+    Returns:
+        Absolute URLs of documents and assets fetched by the browser
+    """
+    from scenarios.hiring_flow import run_hiring_flow
+    from utils.devtools_log import DevtoolsEventTap, enable_performance_log
+    from utils.driver_factory import build_chrome_options, create_chrome_driver
+    from utils.screenshot_handler import ScreenshotHandler
+
+    driver = create_chrome_driver(enable_performance_log(build_chrome_options()))
+    urls = []
+
+    def on_event(method, params, timestamp):
+        if method == "Network.requestWillBeSent" and params["request"].get("method") == "GET":
+            urls.append(params["request"]["url"].split("#", 1)[0])
+
+    tap = DevtoolsEventTap.for_driver(driver)
+    tap.subscribe(on_event)
+    try:
+        try:
+            run_hiring_flow(driver, ScreenshotHandler())
+        except Exception as e:
+            print(f"Hiring flow failed while recording, keeping what was loaded: {e}")
+        tap.drain()
+    finally:
+        driver.quit()
+    return urls
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    server_version = "StandIn/1.0"
+    # Keep-alive, like the real hosts; headers and body go out in separate writes
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        standin = self.server.standin
+        entry = standin.store.lookup(self.server.origin_host, self.path)
+        standin.inject_latency()
+        if entry is None:
+            self.send_error(404, "Not recorded")
+            return
+
+        body = standin.store.read_body(entry)
+        if entry["content_type"].startswith(TEXT_TYPES):
+            body = standin.rewrite(body)
+
+        self.send_response(entry["status"])
+        self.send_header("Content-Type", entry["content_type"] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        standin.write_throttled(self.wfile, body)
+
+    def do_HEAD(self):
+        standin = self.server.standin
+        entry = standin.store.lookup(self.server.origin_host, self.path)
+        self.send_response(entry["status"] if entry else 404)
+        self.send_header("Content-Length", str(len(standin.store.read_body(entry)) if entry else 0))
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Replays a FixtureStore, one local HTTP server per recorded host"""
+
+    def __init__(
+        self,
+        fixture_dir: str,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        bandwidth_kbps: Optional[float] = None,
+        bind: str = "127.0.0.1",
+        base_port: int = 0,
+    ):
+        """
+        Initialize stand-in server
+
+        Args:
+            fixture_dir: Directory written by record mode
+            latency_ms: Added delay before every response
+            jitter_ms: Random +/- variation applied to latency
+            bandwidth_kbps: Response body throughput cap, None for unlimited
+            bind: Interface to listen on
+            base_port: First port to use, hosts get consecutive ports; 0 picks free ports
+        """
+        self.store = FixtureStore(fixture_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bandwidth_kbps = bandwidth_kbps
+        self.bind = bind
+        self.base_port = base_port
+        self.origins: Dict[str, str] = {}
+        self._servers: List[ThreadingHTTPServer] = []
+        self._rewrite_pattern = None
+
+    def start(self):
+        """Start serving every recorded host in background threads"""
+        for index, host in enumerate(self.store.hosts):
+            port = self.base_port + index if self.base_port else 0
+            server = ThreadingHTTPServer((self.bind, port), _StandInHandler)
+            server.daemon_threads = True
+            server.standin = self
+            server.origin_host = host
+            self._servers.append(server)
+            self.origins[host] = f"http://{self.bind}:{server.server_address[1]}"
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        if self.origins:
+            hosts = "|".join(re.escape(h) for h in sorted(self.origins, key=len, reverse=True))
+            self._rewrite_pattern = re.compile(rf"(?:https?:)?(?:\\?/){{2}}({hosts})(?![\w.-])".encode())
+        return self
+
+    def stop(self):
+        """Shut down all servers"""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def url_for(self, url: str) -> str:
+        """
+        Translate an original URL to its stand-in URL
+
+        Args:
+            url: Absolute URL on a recorded host
+
+        Returns:
+            Equivalent URL on the local server
+        """
+        parsed = urllib.parse.urlsplit(url)
+        origin = self.origins[parsed.netloc.lower()]
+        return origin + urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, parsed.fragment))
+
+    def rewrite(self, body: bytes) -> bytes:
+        """Point absolute links to recorded hosts at their local origins"""
+        if self._rewrite_pattern is None:
+            return body
+        return self._rewrite_pattern.sub(
+            lambda m: self.origins[m.group(1).decode().lower()].encode(), body
+        )
+
+    def inject_latency(self):
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def write_throttled(self, wfile, body: bytes):
+        if not self.bandwidth_kbps:
+            wfile.write(body)
+            return
+        tick = 0.05
+        chunk_size = max(1, int(self.bandwidth_kbps * 1024 / 8 * tick))
+        for offset in range(0, len(body), chunk_size):
+            wfile.write(body[offset:offset + chunk_size])
+            wfile.flush()
+            time.sleep(tick)
+
+
+def main(argv=None) -> int:
+    from config import BASE_URL, LEVER_BOARD_URL, STANDIN_BASE_PORT, STANDIN_FIXTURE_DIR
+
+    parser = argparse.ArgumentParser(description="Record or replay the hiring flow")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Capture pages and assets")
+    record.add_argument("--fixture-dir", default=STANDIN_FIXTURE_DIR)
+    record.add_argument("--url", action="append", default=[], help="Record these URLs instead of running the flow")
+
+    serve = sub.add_parser("serve", help="Replay recorded fixtures")
+    serve.add_argument("--fixture-dir", default=STANDIN_FIXTURE_DIR)
+    serve.add_argument("--base-port", type=int, default=STANDIN_BASE_PORT)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0)
+    serve.add_argument("--bandwidth-kbps", type=float, default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        urls = args.url or collect_flow_urls()
+        count = Recorder(FixtureStore(args.fixture_dir)).record(urls)
+        print(f"Recorded {count} responses into {args.fixture_dir}")
+        return 0
+
+    server = StandInServer(
+        args.fixture_dir,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        bandwidth_kbps=args.bandwidth_kbps,
+        base_port=args.base_port,
+    ).start()
+    for host, origin in server.origins.items():
+        print(f"{host} -> {origin}")
+    print("\nPoint the suite at the stand-in with:")
+    print(f"  export HIRING_BASE_URL={server.url_for(BASE_URL)}")
+    print(f"  export LEVER_BOARD_URL={server.url_for(LEVER_BOARD_URL)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Run-wide time budget shared out across scenario steps.
+
+Each step gets a share of what is left of the run budget, weighted by the step's p95
+duration in past runs. Every wait inside the step is capped at the step's remaining
+share, so the worst-case wall time of a run is the budget, not the sum of every
+configured timeout. Failed steps are retried with jittered exponential backoff while
+budget remains.
+"""
+import contextvars
+import json
+import math
+import os
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence
+
+from config import RETRY_BACKOFF, RUN_BUDGET, STEP_RETRIES, STEP_TIMINGS_PATH
+
+# Shortest wait a step is given even when its share is nearly used up
+MIN_WAIT = 0.5
+
+
+class BudgetExceeded(TimeoutError):
+    """The run budget is used up; no further waits or retries are attempted"""
+
+
+class StepTimingHistory:
+    """Recent successful durations per step, persisted as JSON"""
+
+    def __init__(self, path: str, window: int = 50):
+        """
+        Initialize history
+
+        Args:
+            path: JSON file with {step: [seconds, ...]}
+            window: Number of recent durations kept per step
+        """
+        self.path = path
+        self.window = window
+        self.durations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.durations = json.load(f)
+
+    def record(self, step: str, seconds: float):
+        with self._lock:
+            values = self.durations.setdefault(step, [])
+            values.append(round(seconds, 3))
+            del values[:-self.window]
+
+    def p95(self, step: str) -> Optional[float]:
+        """95th percentile (nearest rank) of the recorded durations, None without history"""
+        values = sorted(self.durations.get(step, ()))
+        if not values:
+            return None
+        return values[max(0, math.ceil(0.95 * len(values)) - 1)]
+
+    def median(self, step: str) -> Optional[float]:
+        """Median of the recorded durations, None without history"""
+        values = self.durations.get(step)
+        return statistics.median(values) if values else None
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.durations, f, indent=0, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+class RunBudget:
+    """Time budget for one scenario run"""
+
+    def __init__(
+        self,
+        total: float,
+        steps: Sequence[str],
+        history: Optional[StepTimingHistory] = None,
+        retries: int = 0,
+        backoff: float = 0.5,
+    ):
+        """
+        Initialize budget; the clock starts now
+
+        Args:
+            total: Seconds for the whole run
+            steps: Step names in execution order, used to share out the budget
+            history: Past durations, weights steps by their p95
+            retries: Extra attempts per failed step
+            backoff: Base delay in seconds, attempt n waits up to backoff * 2**n
+        """
+        self.total = total
+        self.steps = list(steps)
+        self.history = history
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = time.monotonic() + total
+        self.attempts: Dict[str, int] = {}
+        # Seconds spent in untimed() blocks during the current step
+        self._untimed = 0.0
+
+    @classmethod
+    def from_config(cls, steps: Sequence[str]) -> "RunBudget":
+        """Budget, retries and shared timing history from config.py"""
+        return cls(RUN_BUDGET, steps, get_step_history(), STEP_RETRIES, RETRY_BACKOFF)
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def _weight(self, step: str, default: float) -> float:
+        p95 = self.history.p95(step) if self.history else None
+        return p95 if p95 else default
+
+    def allowance(self, step: str) -> float:
+        """
+        Seconds the step may take: its weighted share of the budget that is left
+
+        Args:
+            step: Step name
+
+        Returns:
+            Allowance in seconds
+        """
+        upcoming = self.steps[self.steps.index(step):] if step in self.steps else [step]
+        known = [p for p in (self.history.p95(s) if self.history else None for s in self.steps) if p]
+        # Steps without history weigh as much as a typical step with history
+        default = statistics.median(known) if known else 1.0
+        weights = [self._weight(s, default) for s in upcoming]
+        return max(0.0, self.remaining()) * weights[0] / sum(weights)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff, never longer than a tenth of the remaining budget"""
+        return min(random.uniform(0, self.backoff * 2 ** attempt), max(0.0, self.remaining()) / 10)
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Run a block as one attempt of a step; waits inside are capped by step_timeout()
+
+        Args:
+            name: Step name
+        """
+        if self.remaining() <= 0:
+            raise BudgetExceeded(f"Run budget of {self.total:.0f}s used up before step '{name}'")
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+        start = time.monotonic()
+        self._untimed = 0.0
+        step_deadline = min(self.deadline, start + self.allowance(name))
+        token = _current.set((self, name, step_deadline))
+        try:
+            yield
+        finally:
+            _current.reset(token)
+        if self.history is not None:
+            self.history.record(name, time.monotonic() - start - self._untimed)
+
+
+_current = contextvars.ContextVar("step_budget", default=None)
+_history: Optional[StepTimingHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_step_history() -> StepTimingHistory:
+    """Process-wide timing history, shared by every run"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = StepTimingHistory(STEP_TIMINGS_PATH)
+        return _history
+
+
+@contextmanager
+def untimed():
+    """
+    Run a block that is not part of the current step, e.g. metrics collected after a
+    page-object step. Its time is given back to the run and the step, and left out of
+    the step's recorded duration. Outside a budgeted step the block just runs.
+    """
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    budget, name, step_deadline = current
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        budget.deadline += elapsed
+        budget._untimed += elapsed
+        _current.set((budget, name, step_deadline + elapsed))
+
+
+def step_timeout(timeout: float) -> float:
+    """
+    Cap a configured wait to what the current step and run have left.
+    Outside a budgeted step the timeout is returned unchanged.
+
+    Args:
+        timeout: Configured timeout in seconds
+
+    Returns:
+        Effective timeout in seconds
+    """
+    current = _current.get()
+    if current is None:
+        return timeout
+    budget, name, step_deadline = current
+    now = time.monotonic()
+    if budget.deadline - now <= 0:
+        raise BudgetExceeded(f"Run budget of {budget.total:.0f}s used up in step '{name}'")
+    return max(MIN_WAIT, min(timeout, step_deadline - now))
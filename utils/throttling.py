@@ -0,0 +1,294 @@
+"""
+Named network/CPU throttling profiles and a sweep that runs the hiring flow under each.
+
+A profile emulates a slow link with Network.emulateNetworkConditions and a starved
+CPU with Emulation.setCPUThrottlingRate. The sweep runs the flow a few times per
+profile, without a run budget so every wait gets its configured timeout, and
+reports a latency curve per page-object step: median and worst duration per
+profile, and how close the slowest wait inside the step came to its timeout.
+Waits past TIMEOUT_WARN_RATIO of their timeout are flagged, and a timeout is
+suggested for every wait from the worst profile's durations (reports/throttling_sweep.json):
+
+    python -m utils.throttling --profile none --profile fast-3g --profile slow-3g-cpu-6x --runs 3
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config import REPORT_DIR, RUN_BUDGET, THROTTLING_SWEEP_RUNS, TIMEOUT_WARN_RATIO
+from utils.instrumentation import Instrumentation, configure_every_window, get_instrumentation
+
+# Throughput in bytes/s, latency in ms; None leaves the network or CPU untouched
+PROFILES: Dict[str, dict] = {
+    "none": {"network": None, "cpu_rate": 1},
+    # Chrome DevTools presets
+    "fast-3g": {"network": {"latency": 562.5, "download": 180000, "upload": 84375}, "cpu_rate": 1},
+    "slow-3g": {"network": {"latency": 2000, "download": 50000, "upload": 50000}, "cpu_rate": 1},
+    # A CI runner sharing its cores with other jobs
+    "cpu-4x": {"network": None, "cpu_rate": 4},
+    # Lighthouse mobile: 150 ms RTT, 1.6 Mbps down, 750 Kbps up, 4x slower CPU
+    "mobile": {"network": {"latency": 150, "download": 200000, "upload": 93750}, "cpu_rate": 4},
+    "slow-3g-cpu-6x": {"network": {"latency": 2000, "download": 50000, "upload": 50000}, "cpu_rate": 6},
+}
+# Suggested timeout = worst profile's slowest wait times this factor, rounded up to whole seconds
+TIMEOUT_SAFETY = 1.5
+
+
+def apply_throttling(driver, name: str) -> dict:
+    """
+    Apply a named profile to the driver's browser session.
+    Emulation is per tab, so the profile is applied to every window the driver switches
+    to (e.g. the Lever tab) before the next command runs there. Steps that end in a
+    window they never switched to explicitly are caught after the step.
+
+    Args:
+        driver: Selenium Chrome WebDriver instance
+        name: Key in PROFILES
+
+    Returns:
+        The applied profile
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown throttling profile '{name}'. Available: {', '.join(PROFILES)}")
+    configure_every_window(driver, "throttling", lambda: _throttle_current_window(driver, PROFILES[name]))
+    return PROFILES[name]
+
+
+def _throttle_current_window(driver, profile: dict):
+    network = profile["network"]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+        "offline": False,
+        "latency": network["latency"] if network else 0,
+        # -1 disables throughput throttling
+        "downloadThroughput": network["download"] if network else -1,
+        "uploadThroughput": network["upload"] if network else -1,
+    })
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile["cpu_rate"]})
+
+
+def step_latencies(
+    instrumentation: Instrumentation,
+    since: float,
+    until: float,
+    thread_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Page-object steps of one run with the waits that ran inside them
+
+    Args:
+        instrumentation: Instrumentation that recorded the run
+        since: perf_counter() value when the run started
+        until: perf_counter() value when the run ended
+        thread_id: Only spans recorded on this thread
+
+    Returns:
+        [{"name", "duration", "error", "waits": [{"name", "duration", "timeout"}, ...]}, ...], oldest first
+    """
+    with instrumentation._lock:
+        spans = [
+            span for span in sorted(instrumentation.spans, key=lambda s: s.start)
+            if since <= span.start and (span.end or until) <= until
+            and (thread_id is None or span.thread_id == thread_id)
+        ]
+    steps = []
+    for step in (span for span in spans if span.kind == "step"):
+        waits = [
+            {"name": wait.name, "duration": wait.duration, "timeout": wait.timeout}
+            for wait in spans
+            if wait.kind == "wait" and wait.timeout and step.start <= wait.start and wait.end <= step.end
+        ]
+        steps.append({"name": step.name, "duration": step.duration, "error": step.error, "waits": waits})
+    return steps
+
+
+class SweepResult:
+    """Runs of the flow per throttling profile, and the latency curves built from them"""
+
+    def __init__(self):
+        self.runs: Dict[str, List[dict]] = OrderedDict()
+
+    def add_run(self, profile: str, duration: float, error: Optional[str], steps: List[dict]):
+        self.runs.setdefault(profile, []).append({"duration": duration, "error": error, "steps": steps})
+
+    def curves(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Per step and profile: median and worst duration, failures, and the slowest
+        wait's share of its timeout (1.0 or more means the timeout was hit)
+
+        Returns:
+            {step: {profile: {...}}}, steps in the order the flow ran them
+        """
+        curves: Dict[str, Dict[str, dict]] = OrderedDict()
+        for profile, runs in self.runs.items():
+            by_step: Dict[str, List[dict]] = OrderedDict()
+            for run in runs:
+                for step in run["steps"]:
+                    by_step.setdefault(step["name"], []).append(step)
+            for name, samples in by_step.items():
+                ratios = [wait["duration"] / wait["timeout"] for step in samples for wait in step["waits"]]
+                worst_ratio = max(ratios, default=0.0)
+                curves.setdefault(name, OrderedDict())[profile] = {
+                    "median": statistics.median(step["duration"] for step in samples),
+                    "max": max(step["duration"] for step in samples),
+                    "runs": len(samples),
+                    "failures": sum(1 for step in samples if step["error"]),
+                    "timeout_ratio": round(worst_ratio, 3),
+                    "at_risk": worst_ratio >= TIMEOUT_WARN_RATIO,
+                    "exceeded": worst_ratio >= 1.0 or any("Timeout" in (step["error"] or "") for step in samples),
+                }
+        return curves
+
+    def suggested_timeouts(self) -> Dict[str, dict]:
+        """
+        Per "step / wait": the configured timeout, the slowest observed wait and the worst
+        profile, and a timeout that covers it with TIMEOUT_SAFETY headroom
+        """
+        suggestions: Dict[str, dict] = OrderedDict()
+        for profile, runs in self.runs.items():
+            for run in runs:
+                for step in run["steps"]:
+                    for wait in step["waits"]:
+                        key = f"{step['name']} / {wait['name']}"
+                        entry = suggestions.setdefault(key, {"configured": wait["timeout"], "observed": 0.0, "profile": None})
+                        entry["configured"] = max(entry["configured"], wait["timeout"])
+                        if wait["duration"] >= entry["observed"]:
+                            entry["observed"], entry["profile"] = wait["duration"], profile
+        for entry in suggestions.values():
+            entry["observed"] = round(entry["observed"], 3)
+            entry["suggested"] = max(1, math.ceil(entry["observed"] * TIMEOUT_SAFETY))
+        return suggestions
+
+    def totals(self) -> Dict[str, dict]:
+        """Median flow duration per profile against the run budget"""
+        return OrderedDict(
+            (profile, {
+                "median": statistics.median(run["duration"] for run in runs),
+                "failures": sum(1 for run in runs if run["error"]),
+                "over_budget": statistics.median(run["duration"] for run in runs) > RUN_BUDGET,
+            })
+            for profile, runs in self.runs.items()
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "profiles": {name: PROFILES.get(name) for name in self.runs},
+            "totals": self.totals(),
+            "curves": self.curves(),
+            "suggested_timeouts": self.suggested_timeouts(),
+            "runs": self.runs,
+        }
+
+    def format(self) -> str:
+        """Median seconds per step and profile; "!" past TIMEOUT_WARN_RATIO of a timeout, "✗" when one was hit"""
+        profiles = list(self.runs)
+        width = max([len("total")] + [len(name) for name in self.curves()])
+        lines = [f"{'step':<{width}}" + "".join(f"{profile:>18}" for profile in profiles)]
+        for name, by_profile in self.curves().items():
+            cells = []
+            for profile in profiles:
+                point = by_profile.get(profile)
+                if point is None:
+                    cells.append(f"{'-':>18}")
+                    continue
+                mark = "✗" if point["exceeded"] else "!" if point["at_risk"] else " "
+                cells.append(f"{point['median']:>16.2f}s{mark}")
+            lines.append(f"{name:<{width}}" + "".join(cells))
+        totals = self.totals()
+        lines.append(f"{'total':<{width}}" + "".join(
+            f"{totals[profile]['median']:>16.2f}s{'✗' if totals[profile]['over_budget'] else ' '}" for profile in profiles
+        ))
+        changes = [
+            f"  {key}: {entry['configured']:g}s → {entry['suggested']}s (worst {entry['observed']:.2f}s on {entry['profile']})"
+            for key, entry in self.suggested_timeouts().items()
+            if entry["observed"] >= TIMEOUT_WARN_RATIO * entry["configured"]
+        ]
+        if changes:
+            lines.append("\nTimeouts to raise:")
+            lines.extend(changes)
+        return "\n".join(lines)
+
+    def write(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
+
+
+def run_sweep(
+    profiles: Sequence[str],
+    runs: int = THROTTLING_SWEEP_RUNS,
+    factory: Optional[Callable] = None,
+    scenario: Optional[Callable] = None,
+    screenshot_handler=None,
+) -> SweepResult:
+    """
+    Run the scenario `runs` times under every profile, one browser session per profile
+
+    Args:
+        profiles: Keys in PROFILES
+        runs: Runs per profile
+        factory: Callable(throttling_profile) returning a configured driver
+        scenario: Callable(driver, screenshot_handler), defaults to the hiring flow without a run budget
+        screenshot_handler: Screenshot handler passed to the scenario
+
+    Returns:
+        SweepResult with every run's step latencies
+    """
+    from scenarios.hiring_flow import build_hiring_graph
+    from utils.driver_factory import create_chrome_driver
+    from utils.driver_pool import DriverPool
+    from utils.screenshot_handler import ScreenshotHandler
+
+    unknown = [name for name in profiles if name not in PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown throttling profile(s) {', '.join(unknown)}. Available: {', '.join(PROFILES)}")
+    factory = factory or (lambda profile: create_chrome_driver(throttling_profile=profile))
+    if scenario is None:
+        graph = build_hiring_graph()
+        scenario = lambda driver, handler: graph.run(driver, handler, "apply_form")
+    screenshot_handler = screenshot_handler or ScreenshotHandler.from_config()
+    instrumentation = get_instrumentation()
+
+    result = SweepResult()
+    for profile in profiles:
+        driver = factory(profile)
+        try:
+            for i in range(runs):
+                start = time.perf_counter()
+                try:
+                    scenario(driver, screenshot_handler)
+                    error = None
+                except Exception:
+                    error = traceback.format_exc()
+                end = time.perf_counter()
+                result.add_run(profile, end - start, error, step_latencies(instrumentation, start, end))
+                print(f"{'✓' if error is None else '❌'} {profile} run {i + 1}/{runs} ({end - start:.1f}s)")
+                # Cold cache and a single tab for every run
+                DriverPool.reset(driver)
+        finally:
+            driver.quit()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the hiring flow under each throttling profile")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES), help="Profile to sweep, repeatable (default: all)")
+    parser.add_argument("--runs", type=int, default=THROTTLING_SWEEP_RUNS, help="Runs per profile")
+    args = parser.parse_args(argv)
+
+    result = run_sweep(args.profile or list(PROFILES), args.runs)
+    print(result.format())
+    print(f"\nReport written: {result.write(os.path.join(REPORT_DIR, 'throttling_sweep.json'))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+"""
+Visual baselines for screenshots: only the tiles that differ from a step's baseline are stored.
+
+Baselines are keyed by page-object step: whenever a step passes, the screen it leaves
+behind seeds the baseline of its name ("JobListingPage.click_apply_button"), and an
+unapproved one older than VISUAL_BASELINE_REFRESH_HOURS is refreshed
+(ScreenshotHandler.watch_steps). A failure screenshot is compared with the baseline of
+the last step that passed before it, i.e. the screen the failing step started on.
+Screenshots taken before any step passed use their name as key, trailing run numbers
+dropped ("failed_hiring_flow_3" → "failed_hiring_flow"). `approve` sets a known-good
+baseline that refreshes never replace; failure screenshots never seed one and are
+stored in full until their key has a baseline.
+Captures of a key with a baseline are compared in two passes:
+
+1. a 64-bit DCT perceptual hash: identical bytes skip the diff, and a hash far from
+   the baseline's means another page is on screen, so every tile is kept;
+2. a vectorized per-tile pixel diff: tiles where any channel moved more than
+   VISUAL_PIXEL_TOLERANCE are kept.
+
+The kept tiles are written as one PNG strip inside a .vdelta.npz file next to the
+other screenshots. The full image is restored, or a highlighted diff is drawn, on demand:
+
+    python -m utils.visual_diff show screenshots/failed_hiring_flow_*.vdelta.npz
+    python -m utils.visual_diff diff screenshots/<file>.vdelta.npz -o diff.png
+    python -m utils.visual_diff approve screenshots/<file>.vdelta.npz
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from config import VISUAL_BASELINE_DIR, VISUAL_PHASH_THRESHOLD, VISUAL_PIXEL_TOLERANCE, VISUAL_TILE_SIZE
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # numpy and Pillow are optional, visual baselines are then disabled
+    np = Image = None
+
+DELTA_EXTENSION = ".vdelta.npz"
+_HASH_SIZE = 8
+_HASH_SAMPLE = 32
+
+
+def available() -> bool:
+    """Whether numpy and Pillow are installed"""
+    return np is not None and Image is not None
+
+
+def baseline_key(name: str) -> str:
+    """Baseline key of a screenshot name: "failed_hiring_flow_3" → "failed_hiring_flow" """
+    return re.sub(r"_\d+$", "", name)
+
+
+def decode(png: bytes) -> "np.ndarray":
+    """PNG bytes → height x width x 3 uint8 array"""
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+
+
+def encode(pixels: "np.ndarray") -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+_dct_matrix = None
+
+
+def phash(pixels: "np.ndarray") -> int:
+    """
+    64-bit perceptual hash: 32x32 grayscale, 2-D DCT, the 8x8 lowest frequencies
+    compared with their median
+
+    Args:
+        pixels: height x width x 3 uint8 array
+
+    Returns:
+        Hash as an int
+    """
+    global _dct_matrix
+    if _dct_matrix is None:
+        n = np.arange(_HASH_SAMPLE)
+        _dct_matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * _HASH_SAMPLE))
+    gray = Image.fromarray(pixels).convert("L").resize((_HASH_SAMPLE, _HASH_SAMPLE), Image.BOX)
+    low = (_dct_matrix @ np.asarray(gray, dtype=np.float64) @ _dct_matrix.T)[:_HASH_SIZE, :_HASH_SIZE]
+    bits = (low > np.median(low.flat[1:])).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _pad(pixels: "np.ndarray", tile: int) -> "np.ndarray":
+    height, width = pixels.shape[:2]
+    if not height % tile and not width % tile:
+        return pixels
+    padding = ((0, -height % tile), (0, -width % tile)) + ((0, 0),) * (pixels.ndim - 2)
+    return np.pad(pixels, padding)
+
+
+def _tile_view(pixels: "np.ndarray", tile: int) -> "np.ndarray":
+    """rows x columns x tile x tile (x channels) view of the image, padded to whole tiles"""
+    padded = _pad(pixels, tile)
+    rows, columns = padded.shape[0] // tile, padded.shape[1] // tile
+    return padded.reshape(rows, tile, columns, tile, *padded.shape[2:]).swapaxes(1, 2)
+
+
+def changed_tiles(baseline: "np.ndarray", current: "np.ndarray", tile: int, tolerance: int) -> "np.ndarray":
+    """
+    Tiles in which any pixel channel differs by more than `tolerance`
+
+    Args:
+        baseline: height x width x 3 uint8 array
+        current: Array of the same shape
+        tile: Tile edge in pixels
+        tolerance: Largest channel difference still counted as equal (antialiasing, dithering)
+
+    Returns:
+        (N, 2) array of (row, column) tile indices, row-major
+    """
+    # An exact byte comparison finds the candidate tiles; the tolerance is only evaluated on those.
+    # Reducing each band of `tile` rows first keeps the reductions on contiguous memory.
+    height, width = baseline.shape[:2]
+    differs = np.pad((baseline != current).reshape(height, width * 3), ((0, -height % tile), (0, (-width % tile) * 3)))
+    band = np.logical_or.reduce(differs.reshape(-1, tile, differs.shape[1]), axis=1)
+    candidates = np.argwhere(band.reshape(band.shape[0], -1, tile * 3).any(axis=2))
+    if not tolerance:
+        return candidates
+    # Few tiles differ between captures of one step; slicing them avoids padding both images
+    moved = []
+    for row, column in candidates:
+        window = np.s_[row * tile:(row + 1) * tile, column * tile:(column + 1) * tile]
+        a, b = baseline[window], current[window]
+        moved.append((np.maximum(a, b) - np.minimum(a, b)).max() > tolerance)
+    return candidates[np.array(moved, dtype=bool)] if moved else candidates
+
+
+def _cut_tiles(pixels: "np.ndarray", index: "np.ndarray", tile: int) -> "np.ndarray":
+    """The listed tiles stacked vertically into one (N * tile) x tile strip"""
+    return _tile_view(pixels, tile)[index[:, 0], index[:, 1]].reshape(-1, tile, 3)
+
+
+def _paste_tiles(base: "np.ndarray", index: "np.ndarray", strip: "np.ndarray", tile: int) -> "np.ndarray":
+    height, width = base.shape[:2]
+    padded = np.array(_pad(base, tile))
+    _tile_view(padded, tile)[index[:, 0], index[:, 1]] = strip.reshape(-1, tile, tile, 3)
+    return padded[:height, :width]
+
+
+class VisualBaselines:
+    """Baseline image per key, with the delta encoding of captures against it"""
+
+    def __init__(
+        self,
+        directory: str = VISUAL_BASELINE_DIR,
+        tile: int = VISUAL_TILE_SIZE,
+        tolerance: int = VISUAL_PIXEL_TOLERANCE,
+        phash_threshold: int = VISUAL_PHASH_THRESHOLD,
+    ):
+        """
+        Args:
+            directory: Baseline PNGs and their index.json
+            tile: Tile edge in pixels
+            tolerance: Largest channel difference still counted as equal
+            phash_threshold: Hash distance from which a capture counts as another page
+        """
+        if not available():
+            raise RuntimeError("Visual baselines need numpy and Pillow")
+        self.directory = directory
+        self.tile = tile
+        self.tolerance = tolerance
+        self.phash_threshold = phash_threshold
+        self.index_path = os.path.join(directory, "index.json")
+        self.index: Dict[str, dict] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        self._pixels: Dict[str, "np.ndarray"] = {}
+        self._lock = threading.Lock()
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return key in self.index
+
+    def get(self, key: str) -> Optional[dict]:
+        """Copy of the key's index entry, None if it has no baseline"""
+        with self._lock:
+            entry = self.index.get(key)
+            return dict(entry) if entry else None
+
+    def set(self, key: str, png: bytes, approved: bool = True) -> dict:
+        """
+        Make a capture the key's baseline. The replaced file stays until `prune` finds no delta that can refer to it.
+
+        Args:
+            key: Baseline key
+            png: PNG bytes of the capture
+            approved: True for a known-good image, False for one seeded from a passing step
+
+        Returns:
+            Index entry of the new baseline
+        """
+        pixels = decode(png)
+        sha1 = hashlib.sha1(png).hexdigest()
+        filename = f"{key}-{sha1[:12]}.png"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(png)
+        entry = {
+            "file": filename,
+            "sha1": sha1,
+            "phash": f"{phash(pixels):016x}",
+            "width": int(pixels.shape[1]),
+            "height": int(pixels.shape[0]),
+            "approved": approved,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            previous = self.index.get(key)
+            if previous and previous["file"] != filename:
+                # The mtime of a replaced file marks when it stopped being the baseline
+                try:
+                    os.utime(os.path.join(self.directory, previous["file"]))
+                except OSError:
+                    pass
+            self.index[key] = entry
+            self._pixels[filename] = pixels
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        return entry
+
+    def prune(self, oldest_delta: Optional[float]) -> int:
+        """
+        Delete replaced baseline files no remaining delta can refer to.
+        A delta refers to the baseline current when it was written, so a file replaced before
+        the oldest delta still on disk is unused.
+
+        Args:
+            oldest_delta: mtime of the oldest delta still kept, None if there are none
+
+        Returns:
+            Number of files deleted
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        with self._lock:
+            current = {entry["file"] for entry in self.index.values()}
+        if os.path.exists(self.index_path):
+            # `approve` may have run in another process since this index was loaded
+            with open(self.index_path, encoding="utf-8") as f:
+                current.update(entry["file"] for entry in json.load(f).values())
+        deleted = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(".png") or entry.name in current:
+                continue
+            if oldest_delta is not None and entry.stat().st_mtime >= oldest_delta:
+                continue
+            try:
+                os.remove(entry.path)
+                deleted += 1
+            except OSError as e:
+                print(f"Failed to delete old baseline {entry.path}: {e}")
+            with self._lock:
+                self._pixels.pop(entry.name, None)
+        return deleted
+
+    def _baseline_pixels(self, filename: str) -> "np.ndarray":
+        with self._lock:
+            pixels = self._pixels.get(filename)
+        if pixels is None:
+            with open(os.path.join(self.directory, filename), "rb") as f:
+                pixels = decode(f.read())
+            with self._lock:
+                self._pixels[filename] = pixels
+        return pixels
+
+    def compare(self, key: str, png: bytes, pixels: Optional["np.ndarray"] = None) -> dict:
+        """
+        Compare a capture with the key's baseline
+
+        Args:
+            key: Baseline key, must have a baseline
+            png: PNG bytes of the capture
+            pixels: Decoded capture, when the caller already has it
+
+        Returns:
+            {"key", "baseline", "identical", "page_changed", "phash_distance", "tiles": (N, 2) array, "total_tiles"}
+        """
+        with self._lock:
+            entry = dict(self.index[key])
+        result = {"key": key, "baseline": entry["file"], "identical": False, "page_changed": False, "phash_distance": 0}
+        if hashlib.sha1(png).hexdigest() == entry["sha1"]:
+            rows, columns = -(-entry["height"] // self.tile), -(-entry["width"] // self.tile)
+            result.update(identical=True, tiles=np.empty((0, 2), dtype=np.int64), total_tiles=rows * columns)
+            return result
+        pixels = decode(png) if pixels is None else pixels
+        rows, columns = -(-pixels.shape[0] // self.tile), -(-pixels.shape[1] // self.tile)
+        result["total_tiles"] = rows * columns
+        result["phash_distance"] = hamming(phash(pixels), int(entry["phash"], 16))
+        if pixels.shape[:2] != (entry["height"], entry["width"]) or result["phash_distance"] > self.phash_threshold:
+            # Another page or another size: the baseline does not help, keep every tile
+            result["page_changed"] = True
+            result["tiles"] = np.indices((rows, columns)).reshape(2, -1).T
+            return result
+        result["tiles"] = changed_tiles(self._baseline_pixels(entry["file"]), pixels, self.tile, self.tolerance)
+        return result
+
+    def write_delta(self, path: str, key: str, png: bytes) -> dict:
+        """
+        Store a capture as the tiles that differ from the key's baseline
+
+        Args:
+            path: Target .vdelta.npz path
+            key: Baseline key, must have a baseline
+            png: PNG bytes of the capture
+
+        Returns:
+            Metadata written into the delta
+        """
+        pixels = decode(png)
+        comparison = self.compare(key, png, pixels)
+        index = comparison["tiles"].astype(np.uint16)
+        strip = encode(_cut_tiles(pixels, index, self.tile)) if len(index) else b""
+        with self._lock:
+            entry = dict(self.index[key])
+        meta = {
+            "key": key,
+            "baseline": comparison["baseline"],
+            "baseline_sha1": entry["sha1"],
+            "baseline_approved": entry["approved"],
+            "width": int(pixels.shape[1]),
+            "height": int(pixels.shape[0]),
+            "tile": self.tile,
+            "changed_tiles": int(len(index)),
+            "total_tiles": comparison["total_tiles"],
+            "phash_distance": comparison["phash_distance"],
+            "page_changed": comparison["page_changed"],
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), index=index, strip=np.frombuffer(strip, dtype=np.uint8))
+        os.replace(tmp_path, path)
+        return meta
+
+    def read_delta(self, path: str) -> Tuple[dict, "np.ndarray", "np.ndarray"]:
+        """
+        Load a delta with the pixels of its baseline and of the capture
+
+        Returns:
+            (meta, baseline pixels, capture pixels)
+        """
+        with np.load(path) as delta:
+            meta = json.loads(str(delta["meta"]))
+            index = delta["index"].astype(np.int64)
+            strip = delta["strip"].tobytes()
+        baseline = self._baseline_pixels(meta["baseline"])
+        if meta["page_changed"] and baseline.shape[:2] != (meta["height"], meta["width"]):
+            baseline = np.zeros((meta["height"], meta["width"], 3), dtype=np.uint8)
+        if not len(index):
+            return meta, baseline, baseline
+        return meta, baseline, _paste_tiles(baseline, index, decode(strip), meta["tile"])
+
+    def restore(self, path: str) -> bytes:
+        """Full PNG of the capture a delta was made from, exact up to VISUAL_PIXEL_TOLERANCE"""
+        return encode(self.read_delta(path)[2])
+
+    def render_diff(self, path: str) -> bytes:
+        """
+        Highlighted diff of a delta: unchanged areas faded, changed tiles at full
+        strength with a red outline
+
+        Returns:
+            PNG bytes
+        """
+        meta, _, current = self.read_delta(path)
+        tile = meta["tile"]
+        with np.load(path) as delta:
+            index = delta["index"].astype(np.int64)
+        height, width = current.shape[:2]
+        rows, columns = -(-height // tile), -(-width // tile)
+        mask = np.zeros((rows, columns), dtype=bool)
+        mask[index[:, 0], index[:, 1]] = True
+        # Tile grid → pixel mask, and the outline: changed pixels whose neighbour tile is unchanged
+        pixel_mask = np.repeat(np.repeat(mask, tile, axis=0), tile, axis=1)[:height, :width]
+        edge = np.zeros_like(pixel_mask)
+        edge[:, 1:] |= pixel_mask[:, 1:] != pixel_mask[:, :-1]
+        edge[1:, :] |= pixel_mask[1:, :] != pixel_mask[:-1, :]
+        edge[[0, -1], :] |= pixel_mask[[0, -1], :]
+        edge[:, [0, -1]] |= pixel_mask[:, [0, -1]]
+        image = np.where(pixel_mask[..., None], current, (current * 0.3 + 255 * 0.7).astype(np.uint8))
+        image[edge] = (230, 30, 30)
+        return encode(image)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, restore and approve screenshot deltas")
+    parser.add_argument("--baselines", default=VISUAL_BASELINE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Changed tiles and hash distance of deltas")
+    show.add_argument("paths", nargs="+")
+    for name, help_text in (("diff", "Write a highlighted diff image"), ("restore", "Write the full capture")):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument("path")
+        command.add_argument("-o", "--output", required=True)
+    approve = sub.add_parser("approve", help="Make a screenshot or delta the known-good baseline of its key")
+    approve.add_argument("path")
+    approve.add_argument("--key", help="Baseline key, defaults to the delta's key or the one derived from the file name")
+    stats = sub.add_parser("stats", help="Storage of the deltas in a directory against full images")
+    stats.add_argument("directory", nargs="?", default="screenshots")
+    args = parser.parse_args(argv)
+
+    if not available():
+        print("Visual baselines need numpy and Pillow")
+        return 1
+    baselines = VisualBaselines(args.baselines)
+    if args.command == "show":
+        for path in args.paths:
+            with np.load(path) as delta:
+                meta = json.loads(str(delta["meta"]))
+            state = "another page" if meta["page_changed"] else f"hash distance {meta['phash_distance']}"
+            print(f"{path}: {meta['changed_tiles']}/{meta['total_tiles']} tiles changed vs "
+                  f"{meta['baseline']}{'' if meta['baseline_approved'] else ' (unapproved)'}, {state}")
+    elif args.command in ("diff", "restore"):
+        data = baselines.render_diff(args.path) if args.command == "diff" else baselines.restore(args.path)
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print(f"Written: {args.output}")
+    elif args.command == "approve":
+        if args.path.endswith(DELTA_EXTENSION):
+            png = baselines.restore(args.path)
+            with np.load(args.path) as delta:
+                key = json.loads(str(delta["meta"]))["key"]
+        else:
+            with open(args.path, "rb") as f:
+                png = encode(decode(f.read()))
+            # Screenshot names end in _<timestamp>_<sequence>_<pid>
+            name = os.path.splitext(os.path.basename(args.path))[0]
+            key = baseline_key(re.sub(r"(_\d{8}_\d{6}_\d+_\d{4}_\d+)$", "", name))
+        key = args.key or key
+        entry = baselines.set(key, png, approved=True)
+        print(f"Baseline of '{key}' is now {entry['file']}")
+    else:
+        deltas = glob.glob(os.path.join(args.directory, f"*{DELTA_EXTENSION}"))
+        delta_bytes = sum(os.path.getsize(path) for path in deltas)
+        full_bytes = 0
+        for path in deltas:
+            with np.load(path) as delta:
+                meta = json.loads(str(delta["meta"]))
+            full_bytes += os.path.getsize(os.path.join(args.baselines, meta["baseline"]))
+        ratio = f", {full_bytes / delta_bytes:.1f}x smaller" if delta_bytes else ""
+        print(f"{len(deltas)} delta(s): {delta_bytes / 1024:.0f} KiB, as full images ~{full_bytes / 1024:.0f} KiB{ratio}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
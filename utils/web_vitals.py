@@ -0,0 +1,271 @@
+"""
+Core Web Vitals and resource timing of the pages under test.
+
+After a page-object step, a one-line script reads the current document's URL and time
+origin. Only when the step left the driver on a document not read yet (or one whose
+load event had not fired at the last read), a single async script reads its buffered
+performance entries: Navigation Timing, FCP, LCP, CLS (largest session window), an
+INP proxy (slowest interaction in the Event Timing buffer), a TBT proxy (long-task
+time beyond 50 ms after FCP) and the N slowest resources. Collection runs outside the
+step's time budget. Results go to reports/web_vitals.json and the run history.
+
+With WEB_VITALS=0 the run history still gets each document's Navigation Timing from
+a collector in navigation-timing mode, which reads nothing else.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from selenium.webdriver.remote.command import Command
+
+from config import WEB_VITALS_TOP_RESOURCES
+from utils.instrumentation import add_step_observer, get_instrumentation
+from utils.step_budget import untimed
+
+METRICS = ("ttfb", "dom_content_loaded", "load", "transfer_size", "fcp", "lcp", "cls", "inp", "tbt")
+
+_COLLECT_JS = """
+    var done = arguments[arguments.length - 1];
+    var topResources = arguments[0];
+    var supported = PerformanceObserver.supportedEntryTypes || [];
+    var entries = {};
+    var observers = [];
+    ['paint', 'largest-contentful-paint', 'layout-shift', 'longtask', 'event', 'first-input'].forEach(function (type) {
+        entries[type] = [];
+        if (supported.indexOf(type) < 0) { return; }
+        var observer = new PerformanceObserver(function (list) {
+            entries[type] = entries[type].concat(list.getEntries());
+        });
+        var options = {type: type, buffered: true};
+        if (type === 'event') { options.durationThreshold = 16; }
+        observer.observe(options);
+        observers.push([type, observer]);
+    });
+
+    // Buffered entries are delivered asynchronously; one task later every buffer has been replayed
+    setTimeout(function () {
+        observers.forEach(function (pair) {
+            entries[pair[0]] = entries[pair[0]].concat(pair[1].takeRecords());
+            pair[1].disconnect();
+        });
+        function round(value) { return value == null ? null : Math.round(value * 10) / 10; }
+
+        var fcpEntry = entries['paint'].filter(function (e) { return e.name === 'first-contentful-paint'; })[0];
+        var fcp = fcpEntry ? fcpEntry.startTime : null;
+        var lcpEntries = entries['largest-contentful-paint'];
+        var lcp = lcpEntries.length ? lcpEntries[lcpEntries.length - 1].startTime : null;
+
+        var cls = 0, session = 0, first = 0, last = 0;
+        entries['layout-shift'].forEach(function (e) {
+            if (e.hadRecentInput) { return; }
+            if (session && e.startTime - last < 1000 && e.startTime - first < 5000) {
+                session += e.value;
+            } else {
+                session = e.value;
+                first = e.startTime;
+            }
+            last = e.startTime;
+            cls = Math.max(cls, session);
+        });
+
+        var inp = null;
+        entries['event'].concat(entries['first-input']).forEach(function (e) {
+            if (e.interactionId || e.entryType === 'first-input') { inp = Math.max(inp || 0, e.duration); }
+        });
+
+        var tbt = 0;
+        entries['longtask'].forEach(function (e) {
+            if (fcp === null || e.startTime >= fcp) { tbt += Math.max(0, e.duration - 50); }
+        });
+
+        var nav = performance.getEntriesByType('navigation')[0];
+        var resources = performance.getEntriesByType('resource');
+        var slowest = resources.slice().sort(function (a, b) { return b.duration - a.duration; })
+            .slice(0, topResources)
+            .map(function (r) {
+                return {
+                    name: r.name.slice(0, 300),
+                    initiator: r.initiatorType,
+                    start: round(r.startTime),
+                    duration: round(r.duration),
+                    transfer_size: r.transferSize
+                };
+            });
+
+        done({
+            url: location.href,
+            origin: performance.timeOrigin,
+            navigation_type: nav ? nav.type : null,
+            ttfb: nav ? round(nav.responseStart) : null,
+            dom_content_loaded: nav ? round(nav.domContentLoadedEventEnd) : null,
+            load: nav && nav.loadEventEnd ? round(nav.loadEventEnd) : null,
+            transfer_size: nav ? nav.transferSize : null,
+            fcp: round(fcp),
+            lcp: round(lcp),
+            cls: Math.round(cls * 10000) / 10000,
+            inp: round(inp),
+            tbt: round(tbt),
+            long_tasks: entries['longtask'].length,
+            resource_count: resources.length,
+            resources: slowest
+        });
+    }, 0);
+"""
+
+
+_DOCUMENT_JS = "return [location.href, performance.timeOrigin];"
+
+_NAVIGATION_TIMING_JS = """
+    function round(value) { return value == null ? null : Math.round(value * 10) / 10; }
+    var nav = performance.getEntriesByType('navigation')[0];
+    return {
+        url: location.href,
+        origin: performance.timeOrigin,
+        navigation_type: nav ? nav.type : null,
+        ttfb: nav ? round(nav.responseStart) : null,
+        dom_content_loaded: nav ? round(nav.domContentLoadedEventEnd) : null,
+        load: nav && nav.loadEventEnd ? round(nav.loadEventEnd) : null,
+        transfer_size: nav ? nav.transferSize : null
+    };
+"""
+
+
+class WebVitalsCollector:
+    """Reads performance entries of each document the driver visits, after the step that reached it"""
+
+    # Oldest pages are dropped beyond this, so a long-lived driver keeps a bounded history
+    MAX_PAGES = 200
+
+    def __init__(self, driver, top_resources: int = WEB_VITALS_TOP_RESOURCES, vitals: bool = True):
+        """
+        Initialize collector and start observing the driver's steps
+
+        Args:
+            driver: Selenium WebDriver instance
+            top_resources: Number of slowest resources kept per page
+            vitals: False reads Navigation Timing only
+        """
+        self.driver = driver
+        self.top_resources = top_resources
+        self.vitals = vitals
+        self.pages: Dict[tuple, dict] = OrderedDict()
+        self._untaken = set()
+        # (url, time origin) of the last document read, and whether its load event had fired
+        self._document: Optional[tuple] = None
+        self._loaded = False
+        add_step_observer(driver, self._on_step)
+
+    def _execute(self, command: str, params: dict):
+        # Bypass the command counter so collection does not show up in the step's command count
+        execute = getattr(self.driver, "_uninstrumented_execute", self.driver.execute)
+        return execute(command, params)["value"]
+
+    def _on_step(self, step_name: str, error):
+        with untimed():
+            try:
+                document = tuple(self._execute(Command.W3C_EXECUTE_SCRIPT, {"script": _DOCUMENT_JS, "args": []}))
+                if document != self._document or not self._loaded:
+                    self.collect(step_name)
+            except Exception as e:
+                print(f"Web vitals collection failed after {step_name}: {e}")
+
+    def collect(self, step_name: str):
+        """
+        Read the current document now
+
+        Args:
+            step_name: Step that ran on the document
+        """
+        if self.vitals:
+            snapshot = self._execute(
+                Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": _COLLECT_JS, "args": [self.top_resources]}
+            )
+        else:
+            snapshot = self._execute(Command.W3C_EXECUTE_SCRIPT, {"script": _NAVIGATION_TIMING_JS, "args": []})
+        if snapshot:
+            self._document = (snapshot["url"], snapshot["origin"])
+            self._loaded = snapshot.get("load") is not None
+            self.add(snapshot, step_name)
+
+    def add(self, snapshot: dict, step_name: str):
+        """
+        Store a snapshot; a later snapshot of the same document replaces the earlier one
+
+        Args:
+            snapshot: Result of the collection script
+            step_name: Step that ran on the document
+        """
+        key = (snapshot["url"], snapshot.pop("origin"))
+        previous = self.pages.get(key)
+        # Attributed to the step that first saw the document, i.e. the one that navigated to it
+        self.pages[key] = dict(snapshot, step=previous["step"] if previous else step_name)
+        self._untaken.add(key)
+        while len(self.pages) > self.MAX_PAGES:
+            oldest, _ = self.pages.popitem(last=False)
+            self._untaken.discard(oldest)
+
+    def take(self) -> List[dict]:
+        """Pages collected or updated since the previous take(), for the run history"""
+        pages = [page for key, page in self.pages.items() if key in self._untaken]
+        self._untaken.clear()
+        return pages
+
+
+_collectors: List[WebVitalsCollector] = []
+
+
+def collect_web_vitals(driver, top_resources: int = WEB_VITALS_TOP_RESOURCES, vitals: bool = True) -> WebVitalsCollector:
+    """
+    Attach a collector to the driver, once. With vitals it is included in the run's
+    web_vitals report; without, it only feeds Navigation Timing to the run history.
+
+    Args:
+        driver: Selenium WebDriver instance
+        top_resources: Number of slowest resources kept per page
+        vitals: False reads Navigation Timing only
+
+    Returns:
+        WebVitalsCollector
+    """
+    collector = getattr(driver, "_web_vitals", None)
+    if collector is None:
+        collector = driver._web_vitals = WebVitalsCollector(driver, top_resources, vitals)
+        if vitals:
+            if not _collectors:
+                get_instrumentation().add_report("web_vitals", web_vitals_report)
+            _collectors.append(collector)
+    return collector
+
+
+def detach_web_vitals(driver):
+    """
+    Drop the driver's collector from the web_vitals report, e.g. before the driver is quit
+    and replaced, so recycled drivers and their pages are not kept for the whole process
+
+    Args:
+        driver: Selenium WebDriver instance
+    """
+    collector: Optional[WebVitalsCollector] = getattr(driver, "_web_vitals", None)
+    if collector is None:
+        return
+    driver._web_vitals = None
+    if collector in _collectors:
+        _collectors.remove(collector)
+
+
+def take_web_vitals(driver) -> List[dict]:
+    """Pages the driver's collector has not handed out yet, [] without a collector"""
+    collector: Optional[WebVitalsCollector] = getattr(driver, "_web_vitals", None)
+    return collector.take() if collector else []
+
+
+def web_vitals_report() -> dict:
+    """Every collected page plus the worst value of each metric per step"""
+    pages = [page for collector in _collectors for page in collector.pages.values()]
+    worst: Dict[str, dict] = OrderedDict()
+    for page in pages:
+        row = worst.setdefault(page["step"], {"pages": 0})
+        row["pages"] += 1
+        for metric in METRICS:
+            if page.get(metric) is not None:
+                row[metric] = max(row.get(metric, page[metric]), page[metric])
+    return {"worst_by_step": worst, "pages": pages}